@@ -29,14 +29,16 @@ from .constants import BIG_ENDIAN, DEFAULT_PROCMON_PORT, LITTLE_ENDIAN
 from .event_hook import EventHook
 from .exception import BoofuzzFailure, MustImplementException, SizerNotUtilizedError, SullyRuntimeError
 from .fuzz_logger import FuzzLogger
+from .fuzz_logger_async import FuzzLoggerAsync
 from .fuzz_logger_csv import FuzzLoggerCsv
 from .fuzz_logger_curses import FuzzLoggerCurses
+from .fuzz_logger_pcap import FuzzLoggerPcap
 from .fuzz_logger_text import FuzzLoggerText
 from .fuzzable import Fuzzable
 from .fuzzable_block import FuzzableBlock
 from .ifuzz_logger import IFuzzLogger
 from .ifuzz_logger_backend import IFuzzLoggerBackend
-from .monitors import BaseMonitor, CallbackMonitor, NetworkMonitor, pedrpc, ProcessMonitor
+from .monitors import BaseMonitor, CallbackMonitor, CoverageMonitor, NetworkMonitor, pedrpc, ProcessMonitor
 from .utils.process_monitor_local import ProcessMonitorLocal
 from .primitives import (
     BasePrimitive,
@@ -59,6 +61,7 @@ from .primitives import (
     SingleBit,
 )
 from .repeater import CountRepeater, Repeater, TimeRepeater
+from .response_novelty import ResponseFingerprinter, ResponseNoveltyTracker
 from .sessions import open_test_run, Session, Target
 from .protocol_session import ProtocolSession
 from .protocol_session_reference import ProtocolSessionReference
@@ -86,6 +89,7 @@ __all__ = [
     "CallbackMonitor",
     "Checksum",
     "CountRepeater",
+    "CoverageMonitor",
     "DEFAULT_PROCMON_PORT",
     "Delim",
     "DWord",
@@ -97,8 +101,10 @@ __all__ = [
     "Fuzzable",
     "FuzzableBlock",
     "FuzzLogger",
+    "FuzzLoggerAsync",
     "FuzzLoggerCsv",
     "FuzzLoggerCurses",
+    "FuzzLoggerPcap",
     "FuzzLoggerText",
     "Group",
     "IFuzzLogger",
@@ -127,6 +133,8 @@ __all__ = [
     "Repeater",
     "Request",
     "REQUESTS",
+    "ResponseFingerprinter",
+    "ResponseNoveltyTracker",
     "s_aligned",
     "s_bigword",
     "s_binary",
@@ -0,0 +1,219 @@
+import argparse
+import collections
+import json
+import os
+import sys
+import tempfile
+import time
+
+import psutil
+
+from .. import phase_timing
+from ..blocks import Request
+from ..primitives import Delim, Group, Static, String
+from ..sessions import Session, Target
+from .targets import (
+    CERTIFICATE,
+    CrashingServer,
+    make_server,
+    serve,
+    SERVER_KINDS,
+    ServerProcess,
+    SlowAcceptServer,
+    SslEchoServer,
+    StandInServer,
+    TcpEchoServer,
+    TcpResponseServer,
+    UdpResponder,
+)
+
+__all__ = [
+    "BenchResult",
+    "CERTIFICATE",
+    "CrashingServer",
+    "format_phases",
+    "format_result",
+    "make_server",
+    "peak_rss",
+    "RESULT_HEADER",
+    "run_scenario",
+    "save_results",
+    "Scenario",
+    "SCENARIOS",
+    "SERVER_KINDS",
+    "ServerProcess",
+    "SlowAcceptServer",
+    "SslEchoServer",
+    "StandInServer",
+    "TcpEchoServer",
+    "TcpResponseServer",
+    "UdpResponder",
+]
+
+Scenario = collections.namedtuple("Scenario", ["name", "kind", "options", "description"])
+
+#: Canned benchmark scenarios by name: the stand-in server and its options.
+SCENARIOS = collections.OrderedDict(
+    (scenario.name, scenario)
+    for scenario in (
+        Scenario("tcp_echo", "tcp_echo", {}, "TCP echo server"),
+        Scenario("tcp_latency", "tcp_response", {"latency": 0.001}, "TCP server answering after 1 ms"),
+        Scenario("udp", "udp", {}, "UDP echo responder"),
+        Scenario("ssl_echo", "ssl_echo", {}, "TLS echo server"),
+        Scenario("crash", "crash", {"pattern": "%n"}, "TCP echo server crashing on %n, restarted on failure"),
+        Scenario("slow_accept", "slow_accept", {"accept_delay": 0.005}, "TCP echo server accepting every 5 ms"),
+    )
+)
+
+#: Seconds to wait for a stand-in server to crash when it did not answer.
+CRASH_TIMEOUT = 0.1
+
+BenchResult = collections.namedtuple(
+    "BenchResult", ["scenario", "cases", "seconds", "cases_per_second", "failures", "restarts", "peak_rss", "phases"]
+)
+BenchResult.__doc__ = """Result of a benchmark scenario; peak_rss in bytes (None if unknown), phases as PhaseStats."""
+
+#: Header of the text table lines of format_result().
+RESULT_HEADER = "{0:<14} {1:>8} {2:>9} {3:>10} {4:>9} {5:>9} {6:>10}".format(
+    "scenario", "cases", "seconds", "cases/s", "failures", "restarts", "peak rss"
+)
+
+
+def bench_request():
+    """Request fuzzed by the scenarios: an HTTP-like request line and header."""
+    return Request(
+        "bench",
+        children=[
+            Group(name="method", values=["GET", "HEAD", "POST", "PUT"]),
+            Delim(name="space-1", default_value=" "),
+            String(name="path", default_value="/index.html"),
+            Static(name="version", default_value=" HTTP/1.1\r\n"),
+            Static(name="host-key", default_value="Host: "),
+            String(name="host", default_value="localhost"),
+            Static(name="end", default_value="\r\n\r\n"),
+        ],
+    )
+
+
+def peak_rss(reset=False):
+    """Return the peak resident set size of this process.
+
+    Args:
+        reset (bool): Reset the peak to the current size afterwards, where supported (Linux). Default False.
+
+    Returns:
+        int: Bytes; the current size where the peak is not available (Windows), None if neither is.
+    """
+    try:
+        import resource
+
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak = maxrss if sys.platform == "darwin" else maxrss * 1024
+    except ImportError:
+        peak = psutil.Process().memory_info().rss
+    if reset:
+        try:
+            with open("/proc/self/clear_refs", "w") as f:
+                f.write("5")
+        except OSError:
+            pass
+    return peak
+
+
+def run_scenario(name, cases=1000, separate_process=False, recv_timeout=1.0):
+    """Fuzz a stand-in server with a canned session and measure the throughput.
+
+    The session logs only to a results database in a temporary directory, has no web UI, and restarts a crashed server
+    through an on_failure handler, without the settle time of process monitors.
+
+    Args:
+        name (str): Scenario, one of SCENARIOS.
+        cases (int): Number of test cases to run. Default 1000.
+        separate_process (bool): Serve from a separate process, see make_server(). Default False.
+        recv_timeout (float): Seconds to wait for responses. Default 1.0.
+
+    Returns:
+        BenchResult: Test cases, duration, throughput, failures, restarts, peak memory and phase timings of the session.
+    """
+    scenario = SCENARIOS[name]
+    server = make_server(scenario.kind, separate_process=separate_process, **scenario.options)
+    server.start()
+    try:
+        with tempfile.TemporaryDirectory(prefix="boofuzz-bench-") as tmp_dir:
+
+            def check_alive(target, fuzz_data_logger, session, *args, **kwargs):
+                # All stand-in servers answer, so only a missing answer may be a crash.
+                if not server.is_alive(timeout=0 if session.last_recv else CRASH_TIMEOUT):
+                    fuzz_data_logger.log_fail("Stand-in server crashed")
+
+            session = Session(
+                target=Target(connection=server.connection(recv_timeout=recv_timeout)),
+                web_port=None,
+                fuzz_loggers=[],
+                db_filename=os.path.join(tmp_dir, "bench.db"),
+                index_end=cases,
+                receive_data_after_fuzz=True,
+                restart_sleep_time=0,
+                post_test_case_callbacks=[check_alive],
+            )
+            session.on_failure += lambda logger: server.restart()
+            session.connect(bench_request())
+
+            peak_rss(reset=True)
+            start = time.perf_counter()
+            session.fuzz()
+            seconds = time.perf_counter() - start
+            peak = peak_rss()
+    finally:
+        server.stop()
+
+    return BenchResult(
+        scenario=name,
+        cases=session.num_cases_actually_fuzzed,
+        seconds=seconds,
+        cases_per_second=session.num_cases_actually_fuzzed / seconds if seconds else 0.0,
+        failures=session.metrics.failed_test_cases,
+        restarts=session.metrics.restarts,
+        peak_rss=peak,
+        phases=session.phase_timings(),
+    )
+
+
+def format_result(result):
+    """Format a result as a text table line, see RESULT_HEADER."""
+    return "{0:<14} {1:>8} {2:>9.2f} {3:>10.1f} {4:>9} {5:>9} {6:>10}".format(
+        result.scenario,
+        result.cases,
+        result.seconds,
+        result.cases_per_second,
+        result.failures,
+        result.restarts,
+        "{0:.1f} MiB".format(result.peak_rss / 2**20) if result.peak_rss is not None else "-",
+    )
+
+
+def format_phases(result):
+    """Format the phase timings of a result as text table lines, see phase_timing.format_stats()."""
+    return phase_timing.format_stats(result.phases)
+
+
+def save_results(filename, results):
+    """Write results as JSON.
+
+    Args:
+        filename (str): Output file.
+        results (list of BenchResult): Results.
+    """
+    document = [dict(result._asdict(), phases=[stats._asdict() for stats in result.phases]) for result in results]
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m boofuzz.bench", description="Serve a stand-in fuzz target")
+    parser.add_argument("kind", choices=sorted(SERVER_KINDS))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--options", default="{}", help="Arguments of the server class as a JSON object")
+    args = parser.parse_args(argv)
+    serve(args.kind, args.host, args.port, **json.loads(args.options))
@@ -0,0 +1,448 @@
+import json
+import os
+import socket
+import ssl
+import subprocess
+import sys
+import threading
+import time
+
+from .. import exception
+from ..connections import SSLSocketConnection, TCPSocketConnection, UDPSocketConnection
+
+#: Self-signed certificate and key for ``localhost`` and 127.0.0.1 used by SslEchoServer. Only for local benchmarks.
+CERTIFICATE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "localhost.pem")
+
+#: Seconds between checks for stop() while a stand-in server waits for connections or data.
+POLL_INTERVAL = 0.1
+
+
+class StandInServer:
+    """Local server standing in for a fuzz target, served from a background thread.
+
+    TCP servers handle one connection at a time, like the session opens them. Use as a context manager or call
+    start() and stop(). A stopped or crashed server can be started again on the same port with restart().
+
+    Args:
+        host (str): Address to listen on. Default "127.0.0.1".
+        port (int): Port to listen on. Default 0 (any free port, see `port` after start()).
+    """
+
+    #: Name of the server on the ``python -m boofuzz.bench`` command line, see SERVER_KINDS.
+    kind = None
+
+    #: End the process on a crash, before connections are closed. Set by serve() in server processes.
+    exit_on_crash = False
+
+    def __init__(self, host="127.0.0.1", port=0):
+        self.host = host
+        self.port = port
+        self.connections = 0
+        self.crashed = threading.Event()
+        self._listener = None
+        self._thread = None
+        self._stopped = threading.Event()
+
+    @classmethod
+    def make_connection(cls, host, port, recv_timeout=1.0):
+        """Create a target connection to a server of this class.
+
+        Args:
+            host (str): Address of the server.
+            port (int): Port of the server.
+            recv_timeout (float): Seconds to wait for data. Default 1.0.
+
+        Returns:
+            ITargetConnection: Connection.
+        """
+        return TCPSocketConnection(host, port, recv_timeout=recv_timeout)
+
+    def connection(self, recv_timeout=1.0):
+        """Create a target connection to this server, see make_connection()."""
+        return self.make_connection(self.host, self.port, recv_timeout=recv_timeout)
+
+    def start(self):
+        """Listen and serve on a background thread.
+
+        Returns:
+            StandInServer: self
+        """
+        self._stopped.clear()
+        self.crashed.clear()
+        self._listener = self._listen()
+        self.port = self._listener.getsockname()[1]
+        self._thread = threading.Thread(target=self._serve, name="boofuzz-stand-in-" + self.kind, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and close the listening socket."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._listener is not None:
+            self._listener.close()
+            self._listener = None
+
+    def restart(self):
+        """Stop the server if it is running and start it again on the same port."""
+        self.stop()
+        self.start()
+
+    def is_alive(self, timeout=0):
+        """Whether the server is serving, i.e. started and neither stopped nor crashed.
+
+        Args:
+            timeout (float): Seconds to wait for a crash, e.g. after the server closed the connection without an
+                answer. Default 0.
+        """
+        if timeout:
+            self.crashed.wait(timeout)
+        return self._thread is not None and not self._stopped.is_set() and not self.crashed.is_set()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def _listen(self):
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        listener.bind((self.host, self.port))
+        listener.listen(16)
+        listener.settimeout(POLL_INTERVAL)
+        return listener
+
+    def _serve(self):
+        while not self._stopped.is_set() and not self.crashed.is_set():
+            self._before_accept()
+            try:
+                sock, _ = self._listener.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            self.connections += 1
+            try:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)  # answer without waiting for delayed ACKs
+                sock = self._wrap(sock)
+                self._handle(sock)
+            except OSError:
+                pass  # e.g. the session reset the connection or a failed TLS handshake
+            finally:
+                sock.close()
+        if self.crashed.is_set():
+            self._listener.close()  # refuse connections like a crashed process
+
+    def _before_accept(self):
+        pass
+
+    def _wrap(self, sock):
+        sock.settimeout(POLL_INTERVAL)
+        return sock
+
+    def _handle(self, sock):
+        while not self._stopped.is_set():
+            try:
+                data = sock.recv(65536)
+            except socket.timeout:
+                continue
+            if not data:
+                return
+            response = self.respond(data)
+            if self.crashed.is_set():
+                return
+            if response:
+                sock.sendall(response)
+
+    def respond(self, data):
+        """Return the response to `data` received from the session; None or empty for no response."""
+        raise NotImplementedError
+
+
+class TcpEchoServer(StandInServer):
+    """Sends back everything it receives."""
+
+    kind = "tcp_echo"
+
+    def respond(self, data):
+        return data
+
+
+class TcpResponseServer(StandInServer):
+    """Answers every message received with a fixed response after a delay.
+
+    Args:
+        latency (float): Seconds to wait before answering. Default 0.001.
+        response (bytes): Response. Default ``b"OK\\r\\n"``.
+        **kwargs: See StandInServer.
+    """
+
+    kind = "tcp_response"
+
+    def __init__(self, latency=0.001, response=b"OK\r\n", **kwargs):
+        super(TcpResponseServer, self).__init__(**kwargs)
+        self.latency = latency
+        self.response = response if isinstance(response, bytes) else response.encode()
+
+    def respond(self, data):
+        time.sleep(self.latency)
+        return self.response
+
+
+class SslEchoServer(TcpEchoServer):
+    """Sends back everything it receives over TLS, using the self-signed CERTIFICATE."""
+
+    kind = "ssl_echo"
+
+    def __init__(self, **kwargs):
+        super(SslEchoServer, self).__init__(**kwargs)
+        self._context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        self._context.load_cert_chain(CERTIFICATE)
+
+    @classmethod
+    def make_connection(cls, host, port, recv_timeout=1.0):
+        return SSLSocketConnection(
+            host,
+            port,
+            recv_timeout=recv_timeout,
+            sslcontext=ssl.create_default_context(cafile=CERTIFICATE),
+            server_hostname="localhost",
+        )
+
+    def _wrap(self, sock):
+        sock.settimeout(5.0)  # handshake
+        sock = self._context.wrap_socket(sock, server_side=True)
+        sock.settimeout(POLL_INTERVAL)
+        return sock
+
+
+class CrashingServer(TcpEchoServer):
+    """Sends back everything it receives and crashes when a message contains `pattern`.
+
+    On a crash the server stops accepting connections until it is restarted, and a server process exits with status 1.
+
+    Args:
+        pattern (bytes): Data crashing the server. Default ``b"%n"``, found in format string mutations of String.
+        **kwargs: See StandInServer.
+    """
+
+    kind = "crash"
+
+    def __init__(self, pattern=b"%n", **kwargs):
+        super(CrashingServer, self).__init__(**kwargs)
+        self.pattern = pattern if isinstance(pattern, bytes) else pattern.encode()
+        self.crashes = 0
+
+    def respond(self, data):
+        if self.pattern in data:
+            if self.exit_on_crash:
+                os._exit(1)
+            self.crashes += 1
+            self.crashed.set()
+            return None
+        return data
+
+
+class SlowAcceptServer(TcpEchoServer):
+    """Sends back everything it receives, but waits before accepting each connection.
+
+    Args:
+        accept_delay (float): Seconds to wait before each accept. Default 0.005.
+        **kwargs: See StandInServer.
+    """
+
+    kind = "slow_accept"
+
+    def __init__(self, accept_delay=0.005, **kwargs):
+        super(SlowAcceptServer, self).__init__(**kwargs)
+        self.accept_delay = accept_delay
+
+    def _before_accept(self):
+        time.sleep(self.accept_delay)
+
+
+class UdpResponder(StandInServer):
+    """Answers every datagram, with the datagram itself or a fixed response.
+
+    Args:
+        response (bytes): Response. Default None (echo).
+        **kwargs: See StandInServer.
+    """
+
+    kind = "udp"
+
+    def __init__(self, response=None, **kwargs):
+        super(UdpResponder, self).__init__(**kwargs)
+        self.response = response.encode() if isinstance(response, str) else response
+
+    @classmethod
+    def make_connection(cls, host, port, recv_timeout=1.0):
+        return UDPSocketConnection(host, port, recv_timeout=recv_timeout, bind=(host, 0))
+
+    def _listen(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.settimeout(POLL_INTERVAL)
+        return sock
+
+    def _serve(self):
+        while not self._stopped.is_set():
+            try:
+                data, address = self._listener.recvfrom(65536)
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            self.connections += 1
+            self._listener.sendto(self.respond(data), address)
+
+    def respond(self, data):
+        return data if self.response is None else self.response
+
+
+#: Stand-in server classes by kind.
+SERVER_KINDS = {
+    server_class.kind: server_class
+    for server_class in (
+        TcpEchoServer,
+        TcpResponseServer,
+        UdpResponder,
+        SslEchoServer,
+        CrashingServer,
+        SlowAcceptServer,
+    )
+}
+
+
+def make_server(kind, separate_process=False, **options):
+    """Create a stand-in server. Call start() to serve.
+
+    Args:
+        kind (str): One of SERVER_KINDS.
+        separate_process (bool): Serve from a separate process (ServerProcess), so the server does not compete with
+            the session for the GIL. Default False.
+        **options: Arguments of the server class, e.g. ``latency`` of TcpResponseServer.
+
+    Returns:
+        StandInServer or ServerProcess: Server.
+    """
+    if kind not in SERVER_KINDS:
+        raise ValueError("kind must be one of {0}, got {1!r}".format(sorted(SERVER_KINDS), kind))
+    if separate_process:
+        return ServerProcess(kind, **options)
+    return SERVER_KINDS[kind](**options)
+
+
+class ServerProcess:
+    """Stand-in server served by a ``python -m boofuzz.bench`` process, with the interface of StandInServer.
+
+    A crashing server (CrashingServer) ends its process; restart() starts a new one on the same port.
+
+    Args:
+        kind (str): One of SERVER_KINDS.
+        host (str): Address to listen on. Default "127.0.0.1".
+        port (int): Port to listen on. Default 0 (any free port, see `port` after start()).
+        **options: Arguments of the server class. Must be JSON serializable.
+    """
+
+    def __init__(self, kind, host="127.0.0.1", port=0, **options):
+        self.kind = kind
+        self.host = host
+        self.port = port
+        self._options = options
+        self._process = None
+
+    def connection(self, recv_timeout=1.0):
+        """Create a target connection to this server, see StandInServer.make_connection()."""
+        return SERVER_KINDS[self.kind].make_connection(self.host, self.port, recv_timeout=recv_timeout)
+
+    def start(self):
+        """Start the server process and wait until it serves.
+
+        Returns:
+            ServerProcess: self
+        """
+        package_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [package_root, env.get("PYTHONPATH")]))
+        self._process = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "boofuzz.bench",
+                self.kind,
+                "--host",
+                self.host,
+                "--port",
+                str(self.port),
+                "--options",
+                json.dumps(self._options),
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            env=env,
+        )
+        line = self._process.stdout.readline()
+        self._process.stdout.close()
+        if not line:
+            raise exception.BoofuzzError(
+                "Stand-in server process exited with code {0} before serving".format(self._process.wait())
+            )
+        self.port = int(line)
+        return self
+
+    def stop(self):
+        """Stop the server process."""
+        if self._process is not None:
+            self._process.stdin.close()
+            try:
+                self._process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+                self._process.wait()
+            self._process = None
+
+    def restart(self):
+        """Stop the server process if it is running and start a new one on the same port."""
+        self.stop()
+        self.start()
+
+    def is_alive(self, timeout=0):
+        """Whether the server process is running.
+
+        Args:
+            timeout (float): Seconds to wait for the process to end. A crashed process has closed its connections
+                before it is reported as ended. Default 0.
+        """
+        if self._process is None:
+            return False
+        try:
+            self._process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            return True
+        return False
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+def serve(kind, host, port, **options):
+    """Serve a stand-in server in the current process. Runs in the process of a ServerProcess.
+
+    Writes the port served on as one line to stdout once connections are accepted, and returns when stdin is closed.
+    A crashing server exits the process with status 1.
+    """
+    server = SERVER_KINDS[kind](host=host, port=port, **options)
+    server.exit_on_crash = True
+    server.start()
+    sys.stdout.write("{0}\n".format(server.port))
+    sys.stdout.flush()
+    sys.stdin.buffer.read()
+    server.stop()
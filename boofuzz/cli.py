@@ -1,16 +1,19 @@
 #!/usr/bin/env python
 import logging
+import os
 import shlex
+import sys
 import time
 
 import click
 
-from . import constants, sessions
+from . import bench, constants, metrics, microbench, profiler, run_analysis, sessions
 from .cli_context import CliContext
 from .constants import DEFAULT_PROCMON_PORT
 from .connections import TCPSocketConnection
 from .fuzz_logger_csv import FuzzLoggerCsv
 from .fuzz_logger_curses import FuzzLoggerCurses
+from .fuzz_logger_pcap import FuzzLoggerPcap
 from .fuzz_logger_text import FuzzLoggerText
 from .helpers import parse_target
 from .monitors import ProcessMonitor
@@ -27,11 +30,29 @@ def cli():
     pass
 
 
+def _parse_index_range(text):
+    """Parse a test case index or index range like ``5``, ``10-20``, ``10-`` or ``-20`` into (start, end).
+
+    A missing start is 1, a missing end None (no limit).
+    """
+    if "-" in text:
+        start, end = text.split("-")
+        start = int(start) if start else 1
+        end = int(end) if end else None
+    else:
+        start = end = int(text)
+    return start, end
+
+
 @cli.group(help="Must be run via a fuzz script")
 @click.option("--target", metavar="HOST:PORT", help="Target network address", required=True)
 @click.option("--test-case-index", help="Test case index", type=str)
 @click.option("--test-case-name", help="Name of node or specific test case")
 @click.option("--csv-out", help="Output to CSV file")
+@click.option("--pcap-out", metavar="FILENAME", help="Write sent and received data to a synthesized pcapng file")
+@click.option(
+    "--pcap-max-size", type=int, default=None, help="Start a new pcapng file after this many bytes (default: no limit)"
+)
 @click.option(
     "--sleep-between-cases", help="Wait FLOAT (seconds) between test cases (partial seconds OK)", type=float, default=0
 )
@@ -41,6 +62,12 @@ def cli():
 @click.option("--procmon-capture", is_flag=True, help="Capture stdout/stderr from target process upon failure")
 @click.option("--tui/--no-tui", help="Enable/disable TUI")
 @click.option("--text-dump/--no-text-dump", help="Enable/disable full text dump of logs", default=False)
+@click.option(
+    "--log-max-data",
+    type=int,
+    default=1024,
+    help="Show at most this many bytes of sent and received data in text and CSV logs; 0 for no limit",
+)
 @click.option("--feature-check", is_flag=True, help="Run a feature check instead of a fuzz test", default=False)
 @click.option("--target-cmd", help="Target command and arguments")
 @click.option(
@@ -49,6 +76,12 @@ def cli():
     default=True,
     help="Keep web server for web UI open when out of fuzz cases",
 )
+@click.option(
+    "--web-process",
+    is_flag=True,
+    default=False,
+    help="Serve the web UI from a separate process so that browsing it does not slow down fuzzing",
+)
 @click.option(
     "--combinatorial/--no-combinatorial", is_flag=True, default=True, help="Enable fuzzing with multiple mutations"
 )
@@ -58,6 +91,47 @@ def cli():
     type=int,
     help="Record this many cases before each failure. Set to 0 to record all test cases (high disk space usage!).",
 )
+@click.option(
+    "--db-compression",
+    type=click.Choice(["zlib", "zstd"]),
+    default=None,
+    help="Compress sent and received data in the results database",
+)
+@click.option(
+    "--db-compact",
+    is_flag=True,
+    default=False,
+    help="Store only length, hash and prefix of sent and received data of test cases without failures",
+)
+@click.option(
+    "--metrics-file",
+    metavar="FILENAME",
+    help="Write campaign metrics in the Prometheus text format to this file, see boo serve-metrics",
+)
+@click.option(
+    "--profile",
+    metavar="RANGE",
+    help="Profile the fuzzing thread over this range of test case indices, e.g. 10000-20000; - for the whole run. "
+    "The profile is written next to the results database",
+)
+@click.option(
+    "--profile-format",
+    type=click.Choice(profiler.PROFILE_FORMATS),
+    default="collapsed",
+    help="Profile format: collapsed stacks for flame graph tools or speedscope JSON (default collapsed)",
+)
+@click.option(
+    "--memory-report-interval",
+    type=float,
+    metavar="SECONDS",
+    help="Report memory use, live per-test-case objects and container sizes this often, see /api/memory",
+)
+@click.option(
+    "--memory-trace-allocations",
+    is_flag=True,
+    default=False,
+    help="Add the allocation sites that grew most to memory reports (slow, uses tracemalloc)",
+)
 @click.pass_context
 def fuzz(
     ctx,
@@ -65,6 +139,8 @@ def fuzz(
     test_case_index,
     test_case_name,
     csv_out,
+    pcap_out,
+    pcap_max_size,
     sleep_between_cases,
     procmon_host,
     procmon_port,
@@ -72,11 +148,20 @@ def fuzz(
     procmon_capture,
     tui,
     text_dump,
+    log_max_data,
     feature_check,
     target_cmd,
     keep_web,
+    web_process,
     combinatorial,
     record_passes,
+    db_compression,
+    db_compact,
+    metrics_file,
+    profile,
+    profile_format,
+    memory_report_interval,
+    memory_trace_allocations,
 ):
     local_procmon = None
     if target_cmd is not None and procmon_host is None:
@@ -89,13 +174,17 @@ def fuzz(
         )
 
     fuzz_loggers = []
+    max_data_length = log_max_data if log_max_data > 0 else None
     if text_dump:
-        fuzz_loggers.append(FuzzLoggerText())
+        fuzz_loggers.append(FuzzLoggerText(max_data_length=max_data_length, flush_interval=0.5))
     elif tui:
         fuzz_loggers.append(FuzzLoggerCurses())
     if csv_out is not None:
         f = open("boofuzz.csv", "wb")
-        fuzz_loggers.append(FuzzLoggerCsv(file_handle=f))
+        fuzz_loggers.append(FuzzLoggerCsv(file_handle=f, max_data_length=max_data_length, flush_interval=0.5))
+    if pcap_out is not None:
+        _, target_port = parse_target(target_name=target)
+        fuzz_loggers.append(FuzzLoggerPcap(filename=pcap_out, target_port=target_port, max_file_size=pcap_max_size))
 
     procmon_options = {}
     if procmon_start is not None:
@@ -124,18 +213,8 @@ def fuzz(
     if test_case_index is None:
         start = 1
         end = None
-    elif "-" in test_case_index:
-        start, end = test_case_index.split("-")
-        if not start:
-            start = 1
-        else:
-            start = int(start)
-        if not end:
-            end = None
-        else:
-            end = int(end)
     else:
-        start = end = int(test_case_index)
+        start, end = _parse_index_range(test_case_index)
 
     connection = TCPSocketConnection(*parse_target(target_name=target))
 
@@ -149,7 +228,15 @@ def fuzz(
         index_start=start,
         index_end=end,
         keep_web_open=keep_web,
+        web_process=web_process,
         fuzz_db_keep_only_n_pass_cases=record_passes,
+        fuzz_db_compression=db_compression,
+        fuzz_db_compact=db_compact,
+        metrics_file=metrics_file,
+        profile=_parse_index_range(profile) if profile is not None else None,
+        profile_format=profile_format,
+        memory_report_interval=memory_report_interval,
+        memory_trace_allocations=memory_trace_allocations,
     )
 
     ctx.obj = CliContext(session=session)
@@ -193,6 +280,119 @@ def open_file(debug, filename, ui_port, ui_addr):
         time.sleep(0.001)
 
 
+@cli.command(name="stats", help="Print failure rates and throughput of a results database")
+@click.option("--top", type=int, default=20, help="Number of elements to list (default 20)")
+@click.option("--interval", type=float, default=60.0, help="Throughput bucket width in seconds (default 60)")
+@click.option("--chunk-size", type=int, default=10000, help="Test cases read at a time (default 10000)")
+@click.argument("filename", type=click.Path(exists=True, dir_okay=False))
+def stats(filename, top, interval, chunk_size):
+    print(run_analysis.run_stats(db_filename=filename, interval=interval, chunk_size=chunk_size).report(top=top))
+
+
+@cli.command(name="export", help="Export a results database with one row per test case")
+@click.option(
+    "--format", "export_format", type=click.Choice(run_analysis.EXPORT_FORMATS), default="csv", help="Output format"
+)
+@click.option("--output", "-o", help="Output file (default: database name with the format's extension)")
+@click.option("--chunk-size", type=int, default=10000, help="Test cases read at a time (default 10000)")
+@click.argument("filename", type=click.Path(exists=True, dir_okay=False))
+def export(filename, export_format, output, chunk_size):
+    if output is None:
+        output = os.path.splitext(filename)[0] + run_analysis.EXPORT_EXTENSIONS[export_format]
+    count = run_analysis.export(filename, output, export_format=export_format, chunk_size=chunk_size)
+    print("Exported {0} test cases to {1}".format(count, output))
+
+
+@cli.command(name="serve-metrics", help="Serve a metrics file written by boo fuzz --metrics-file to Prometheus")
+@click.option(
+    "--port",
+    type=int,
+    default=constants.DEFAULT_METRICS_PORT,
+    help="Port to serve /metrics on (default {0})".format(constants.DEFAULT_METRICS_PORT),
+)
+@click.option("--address", default="", help="Address to serve on (default: all interfaces)")
+@click.argument("filename")
+def serve_metrics(filename, port, address):
+    exporter = metrics.MetricsExporter(lambda: metrics.read_metrics_file(filename), port=port, address=address)
+    print("Serving {0} at http://{1}:{2}/metrics. Hit Ctrl+C to quit.".format(filename, address or "*", exporter.port))
+    exporter.serve_forever()
+
+
+@cli.command(name="microbench", help="Time mutation, rendering and name resolution hot paths")
+@click.option(
+    "--filter", "-k", "pattern", metavar="PATTERN", help="Run only benchmarks matching a glob pattern, e.g. 'string.*'"
+)
+@click.option("--rounds", type=int, default=5, help="Timed rounds per benchmark (default 5)")
+@click.option("--min-time", type=float, default=0.1, help="Minimum seconds per round (default 0.1)")
+@click.option("--output", "-o", metavar="FILENAME", help="Save the results as JSON, e.g. as a baseline")
+@click.option(
+    "--baseline",
+    metavar="FILENAME",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Compare against results saved with --output and exit with status 1 on regressions",
+)
+@click.option(
+    "--threshold",
+    type=float,
+    default=microbench.DEFAULT_THRESHOLD,
+    help="Relative slowdown reported as a regression (default {0})".format(microbench.DEFAULT_THRESHOLD),
+)
+@click.option("--list", "list_only", is_flag=True, help="List the benchmarks and exit")
+def microbench_command(pattern, rounds, min_time, output, baseline, threshold, list_only):
+    if list_only:
+        print("\n".join(microbench.benchmark_names(pattern)))
+        return
+    print(microbench.RESULT_HEADER)
+    results = microbench.run(
+        pattern, rounds=rounds, min_time=min_time, callback=lambda result: print(microbench.format_result(result))
+    )
+    if output is not None:
+        microbench.save_results(output, results)
+        print("Saved results to {0}".format(output))
+    if baseline is not None:
+        comparisons = microbench.compare(results, microbench.load_results(baseline), threshold=threshold)
+        print()
+        print(microbench.COMPARISON_HEADER)
+        for comparison in comparisons:
+            print(microbench.format_comparison(comparison))
+        regressions = [c.name for c in comparisons if c.regressed]
+        if regressions:
+            print("Regressed by more than {0:.0%}: {1}".format(threshold, ", ".join(regressions)))
+            sys.exit(1)
+
+
+@cli.command(name="bench", help="Measure fuzzing throughput against local stand-in targets")
+@click.argument("scenarios", nargs=-1, type=click.Choice(list(bench.SCENARIOS)))
+@click.option("--cases", type=int, default=1000, help="Test cases per scenario (default 1000)")
+@click.option(
+    "--separate-process",
+    is_flag=True,
+    help="Serve the stand-in targets from separate processes instead of threads of the fuzzing process",
+)
+@click.option("--phases", is_flag=True, help="Print the phase timings of each scenario")
+@click.option("--output", "-o", metavar="FILENAME", help="Save the results as JSON")
+@click.option("--list", "list_only", is_flag=True, help="List the scenarios and exit")
+def bench_command(scenarios, cases, separate_process, phases, output, list_only):
+    if list_only:
+        for scenario in bench.SCENARIOS.values():
+            print("{0:<14} {1}".format(scenario.name, scenario.description))
+        return
+    results = []
+    print(bench.RESULT_HEADER)
+    for name in scenarios or bench.SCENARIOS:
+        result = bench.run_scenario(name, cases=cases, separate_process=separate_process)
+        print(bench.format_result(result))
+        results.append(result)
+    if phases:
+        for result in results:
+            print()
+            print(result.scenario)
+            print("\n".join(bench.format_phases(result)))
+    if output is not None:
+        bench.save_results(output, results)
+        print("Saved results to {0}".format(output))
+
+
 def main():
     cli()
 
@@ -5,6 +5,7 @@ This file contains constants for the IPv4 protocol.
     ip_constants has been moved into the connections subpackage.
     The full path is now boofuzz.connections.ip_constants
 """
+IPV4_PROTOCOL_TCP = 0x06
 IPV4_PROTOCOL_UDP = 0x11
 #: Theoretical maximum length of a UDP packet, based on constraints in the UDP
 #: packet format.
@@ -3,10 +3,16 @@ LITTLE_ENDIAN = "<"
 
 DEFAULT_WEB_UI_PORT = 26000
 DEFAULT_PROCMON_PORT = 26002
+DEFAULT_METRICS_PORT = 26003
 DEFAULT_WEB_UI_ADDRESS = "localhost"
 
 RESULTS_DIR = "boofuzz-results"
 
+# Log levels, ordered like those of the logging module. Loggers only receive messages at or above their log_level.
+LOG_LEVEL_DEBUG = 10  # details like the default and current value of the fuzzed element, send/receive notices
+LOG_LEVEL_INFO = 20  # test steps, info, checks, passes, sent and received data
+LOG_LEVEL_FAIL = 40  # failures and errors
+
 ERR_CONN_FAILED_TERMINAL = (
     "Cannot connect to target; target presumed down. Stopping test run. Note: This likely "
     "indicates a failure caused by the previous test case. "
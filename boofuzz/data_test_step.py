@@ -14,6 +14,8 @@ class DataTestStep:
     except TypeError:
         # in case attr version is too old
         truncated = attr.ib()
+    data_length = attr.ib(default=None)  # length of the full payload, if known
+    data_hash = attr.ib(default=None)  # fuzz_logger_db.payload_hash of the full payload, if known
 
     @property
     def text_render(self):
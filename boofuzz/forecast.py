@@ -0,0 +1,213 @@
+import collections
+import time
+
+#: Number of test cases of an element, element type or request after which its own mean time per case is used alone.
+#: Before that, its mean is blended with the estimate of the next more general group, weighted by the test cases seen.
+MIN_SAMPLES = 10
+
+PlannedElement = collections.namedtuple("PlannedElement", ["path", "request", "element", "element_type", "cases"])
+PlannedElement.__doc__ = """An element to fuzz: message path, request name, qualified name, type name and test cases."""
+
+ElementForecast = collections.namedtuple(
+    "ElementForecast",
+    ["path", "element", "element_type", "cases", "done", "remaining_cases", "seconds_per_case", "remaining_seconds"],
+)
+ElementForecast.__doc__ = """Forecast for one planned element; time estimates are None until a test case has run."""
+
+RequestForecast = collections.namedtuple(
+    "RequestForecast", ["path", "cases", "done", "remaining_cases", "remaining_seconds"]
+)
+RequestForecast.__doc__ = """Forecast for the elements of the request at the end of a message path."""
+
+Forecast = collections.namedtuple(
+    "Forecast", ["cases", "done", "remaining_cases", "remaining_seconds", "eta", "requests", "elements"]
+)
+Forecast.__doc__ = """Forecast of a run: totals, estimated remaining seconds and ETA (Unix time), per request and
+element. remaining_seconds and eta are None until a test case has run."""
+
+
+class _Mean:
+    __slots__ = ("count", "total")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+
+
+class ThroughputForecaster:
+    """Forecasts the remaining time of a run from the measured time per test case.
+
+    Test cases differ a lot in cost: a megabyte-long string mutation takes far longer to send and answer than a byte
+    mutation. So the time per test case is measured for each element, element type, request and overall, and the
+    remaining test cases of each planned element are multiplied by the most specific estimate available. Elements that
+    have not run yet are estimated by their type, then their request, then the whole run.
+
+    Elements are expected to be fuzzed in the order they were planned; test cases of earlier elements that have not run
+    when a later element starts, e.g. because it was skipped, are not counted as remaining.
+
+    Args:
+        min_samples (int): See MIN_SAMPLES. Default MIN_SAMPLES.
+    """
+
+    def __init__(self, min_samples=MIN_SAMPLES):
+        self.min_samples = min_samples
+        self._plan = []
+        self._done = []
+        self._positions = {}  # (path, element) -> index into self._plan
+        self._position = -1  # furthest planned element reached
+        self._elements = collections.defaultdict(_Mean)  # (path, element) -> time per test case
+        self._types = collections.defaultdict(_Mean)
+        self._requests = collections.defaultdict(_Mean)
+        self._overall = _Mean()
+
+    @property
+    def planned(self):
+        """True if elements are planned."""
+        return bool(self._plan)
+
+    def plan(self, elements):
+        """Set the elements to fuzz and forget the progress through the previous plan. Measured times are kept.
+
+        Args:
+            elements (iterable of PlannedElement): Elements in the order they are fuzzed.
+        """
+        self._plan = list(elements)
+        self._done = [0] * len(self._plan)
+        self._positions = {(e.path, e.element): i for i, e in enumerate(self._plan)}
+        self._position = -1
+
+    def record(self, path, request, element, element_type, seconds, planned=True):
+        """Record the duration of a test case.
+
+        Elements within planned elements, e.g. the children of a block with a group, count towards the planned
+        element.
+
+        Args:
+            path (str): Message path.
+            request (str): Name of the fuzzed request.
+            element (str): Qualified name of the mutated element.
+            element_type (str): Type name of the mutated element.
+            seconds (float): Duration of the test case.
+            planned (bool): Whether the test case is one of the planned ones, as opposed to e.g. a calibration case.
+                Default True.
+        """
+        position = self._find(path, element)
+        if position is not None:
+            planned_element = self._plan[position]
+            element, element_type = planned_element.element, planned_element.element_type
+            if planned:
+                self._position = max(self._position, position)
+                if position == self._position:
+                    self._done[position] += 1
+        self._elements[(path, element)].add(seconds)
+        self._types[element_type].add(seconds)
+        self._requests[request].add(seconds)
+        self._overall.add(seconds)
+
+    def _find(self, path, element):
+        while True:
+            position = self._positions.get((path, element))
+            if position is not None or "." not in element:
+                return position
+            element = element.rsplit(".", 1)[0]
+
+    def seconds_per_case(self, path, request, element, element_type):
+        """Estimated time per test case of an element, None if no test case has run yet."""
+        estimate = None
+        for mean in (
+            self._overall,
+            self._requests.get(request),
+            self._types.get(element_type),
+            self._elements.get((path, element)),
+        ):
+            if mean is None or not mean.count:
+                continue
+            weight = min(mean.count / self.min_samples, 1.0)
+            if estimate is None:
+                estimate = mean.total / mean.count
+            else:
+                estimate = weight * mean.total / mean.count + (1 - weight) * estimate
+        return estimate
+
+    def forecast(self, limit=None, now=None):
+        """Forecast the rest of the plan.
+
+        Args:
+            limit (int): Number of test cases still to run at most, e.g. up to the last index of the run. Default None.
+            now (float): Unix time the ETA is based on. Default None (the current time).
+
+        Returns:
+            Forecast: Forecast.
+        """
+        elements = []
+        requests = collections.OrderedDict()
+        current = self._position
+        # Called from other threads, e.g. for the metrics; the plan may be replaced meanwhile.
+        for position, (planned, done) in enumerate(zip(self._plan, self._done)):
+            remaining = max(planned.cases - done, 0) if position >= current else 0
+            if limit is not None:
+                remaining = min(remaining, limit)
+                limit -= remaining
+            seconds_per_case = self.seconds_per_case(
+                planned.path, planned.request, planned.element, planned.element_type
+            )
+            remaining_seconds = remaining * seconds_per_case if seconds_per_case is not None else None
+            elements.append(
+                ElementForecast(
+                    path=planned.path,
+                    element=planned.element,
+                    element_type=planned.element_type,
+                    cases=planned.cases,
+                    done=done,
+                    remaining_cases=remaining,
+                    seconds_per_case=seconds_per_case,
+                    remaining_seconds=remaining_seconds,
+                )
+            )
+            requests.setdefault(planned.path, []).append(elements[-1])
+
+        requests = [_sum(path, request) for path, request in requests.items()]
+        total = _sum(None, elements)
+        if total.remaining_seconds is None:
+            eta = None
+        else:
+            eta = (time.time() if now is None else now) + total.remaining_seconds
+        return Forecast(
+            cases=total.cases,
+            done=total.done,
+            remaining_cases=total.remaining_cases,
+            remaining_seconds=total.remaining_seconds,
+            eta=eta,
+            requests=requests,
+            elements=elements,
+        )
+
+
+def _sum(path, elements):
+    remaining_seconds = [e.remaining_seconds for e in elements]
+    return RequestForecast(
+        path=path,
+        cases=sum(e.cases for e in elements),
+        done=sum(e.done for e in elements),
+        remaining_cases=sum(e.remaining_cases for e in elements),
+        remaining_seconds=sum(remaining_seconds) if None not in remaining_seconds else None,
+    )
+
+
+def format_remaining(seconds):
+    """Format a remaining time to the two most significant units, e.g. "2 d 5 h", "3 h 12 min" or "45 s"."""
+    if seconds is None:
+        return ""
+    seconds = int(round(seconds))
+    parts = []
+    for unit, size in (("d", 86400), ("h", 3600), ("min", 60), ("s", 1)):
+        if seconds >= size or (unit == "s" and not parts):
+            parts.append("{0} {1}".format(seconds // size, unit))
+            seconds %= size
+        elif parts:
+            break
+    return " ".join(parts[:2])
@@ -1,6 +1,17 @@
 from typing import Union  # noqa: F401
 
+from . import constants
 from .ifuzz_logger import IFuzzLogger
+from .spill_dict import SpillDict
+
+
+def _backend_log_level(fuzz_logger):
+    level = getattr(fuzz_logger, "log_level", constants.LOG_LEVEL_DEBUG)
+    return level if isinstance(level, int) else constants.LOG_LEVEL_DEBUG
+
+
+def _resolve(description):
+    return description() if callable(description) else description
 
 
 class FuzzLogger(IFuzzLogger):
@@ -9,64 +20,109 @@ class FuzzLogger(IFuzzLogger):
 
     FuzzLogger also maintains summary failure and error data.
 
+    Each message is only passed to the loggers whose `log_level` admits it. Descriptions may be given as callables,
+    which are called once, and only if some logger takes the message; together with :meth:`is_enabled` this keeps
+    the cost of unused log messages near zero.
+
     Args:
         fuzz_loggers (:obj:`list` of :obj:`IFuzzLogger`): IFuzzLogger objects
                                                           to which to send log data.
+        log_level (int): Minimum level of messages passed to any logger. Default LOG_LEVEL_DEBUG.
+        spill_db_filename (str): Run database to which failed_test_cases and error_test_cases entries beyond
+            max_failures_in_memory are spilled, see :class:`SpillDict <boofuzz.spill_dict.SpillDict>`. Default None
+            (keep all in memory).
+        max_failures_in_memory (int): Number of test cases kept in memory in each of failed_test_cases and
+            error_test_cases when spilling. Default 1000.
     """
 
-    def __init__(self, fuzz_loggers=None):
+    def __init__(
+        self,
+        fuzz_loggers=None,
+        log_level=constants.LOG_LEVEL_DEBUG,
+        spill_db_filename=None,
+        max_failures_in_memory=1000,
+    ):
         if fuzz_loggers is None:
             fuzz_loggers = []
         self._fuzz_loggers = fuzz_loggers
+        self.log_level = log_level
+        self._debug_loggers = self._loggers_at(constants.LOG_LEVEL_DEBUG, log_level)
+        self._info_loggers = self._loggers_at(constants.LOG_LEVEL_INFO, log_level)
+        self._fail_loggers = self._loggers_at(constants.LOG_LEVEL_FAIL, log_level)
 
         self._cur_test_case_id = ""  # type: Union[int, str]
-        self.failed_test_cases = {}
-        self.error_test_cases = {}
+        self.failed_test_cases = SpillDict(spill_db_filename, "failed_test_cases", max_failures_in_memory)
+        self.error_test_cases = SpillDict(spill_db_filename, "error_test_cases", max_failures_in_memory)
         self.passed_test_case_count = 0  # passed test cases are simply counted to avoid runaway memory usage
         self._last_passed_id = ""  # helps avoid duplicates
         self.test_case_count = 0
 
+    def _loggers_at(self, level, log_level):
+        if level < log_level:
+            return []
+        return [f for f in self._fuzz_loggers if level >= _backend_log_level(f)]
+
+    def is_enabled(self, level):
+        """Return True if any logger takes messages of the given level."""
+        return level >= self.log_level and any(level >= _backend_log_level(f) for f in self._fuzz_loggers)
+
     @property
     def most_recent_test_id(self):
         """Return a value (e.g. string) representing the most recent test case."""
         return self._cur_test_case_id
 
     def open_test_step(self, description):
-        for fuzz_logger in self._fuzz_loggers:
-            fuzz_logger.open_test_step(description=description)
+        if self._info_loggers:
+            description = _resolve(description)
+            for fuzz_logger in self._info_loggers:
+                fuzz_logger.open_test_step(description=description)
 
     def log_error(self, description):
+        description = _resolve(description)
         if self._cur_test_case_id not in self.error_test_cases:
             self.error_test_cases[self._cur_test_case_id] = []
         self.error_test_cases[self._cur_test_case_id].append(description)
-        for fuzz_logger in self._fuzz_loggers:
+        for fuzz_logger in self._fail_loggers:
             fuzz_logger.log_error(description=description)
 
     def log_fail(self, description=""):
+        description = _resolve(description)
         if self._cur_test_case_id not in self.failed_test_cases:
             self.failed_test_cases[self._cur_test_case_id] = []
         self.failed_test_cases[self._cur_test_case_id].append(description)
-        for fuzz_logger in self._fuzz_loggers:
+        for fuzz_logger in self._fail_loggers:
             fuzz_logger.log_fail(description=description)
 
     def log_info(self, description):
-        for fuzz_logger in self._fuzz_loggers:
-            fuzz_logger.log_info(description=description)
+        if self._info_loggers:
+            description = _resolve(description)
+            for fuzz_logger in self._info_loggers:
+                fuzz_logger.log_info(description=description)
+
+    def log_debug(self, description):
+        if self._debug_loggers:
+            description = _resolve(description)
+            for fuzz_logger in self._debug_loggers:
+                fuzz_logger.log_info(description=description)
 
     def log_recv(self, data):
-        for fuzz_logger in self._fuzz_loggers:
+        for fuzz_logger in self._info_loggers:
             fuzz_logger.log_recv(data=data)
 
     def log_pass(self, description=""):
         if self._cur_test_case_id != self._last_passed_id:
             self.passed_test_case_count += 1
             self._last_passed_id = self._cur_test_case_id
-        for fuzz_logger in self._fuzz_loggers:
-            fuzz_logger.log_pass(description=description)
+        if self._info_loggers:
+            description = _resolve(description)
+            for fuzz_logger in self._info_loggers:
+                fuzz_logger.log_pass(description=description)
 
     def log_check(self, description):
-        for fuzz_logger in self._fuzz_loggers:
-            fuzz_logger.log_check(description=description)
+        if self._info_loggers:
+            description = _resolve(description)
+            for fuzz_logger in self._info_loggers:
+                fuzz_logger.log_check(description=description)
 
     def open_test_case(self, test_case_id, name, index, *args, **kwargs):
         self._cur_test_case_id = test_case_id
@@ -75,7 +131,7 @@ class FuzzLogger(IFuzzLogger):
             fuzz_logger.open_test_case(test_case_id=test_case_id, name=name, index=index, *args, **kwargs)
 
     def log_send(self, data):
-        for fuzz_logger in self._fuzz_loggers:
+        for fuzz_logger in self._info_loggers:
             fuzz_logger.log_send(data=data)
 
     def close_test_case(self):
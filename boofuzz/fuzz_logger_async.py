@@ -0,0 +1,172 @@
+import collections
+import threading
+
+from . import constants, ifuzz_logger_backend
+
+OVERFLOW_BLOCK = "block"
+OVERFLOW_DROP = "drop"
+
+# Events that may be discarded under the "drop" policy. Test case boundaries, errors and failures are always delivered.
+_DROPPABLE_EVENTS = frozenset(["open_test_step", "log_check", "log_info", "log_recv", "log_send", "log_pass"])
+
+
+class FuzzLoggerAsync(ifuzz_logger_backend.IFuzzLoggerBackend):
+    """
+    Hands log events to a wrapped IFuzzLoggerBackend on its own consumer thread.
+
+    Slow backends like FuzzLoggerText on a terminal, FuzzLoggerCurses or FuzzLoggerCsv then no longer hold up the
+    fuzzing thread. Events are queued as (method name, arguments) tuples; the fuzzing thread only appends to a deque
+    and takes a lock when the consumer is idle or the queue is full.
+
+    At most `max_lag` events are queued. When the queue is full, the "block" policy makes the fuzzing thread wait for
+    the consumer, while the "drop" policy discards steps, checks, infos, passes and sent or received data (counted in
+    `dropped_events`). Opening and closing test cases, errors and failures are never dropped.
+
+    close_test() delivers all queued events and stops the consumer thread; it is restarted on the next event. Note that
+    backends that timestamp log lines do so on delivery.
+
+    Args:
+        fuzz_logger (ifuzz_logger_backend.IFuzzLoggerBackend): Backend to deliver events to.
+        max_lag (int): Maximum number of queued events. Default 10000.
+        overflow (str): "block" or "drop". Default "block".
+    """
+
+    def __init__(self, fuzz_logger, max_lag=10000, overflow=OVERFLOW_BLOCK):
+        if overflow not in (OVERFLOW_BLOCK, OVERFLOW_DROP):
+            raise ValueError(
+                "overflow must be {0!r} or {1!r}, got {2!r}".format(OVERFLOW_BLOCK, OVERFLOW_DROP, overflow)
+            )
+        self._fuzz_logger = fuzz_logger
+        self._max_lag = max_lag
+        self._overflow = overflow
+        self.dropped_events = 0
+
+        self._events = collections.deque()
+        self._condition = threading.Condition()
+        self._queued = 0  # only written by the producer
+        self._delivered = 0  # only written by the consumer
+        self._consumer_idle = False
+        self._producer_waiting = False
+        self._stopping = False
+        self._thread = None
+        self._error = None
+
+    def open_test_case(self, test_case_id, name, index, *args, **kwargs):
+        kwargs.update(test_case_id=test_case_id, name=name, index=index)
+        self._put("open_test_case", kwargs)
+
+    def open_test_step(self, description):
+        self._put("open_test_step", {"description": description})
+
+    def log_check(self, description):
+        self._put("log_check", {"description": description})
+
+    def log_error(self, description):
+        self._put("log_error", {"description": description})
+
+    def log_recv(self, data):
+        self._put("log_recv", {"data": data})
+
+    def log_send(self, data):
+        self._put("log_send", {"data": data})
+
+    def log_info(self, description):
+        self._put("log_info", {"description": description})
+
+    def log_fail(self, description=""):
+        self._put("log_fail", {"description": description})
+
+    def log_pass(self, description=""):
+        self._put("log_pass", {"description": description})
+
+    def close_test_case(self):
+        self._put("close_test_case", {})
+
+    def close_test(self):
+        self._put("close_test", {})
+        self._stop()
+
+    @property
+    def log_level(self):
+        """Log level of the wrapped backend."""
+        return getattr(self._fuzz_logger, "log_level", constants.LOG_LEVEL_DEBUG)
+
+    @property
+    def lag(self):
+        """Number of events queued but not yet delivered."""
+        return self._queued - self._delivered
+
+    def flush(self):
+        """Wait until all queued events are delivered."""
+        with self._condition:
+            while self._delivered < self._queued and self._thread is not None and self._thread.is_alive():
+                self._condition.wait(0.1)
+        self._raise_consumer_error()
+
+    def _put(self, method, kwargs):
+        self._raise_consumer_error()
+        if self._thread is None:
+            self._start()
+        if len(self._events) >= self._max_lag:
+            if self._overflow == OVERFLOW_DROP and method in _DROPPABLE_EVENTS:
+                self.dropped_events += 1
+                return
+            with self._condition:
+                self._producer_waiting = True
+                while len(self._events) >= self._max_lag:
+                    self._condition.wait(0.1)
+                self._producer_waiting = False
+        self._queued += 1
+        self._events.append((method, kwargs))
+        if self._consumer_idle:
+            with self._condition:
+                self._condition.notify_all()
+
+    def _start(self):
+        self._stopping = False
+        self._thread = threading.Thread(target=self._consume, name="FuzzLoggerAsync")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _stop(self):
+        if self._thread is None:
+            return
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        self._thread.join()
+        self._thread = None
+        self._raise_consumer_error()
+
+    def _raise_consumer_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def _consume(self):
+        while True:
+            try:
+                method, kwargs = self._events.popleft()
+            except IndexError:
+                with self._condition:
+                    self._condition.notify_all()  # wake flush() and a blocked producer
+                    if self._events:
+                        continue
+                    if self._stopping:
+                        return
+                    self._consumer_idle = True
+                    # Re-check after publishing the idle flag; the producer only notifies when it sees the flag.
+                    if not self._events:
+                        self._condition.wait()
+                    self._consumer_idle = False
+                continue
+
+            try:
+                getattr(self._fuzz_logger, method)(**kwargs)
+            except Exception as e:
+                if self._error is None:
+                    self._error = e
+            self._delivered += 1
+            if self._producer_waiting:
+                with self._condition:
+                    self._condition.notify_all()
@@ -2,7 +2,7 @@ import csv
 import datetime
 import sys
 
-from . import helpers, ifuzz_logger_backend
+from . import constants, helpers, ifuzz_logger_backend
 
 
 def hex_to_hexstr(input_bytes):
@@ -31,15 +31,34 @@ class FuzzLoggerCsv(ifuzz_logger_backend.IFuzzLoggerBackend):
     configured to output to a named file.
     """
 
-    def __init__(self, file_handle=sys.stdout, bytes_to_str=DEFAULT_HEX_TO_STR):
+    def __init__(
+        self,
+        file_handle=sys.stdout,
+        bytes_to_str=DEFAULT_HEX_TO_STR,
+        log_level=constants.LOG_LEVEL_DEBUG,
+        max_data_length=None,
+        tail_length=16,
+        flush_interval=0.0,
+    ):
         """
         Args:
             file_handle (io.BinaryIO): Open file handle for logging. Defaults to sys.stdout.
             bytes_to_str (function): Function that converts sent/received bytes data to string for logging.
+            log_level (int): Minimum level of logged messages, see LOG_LEVEL_* in boofuzz.constants.
+                Defaults to LOG_LEVEL_DEBUG.
+            max_data_length (int): Maximum number of sent/received bytes to log. Longer data is shortened to its head
+                and last tail_length bytes, with its length and digest. Defaults to None (no limit).
+            tail_length (int): Number of bytes from the end of shortened data to log. Defaults to 16.
+            flush_interval (float): Buffer output for up to this many seconds. Output is also written at the end of
+                each test case and on failures and errors. Defaults to 0 (write every row immediately).
         """
+        self.log_level = log_level
+        self.max_data_length = max_data_length
+        self.tail_length = tail_length
         self._file_handle = file_handle
         self._format_raw_bytes = bytes_to_str
-        self._csv_handle = csv.writer(self._file_handle)
+        self._output = helpers.LineBuffer(file_handle=file_handle, flush_interval=flush_interval)
+        self._csv_handle = csv.writer(self._output)
 
     def open_test_step(self, description):
         self._print_log_msg(["open step", "", "", description])
@@ -49,12 +68,13 @@ class FuzzLoggerCsv(ifuzz_logger_backend.IFuzzLoggerBackend):
 
     def log_error(self, description):
         self._print_log_msg(["error", "", "", description])
+        self._output.flush()
 
     def log_recv(self, data):
-        self._print_log_msg(["recv", len(data), self._format_raw_bytes(data), repr(data)])
+        self._print_log_msg(["recv", len(data)] + self._format_data(data))
 
     def log_send(self, data):
-        self._print_log_msg(["send", len(data), self._format_raw_bytes(data), repr(data)])
+        self._print_log_msg(["send", len(data)] + self._format_data(data))
 
     def log_info(self, description):
         self._print_log_msg(["info", "", "", description])
@@ -64,15 +84,22 @@ class FuzzLoggerCsv(ifuzz_logger_backend.IFuzzLoggerBackend):
 
     def log_fail(self, description=""):
         self._print_log_msg(["fail", "", "", description])
+        self._output.flush()
 
     def log_pass(self, description=""):
         self._print_log_msg(["pass", "", "", description])
 
     def close_test_case(self):
-        pass
+        self._output.flush()
 
     def close_test(self):
-        pass
+        self._output.flush()
+
+    def _format_data(self, data):
+        return [
+            helpers.abbreviate_bytes(data, self.max_data_length, self.tail_length, bytes_to_str=self._format_raw_bytes),
+            helpers.abbreviate_bytes(data, self.max_data_length, self.tail_length, bytes_to_str=repr),
+        ]
 
     def _print_log_msg(self, msg):
         time_stamp = get_time_stamp()
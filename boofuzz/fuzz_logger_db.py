@@ -1,7 +1,17 @@
 import collections
 import datetime
+import hashlib
+import itertools
+import os
+import queue
+import re
 import sqlite3
 import sys
+import threading
+import time
+import urllib.request
+import warnings
+import zlib
 
 from . import data_test_case, data_test_step, exception, helpers, ifuzz_logger_backend
 
@@ -24,32 +34,327 @@ def hex_to_hexstr(input_bytes):
 
 DEFAULT_HEX_TO_STR = hex_to_hexstr
 
+# Control messages for the writer thread
+_FLUSH = object()
+_STOP = object()
+# Queued in place of _INSERT_STEP for payload steps the writer should store in compact form
+_COMPACT_STEP = object()
+
 
 def get_time_stamp():
     s = datetime.datetime.utcnow().isoformat()
     return s
 
 
+SCHEMA_VERSION = 6
+
+BLOB_COMPRESSIONS = ("zlib", "zstd")
+
+_INSERT_STEP = """INSERT INTO steps (test_case_index, type, description, data, timestamp, is_truncated)
+                  VALUES(?, ?, ?, ?, ?, ?)"""
+_INSERT_STEP_FULL = """INSERT INTO steps (test_case_index, type, description, data, timestamp, is_truncated,
+                                    blob_hash, data_length, data_hash) VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+_INSERT_FAILURE = """INSERT INTO failures (test_case_index, description, request, element, monitor, bucket)
+                     VALUES(?, ?, ?, ?, ?, ?)"""
+
+#: Columns of the failures table that failures can be filtered by, see FuzzLoggerDbReader.failure_page.
+FAILURE_FILTERS = ("request", "element", "monitor", "bucket")
+
+MAX_BUCKET_LENGTH = 120
+
+# Failures logged by Session on behalf of a monitor, e.g. "ProcessMonitor#1234[host:26002] detected crash on ..."
+_MONITOR_FAILURE = re.compile(
+    r"(.+?) (?:detected crash on test case|provided additional information for crash on) #\d+: ", re.DOTALL
+)
+_NUMBERS = re.compile(r"0x[0-9a-fA-F]+|\d+")
+
+
+def classify_failure(test_case_name, description):
+    """Derive the keys failures can be filtered by from a test case name and failure description.
+
+    - request: Fuzzed message, i.e. the last message of the test case.
+    - element: Qualified name of the first mutated element, or None.
+    - monitor: Monitor that reported the failure without its object id, or None.
+    - bucket: First line of the synopsis with numbers replaced by "#", so that similar crashes share a bucket.
+
+    Args:
+        test_case_name (str): Test case name as built by Session.
+        description (str): Failure description.
+
+    Returns:
+        tuple: request, element, monitor and bucket.
+    """
+    try:
+        path, mutation_names = helpers.parse_test_case_name(test_case_name)
+    except exception.BoofuzzError:
+        path, mutation_names = [test_case_name], []
+    element = helpers.split_mutation_name(mutation_names[0])[0] if mutation_names else None
+    synopsis = description or ""
+    monitor = None
+    match = _MONITOR_FAILURE.match(synopsis)
+    if match is not None:
+        monitor = re.sub(r"#\d+", "", match.group(1))
+        synopsis = synopsis[match.end() :]
+    bucket = _NUMBERS.sub("#", synopsis.strip().split("\n", 1)[0])[:MAX_BUCKET_LENGTH]
+    return path[-1], element, monitor, bucket
+
+
+def _create_v1_tables(cursor):
+    cursor.execute("""CREATE TABLE cases (name text, number integer, timestamp TEXT)""")
+    cursor.execute("""CREATE TABLE steps (test_case_index integer, type text, description text, data blob,
+                            timestamp TEXT, is_truncated BOOLEAN)""")
+
+
+def _migrate_to_v2(cursor):
+    cursor.execute("""CREATE INDEX IF NOT EXISTS cases_number ON cases (number)""")
+    cursor.execute("""CREATE INDEX IF NOT EXISTS steps_test_case_index ON steps (test_case_index)""")
+    cursor.execute("""CREATE INDEX IF NOT EXISTS steps_type ON steps (type)""")
+    cursor.execute("""CREATE TABLE failures (test_case_index integer, description text)""")
+    cursor.execute("""CREATE INDEX failures_test_case_index ON failures (test_case_index)""")
+    cursor.execute(
+        """INSERT INTO failures SELECT test_case_index, description FROM steps WHERE type='fail' ORDER BY rowid"""
+    )
+    # Keep the summary table up to date no matter who writes the steps.
+    cursor.execute("""CREATE TRIGGER steps_failures AFTER INSERT ON steps WHEN NEW.type = 'fail'
+           BEGIN INSERT INTO failures VALUES (NEW.test_case_index, NEW.description); END""")
+
+
+def _migrate_to_v3(cursor):
+    # Existing payloads stay inline in steps.data; only new ones go to the blob store.
+    cursor.execute("""CREATE TABLE blobs (hash blob PRIMARY KEY, encoding text, data blob) WITHOUT ROWID""")
+    cursor.execute("""ALTER TABLE steps ADD COLUMN blob_hash blob""")
+
+
+def _migrate_to_v4(cursor):
+    cursor.execute("""ALTER TABLE steps ADD COLUMN data_length integer""")
+    cursor.execute("""ALTER TABLE steps ADD COLUMN data_hash blob""")
+
+
+def _migrate_to_v5(cursor):
+    # Entries evicted from in-memory bookkeeping, see spill_dict.SpillDict
+    cursor.execute("""CREATE TABLE spilled (namespace text, key blob, value blob, PRIMARY KEY (namespace, key))""")
+
+
+def _migrate_to_v6(cursor):
+    # Failures get keys to filter and page by. Classifying needs Python, so FuzzLoggerDb inserts failure rows itself.
+    cursor.execute("""DROP TRIGGER IF EXISTS steps_failures""")
+    for column in FAILURE_FILTERS:
+        cursor.execute("""ALTER TABLE failures ADD COLUMN {0} text""".format(column))
+    rows = cursor.execute("""SELECT failures.rowid, cases.name, failures.description FROM failures
+           LEFT JOIN cases ON cases.number = failures.test_case_index""").fetchall()
+    cursor.executemany(
+        """UPDATE failures SET request=?, element=?, monitor=?, bucket=? WHERE rowid=?""",
+        [classify_failure(name or "", description) + (rowid,) for rowid, name, description in rows],
+    )
+    for column in FAILURE_FILTERS:
+        cursor.execute("""CREATE INDEX failures_{0} ON failures ({0}, test_case_index)""".format(column))
+
+
+# (version, function upgrading from the previous version)
+_MIGRATIONS = [
+    (2, _migrate_to_v2),
+    (3, _migrate_to_v3),
+    (4, _migrate_to_v4),
+    (5, _migrate_to_v5),
+    (6, _migrate_to_v6),
+]
+
+
+def payload_hash(data):
+    """Hash identifying a sent or received payload in the run database.
+
+    Args:
+        data (bytes): Payload.
+
+    Returns:
+        bytes: 16 byte BLAKE2b digest.
+    """
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _zstd():
+    try:
+        import zstandard  # pytype: disable=import-error
+    except ImportError:
+        warnings.warn("Importing zstandard package failed. Please install it using pip.", UserWarning)
+        raise
+    return zstandard
+
+
+def _encode_blob(data, compression):
+    """Compress a payload for the blob store, keeping it raw if compression does not make it smaller."""
+    if compression == "zlib":
+        compressed = zlib.compress(data, 1)
+    elif compression == "zstd":
+        compressed = _zstd().ZstdCompressor(level=3).compress(data)
+    else:
+        return "", data
+    if len(compressed) < len(data):
+        return compression, compressed
+    return "", data
+
+
+def _decode_blob(data, encoding):
+    if encoding == "zlib":
+        return zlib.decompress(data)
+    if encoding == "zstd":
+        return _zstd().ZstdDecompressor().decompress(data)
+    return bytes(data)
+
+
+def _read_test_case(cursor, index, schema_version):
+    """Read a test case and its steps, resolving payloads from the blob store.
+
+    Returns:
+        DataTestCase: The test case, or None if there is no test case with this index.
+    """
+    try:
+        test_case_row = next(cursor.execute("""SELECT * FROM cases WHERE number=?""", [index]))
+    except StopIteration:
+        return None
+
+    if schema_version >= 3:
+        rows = cursor.execute(
+            """SELECT steps.type, steps.description, steps.data, steps.timestamp, steps.is_truncated, blobs.encoding,
+                      blobs.data, {0}
+               FROM steps LEFT JOIN blobs ON steps.blob_hash = blobs.hash
+               WHERE steps.test_case_index=? ORDER BY steps.rowid""".format(
+                "steps.data_length, steps.data_hash" if schema_version >= 4 else "NULL, NULL"
+            ),
+            [index],
+        )
+    else:
+        rows = cursor.execute(
+            """SELECT type, description, data, timestamp, is_truncated, NULL, NULL, NULL, NULL FROM steps
+               WHERE test_case_index=? ORDER BY rowid""",
+            [index],
+        )
+    steps = []
+    for step_type, description, data, timestamp, truncated, blob_encoding, blob_data, length, data_hash in rows:
+        if blob_data is not None:
+            data = _decode_blob(blob_data, blob_encoding)
+        steps.append(
+            data_test_step.DataTestStep(
+                type=step_type,
+                description=description,
+                data=data,
+                timestamp=timestamp,
+                truncated=truncated,
+                data_length=length,
+                data_hash=data_hash,
+            )
+        )
+    return data_test_case.DataTestCase(
+        name=test_case_row[0], index=test_case_row[1], timestamp=test_case_row[2], steps=steps
+    )
+
+
+def get_schema_version(connection):
+    """Version of the results schema in a database.
+
+    Args:
+        connection (sqlite3.Connection): Open database.
+
+    Returns:
+        int: Schema version; 0 for an empty database and 1 for databases from before versioning.
+    """
+    tables = {row[0] for row in connection.execute("""SELECT name FROM sqlite_master WHERE type='table'""")}
+    if "schema_version" in tables:
+        return next(connection.execute("""SELECT version FROM schema_version"""))[0]
+    if "cases" in tables:
+        return 1
+    return 0
+
+
+def upgrade_schema(connection):
+    """Create the results schema in an empty database or migrate an older one to SCHEMA_VERSION.
+
+    Each migration runs in its own transaction. Migrating a large existing run builds its indexes once, which can
+    take a while.
+
+    Args:
+        connection (sqlite3.Connection): Open database.
+
+    Returns:
+        int: Schema version after the upgrade.
+    """
+    version = get_schema_version(connection)
+    if version >= SCHEMA_VERSION:
+        return version
+    cursor = connection.cursor()
+    if version == 0:
+        _create_v1_tables(cursor)
+        version = 1
+    for target_version, migrate in _MIGRATIONS:
+        if version < target_version:
+            migrate(cursor)
+            cursor.execute("""CREATE TABLE IF NOT EXISTS schema_version (version integer)""")
+            cursor.execute("""DELETE FROM schema_version""")
+            cursor.execute("""INSERT INTO schema_version VALUES (?)""", [target_version])
+            connection.commit()
+            version = target_version
+    return version
+
+
 class FuzzLoggerDb(ifuzz_logger_backend.IFuzzLoggerBackend):
     """
     Log fuzz data in a sqlite database file.
     Using an existing database requires more graceful exits to prevent case number duplication.
+
+    Rows are written by a background thread, so the fuzzing thread only has to hand over each batch of queued steps.
+    The writer inserts batches with executemany and commits every `commit_interval` seconds or `commit_count` rows,
+    whichever comes first. The database uses WAL journaling with synchronous=NORMAL, which keeps commits cheap and
+    lets readers like the web UI work concurrently. close_test() waits for all rows to be committed.
+
+    Sent and received payloads are kept in a content-addressed blob store: each distinct payload is stored once in
+    the ``blobs`` table, keyed by its BLAKE2b hash and optionally compressed, and steps reference it by hash.
+
+    In compact mode, sent and received payloads of test cases without failures are reduced to their length, hash and
+    a short prefix. Together with the test case name, which encodes the message path and mutations, this is enough to
+    regenerate sent payloads from the protocol definition, see :meth:`Session.test_case_data
+    <boofuzz.Session.test_case_data>`. Payloads of failing test cases are always stored in full.
+
+    Args:
+        db_filename (str): Name of the database file.
+        num_log_cases (int): Number of test cases to keep before a failure; 0 logs all test cases. Default 0.
+        commit_interval (float): Maximum seconds between commits of the writer thread. Default 1.0.
+        commit_count (int): Maximum number of rows written between commits. Default 1000.
+        write_queue_size (int): Maximum number of batches waiting for the writer. The fuzzing thread blocks when the
+            queue is full. Default 1024.
+        blob_store (bool): Store payloads in the blob store instead of inline. Default True.
+        compression (str): Compress blobs with "zlib" or "zstd" (requires the zstandard package). Default None.
+        blob_cache_size (int): Number of recently stored blob hashes remembered to skip redundant inserts.
+            Default 65536.
+        compact (bool): Store only length, hash and prefix of payloads of test cases without failures. Default False.
+        compact_prefix_length (int): Number of leading payload bytes kept in compact mode. Default 32.
     """
 
-    def __init__(self, db_filename, num_log_cases=0):
-        # Check if a db exists before the connect leaves an "empty" file behind.
-        db_already_exist = helpers.path_exists(db_filename)
+    def __init__(
+        self,
+        db_filename,
+        num_log_cases=0,
+        commit_interval=1.0,
+        commit_count=1000,
+        write_queue_size=1024,
+        blob_store=True,
+        compression=None,
+        blob_cache_size=65536,
+        compact=False,
+        compact_prefix_length=32,
+    ):
+        if compression is not None and compression not in BLOB_COMPRESSIONS:
+            raise ValueError("compression must be one of {0}, got {1!r}".format(BLOB_COMPRESSIONS, compression))
+        if compression == "zstd":
+            _zstd()
+        self._db_filename = db_filename
         self._database_connection = sqlite3.connect(db_filename, check_same_thread=False)
         self._db_cursor = self._database_connection.cursor()
-
-        if not db_already_exist:
-            self._db_cursor.execute("""CREATE TABLE cases (name text, number integer, timestamp TEXT)""")
-            self._db_cursor.execute(
-                """CREATE TABLE steps (test_case_index integer, type text, description text, data blob,
-                                    timestamp TEXT, is_truncated BOOLEAN)"""
-            )
+        self._db_cursor.execute("PRAGMA journal_mode=WAL")
+        self._db_cursor.execute("PRAGMA synchronous=NORMAL")
+        upgrade_schema(self._database_connection)
 
         self._current_test_case_index = 0
+        self._current_test_case_name = ""
 
         self._queue = collections.deque([])  # Queue that holds last n test cases before commiting
         self._queue_max_len = num_log_cases
@@ -57,144 +362,76 @@ class FuzzLoggerDb(ifuzz_logger_backend.IFuzzLoggerBackend):
         self._log_first_case = True
         self._data_truncate_length = 512
 
+        self._commit_interval = commit_interval
+        self._commit_count = commit_count
+        self._write_queue = queue.Queue(maxsize=write_queue_size)
+        self._writer_thread = None
+        self._writer_error = None
+        self._reader = None  # read-only connections for get_test_case_data
+
+        self._blob_store = blob_store
+        self._compression = compression
+        self._blob_cache = collections.OrderedDict()
+        self._blob_cache_size = blob_cache_size
+        self._compact = compact
+        self._compact_prefix_length = compact_prefix_length
+
     def get_test_case_data(self, index):
-        c = self._database_connection.cursor()
+        """Read a test case, e.g. for the web server, once the batches handed to the writer thread are committed.
+
+        Reads through a separate read-only connection per thread. Errors of the writer thread are left to be raised
+        on the logging thread.
+
+        Returns:
+            DataTestCase: Test case, or None if it is not in the database.
+        """
+        self._wait_for_writer()
+        if self._reader is None:
+            self._reader = FuzzLoggerDbReader(db_filename=self._db_filename, read_only=True)
         try:
-            test_case_row = next(c.execute("""SELECT * FROM cases WHERE number=?""", [index]))
-        except StopIteration:
+            return self._reader.get_test_case_data(index)
+        except exception.BoofuzzNoSuchTestCase:
             return None
-        rows = c.execute("""SELECT * FROM steps WHERE test_case_index=?""", [index])
-        steps = []
-        for row in rows:
-            data = row[3]
-            # Little hack since BLOB becomes type buffer in py2 and bytes in py3
-            # At the end, data will be equivalent types: bytes in py3 and str in py2
-            try:
-                if isinstance(data, buffer):
-                    data = str(data)
-            except NameError as e:
-                if "buffer" in str(e):  # buffer type does not exist in py3
-                    pass
-                else:
-                    raise
-            steps.append(
-                data_test_step.DataTestStep(
-                    type=row[1], description=row[2], data=data, timestamp=row[4], truncated=row[5]
-                )
-            )
-        return data_test_case.DataTestCase(
-            name=test_case_row[0], index=test_case_row[1], timestamp=test_case_row[2], steps=steps
-        )
 
     def open_test_case(self, test_case_id, name, index, *args, **kwargs):
         self._queue.append(["INSERT INTO cases VALUES(?, ?, ?);\n", name, index, helpers.get_time_stamp()])
         self._current_test_case_index = index
+        self._current_test_case_name = name
 
     def open_test_step(self, description):
-        self._queue.append(
-            [
-                "INSERT INTO steps VALUES(?, ?, ?, ?, ?, ?);\n",
-                self._current_test_case_index,
-                "step",
-                description,
-                b"",
-                helpers.get_time_stamp(),
-                False,
-            ]
-        )
+        self._queue_step("step", description)
 
     def log_check(self, description):
-        self._queue.append(
-            [
-                "INSERT INTO steps VALUES(?, ?, ?, ?, ?, ?);\n",
-                self._current_test_case_index,
-                "check",
-                description,
-                b"",
-                helpers.get_time_stamp(),
-                False,
-            ]
-        )
+        self._queue_step("check", description)
 
     def log_error(self, description):
-        self._queue.append(
-            [
-                "INSERT INTO steps VALUES(?, ?, ?, ?, ?, ?);\n",
-                self._current_test_case_index,
-                "error",
-                description,
-                b"",
-                helpers.get_time_stamp(),
-                False,
-            ]
-        )
+        self._queue_step("error", description)
         self._fail_detected = True
         self._write_log()
 
     def log_recv(self, data):
-        self._queue.append(
-            [
-                "INSERT INTO steps VALUES(?, ?, ?, ?, ?, ?);\n",
-                self._current_test_case_index,
-                "receive",
-                "",
-                buffer(data),
-                helpers.get_time_stamp(),
-                False,
-            ]
-        )
+        self._queue_step("receive", "", buffer(data))
 
     def log_send(self, data):
-        self._queue.append(
-            [
-                "INSERT INTO steps VALUES(?, ?, ?, ?, ?, ?);\n",
-                self._current_test_case_index,
-                "send",
-                "",
-                buffer(data),
-                helpers.get_time_stamp(),
-                False,
-            ]
-        )
+        self._queue_step("send", "", buffer(data))
 
     def log_info(self, description):
-        self._queue.append(
-            [
-                "INSERT INTO steps VALUES(?, ?, ?, ?, ?, ?);\n",
-                self._current_test_case_index,
-                "info",
-                description,
-                b"",
-                helpers.get_time_stamp(),
-                False,
-            ]
-        )
+        self._queue_step("info", description)
 
     def log_fail(self, description=""):
+        self._queue_step("fail", description)
         self._queue.append(
-            [
-                "INSERT INTO steps VALUES(?, ?, ?, ?, ?, ?);\n",
-                self._current_test_case_index,
-                "fail",
-                description,
-                b"",
-                helpers.get_time_stamp(),
-                False,
-            ]
+            [_INSERT_FAILURE, self._current_test_case_index, description]
+            + list(classify_failure(self._current_test_case_name, description))
         )
         self._fail_detected = True
 
     def log_pass(self, description=""):
+        self._queue_step("pass", description)
+
+    def _queue_step(self, step_type, description, data=b""):
         self._queue.append(
-            [
-                "INSERT INTO steps VALUES(?, ?, ?, ?, ?, ?);\n",
-                self._current_test_case_index,
-                "pass",
-                description,
-                b"",
-                helpers.get_time_stamp(),
-                False,
-            ]
+            [_INSERT_STEP, self._current_test_case_index, step_type, description, data, helpers.get_time_stamp(), False]
         )
 
     def close_test_case(self):
@@ -202,30 +439,145 @@ class FuzzLoggerDb(ifuzz_logger_backend.IFuzzLoggerBackend):
 
     def close_test(self):
         self._write_log(force=True)
+        self._stop_writer()
+
+    def flush(self):
+        """Wait until all batches handed to the writer thread are committed, and raise any error it ran into."""
+        self._wait_for_writer()
+        self._raise_writer_error()
+
+    def _wait_for_writer(self):
+        if self._writer_thread is not None and self._writer_thread.is_alive():
+            self._write_queue.put(_FLUSH)
+            self._write_queue.join()
 
     def _write_log(self, force=False):
         if len(self._queue) > 0:
+            write_all = force
             if self._queue_max_len > 0:
                 while (
                     self._current_test_case_index - next(x for x in self._queue[0] if isinstance(x, int))
                 ) >= self._queue_max_len:
                     self._queue.popleft()
             else:
-                force = True
-
-            if force or self._fail_detected or self._log_first_case:
-                for query in self._queue:
+                write_all = True
+
+            if write_all or self._fail_detected or self._log_first_case:
+                if self._compact:
+                    for query in self._queue:
+                        if (
+                            query[0] == _INSERT_STEP
+                            and query[2] in ["send", "receive"]
+                            and not (self._fail_detected and query[1] == self._current_test_case_index)
+                        ):
+                            query[0] = _COMPACT_STEP
+                elif not self._fail_detected:
                     # abbreviate long entries first
-                    if not self._fail_detected:
+                    for query in self._queue:
                         self._truncate_send_recv(query)
-                    self._db_cursor.execute(query[0], query[1:])
+                self._submit(list(self._queue))
                 self._queue.clear()
-                self._database_connection.commit()
+                if force or self._fail_detected:
+                    self.flush()
                 self._log_first_case = False
                 self._fail_detected = False
 
+    def _submit(self, batch):
+        """Hand a batch of queries to the writer thread, blocking only while the write queue is full."""
+        self._raise_writer_error()
+        if self._writer_thread is None or not self._writer_thread.is_alive():
+            self._writer_thread = threading.Thread(target=self._writer_loop, name="FuzzLoggerDb writer")
+            self._writer_thread.daemon = True
+            self._writer_thread.start()
+        self._write_queue.put(batch)
+
+    def _stop_writer(self):
+        if self._writer_thread is not None and self._writer_thread.is_alive():
+            self._write_queue.put(_STOP)
+            self._writer_thread.join()
+        self._writer_thread = None
+        self._raise_writer_error()
+
+    def _raise_writer_error(self):
+        if self._writer_error is not None:
+            error, self._writer_error = self._writer_error, None
+            raise error
+
+    def _writer_loop(self):
+        uncommitted_rows = 0
+        last_commit = time.monotonic()
+        while True:
+            timeout = None
+            if uncommitted_rows > 0:
+                timeout = max(0.0, self._commit_interval - (time.monotonic() - last_commit))
+            try:
+                item = self._write_queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None  # commit interval elapsed
+
+            try:
+                if item is not None and item is not _FLUSH and item is not _STOP:
+                    for statement, queries in itertools.groupby(item, key=lambda q: q[0]):
+                        rows = [query[1:] for query in queries]
+                        if statement == _INSERT_STEP or statement is _COMPACT_STEP:
+                            rows = self._prepare_steps(rows, compact=statement is _COMPACT_STEP)
+                            statement = _INSERT_STEP_FULL
+                        self._db_cursor.executemany(statement, rows)
+                        uncommitted_rows += len(rows)
+                if uncommitted_rows > 0 and (
+                    uncommitted_rows >= self._commit_count or item is None or item is _FLUSH or item is _STOP
+                ):
+                    self._database_connection.commit()
+                    uncommitted_rows = 0
+                    last_commit = time.monotonic()
+            except Exception as e:
+                self._writer_error = e
+                # drop the rows of the failed batch, so the next commit does not store half a test case
+                self._database_connection.rollback()
+                self._blob_cache.clear()
+                uncommitted_rows = 0
+            finally:
+                if item is not None:
+                    self._write_queue.task_done()
+            if item is _STOP:
+                return
+
+    def _prepare_steps(self, rows, compact):
+        """Add payload length and hash to step rows, moving payloads to the blob store or reducing them to a prefix.
+
+        Returns:
+            list: Rows for _INSERT_STEP_FULL.
+        """
+        new_blobs = []
+        step_rows = []
+        for row in rows:
+            data = row[3]
+            if len(data) == 0:
+                step_rows.append(row + [None, None, None])
+                continue
+            data = bytes(data)
+            digest = payload_hash(data)
+            if compact:
+                step_rows.append(row[:3] + [data[: self._compact_prefix_length], row[4], True, None, len(data), digest])
+                continue
+            if not self._blob_store:
+                step_rows.append(row + [None, len(data), digest])
+                continue
+            if digest in self._blob_cache:
+                self._blob_cache.move_to_end(digest)
+            else:
+                encoding, stored = _encode_blob(data, self._compression)
+                new_blobs.append((digest, encoding, stored))
+                self._blob_cache[digest] = None
+                if len(self._blob_cache) > self._blob_cache_size:
+                    self._blob_cache.popitem(last=False)
+            step_rows.append(row[:3] + [b""] + row[4:] + [digest, len(data), digest])
+        if new_blobs:
+            self._db_cursor.executemany("""INSERT OR IGNORE INTO blobs VALUES (?, ?, ?)""", new_blobs)
+        return step_rows
+
     def _truncate_send_recv(self, query):
-        if query[2] in ["send", "recv"] and len(query[4]) > self._data_truncate_length:
+        if query[0] == _INSERT_STEP and query[2] in ["send", "recv"] and len(query[4]) > self._data_truncate_length:
             query[6] = True
             query[4] = buffer(query[4][: self._data_truncate_length])
 
@@ -233,56 +585,148 @@ class FuzzLoggerDb(ifuzz_logger_backend.IFuzzLoggerBackend):
 class FuzzLoggerDbReader:
     """Read fuzz data saved using FuzzLoggerDb
 
+    Databases written with an older schema are migrated on open, unless the file is read-only.
+
+    With `read_only`, the database is opened read-only and never migrated, and each thread gets its own connection.
+    Readers then run concurrently with each other and, thanks to WAL journaling, with a FuzzLoggerDb still writing
+    to the file; they see the rows committed so far.
+
     Args:
         db_filename (str): Name of database file to read.
+        read_only (bool): Open read-only with one connection per thread. Default False.
     """
 
-    def __init__(self, db_filename):
+    def __init__(self, db_filename, read_only=False):
+        self._db_filename = db_filename
+        self._read_only = read_only
+        self._connections = threading.local()
+        if read_only:
+            self._database_connection = None
+            self._db_cursor = None
+            self._schema_version = get_schema_version(self._connection())
+            return
         self._database_connection = sqlite3.connect(db_filename, check_same_thread=False)
         self._db_cursor = self._database_connection.cursor()
+        try:
+            self._schema_version = upgrade_schema(self._database_connection)
+        except sqlite3.OperationalError:
+            self._database_connection.rollback()
+            self._schema_version = get_schema_version(self._database_connection)
+
+    def _connection(self):
+        connection = getattr(self._connections, "connection", None)
+        if connection is None:
+            uri = "file:{0}?mode=ro".format(urllib.request.pathname2url(os.path.abspath(self._db_filename)))
+            connection = self._connections.connection = sqlite3.connect(uri, uri=True)
+        return connection
+
+    def _cursor(self):
+        if not self._read_only:
+            return self._db_cursor
+        cursor = getattr(self._connections, "cursor", None)
+        if cursor is None:
+            cursor = self._connections.cursor = self._connection().cursor()
+        return cursor
+
+    @property
+    def schema_version(self):
+        """Schema version of the database, see SCHEMA_VERSION."""
+        return self._schema_version
 
     def get_test_case_data(self, index):
-        c = self._db_cursor
-        try:
-            test_case_row = next(c.execute("""SELECT * FROM cases WHERE number=?""", [index]))
-        except StopIteration:
+        test_case = _read_test_case(self._cursor(), index, self._schema_version)
+        if test_case is None:
             raise exception.BoofuzzNoSuchTestCase()
-
-        rows = c.execute("""SELECT * FROM steps WHERE test_case_index=?""", [index])
-        steps = []
-        for row in rows:
-            data = row[3]
-            # Little hack since BLOB becomes type buffer in py2 and bytes in py3
-            # At the end, data will be equivalent types: bytes in py3 and str in py2
-            try:
-                if isinstance(data, buffer):
-                    data = str(data)
-            except NameError as e:
-                if "buffer" in str(e):  # buffer type does not exist in py3
-                    pass
-                else:
-                    raise
-            steps.append(
-                data_test_step.DataTestStep(
-                    type=row[1], description=row[2], data=data, timestamp=row[4], truncated=row[5]
-                )
-            )
-        return data_test_case.DataTestCase(
-            name=test_case_row[0], index=test_case_row[1], timestamp=test_case_row[2], steps=steps
-        )
+        return test_case
 
     def query(self, query, params=None):
         if params is None:
             params = []
-        c = self._db_cursor
+        c = self._cursor()
         return c.execute(query, params)
 
     @property
     def failure_map(self):
-        c = self._db_cursor
-        failure_steps = c.execute('''SELECT * FROM steps WHERE type="fail"''')
+        c = self._cursor()
+        if self._schema_version >= 2:
+            failures = c.execute("""SELECT test_case_index, description FROM failures ORDER BY rowid""")
+        else:
+            failures = c.execute("""SELECT test_case_index, description FROM steps WHERE type='fail'""")
 
         failure_map = collections.defaultdict(list)
-        for step in failure_steps:
-            failure_map[step[0]].append(step[2])
+        for test_case_index, description in failures:
+            failure_map[test_case_index].append(description)
         return failure_map
+
+    def failure_page(self, after=0, limit=100, filters=None):
+        """Read one page of failing test cases, in test case order.
+
+        Pages are addressed by a cursor, the last test case index of the previous page, so each page is a range
+        scan on an index no matter how far into the list it is.
+
+        Args:
+            after (int): Return test cases after this index. Default 0.
+            limit (int): Maximum number of test cases. Default 100.
+            filters (dict): Only return test cases with a failure matching all of these columns, see FAILURE_FILTERS.
+                Needs schema version 6. Default None.
+
+        Returns:
+            tuple: List of (test case index, list of failure descriptions) and the cursor of the next page, or None if
+            this is the last page.
+        """
+        filters = {key: value for key, value in (filters or {}).items() if value is not None}
+        for key in filters:
+            if key not in FAILURE_FILTERS:
+                raise ValueError("can not filter failures by {0!r}".format(key))
+        if filters and self._schema_version < 6:
+            raise exception.BoofuzzError(
+                "database schema version {0} does not support filtering failures".format(self._schema_version)
+            )
+        if self._schema_version >= 2:
+            table, condition = "failures", "1"
+        else:
+            table, condition = "steps", "type = 'fail'"
+        where = [condition, "test_case_index > ?"] + ["{0} = ?".format(key) for key in filters]
+        c = self._cursor()
+        indices = [
+            row[0]
+            for row in c.execute(
+                """SELECT DISTINCT test_case_index FROM {0} WHERE {1}
+                   ORDER BY test_case_index LIMIT ?""".format(table, " AND ".join(where)),
+                [after] + list(filters.values()) + [limit + 1],
+            )
+        ]
+        next_cursor = None
+        if len(indices) > limit:
+            indices = indices[:limit]
+            next_cursor = indices[-1] if indices else after
+        if not indices:
+            return [], next_cursor
+
+        reasons = collections.OrderedDict((index, []) for index in indices)
+        for test_case_index, description in c.execute(
+            """SELECT test_case_index, description FROM {0} WHERE {1} AND test_case_index BETWEEN ? AND ?
+               ORDER BY rowid""".format(table, condition),
+            [indices[0], indices[-1]],
+        ):
+            if test_case_index in reasons:
+                reasons[test_case_index].append(description)
+        return list(reasons.items()), next_cursor
+
+    def failure_counts(self, key, limit=100):
+        """Count failing test cases per value of a failure column, most frequent first.
+
+        Args:
+            key (str): Column, see FAILURE_FILTERS.
+            limit (int): Maximum number of values. Default 100.
+
+        Returns:
+            list: (value, number of test cases) tuples.
+        """
+        if key not in FAILURE_FILTERS:
+            raise ValueError("can not count failures by {0!r}".format(key))
+        if self._schema_version < 6:
+            return []
+        query = """SELECT {0}, COUNT(DISTINCT test_case_index) AS n FROM failures WHERE {0} IS NOT NULL
+                   GROUP BY {0} ORDER BY n DESC, {0} LIMIT ?""".format(key)
+        return self._cursor().execute(query, [limit]).fetchall()
@@ -0,0 +1,287 @@
+import os
+import socket
+import struct
+import time
+
+from . import helpers, ifuzz_logger_backend
+from .connections import ip_constants
+
+PROTOCOL_TCP = "tcp"
+PROTOCOL_UDP = "udp"
+
+LINKTYPE_RAW = 101  # packets start with the IPv4 header
+
+_BLOCK_TYPE_SHB = 0x0A0D0D0A
+_BLOCK_TYPE_IDB = 0x00000001
+_BLOCK_TYPE_EPB = 0x00000006
+_BYTE_ORDER_MAGIC = 0x1A2B3C4D
+_OPT_END = 0
+_OPT_COMMENT = 1
+_OPT_SHB_USERAPPL = 4
+
+_TCP_FIN = 0x01
+_TCP_SYN = 0x02
+_TCP_PSH = 0x08
+_TCP_ACK = 0x10
+
+_IPV4_HEADER_LENGTH = 20
+_TCP_HEADER_LENGTH = 20
+_UDP_HEADER_LENGTH = 8
+_IPV4_MAX_LENGTH = 65535
+_FIRST_SOURCE_PORT = 1024
+
+
+def _pad4(data):
+    return data + b"\x00" * (-len(data) % 4)
+
+
+def _options(options):
+    """Encode pcapng options given as (code, bytes) pairs."""
+    if not options:
+        return b""
+    encoded = b"".join(struct.pack("<HH", code, len(value)) + _pad4(value) for code, value in options)
+    return encoded + struct.pack("<HH", _OPT_END, 0)
+
+
+def _block(block_type, body):
+    length = 12 + len(body)
+    return struct.pack("<II", block_type, length) + body + struct.pack("<I", length)
+
+
+class FuzzLoggerPcap(ifuzz_logger_backend.IFuzzLoggerBackend):
+    """
+    Writes sent and received data as a pcapng capture that can be opened in Wireshark.
+
+    No traffic is captured; packets are synthesized from log_send and log_recv with IPv4 and TCP or UDP headers. Each
+    test case is a separate flow from the fuzzer to the target, using its own source port. TCP flows get a handshake
+    and teardown, and sequence numbers follow the data, so "Follow TCP Stream" shows the test case conversation. The
+    first packet of each test case carries a comment with the test case index and name; failures and errors are
+    added as comments to its last packet.
+
+    Data is written through a buffered file. With `max_file_size` set, a new file is started at the next test case
+    boundary once the current file reaches that size: ``boofuzz.pcapng`` is followed by ``boofuzz-0001.pcapng``,
+    ``boofuzz-0002.pcapng``, etc.
+
+    TCP and UDP checksums are left zero (Wireshark does not validate them by default). Payloads too large for a single
+    IPv4 packet are split into several segments for TCP and truncated for UDP.
+
+    Args:
+        filename (str): Capture file name.
+        protocol (str): "tcp" or "udp". Default "tcp".
+        target_port (int): Destination port of the flows, used by Wireshark to pick a dissector. Default 9.
+        fuzzer_address (str): IPv4 address of the fuzzer side. Default "10.0.0.1".
+        target_address (str): IPv4 address of the target side. Default "10.0.0.2".
+        max_file_size (int): Size in bytes after which a new file is started. Default None (no rotation).
+        buffer_size (int): Size of the write buffer in bytes. Default 1 MiB.
+    """
+
+    def __init__(
+        self,
+        filename,
+        protocol=PROTOCOL_TCP,
+        target_port=9,
+        fuzzer_address="10.0.0.1",
+        target_address="10.0.0.2",
+        max_file_size=None,
+        buffer_size=1 << 20,
+    ):
+        if protocol not in (PROTOCOL_TCP, PROTOCOL_UDP):
+            raise ValueError("protocol must be {0!r} or {1!r}, got {2!r}".format(PROTOCOL_TCP, PROTOCOL_UDP, protocol))
+        self.filename = filename
+        self.protocol = protocol
+        self.target_port = target_port
+        self.max_file_size = max_file_size
+        self._fuzzer_address = socket.inet_aton(fuzzer_address)
+        self._target_address = socket.inet_aton(target_address)
+        self._buffer_size = buffer_size
+        self._file = None
+        self._file_size = 0
+        self._file_number = 0
+        self.filenames = []
+
+        self._flow_open = False
+        self._source_port = _FIRST_SOURCE_PORT
+        self._seq = {}  # True (sent by fuzzer) -> next sequence number of that side
+        self._ip_id = 0
+        self._pending = None  # last packet of the test case, held back to attach failure comments
+        self._comments = []
+
+    def open_test_case(self, test_case_id, name, index, *args, **kwargs):
+        self._close_flow()
+        if self._file is not None and self.max_file_size is not None and self._file_size >= self.max_file_size:
+            self._close_file()
+            self._file_number += 1
+        if self._file is None:
+            self._open_file()
+        self._source_port = _FIRST_SOURCE_PORT + index % (65536 - _FIRST_SOURCE_PORT)
+        self._comments.append("Test case #{0}: {1}".format(index, name))
+
+    def open_test_step(self, description):
+        pass
+
+    def log_check(self, description):
+        pass
+
+    def log_error(self, description):
+        self._annotate("Error: {0}".format(description))
+
+    def log_recv(self, data):
+        self._log_data(data, from_fuzzer=False)
+
+    def log_send(self, data):
+        self._log_data(data, from_fuzzer=True)
+
+    def log_info(self, description):
+        pass
+
+    def log_fail(self, description=""):
+        self._annotate("Fail: {0}".format(description))
+
+    def log_pass(self, description=""):
+        pass
+
+    def close_test_case(self):
+        self._close_flow()
+
+    def close_test(self):
+        self._close_flow()
+        self._close_file()
+
+    def flush(self):
+        """Write buffered packets to the current file."""
+        if self._file is not None:
+            self._file.flush()
+
+    def _current_filename(self):
+        if self._file_number == 0:
+            return self.filename
+        root, ext = os.path.splitext(self.filename)
+        return "{0}-{1:04d}{2}".format(root, self._file_number, ext)
+
+    def _open_file(self):
+        filename = self._current_filename()
+        self._file = open(filename, "wb", buffering=self._buffer_size)
+        self.filenames.append(filename)
+        self._file_size = 0
+        self._write(
+            _block(
+                _BLOCK_TYPE_SHB,
+                struct.pack("<IHHq", _BYTE_ORDER_MAGIC, 1, 0, -1)
+                + _options([(_OPT_SHB_USERAPPL, "boofuzz {0}".format(helpers.get_boofuzz_version(helpers)).encode())]),
+            )
+        )
+        self._write(_block(_BLOCK_TYPE_IDB, struct.pack("<HHI", LINKTYPE_RAW, 0, 0)))
+
+    def _close_file(self):
+        if self._file is None:
+            return
+        self._write_pending()
+        self._file.close()
+        self._file = None
+
+    def _write(self, data):
+        self._file.write(data)
+        self._file_size += len(data)
+
+    def _annotate(self, comment):
+        if self._pending is not None:
+            self._pending[2].append(comment)
+        else:
+            self._comments.append(comment)
+
+    def _log_data(self, data, from_fuzzer):
+        if self._file is None:
+            self._open_file()
+        if not self._flow_open:
+            self._open_flow()
+        if not data:
+            return
+        if self.protocol == PROTOCOL_UDP:
+            max_payload = ip_constants.UDP_MAX_PAYLOAD_IPV4_THEORETICAL
+            if len(data) > max_payload:
+                self._comments.append("Truncated from {0} bytes".format(len(data)))
+                data = data[:max_payload]
+            self._packet(self._udp(data, from_fuzzer))
+            return
+        max_segment = _IPV4_MAX_LENGTH - _IPV4_HEADER_LENGTH - _TCP_HEADER_LENGTH
+        for offset in range(0, len(data), max_segment):
+            self._tcp_packet(from_fuzzer, _TCP_PSH | _TCP_ACK, data[offset : offset + max_segment])
+
+    def _open_flow(self):
+        self._flow_open = True
+        if self.protocol == PROTOCOL_TCP:
+            self._seq = {True: 0, False: 0}
+            self._tcp_packet(True, _TCP_SYN)
+            self._tcp_packet(False, _TCP_SYN | _TCP_ACK)
+            self._tcp_packet(True, _TCP_ACK)
+
+    def _close_flow(self):
+        if self._flow_open and self.protocol == PROTOCOL_TCP:
+            self._tcp_packet(True, _TCP_FIN | _TCP_ACK)
+            self._tcp_packet(False, _TCP_FIN | _TCP_ACK)
+            self._tcp_packet(True, _TCP_ACK)
+        self._flow_open = False
+        self._comments = []
+        if self._file is not None:
+            self._write_pending()
+
+    def _ports(self, from_fuzzer):
+        if from_fuzzer:
+            return self._source_port, self.target_port
+        return self.target_port, self._source_port
+
+    def _tcp_packet(self, from_fuzzer, flags, payload=b""):
+        source_port, destination_port = self._ports(from_fuzzer)
+        seq = self._seq[from_fuzzer]
+        ack = self._seq[not from_fuzzer] if flags & _TCP_ACK else 0
+        # SYN and FIN each take up one sequence number
+        self._seq[from_fuzzer] = (seq + len(payload) + (1 if flags & (_TCP_SYN | _TCP_FIN) else 0)) & 0xFFFFFFFF
+        header = struct.pack(
+            ">HHIIBBHHH", source_port, destination_port, seq, ack, _TCP_HEADER_LENGTH // 4 << 4, flags, 65535, 0, 0
+        )
+        self._packet(self._ipv4(ip_constants.IPV4_PROTOCOL_TCP, header + payload, from_fuzzer))
+
+    def _udp(self, payload, from_fuzzer):
+        source_port, destination_port = self._ports(from_fuzzer)
+        header = struct.pack(">HHHH", source_port, destination_port, _UDP_HEADER_LENGTH + len(payload), 0)
+        return self._ipv4(ip_constants.IPV4_PROTOCOL_UDP, header + payload, from_fuzzer)
+
+    def _ipv4(self, protocol, payload, from_fuzzer):
+        if from_fuzzer:
+            source, destination = self._fuzzer_address, self._target_address
+        else:
+            source, destination = self._target_address, self._fuzzer_address
+        self._ip_id = (self._ip_id + 1) & 0xFFFF
+        header = struct.pack(
+            ">BBHHHBBH4s4s",
+            0x45,
+            0,
+            _IPV4_HEADER_LENGTH + len(payload),
+            self._ip_id,
+            0x4000,  # don't fragment
+            64,
+            protocol,
+            0,
+            source,
+            destination,
+        )
+        checksum = helpers.ipv4_checksum(header)
+        return header[:10] + struct.pack(">H", checksum) + header[12:] + payload
+
+    def _packet(self, packet):
+        self._write_pending()
+        self._pending = (time.time(), packet, self._comments)
+        self._comments = []
+
+    def _write_pending(self):
+        if self._pending is None:
+            return
+        timestamp, packet, comments = self._pending
+        self._pending = None
+        microseconds = int(timestamp * 1000000)
+        body = (
+            struct.pack("<IIIII", 0, microseconds >> 32, microseconds & 0xFFFFFFFF, len(packet), len(packet))
+            + _pad4(packet)
+            + _options([(_OPT_COMMENT, comment.encode("utf-8", "replace")) for comment in comments])
+        )
+        self._write(_block(_BLOCK_TYPE_EPB, body))
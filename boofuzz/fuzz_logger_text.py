@@ -2,7 +2,7 @@ import sys
 
 from colorama import init
 
-from . import helpers, ifuzz_logger_backend
+from . import constants, helpers, ifuzz_logger_backend
 
 init()
 
@@ -20,16 +20,43 @@ class FuzzLoggerText(ifuzz_logger_backend.IFuzzLoggerBackend):
 
     INDENT_SIZE = 2
 
-    def __init__(self, file_handle=sys.stdout, bytes_to_str=DEFAULT_HEX_TO_STR):
+    def __init__(
+        self,
+        file_handle=sys.stdout,
+        bytes_to_str=DEFAULT_HEX_TO_STR,
+        log_level=constants.LOG_LEVEL_DEBUG,
+        max_data_length=None,
+        tail_length=16,
+        flush_interval=0.0,
+    ):
         """
         :type file_handle: io.BinaryIO
         :param file_handle: Open file handle for logging. Defaults to sys.stdout.
 
         :type bytes_to_str: function
         :param bytes_to_str: Function that converts sent/received bytes data to string for logging.
+
+        :type log_level: int
+        :param log_level: Minimum level of logged messages, see LOG_LEVEL_* in boofuzz.constants.
+            Defaults to LOG_LEVEL_DEBUG.
+
+        :type max_data_length: int
+        :param max_data_length: Maximum number of sent/received bytes to print. Longer data is shortened to its head and
+            last tail_length bytes, with its length and digest. Defaults to None (no limit).
+
+        :type tail_length: int
+        :param tail_length: Number of bytes from the end of shortened data to print. Defaults to 16.
+
+        :type flush_interval: float
+        :param flush_interval: Buffer output for up to this many seconds. Output is also written at the end of each
+            test case and on failures and errors. Defaults to 0 (write every line immediately).
         """
         self._file_handle = file_handle
         self._format_raw_bytes = bytes_to_str
+        self.log_level = log_level
+        self.max_data_length = max_data_length
+        self.tail_length = tail_length
+        self._output = helpers.LineBuffer(file_handle=file_handle, flush_interval=flush_interval)
 
     def open_test_step(self, description):
         self._print_log_msg(msg=description, msg_type="step")
@@ -39,12 +66,13 @@ class FuzzLoggerText(ifuzz_logger_backend.IFuzzLoggerBackend):
 
     def log_error(self, description):
         self._print_log_msg(msg=description, msg_type="error")
+        self._output.flush()
 
     def log_recv(self, data):
-        self._print_log_msg(data=data, msg_type="receive")
+        self._print_log_msg(msg=self._format_data(data), data=data, msg_type="receive")
 
     def log_send(self, data):
-        self._print_log_msg(data=data, msg_type="send")
+        self._print_log_msg(msg=self._format_data(data), data=data, msg_type="send")
 
     def log_info(self, description):
         self._print_log_msg(msg=description, msg_type="info")
@@ -54,18 +82,25 @@ class FuzzLoggerText(ifuzz_logger_backend.IFuzzLoggerBackend):
 
     def log_fail(self, description=""):
         self._print_log_msg(msg=description, msg_type="fail")
+        self._output.flush()
 
     def log_pass(self, description=""):
         self._print_log_msg(msg=description, msg_type="pass")
 
     def close_test_case(self):
-        pass
+        self._output.flush()
 
     def close_test(self):
-        pass
+        self._output.flush()
+
+    def _format_data(self, data):
+        if not data:
+            return None
+        return helpers.abbreviate_bytes(
+            data, max_length=self.max_data_length, tail_length=self.tail_length, bytes_to_str=self._format_raw_bytes
+        )
 
     def _print_log_msg(self, msg_type, msg=None, data=None):
-        print(
-            helpers.format_log_msg(msg_type=msg_type, description=msg, data=data, indent_size=self.INDENT_SIZE),
-            file=self._file_handle,
+        self._output.write(
+            helpers.format_log_msg(msg_type=msg_type, description=msg, data=data, indent_size=self.INDENT_SIZE) + "\n"
         )
@@ -1,4 +1,5 @@
 import errno
+import hashlib
 import os
 import re
 import signal
@@ -304,6 +305,9 @@ def udp_checksum(msg, src_addr, dst_addr):
     return ipv4_checksum(_udp_checksum_pseudo_header(src_addr, dst_addr, len(msg)) + msg)
 
 
+_HEX_TABLE = ["{:02x}".format(b) for b in range(256)]
+
+
 def hex_str(s):
     """
     Returns a hex-formatted string based on s.
@@ -314,7 +318,7 @@ def hex_str(s):
     Returns:
         str: Hex-formatted string representing s.
     """
-    return " ".join("{:02x}".format(b) for b in bytearray(s))
+    return " ".join(map(_HEX_TABLE.__getitem__, bytearray(s)))
 
 
 def pause_for_signal():
@@ -407,6 +411,83 @@ def hex_to_hexstr(input_bytes):
     return hex_str(input_bytes) + " " + repr(input_bytes)
 
 
+def abbreviate_bytes(input_bytes, max_length=None, tail_length=16, bytes_to_str=hex_to_hexstr):
+    """
+    Render input_bytes with bytes_to_str, keeping only its head and tail if it is longer than max_length.
+
+    The omitted middle is replaced by a note with the total length and a digest of the full data, so that long
+    payloads can still be told apart.
+
+    Args:
+        input_bytes (bytes): Arbitrary bytes.
+        max_length (int): Maximum number of bytes to render. None renders everything. Default None.
+        tail_length (int): Number of bytes at the end of input_bytes to render, out of max_length. Default 16.
+        bytes_to_str (function): Function rendering bytes as str. Default hex_to_hexstr.
+
+    Returns:
+        str: Printable string
+    """
+    if max_length is None or len(input_bytes) <= max_length:
+        return bytes_to_str(input_bytes)
+    tail_length = min(tail_length, max_length)
+    head = input_bytes[: max_length - tail_length]
+    tail = input_bytes[len(input_bytes) - tail_length :] if tail_length > 0 else b""
+    note = "[... {0} bytes omitted, {1} bytes total, blake2b {2} ...]".format(
+        len(input_bytes) - len(head) - len(tail),
+        len(input_bytes),
+        hashlib.blake2b(input_bytes, digest_size=8).hexdigest(),
+    )
+    parts = [note]
+    if head:
+        parts.insert(0, bytes_to_str(head))
+    if tail:
+        parts.append(bytes_to_str(tail))
+    return " ".join(parts)
+
+
+class LineBuffer:
+    """
+    File-like object collecting log output and writing it to a file handle in batches.
+
+    With a flush_interval of 0, every write goes straight to the file handle. Otherwise, output is written once
+    max_size characters are buffered or flush_interval seconds have passed since the last write-out, whichever comes
+    first, and when flush() is called.
+
+    Args:
+        file_handle: Open file handle to write to.
+        flush_interval (float): Maximum number of seconds output stays buffered while logging continues. Default 0.
+        max_size (int): Maximum number of characters buffered. Default 65536.
+    """
+
+    def __init__(self, file_handle, flush_interval=0.0, max_size=65536):
+        self.file_handle = file_handle
+        self.flush_interval = flush_interval
+        self.max_size = max_size
+        self._buffer = []
+        self._size = 0
+        self._last_flush = time.monotonic()
+
+    def write(self, text):
+        if self.flush_interval <= 0:
+            self.file_handle.write(text)
+            return
+        self._buffer.append(text)
+        self._size += len(text)
+        if self._size >= self.max_size or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Write buffered output to the file handle."""
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        text = "".join(self._buffer)
+        self._buffer = []
+        self._size = 0
+        self.file_handle.write(text)
+        self.file_handle.flush()
+
+
 def mkdir_safe(directory_name, file_included=False):
     """Creates directory_name and subdirectories. If file_included is true, removes final element of the path"""
     if file_included:
@@ -500,3 +581,20 @@ def parse_test_case_name(test_case):
         mutations = match.group(1)
         mutations = re.split(r",\s*", mutations)
         return path, mutations
+
+
+def split_mutation_name(mutation_name):
+    """Split a mutation name from a test case name into qualified element name and mutation index.
+
+    Example:
+        Input: "message1.first_byte:2"
+        Output: "message1.first_byte", 2
+
+    Returns:
+        The qualified name and the mutation index, or the whole name and None if it has no index.
+    """
+    qualified_name, _, index = mutation_name.rpartition(":")
+    try:
+        return qualified_name, int(index)
+    except ValueError:
+        return mutation_name, None
@@ -1,5 +1,7 @@
 import abc
 
+from . import constants
+
 
 # abc.ABCMeta is the metaclass in both python 2 and 3
 class IFuzzLogger(metaclass=abc.ABCMeta):
@@ -54,8 +56,39 @@ class IFuzzLogger(metaclass=abc.ABCMeta):
     Within a test step, a test may log data sent, data received, checks, check
     results, and other information.
 
+    Loggers receive only messages at or above their `log_level` (see the LOG_LEVEL_* constants); details logged with
+    log_debug are skipped unless the level is LOG_LEVEL_DEBUG.
+
     """
 
+    log_level = constants.LOG_LEVEL_DEBUG
+
+    def is_enabled(self, level):
+        """Return True if messages of the given level are logged.
+
+        Use this to skip preparing expensive log messages.
+
+        :param level: One of the LOG_LEVEL_* constants.
+        :type level: int
+
+        :return: True if the message would be logged.
+        :rtype: bool
+        """
+        return level >= self.log_level
+
+    def log_debug(self, description):
+        """
+        Records detailed information, passed on as log_info if debug messages are enabled.
+
+        :param description: Information, or a callable returning it, which is only called if the message is logged.
+        :type description: str
+
+        :return: None
+        :rtype: None
+        """
+        if self.is_enabled(constants.LOG_LEVEL_DEBUG):
+            self.log_info(description() if callable(description) else description)
+
     @abc.abstractmethod
     def open_test_case(self, test_case_id, name, index, *args, **kwargs):
         """
@@ -0,0 +1,201 @@
+import collections
+import gc
+import threading
+import time
+import tracemalloc
+
+import psutil
+
+from .data_test_step import DataTestStep
+from .mutation import Mutation
+from .mutation_context import MutationContext
+
+#: Types whose live instances are counted by default: one of each is created for every test case and should not
+#: outlive it.
+TRACKED_TYPES = (MutationContext, Mutation, DataTestStep)
+
+#: Default number of reports kept by a MemoryTracker.
+DEFAULT_HISTORY = 100
+
+AllocationSite = collections.namedtuple("AllocationSite", ["site", "size", "size_diff", "count", "count_diff"])
+AllocationSite.__doc__ = """Memory allocated by a source line still alive, in bytes and blocks, and the change."""
+
+MemoryReport = collections.namedtuple(
+    "MemoryReport", ["time", "rss", "objects", "containers", "traced", "traced_peak", "allocations"]
+)
+MemoryReport.__doc__ = """Memory use at a point of a run.
+
+time is a Unix timestamp, rss the resident set size in bytes, objects the number of live instances by type name and
+containers the number of entries by container name. traced and traced_peak are the current and peak size of the
+memory blocks traced by tracemalloc, and allocations the AllocationSites that changed most since the previous report;
+all three are None unless allocations are traced.
+"""
+
+# Allocations made by tracemalloc itself while taking snapshots.
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def count_objects(types):
+    """Count the live instances of `types`, excluding instances of subclasses.
+
+    Walks all objects tracked by the garbage collector, which takes tens of milliseconds in a large process.
+
+    Args:
+        types (iterable of type): Types to count.
+
+    Returns:
+        collections.OrderedDict: Number of instances by type name, in the order of `types`.
+    """
+    counts = collections.OrderedDict((t, 0) for t in types)
+    for o in gc.get_objects():
+        t = type(o)
+        if t in counts:
+            counts[t] += 1
+    return collections.OrderedDict((t.__name__, n) for t, n in counts.items())
+
+
+class MemoryTracker:
+    """Takes reports of the memory use of this process, to find what grows over a long campaign.
+
+    Each report holds the resident set size, the number of live instances of a few types, the sizes of the containers
+    passed by the caller and, if allocations are traced, the source lines whose live allocations changed most since
+    the previous report.
+
+    Tracing allocations with tracemalloc slows down every allocation, typically by a third or more.
+
+    Args:
+        types (iterable of type): Types whose live instances are counted. Default TRACKED_TYPES.
+        trace_allocations (bool): Trace allocations with tracemalloc. Default False.
+        top (int): Number of allocation sites in each report. Default 10.
+        history (int): Number of reports kept. Default DEFAULT_HISTORY.
+    """
+
+    def __init__(self, types=TRACKED_TYPES, trace_allocations=False, top=10, history=DEFAULT_HISTORY):
+        self.types = tuple(types)
+        self.trace_allocations = trace_allocations
+        self.top = top
+        self._reports = collections.deque(maxlen=history)
+        self._lock = threading.Lock()  # reports are read by the web server while the fuzz thread adds them
+        self._started_tracing = False
+        self._snapshot = None
+
+    @property
+    def reports(self):
+        """list of MemoryReport: Reports kept, oldest first."""
+        with self._lock:
+            return list(self._reports)
+
+    def start(self):
+        """Start tracing allocations, if enabled, and take the snapshot the first report is compared to."""
+        if not self.trace_allocations:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self._snapshot = self._take_snapshot()
+
+    def stop(self):
+        """Stop tracing allocations, unless tracing was started elsewhere."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        self._snapshot = None
+
+    def report(self, containers=None):
+        """Take a report and add it to the history.
+
+        Args:
+            containers (dict): Number of entries by container name. Default None.
+
+        Returns:
+            MemoryReport: The report.
+        """
+        traced = traced_peak = allocations = None
+        if self._snapshot is not None:
+            snapshot = self._take_snapshot()
+            allocations = [
+                AllocationSite(
+                    site="{0}:{1}".format(stat.traceback[0].filename, stat.traceback[0].lineno),
+                    size=stat.size,
+                    size_diff=stat.size_diff,
+                    count=stat.count,
+                    count_diff=stat.count_diff,
+                )
+                for stat in snapshot.compare_to(self._snapshot, "lineno")[: self.top]
+            ]
+            self._snapshot = snapshot
+            traced, traced_peak = tracemalloc.get_traced_memory()
+        report = MemoryReport(
+            time=time.time(),
+            rss=psutil.Process().memory_info().rss,
+            objects=count_objects(self.types),
+            containers=collections.OrderedDict(containers or {}),
+            traced=traced,
+            traced_peak=traced_peak,
+            allocations=allocations,
+        )
+        with self._lock:
+            self._reports.append(report)
+        return report
+
+    @staticmethod
+    def _take_snapshot():
+        return tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+
+
+def format_report(report, previous=None):
+    """Format a report as text lines, with the changes since the `previous` report if given.
+
+    Args:
+        report (MemoryReport): Report.
+        previous (MemoryReport): Earlier report. Default None.
+
+    Returns:
+        list of str: Lines.
+    """
+
+    def change(name, key, value, fmt=str):
+        if previous is None:
+            return fmt(value)
+        old = getattr(previous, name)
+        old = old.get(key) if key is not None else old
+        if old is None:
+            return fmt(value)
+        diff = value - old
+        return "{0} ({1}{2})".format(fmt(value), "+" if diff >= 0 else "-", fmt(abs(diff)))
+
+    lines = ["RSS: {0}".format(change("rss", None, report.rss, _format_size))]
+    for name, count in report.objects.items():
+        lines.append("Live {0} objects: {1}".format(name, change("objects", name, count)))
+    for name, size in report.containers.items():
+        lines.append("{0} entries: {1}".format(name, change("containers", name, size)))
+    if report.traced is not None:
+        lines.append(
+            "Traced: {0}, peak {1}".format(
+                change("traced", None, report.traced, _format_size), _format_size(report.traced_peak)
+            )
+        )
+        for site in report.allocations:
+            lines.append(
+                "{0}{1} ({2:+d} blocks) at {3}, {4} in {5} blocks".format(
+                    "+" if site.size_diff >= 0 else "-",
+                    _format_size(abs(site.size_diff)),
+                    site.count_diff,
+                    site.site,
+                    _format_size(site.size),
+                    site.count,
+                )
+            )
+    return lines
+
+
+def _format_size(size):
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024:
+            return "{0:.1f} {1}".format(size, unit) if unit != "B" else "{0} B".format(size)
+        size /= 1024
+    return "{0:.1f} GiB".format(size)
@@ -0,0 +1,274 @@
+import http.server
+import os
+import socketserver
+import threading
+
+from . import phase_timing
+
+#: Content type of the Prometheus text exposition format.
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+#: Classes of connection errors counted by CampaignMetrics.
+CONNECTION_ERROR_CLASSES = ("connect_failed", "no_sockets", "reset", "aborted", "ssl")
+
+#: Upper bounds of the exported phase duration histogram buckets in seconds (every eighth bound of the phase timing
+#: histograms, i.e. a factor of four apart).
+HISTOGRAM_BUCKETS = phase_timing.BUCKET_BOUNDS[::8]
+
+#: Minimum number of seconds between writes of a metrics file by a session.
+METRICS_FILE_INTERVAL = 1.0
+
+#: Failures not reported by a monitor are counted for this monitor label.
+SESSION_MONITOR = "session"
+
+
+class CampaignMetrics:
+    """Counters of a fuzzing campaign that are not kept elsewhere in the session.
+
+    Updated by Session in constant time per event; formatted together with the session's progress and phase timings
+    by format_metrics(). Formatting may happen on another thread, so containers are only read through copies.
+    """
+
+    def __init__(self):
+        self.connection_errors = dict.fromkeys(CONNECTION_ERROR_CLASSES, 0)
+        self.restarts = 0
+        self.receives = 0
+        self.empty_receives = 0
+        self.failed_test_cases = 0
+        self.failures_by_monitor = {}
+        self.cases_by_request = {}
+        self.mutations_by_request = {}
+
+    def count_case(self, request, num_mutations):
+        """Count a test case fuzzing `request`, which has `num_mutations` mutations."""
+        self.cases_by_request[request] = self.cases_by_request.get(request, 0) + 1
+        self.mutations_by_request[request] = num_mutations
+
+    def count_failures(self, monitors):
+        """Count the failures of one test case.
+
+        Args:
+            monitors (list of str): Monitor that reported each failure, None for failures detected by the session.
+        """
+        self.failed_test_cases += 1
+        for monitor in monitors:
+            monitor = monitor or SESSION_MONITOR
+            self.failures_by_monitor[monitor] = self.failures_by_monitor.get(monitor, 0) + 1
+
+    def count_connection_error(self, error_class):
+        """Count a connection error of one of CONNECTION_ERROR_CLASSES."""
+        self.connection_errors[error_class] += 1
+
+    def count_restart(self):
+        self.restarts += 1
+
+    def count_receive(self, data):
+        """Count a receive. Socket connections return no data when the receive timeout expires."""
+        self.receives += 1
+        if not data:
+            self.empty_receives += 1
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value):
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+class _Writer:
+    def __init__(self):
+        self.lines = []
+
+    def metric(self, name, metric_type, help_text, samples):
+        self.lines.append("# HELP {0} {1}".format(name, help_text))
+        self.lines.append("# TYPE {0} {1}".format(name, metric_type))
+        for labels, value in samples:
+            self.sample(name, labels, value)
+
+    def sample(self, name, labels, value):
+        if labels:
+            label_text = ",".join('{0}="{1}"'.format(k, _escape(v)) for k, v in labels)
+            self.lines.append("{0}{{{1}}} {2}".format(name, label_text, _number(value)))
+        else:
+            self.lines.append("{0} {1}".format(name, _number(value)))
+
+
+def format_metrics(session, metrics, phase_histograms, forecast=None):
+    """Format the metrics of a session in the Prometheus text exposition format (see CONTENT_TYPE).
+
+    Args:
+        session (Session): Session to report progress on.
+        metrics (CampaignMetrics): Counters of the session.
+        phase_histograms (dict): Phase timing histograms of the session by phase, see phase_timing.PhaseTimer.
+        forecast (boofuzz.forecast.Forecast): Forecast of the remaining time of the run. Default None.
+
+    Returns:
+        str: Metrics.
+    """
+    w = _Writer()
+    w.metric("boofuzz_test_cases_total", "counter", "Test cases run.", [((), session.num_cases_actually_fuzzed)])
+    w.metric("boofuzz_test_case_index", "gauge", "Index of the current test case.", [((), session.total_mutant_index)])
+    if session.total_num_mutations is not None:
+        w.metric("boofuzz_num_mutations", "gauge", "Test cases of the run.", [((), session.total_num_mutations)])
+    w.metric("boofuzz_exec_speed", "gauge", "Test cases per second.", [((), session.exec_speed)])
+    w.metric("boofuzz_runtime_seconds", "gauge", "Run time without pauses.", [((), session.runtime)])
+    w.metric("boofuzz_paused", "gauge", "Whether fuzzing is paused.", [((), session.is_paused)])
+    w.metric(
+        "boofuzz_request_test_cases_total",
+        "counter",
+        "Test cases run per fuzzed request.",
+        [((("request", request),), n) for request, n in sorted(list(metrics.cases_by_request.items()))],
+    )
+    w.metric(
+        "boofuzz_request_mutations",
+        "gauge",
+        "Mutations of each request fuzzed so far.",
+        [((("request", request),), n) for request, n in sorted(list(metrics.mutations_by_request.items()))],
+    )
+    w.metric(
+        "boofuzz_failed_test_cases_total", "counter", "Test cases with failures.", [((), metrics.failed_test_cases)]
+    )
+    w.metric(
+        "boofuzz_failures_total",
+        "counter",
+        "Failures per reporting monitor.",
+        [((("monitor", monitor),), n) for monitor, n in sorted(list(metrics.failures_by_monitor.items()))],
+    )
+    w.metric("boofuzz_restarts_total", "counter", "Target restarts.", [((), metrics.restarts)])
+    w.metric(
+        "boofuzz_connection_errors_total",
+        "counter",
+        "Connection errors per class.",
+        [((("class", error_class),), n) for error_class, n in list(metrics.connection_errors.items())],
+    )
+    w.metric("boofuzz_receives_total", "counter", "Receives from the target.", [((), metrics.receives)])
+    w.metric(
+        "boofuzz_empty_receives_total",
+        "counter",
+        "Receives without data, including receive timeouts.",
+        [((), metrics.empty_receives)],
+    )
+
+    if forecast is not None:
+        w.metric(
+            "boofuzz_remaining_test_cases",
+            "gauge",
+            "Planned test cases not run yet.",
+            [((), forecast.remaining_cases)],
+        )
+        if forecast.remaining_seconds is not None:
+            w.metric(
+                "boofuzz_remaining_seconds",
+                "gauge",
+                "Estimated time to run the remaining test cases.",
+                [((), forecast.remaining_seconds)],
+            )
+            w.metric(
+                "boofuzz_request_remaining_seconds",
+                "gauge",
+                "Estimated time to run the remaining test cases per message path.",
+                [((("request", r.path),), r.remaining_seconds) for r in forecast.requests],
+            )
+
+    histograms = [(phase, h) for phase, h in list(phase_histograms.items()) if h.count]
+    if histograms:
+        w.metric("boofuzz_phase_duration_seconds", "histogram", "Time per test case spent in each phase.", [])
+        for phase, histogram in histograms:
+            _histogram_samples(w, "boofuzz_phase_duration_seconds", phase, histogram)
+    return "\n".join(w.lines) + "\n"
+
+
+def _histogram_samples(w, name, phase, histogram):
+    counts = list(histogram.counts)
+    count = sum(counts)
+    cumulative = 0
+    bucket = 0
+    for i, bound in enumerate(phase_timing.BUCKET_BOUNDS):
+        cumulative += counts[i]
+        if bucket < len(HISTOGRAM_BUCKETS) and bound == HISTOGRAM_BUCKETS[bucket]:
+            w.sample(name + "_bucket", (("phase", phase), ("le", "{0:.6g}".format(bound))), cumulative)
+            bucket += 1
+    w.sample(name + "_bucket", (("phase", phase), ("le", "+Inf")), count)
+    w.sample(name + "_sum", (("phase", phase),), histogram.total)
+    w.sample(name + "_count", (("phase", phase),), count)
+
+
+def write_metrics_file(filename, text):
+    """Replace `filename` with `text` atomically, so readers never see a partial file.
+
+    Args:
+        filename (str): Metrics file.
+        text (str): Metrics, see format_metrics().
+    """
+    temp_filename = "{0}.{1}.tmp".format(filename, os.getpid())
+    with open(temp_filename, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(temp_filename, filename)
+
+
+def read_metrics_file(filename):
+    """Read a metrics file written by write_metrics_file(). Returns an empty string if it does not exist yet."""
+    try:
+        with open(filename, encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        return ""
+
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+
+
+class MetricsExporter:
+    """Standalone HTTP server exposing metrics at ``/metrics`` for Prometheus.
+
+    Use it to expose a session's metrics without the web UI, or with ``boo serve-metrics`` to serve a metrics file
+    written by a session in another process (Session arg `metrics_file`).
+
+    Args:
+        source (callable): Returns the metrics text on each scrape, e.g. ``session.metrics_text``.
+        port (int): Port to serve on. 0 picks a free port, see `port` after start().
+        address (str): Address to serve on. Default "" (all addresses).
+    """
+
+    def __init__(self, source, port, address=""):
+        self._source = source
+        exporter = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = exporter._source().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = _ThreadingHTTPServer((address, port), Handler)
+        self.port = self._server.server_address[1]
+        self._thread = None
+
+    def start(self):
+        """Serve on a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def serve_forever(self):
+        """Serve on the calling thread until stop() is called."""
+        self._server.serve_forever()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,357 @@
+import collections
+import fnmatch
+import json
+import platform
+import statistics
+import time
+import timeit
+
+from . import helpers
+from .blocks import Block, Checksum, Repeat, Request, Size
+from .mutation_context import MutationContext
+from .primitives import BitField, Bytes, Group, Mirror, RandomData, String
+
+#: Version of the results file format written by save_results().
+RESULTS_FORMAT = 1
+
+#: Default relative slowdown of a benchmark against the baseline reported as a regression.
+DEFAULT_THRESHOLD = 0.2
+
+BenchmarkResult = collections.namedtuple("BenchmarkResult", ["name", "rounds", "loops", "min", "median", "stdev"])
+BenchmarkResult.__doc__ = """Timing of one benchmark, in seconds per call of the benchmarked function."""
+
+Comparison = collections.namedtuple("Comparison", ["name", "baseline", "current", "change", "regressed"])
+Comparison.__doc__ = """Fastest round of a benchmark against its baseline; change is the relative slowdown."""
+
+#: Header of the text table lines of format_result().
+RESULT_HEADER = "{0:<28} {1:>12} {2:>12} {3:>10}".format("benchmark", "min", "median", "stdev")
+
+#: Header of the text table lines of format_comparison().
+COMPARISON_HEADER = "{0:<28} {1:>12} {2:>12} {3:>8}".format("benchmark", "baseline", "current", "change")
+
+_BENCHMARKS = collections.OrderedDict()
+
+
+def _benchmark(name):
+    """Register a benchmark. The decorated function sets up the data and returns the function to time."""
+
+    def register(setup):
+        _BENCHMARKS[name] = setup
+        return setup
+
+    return register
+
+
+def _drain(iterable):
+    for _ in iterable:
+        pass
+
+
+def _wide_request(width=50):
+    """Request with `width` length-value fields, each with a Size, a Mirror and a Checksum of its value."""
+    return Request(
+        "wide",
+        children=[
+            Block(
+                name="field{0}".format(i),
+                children=[
+                    Size(name="length", block_name=".value", length=2),
+                    String(name="value", default_value="value {0}".format(i)),
+                    Mirror(name="copy", primitive_name=".value"),
+                    Checksum(name="crc", block_name=".value", algorithm="crc32"),
+                ],
+            )
+            for i in range(width)
+        ],
+    )
+
+
+def _deep_level(depth, max_depth):
+    children = [Bytes(name="data", default_value=b"level", field_type=None)]
+    if depth < max_depth:
+        children.append(_deep_level(depth + 1, max_depth))
+    return Block(
+        name="level{0}".format(depth),
+        children=[Size(name="size", block_name=".body", length=4), Block(name="body", children=children)],
+    )
+
+
+def _deep_request(depth=8):
+    """Request with blocks nested `depth` levels deep, each prefixed by its Size, repeated by a Repeat.
+
+    Each Size renders its block, so rendering time doubles with every level.
+    """
+    return Request(
+        "deep",
+        children=[
+            _deep_level(0, depth - 1),
+            Repeat(name="repeat", block_name="level0", min_reps=0, max_reps=5, default_value=2),
+        ],
+    )
+
+
+def _mutations_benchmark(element):
+    return lambda: _drain(element.get_mutations())
+
+
+@_benchmark("string.mutations")
+def _string_mutations():
+    return _mutations_benchmark(String(name="string", default_value="GET /index.html HTTP/1.1"))
+
+
+@_benchmark("string.num_mutations")
+def _string_num_mutations():
+    return String(name="string", default_value="GET /index.html HTTP/1.1").get_num_mutations
+
+
+@_benchmark("bytes.mutations")
+def _bytes_mutations():
+    return _mutations_benchmark(Bytes(name="bytes", default_value=b"\x01\x02\x03\x04", max_len=64, field_type=None))
+
+
+@_benchmark("bytes.num_mutations")
+def _bytes_num_mutations():
+    return Bytes(name="bytes", default_value=b"\x01\x02\x03\x04", max_len=64, field_type=None).get_num_mutations
+
+
+@_benchmark("bit_field.mutations")
+def _bit_field_mutations():
+    return _mutations_benchmark(BitField(name="bit_field", default_value=0, width=32))
+
+
+@_benchmark("bit_field.num_mutations")
+def _bit_field_num_mutations():
+    return BitField(name="bit_field", default_value=0, width=32).get_num_mutations
+
+
+@_benchmark("random_data.mutations")
+def _random_data_mutations():
+    return _mutations_benchmark(RandomData(name="random_data", default_value=b"x", max_length=256, max_mutations=100))
+
+
+@_benchmark("random_data.num_mutations")
+def _random_data_num_mutations():
+    return RandomData(name="random_data", default_value=b"x", max_length=256, max_mutations=100).get_num_mutations
+
+
+@_benchmark("group.mutations")
+def _group_mutations():
+    return _mutations_benchmark(Group(name="group", values=["GET", "HEAD", "POST", "PUT", "DELETE", "OPTIONS"]))
+
+
+@_benchmark("group.num_mutations")
+def _group_num_mutations():
+    return Group(name="group", values=["GET", "HEAD", "POST", "PUT", "DELETE", "OPTIONS"]).get_num_mutations
+
+
+@_benchmark("request.render.wide")
+def _render_wide():
+    return _wide_request().render
+
+
+@_benchmark("request.render.deep")
+def _render_deep():
+    return _deep_request().render
+
+
+@_benchmark("request.render.mutated")
+def _render_mutated():
+    request = _wide_request()
+    contexts = []
+    for mutations in request.get_mutations():
+        contexts.append(MutationContext(mutations=mutations))
+        if len(contexts) == 100:
+            break
+
+    def render():
+        for context in contexts:
+            request.render(context)
+
+    return render
+
+
+@_benchmark("request.num_mutations.wide")
+def _num_mutations_wide():
+    return _wide_request().get_num_mutations
+
+
+@_benchmark("request.resolve_name")
+def _resolve_name():
+    request = _deep_request()
+    context_path = max((e.context_path for e in request.names.values() if e is not request), key=len)
+
+    def resolve():
+        request.resolve_name(context_path, ".data")
+        request.resolve_name(context_path, "..size")
+        request.resolve_name("", "level0.body.level1.body.data")
+        request.resolve_name("", "repeat")
+
+    return resolve
+
+
+@_benchmark("mutation_context")
+def _mutation_context():
+    request = _wide_request()
+    mutations = next(iter(request.get_mutations()))
+    return lambda: MutationContext(mutations=mutations, message_path=[])
+
+
+def benchmark_names(pattern=None):
+    """Return the names of the benchmarks, optionally only those matching a glob pattern, e.g. ``"string.*"``.
+
+    Args:
+        pattern (str): Glob pattern. Default None (all benchmarks).
+
+    Returns:
+        list of str: Benchmark names.
+    """
+    return [name for name in _BENCHMARKS if pattern is None or fnmatch.fnmatchcase(name, pattern)]
+
+
+def run_benchmark(name, rounds=5, min_time=0.1):
+    """Time one benchmark.
+
+    After a warm-up call, which fills caches such as the fuzz library, the number of calls per round is chosen so
+    that a round takes at least `min_time` seconds. Timing uses timeit, which disables garbage collection during each
+    round.
+
+    Args:
+        name (str): Benchmark name, see benchmark_names().
+        rounds (int): Number of timed rounds. Default 5.
+        min_time (float): Minimum duration of a round in seconds. Default 0.1.
+
+    Returns:
+        BenchmarkResult: Timing.
+    """
+    timer = timeit.Timer(_BENCHMARKS[name]())
+    timer.timeit(1)
+    loops = 1
+    while True:
+        elapsed = timer.timeit(loops)
+        if elapsed >= min_time:
+            break
+        loops = max(loops * 2, int(loops * min_time / elapsed * 1.2) if elapsed > 0 else loops * 10)
+    times = [timer.timeit(loops) / loops for _ in range(rounds)]
+    return BenchmarkResult(
+        name=name,
+        rounds=rounds,
+        loops=loops,
+        min=min(times),
+        median=statistics.median(times),
+        stdev=statistics.stdev(times) if rounds > 1 else 0.0,
+    )
+
+
+def run(pattern=None, rounds=5, min_time=0.1, callback=None):
+    """Run the benchmarks matching `pattern`, see run_benchmark().
+
+    Args:
+        pattern (str): Glob pattern of benchmark names. Default None (all benchmarks).
+        rounds (int): Number of timed rounds per benchmark. Default 5.
+        min_time (float): Minimum duration of a round in seconds. Default 0.1.
+        callback (callable): Called with each BenchmarkResult as it is available. Default None.
+
+    Returns:
+        list of BenchmarkResult: Timings.
+    """
+    results = []
+    for name in benchmark_names(pattern):
+        result = run_benchmark(name, rounds=rounds, min_time=min_time)
+        if callback is not None:
+            callback(result)
+        results.append(result)
+    return results
+
+
+def save_results(filename, results):
+    """Write results as JSON, along with the versions and the machine they were taken on.
+
+    Args:
+        filename (str): Output file.
+        results (list of BenchmarkResult): Timings.
+    """
+    document = {
+        "format": RESULTS_FORMAT,
+        "boofuzz": helpers.get_boofuzz_version(helpers),
+        "python": "{0} {1}".format(platform.python_implementation(), platform.python_version()),
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "benchmarks": [result._asdict() for result in results],
+    }
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2)
+
+
+def load_results(filename):
+    """Read results written by save_results().
+
+    Args:
+        filename (str): Results file.
+
+    Returns:
+        list of BenchmarkResult: Timings.
+    """
+    with open(filename, encoding="utf-8") as f:
+        document = json.load(f)
+    if document.get("format") != RESULTS_FORMAT:
+        raise ValueError("{0} is not a benchmark results file of format {1}".format(filename, RESULTS_FORMAT))
+    return [BenchmarkResult(**result) for result in document["benchmarks"]]
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """Compare results against a baseline by the fastest round, which is least disturbed by other load.
+
+    Args:
+        results (list of BenchmarkResult): Current timings.
+        baseline (list of BenchmarkResult): Baseline timings. Benchmarks missing from either are skipped.
+        threshold (float): Relative slowdown reported as a regression. Default DEFAULT_THRESHOLD.
+
+    Returns:
+        list of Comparison: One per benchmark in both.
+    """
+    baseline = {result.name: result for result in baseline}
+    comparisons = []
+    for result in results:
+        if result.name not in baseline:
+            continue
+        change = result.min / baseline[result.name].min - 1
+        comparisons.append(
+            Comparison(
+                name=result.name,
+                baseline=baseline[result.name].min,
+                current=result.min,
+                change=change,
+                regressed=change > threshold,
+            )
+        )
+    return comparisons
+
+
+def format_result(result):
+    """Format a result as a text table line: fastest round, median round and standard deviation."""
+    return "{0:<28} {1:>12} {2:>12} {3:>10}".format(
+        result.name,
+        _format_time(result.min),
+        _format_time(result.median),
+        "+-{0:.1%}".format(result.stdev / result.median if result.median else 0),
+    )
+
+
+def format_comparison(comparison):
+    """Format a comparison as a text table line: baseline, current time and change."""
+    return "{0:<28} {1:>12} {2:>12} {3:>+8.1%}{4}".format(
+        comparison.name,
+        _format_time(comparison.baseline),
+        _format_time(comparison.current),
+        comparison.change,
+        "  REGRESSION" if comparison.regressed else "",
+    )
+
+
+def _format_time(seconds):
+    if seconds >= 1e-3:
+        return "{0:.2f} ms".format(seconds * 1e3)
+    if seconds >= 1e-6:
+        return "{0:.2f} us".format(seconds * 1e6)
+    return "{0:.0f} ns".format(seconds * 1e9)
@@ -0,0 +1,349 @@
+import collections
+import re
+import sqlite3
+import threading
+
+import attr
+
+from . import constants, exception, fuzz_logger, helpers
+from .mutation import Mutation
+from .mutation_context import MutationContext
+from .protocol_session import ProtocolSession
+
+_VOLATILE_SYNOPSIS_REGEX = re.compile(r"0x[0-9a-fA-F]+|\d+")
+_SUPPLEMENTARY_FAILURE_TEXT = "provided additional information"
+
+
+def crash_bucket(failure_descriptions):
+    """Reduce the failure descriptions of a test case to a comparable crash bucket.
+
+    Numbers and hex addresses (test case indices, PIDs, pointers) are masked, and supplementary monitor reports are
+    dropped, so that replays of the same crash land in the same bucket.
+
+    Args:
+        failure_descriptions (list of str): Descriptions logged via log_fail.
+
+    Returns:
+        frozenset: Crash bucket. Empty if there was no failure.
+    """
+    return frozenset(
+        _VOLATILE_SYNOPSIS_REGEX.sub("#", description)
+        for description in failure_descriptions
+        if _SUPPLEMENTARY_FAILURE_TEXT not in description
+    )
+
+
+@attr.s
+class MinimizedCase:
+    """Result of minimizing one failing test case."""
+
+    test_case_index = attr.ib(type=int)
+    name = attr.ib(type=str)
+    reproducible = attr.ib(type=bool, default=False)
+    mutations = attr.ib(factory=dict)  # qualified name -> minimized Mutation
+    data = attr.ib(type=bytes, default=b"")  # minimized fuzzed message as sent
+    original_length = attr.ib(type=int, default=0)
+    bucket = attr.ib(factory=frozenset)
+    replays = attr.ib(type=int, default=0)
+
+    @property
+    def minimized_length(self):
+        return len(self.data)
+
+
+class CaseMinimizer:
+    """Shrinks failing test cases by replaying them against one target.
+
+    Minimization is structure-aware delta debugging: mutated elements are first reset to their default values one at
+    a time, then the values of the remaining mutations are shortened by removing ever smaller chunks. A candidate is
+    kept only if replaying it produces the same crash bucket as the original test case. The target is restarted
+    after each crashing replay.
+
+    Args:
+        session (Session): Session holding the protocol definition and settings.
+        target (Target): Target to replay against. Each concurrently running CaseMinimizer needs its own target.
+        max_replays (int): Maximum number of replays per test case. Default 1000.
+    """
+
+    def __init__(self, session, target, max_replays=1000):
+        self._session = session
+        self._target = target
+        self._max_replays = max_replays
+        self._logger = fuzz_logger.FuzzLogger(fuzz_loggers=[])
+        self._replays = 0
+        self._path = None
+        self._bucket = None
+
+    def minimize(self, test_case_index, name, failure_descriptions):
+        """Minimize one failing test case.
+
+        Args:
+            test_case_index (int): Index of the test case in the run.
+            name (str): Test case name, as stored in the run database.
+            failure_descriptions (list of str): Failures logged for the test case.
+
+        Returns:
+            MinimizedCase: Result; `reproducible` is False if the replayed test case did not fail the same way.
+        """
+        result = MinimizedCase(test_case_index=test_case_index, name=name)
+        saved_logger = self._target._fuzz_data_logger
+        self._target.set_fuzz_data_logger(self._logger)
+        try:
+            self._minimize(result, failure_descriptions)
+        finally:
+            self._target.set_fuzz_data_logger(saved_logger)
+        return result
+
+    def _minimize(self, result, failure_descriptions):
+        path_names, mutation_names = helpers.parse_test_case_name(result.name)
+        self._path = self._session._path_names_to_edges(node_names=path_names)
+        mutations = self._session._mutations_from_names(self._fuzz_node, mutation_names)
+        mutations = {qualified_name: self._concrete(mutation) for qualified_name, mutation in mutations.items()}
+        result.original_length = len(self._render(mutations))
+        self._replays = 0
+
+        original_bucket = crash_bucket(failure_descriptions)
+        bucket = self._replay(mutations)
+        if not bucket or (original_bucket and not bucket & original_bucket):
+            result.replays = self._replays
+            return
+        self._bucket = bucket
+
+        for qualified_name in list(mutations):
+            if len(mutations) > 1:
+                candidate = dict(mutations)
+                del candidate[qualified_name]
+                if self._reproduces(candidate):
+                    mutations = candidate
+        for qualified_name in list(mutations):
+            mutations = self._shrink_value(mutations, qualified_name)
+
+        result.reproducible = True
+        result.bucket = bucket
+        result.mutations = mutations
+        result.data = self._render(mutations)
+        result.replays = self._replays
+
+    @property
+    def _fuzz_node(self):
+        return self._session.nodes[self._path[-1].dst]
+
+    def _concrete(self, mutation):
+        """Resolve callable mutation values so they can be shortened."""
+        if callable(mutation.value):
+            element = self._fuzz_node.names[mutation.qualified_name]
+            return Mutation(
+                value=mutation.value(element.original_value()),
+                qualified_name=mutation.qualified_name,
+                index=mutation.index,
+            )
+        return mutation
+
+    def _shrink_value(self, mutations, qualified_name):
+        """Delta-debug the value of one mutation by removing chunks while the crash reproduces."""
+        mutation = mutations[qualified_name]
+        value = mutation.value
+        if not isinstance(value, (bytes, str)):
+            return mutations
+
+        def with_value(new_value):
+            candidate = dict(mutations)
+            candidate[qualified_name] = Mutation(value=new_value, qualified_name=qualified_name, index=mutation.index)
+            return candidate
+
+        granularity = 2
+        while len(value) >= 2 and self._replays < self._max_replays:
+            chunk_size = -(-len(value) // granularity)
+            for start in range(0, len(value), chunk_size):
+                candidate_value = value[:start] + value[start + chunk_size :]
+                if self._reproduces(with_value(candidate_value)):
+                    value = candidate_value
+                    granularity = max(granularity - 1, 2)
+                    break
+            else:
+                if granularity >= len(value):
+                    break
+                granularity = min(granularity * 2, len(value))
+        return with_value(value)
+
+    def _reproduces(self, mutations):
+        if self._replays >= self._max_replays:
+            return False
+        return self._replay(mutations) == self._bucket
+
+    def _render(self, mutations):
+        with self._session._render_lock:
+            return self._fuzz_node.render(MutationContext(message_path=self._path, mutations=mutations))
+
+    def _replay(self, mutations):
+        """Send a test case once and return its crash bucket."""
+        self._replays += 1
+        session = self._session
+        target = self._target
+        logger = self._logger
+        test_case_id = "minimize-{0}".format(self._replays)
+        logger.open_test_case(test_case_id, name=test_case_id, index=self._replays)
+        mutation_context = MutationContext(message_path=self._path, mutations=mutations)
+
+        opened = False
+        try:
+            try:
+                target.open()
+            except exception.BoofuzzTargetConnectionFailedError:
+                session._restart_target(target, fuzz_data_logger=logger)
+                target.open()
+            opened = True
+            for monitor in target.monitors:
+                monitor.pre_send(target=target, fuzz_data_logger=logger, session=session)
+
+            for edge in self._path:
+                node = session.nodes[edge.dst]
+                mutation_context.protocol_session = ProtocolSession(
+                    previous_message=session.nodes[edge.src], current_message=node
+                )
+                data = None
+                if edge.callback:
+                    data = edge.callback(
+                        target,
+                        logger,
+                        session=session,
+                        node=node,
+                        edge=edge,
+                        test_case_context=mutation_context.protocol_session,
+                        mutation_context=mutation_context,
+                    )
+                if not data:
+                    with session._render_lock:
+                        data = node.render(mutation_context)
+                self._transmit(data, is_fuzzed_message=edge is self._path[-1])
+
+            for monitor in target.monitors:
+                if not monitor.post_send(target=target, fuzz_data_logger=logger, session=session):
+                    logger.log_fail(
+                        "{0} detected crash on test case #{1}: {2}".format(
+                            str(monitor), self._replays, monitor.get_crash_synopsis()
+                        )
+                    )
+        except exception.BoofuzzFailure as e:
+            logger.log_fail(e.message)
+        finally:
+            if opened:
+                target.close()
+            logger.close_test_case()
+
+        failures = logger.failed_test_cases.pop(test_case_id, [])
+        if failures:
+            session._restart_target(target, fuzz_data_logger=logger)
+        return crash_bucket(failures)
+
+    def _transmit(self, data, is_fuzzed_message):
+        """Send one message and receive the reply, treating connection errors like Session does."""
+        session = self._session
+        if is_fuzzed_message:
+            ignore_send_errors = session._ignore_connection_issues_when_sending_fuzz_data
+            receive = session._receive_data_after_fuzz
+        else:
+            ignore_send_errors = session._ignore_connection_reset and session._ignore_connection_aborted
+            receive = session._receive_data_after_each_request
+
+        try:
+            self._target.send(data)
+        except (exception.BoofuzzTargetConnectionReset, exception.BoofuzzTargetConnectionAborted) as e:
+            if not ignore_send_errors:
+                raise exception.BoofuzzFailure(message=_connection_error_message(e))
+
+        if receive:
+            try:
+                received = self._target.recv()
+            except (exception.BoofuzzTargetConnectionReset, exception.BoofuzzTargetConnectionAborted) as e:
+                if session._check_data_received_each_request:
+                    raise exception.BoofuzzFailure(message=_connection_error_message(e))
+                return
+            if not is_fuzzed_message and session._check_data_received_each_request and not received:
+                raise exception.BoofuzzFailure(message="Nothing received from target.")
+
+
+def _connection_error_message(error):
+    if isinstance(error, exception.BoofuzzTargetConnectionAborted):
+        return constants.ERR_CONN_ABORTED.format(socket_errno=error.socket_errno, socket_errmsg=error.socket_errmsg)
+    return constants.ERR_CONN_RESET
+
+
+def minimize_in_parallel(session, targets, failing_cases, max_replays=1000):
+    """Minimize failing test cases, running one CaseMinimizer per target in its own thread.
+
+    Args:
+        session (Session): Session holding the protocol definition.
+        targets (list of Target): Independent target instances.
+        failing_cases (list of (int, str, list of str)): Index, name and failure descriptions of each test case.
+        max_replays (int): Maximum number of replays per test case.
+
+    Returns:
+        list of MinimizedCase: Results, ordered by test case index.
+    """
+    work = collections.deque(failing_cases)
+    work_lock = threading.Lock()
+    results = []
+    errors = []
+
+    def worker(target):
+        minimizer = CaseMinimizer(session=session, target=target, max_replays=max_replays)
+        while True:
+            with work_lock:
+                if not work:
+                    return
+                index, name, failure_descriptions = work.popleft()
+            try:
+                results.append(minimizer.minimize(index, name, failure_descriptions))
+            except Exception as e:
+                errors.append(e)
+                return
+
+    threads = [threading.Thread(target=worker, args=(target,)) for target in targets]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+    return sorted(results, key=lambda r: r.test_case_index)
+
+
+def _describe_mutation(qualified_name, mutation):
+    if isinstance(mutation.value, (bytes, str)):
+        return "{0}:{1} ({2} bytes)".format(qualified_name, mutation.index, len(mutation.value))
+    return "{0}:{1}".format(qualified_name, mutation.index)
+
+
+def save_minimized_cases(db_filename, minimized_cases):
+    """Store minimization results in the run database.
+
+    Args:
+        db_filename (str): Run database written by FuzzLoggerDb.
+        minimized_cases (list of MinimizedCase): Results to store. Cases that did not reproduce are skipped.
+    """
+    connection = sqlite3.connect(db_filename)
+    try:
+        connection.execute(
+            """CREATE TABLE IF NOT EXISTS minimized_cases (test_case_index integer, name text, mutations text,
+                                data blob, original_length integer, bucket text, timestamp TEXT)"""
+        )
+        for case in minimized_cases:
+            if not case.reproducible:
+                continue
+            connection.execute("""DELETE FROM minimized_cases WHERE test_case_index=?""", [case.test_case_index])
+            connection.execute(
+                """INSERT INTO minimized_cases VALUES(?, ?, ?, ?, ?, ?, ?)""",
+                [
+                    case.test_case_index,
+                    case.name,
+                    ", ".join(_describe_mutation(name, mutation) for name, mutation in case.mutations.items()),
+                    case.data,
+                    case.original_length,
+                    "\n".join(sorted(case.bucket)),
+                    helpers.get_time_stamp(),
+                ],
+            )
+        connection.commit()
+    finally:
+        connection.close()
@@ -1,7 +1,17 @@
 from .base_monitor import BaseMonitor
 from .callback_monitor import CallbackMonitor
+from .coverage_monitor import CoverageMap, CoverageMonitor, SharedMemoryBitmap
 from .network_monitor import NetworkMonitor
 from .process_monitor import ProcessMonitor
 from .runtime_monitor import RuntimeMonitor
 
-__all__ = ["BaseMonitor", "ProcessMonitor", "NetworkMonitor", "CallbackMonitor", "RuntimeMonitor"]
+__all__ = [
+    "BaseMonitor",
+    "ProcessMonitor",
+    "NetworkMonitor",
+    "CallbackMonitor",
+    "RuntimeMonitor",
+    "CoverageMap",
+    "CoverageMonitor",
+    "SharedMemoryBitmap",
+]
@@ -0,0 +1,241 @@
+import ctypes
+import ctypes.util
+import sys
+
+from .base_monitor import BaseMonitor
+
+AFL_SHM_ENV_VAR = "__AFL_SHM_ID"
+AFL_MAP_SIZE = 1 << 16
+
+# SysV IPC constants (identical on Linux and the BSDs)
+_IPC_PRIVATE = 0
+_IPC_CREAT = 0o1000
+_IPC_EXCL = 0o2000
+_IPC_RMID = 0
+
+
+def _count_class_table():
+    """Build AFL's hit count classification table.
+
+    Maps raw 8-bit edge hit counts to the buckets 0, 1, 2, 3, 4-7, 8-15, 16-31, 32-127, 128+, so that loop iteration
+    counts only register as new behaviour when they move to a different bucket.
+    """
+    table = bytearray(256)
+    for count in range(256):
+        if count == 0:
+            bucket = 0
+        elif count <= 2:
+            bucket = count
+        elif count == 3:
+            bucket = 4
+        elif count <= 7:
+            bucket = 8
+        elif count <= 15:
+            bucket = 16
+        elif count <= 31:
+            bucket = 32
+        elif count <= 127:
+            bucket = 64
+        else:
+            bucket = 128
+        table[count] = bucket
+    return bytes(table)
+
+
+_COUNT_CLASS_TABLE = _count_class_table()
+_EDGE_HIT_TABLE = bytes([0] + [1] * 255)
+
+
+class CoverageMap:
+    """Accumulated edge coverage over all test cases seen so far.
+
+    The comparison against the accumulated ("virgin") map is done on whole maps at once: hit counts are bucketed with
+    a single ``bytes.translate`` call and the map is compared as one big integer, so a 64 KB map is diffed in C without
+    a per-byte Python loop.
+
+    Args:
+        map_size (int): Size of the edge bitmap in bytes. Default 65536 (AFL's MAP_SIZE).
+    """
+
+    def __init__(self, map_size=AFL_MAP_SIZE):
+        self.map_size = map_size
+        self._virgin_bits = (1 << (8 * map_size)) - 1
+        self._unseen_edges = int.from_bytes(b"\x01" * map_size, "little")
+        self.edges_covered = 0
+
+    def update(self, trace_bits):
+        """Merge a trace into the accumulated coverage.
+
+        Args:
+            trace_bits (bytes): Raw hit counts of one execution, as written by the instrumented target.
+
+        Returns:
+            (int, int): Number of edges never hit before, and number of edges that reached a new hit count bucket.
+                Both are 0 if the trace produced no new coverage.
+        """
+        classified = trace_bits.translate(_COUNT_CLASS_TABLE)
+        current = int.from_bytes(classified, "little")
+        new_bits = current & self._virgin_bits
+        if not new_bits:
+            return 0, 0
+        self._virgin_bits ^= new_bits
+
+        hit = int.from_bytes(classified.translate(_EDGE_HIT_TABLE), "little")
+        new_edges = hit & self._unseen_edges
+        num_new_edges = bin(new_edges).count("1")
+        self._unseen_edges ^= new_edges
+        self.edges_covered += num_new_edges
+
+        num_changed = self.map_size - new_bits.to_bytes(self.map_size, "little").count(0)
+        return num_new_edges, num_changed - num_new_edges
+
+    def reset(self):
+        """Forget all accumulated coverage."""
+        self.__init__(map_size=self.map_size)
+
+
+class SharedMemoryBitmap:
+    """SysV shared memory segment holding an AFL-style edge bitmap.
+
+    The segment is created private to this process; its id is handed to the target through the ``__AFL_SHM_ID``
+    environment variable, which is what AFL's compile-time instrumentation (afl-gcc, afl-clang-fast, ...) attaches to.
+
+    Only available on POSIX systems with SysV IPC.
+
+    Args:
+        map_size (int): Size of the bitmap in bytes. Default 65536.
+    """
+
+    def __init__(self, map_size=AFL_MAP_SIZE):
+        if sys.platform == "win32":
+            raise OSError("SysV shared memory is not available on Windows")
+        self.map_size = map_size
+
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._libc.shmget.argtypes = (ctypes.c_int, ctypes.c_size_t, ctypes.c_int)
+        self._libc.shmget.restype = ctypes.c_int
+        self._libc.shmat.argtypes = (ctypes.c_int, ctypes.c_void_p, ctypes.c_int)
+        self._libc.shmat.restype = ctypes.c_void_p
+        self._libc.shmdt.argtypes = (ctypes.c_void_p,)
+        self._libc.shmdt.restype = ctypes.c_int
+        self._libc.shmctl.argtypes = (ctypes.c_int, ctypes.c_int, ctypes.c_void_p)
+        self._libc.shmctl.restype = ctypes.c_int
+
+        self.shm_id = self._libc.shmget(_IPC_PRIVATE, map_size, _IPC_CREAT | _IPC_EXCL | 0o600)
+        if self.shm_id < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, "shmget() failed")
+
+        address = self._libc.shmat(self.shm_id, None, 0)
+        if address is None or address == ctypes.c_void_p(-1).value:
+            errno = ctypes.get_errno()
+            self._libc.shmctl(self.shm_id, _IPC_RMID, None)
+            raise OSError(errno, "shmat() failed")
+        self._address = address
+
+    @property
+    def environment(self):
+        """Environment variables to pass to the instrumented target process."""
+        return {AFL_SHM_ENV_VAR: str(self.shm_id)}
+
+    def clear(self):
+        """Zero the bitmap before the next execution."""
+        ctypes.memset(self._address, 0, self.map_size)
+
+    def read(self):
+        """Copy the current bitmap out of shared memory.
+
+        Returns:
+            bytes: Raw edge hit counts.
+        """
+        return ctypes.string_at(self._address, self.map_size)
+
+    def write(self, data):
+        """Overwrite the beginning of the bitmap, mostly useful for testing.
+
+        Args:
+            data (bytes): Data to write; must not be longer than the map.
+        """
+        if len(data) > self.map_size:
+            raise ValueError("data exceeds map size")
+        ctypes.memmove(self._address, data, len(data))
+
+    def close(self):
+        """Detach and remove the shared memory segment."""
+        if self._address is not None:
+            self._libc.shmdt(self._address)
+            self._libc.shmctl(self.shm_id, _IPC_RMID, None)
+            self._address = None
+
+    def __del__(self):
+        try:
+            self.close()
+        except AttributeError:
+            pass
+
+
+class CoverageMonitor(BaseMonitor):
+    """Coverage feedback for locally built, AFL-instrumented targets.
+
+    Sets up a shared memory edge bitmap and reads it after every test case. Test cases that hit edges or edge hit
+    count buckets no earlier test case hit are handed to :meth:`Session.add_seed <boofuzz.Session.add_seed>`, which
+    schedules further structure-aware mutations on top of them.
+
+    The target must be started with the bitmap's id in its environment, e.g. by a local process monitor::
+
+        coverage = CoverageMonitor()
+        procmon = ProcessMonitorLocal(crash_filename="crash-bin", debugger_class=DebuggerThreadSimple)
+        procmon.set_options(start_commands=["./target-afl"], env=coverage.environment)
+        target = Target(connection=TCPSocketConnection("127.0.0.1", 8021), monitors=[procmon, coverage])
+
+    Add the coverage monitor *after* the process monitor so the bitmap is read once the target had a chance to run.
+
+    Args:
+        map_size (int): Size of the edge bitmap in bytes. Must match the target's instrumentation. Default 65536.
+        bitmap (SharedMemoryBitmap): Use an existing bitmap instead of creating a new one. Default None.
+
+    .. versionadded:: 0.4.2
+    """
+
+    def __init__(self, map_size=AFL_MAP_SIZE, bitmap=None):
+        BaseMonitor.__init__(self)
+        self.bitmap = bitmap if bitmap is not None else SharedMemoryBitmap(map_size=map_size)
+        self.coverage = CoverageMap(map_size=self.bitmap.map_size)
+        self.last_new_edges = 0
+        self.last_new_buckets = 0
+
+    @property
+    def environment(self):
+        """Environment variables to pass to the instrumented target process."""
+        return self.bitmap.environment
+
+    @property
+    def edges_covered(self):
+        """Number of distinct edges hit over the whole session."""
+        return self.coverage.edges_covered
+
+    def pre_send(self, target=None, fuzz_data_logger=None, session=None):
+        self.bitmap.clear()
+
+    def post_send(self, target=None, fuzz_data_logger=None, session=None):
+        """Diff the bitmap against the accumulated coverage and register a seed on new coverage.
+
+        Never reports a failure; crash detection is left to the process monitor.
+        """
+        self.last_new_edges, self.last_new_buckets = self.coverage.update(self.bitmap.read())
+        if self.last_new_edges or self.last_new_buckets:
+            if fuzz_data_logger is not None:
+                fuzz_data_logger.log_info(
+                    "New coverage: {0} new edges, {1} new hit count buckets ({2} edges total)".format(
+                        self.last_new_edges, self.last_new_buckets, self.coverage.edges_covered
+                    )
+                )
+            if session is not None:
+                session.add_seed()
+        return True
+
+    def set_options(self, *args, **kwargs):
+        return
+
+    def __repr__(self):
+        return "CoverageMonitor#{}[shm_id={}]".format(id(self), self.bitmap.shm_id)
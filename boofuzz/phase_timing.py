@@ -0,0 +1,237 @@
+import bisect
+import collections
+import math
+import time
+
+#: Phases of a test case, see Session._fuzz_current_case:
+#:
+#: - ``connect``: Opening the target connection, including retries.
+#: - ``pre_send``: Monitors and callbacks run before each test case (Session._pre_send).
+#: - ``callbacks``: Callbacks registered on the edges of the message path.
+#: - ``prep_render``, ``prep_send``, ``prep_recv``: Rendering, sending and receiving the messages leading up to the
+#:   fuzzed message.
+#: - ``fuzz_render``, ``fuzz_send``, ``fuzz_recv``: Rendering, sending and receiving the fuzzed message.
+#: - ``check_failures``: Asking monitors for passively detected failures.
+#: - ``disconnect``: Closing the target connection.
+#: - ``process_failures``: Failure bookkeeping and target restarts (Session._process_failures).
+#: - ``logging``: Opening and closing the test case in the fuzz loggers.
+#: - ``export``: Saving the session state (Session.export_file).
+#: - ``test_case``: The whole test case, including the time between tests.
+PHASES = (
+    "connect",
+    "pre_send",
+    "callbacks",
+    "prep_render",
+    "prep_send",
+    "prep_recv",
+    "fuzz_render",
+    "fuzz_send",
+    "fuzz_recv",
+    "check_failures",
+    "disconnect",
+    "process_failures",
+    "logging",
+    "export",
+    "test_case",
+)
+
+#: Upper bounds of the histogram buckets in seconds: four buckets per doubling from 1 microsecond to about 18 minutes.
+#: Durations above the last bound are counted in an overflow bucket.
+BUCKET_BOUNDS = tuple(1e-6 * 2 ** (i / 4) for i in range(121))
+
+PhaseStats = collections.namedtuple("PhaseStats", ["phase", "count", "total", "p50", "p99", "max"])
+
+
+class Histogram:
+    """Fixed-bucket histogram of durations.
+
+    Percentiles are reported as the upper bound of the bucket they fall into (at most the maximum), which is within 19%
+    of the exact value.
+    """
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        """Count one duration.
+
+        Args:
+            seconds (float): Duration.
+        """
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, fraction):
+        """Estimate a percentile.
+
+        Args:
+            fraction (float): Percentile as a fraction, e.g. 0.99.
+
+        Returns:
+            float: Estimated duration in seconds, 0 if nothing was counted.
+        """
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(fraction * self.count))
+        cumulative = 0
+        for bucket, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                if bucket == len(BUCKET_BOUNDS):
+                    return self.max
+                return min(BUCKET_BOUNDS[bucket], self.max)
+        return self.max
+
+
+class _Measurement:
+    """Context manager timing one phase, reused for every occurrence of the phase to avoid allocations."""
+
+    __slots__ = ("elapsed", "occurred", "_start")
+
+    def __init__(self):
+        self.elapsed = 0.0
+        self.occurred = False
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.elapsed += time.perf_counter() - self._start
+        self.occurred = True
+        return False
+
+
+class _NoMeasurement:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+_NO_MEASUREMENT = _NoMeasurement()
+
+
+class PhaseTimer:
+    """Times the phases of each test case and aggregates them into one histogram per phase.
+
+    Durations are taken with the monotonic performance counter. Time spent in a phase is summed up over the test case
+    (e.g. over all messages leading up to the fuzzed message) and counted once per test case in which the phase
+    occurred when the test case is finished. Only the fuzzing thread may measure; statistics can be read from any
+    thread.
+
+    Example::
+
+        with timer.measure("fuzz_send"):
+            target.send(data)
+        ...
+        timer.finish_case(time.perf_counter() - case_start)
+
+    Args:
+        enabled (bool): Measure phases. If False, measure() and finish_case() do nothing. Default True.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.histograms = collections.OrderedDict((phase, Histogram()) for phase in PHASES)
+        self._measurements = {phase: _Measurement() for phase in PHASES}
+
+    def measure(self, phase):
+        """Context manager adding the time spent in its body to `phase` of the current test case.
+
+        Args:
+            phase (str): One of PHASES.
+
+        Returns:
+            Context manager.
+        """
+        if not self.enabled:
+            return _NO_MEASUREMENT
+        return self._measurements[phase]
+
+    def finish_case(self, duration):
+        """Count the phases of the finished test case.
+
+        Args:
+            duration (float): Duration of the whole test case in seconds, counted as phase ``test_case``.
+        """
+        if not self.enabled:
+            return
+        for phase, measurement in self._measurements.items():
+            if measurement.occurred:
+                self.histograms[phase].add(measurement.elapsed)
+                measurement.elapsed = 0.0
+                measurement.occurred = False
+        self.histograms["test_case"].add(duration)
+
+    def stats(self):
+        """Return the statistics of all phases measured so far, in the order of PHASES.
+
+        Returns:
+            list of PhaseStats: Phase name, number of test cases in which it occurred, total, median, 99th percentile
+            and maximum duration in seconds.
+        """
+        return [
+            PhaseStats(
+                phase=phase,
+                count=histogram.count,
+                total=histogram.total,
+                p50=histogram.percentile(0.5),
+                p99=histogram.percentile(0.99),
+                max=histogram.max,
+            )
+            for phase, histogram in list(self.histograms.items())
+            if histogram.count
+        ]
+
+
+def format_duration(seconds):
+    """Format a duration with a unit fitting its magnitude, e.g. ``"12.3 ms"``.
+
+    Args:
+        seconds (float): Duration.
+
+    Returns:
+        str: Formatted duration.
+    """
+    if seconds >= 1:
+        return "{0:.2f} s".format(seconds)
+    if seconds >= 1e-3:
+        return "{0:.1f} ms".format(seconds * 1e3)
+    return "{0:.0f} us".format(seconds * 1e6)
+
+
+def format_stats(stats):
+    """Format phase statistics as text table lines.
+
+    Args:
+        stats (list of PhaseStats): Statistics, see PhaseTimer.stats().
+
+    Returns:
+        list of str: Header line and one line per phase.
+    """
+    lines = ["{0:<16} {1:>10} {2:>10} {3:>10} {4:>10} {5:>10}".format("phase", "cases", "p50", "p99", "max", "total")]
+    for s in stats:
+        lines.append(
+            "{0:<16} {1:>10} {2:>10} {3:>10} {4:>10} {5:>10}".format(
+                s.phase,
+                s.count,
+                format_duration(s.p50),
+                format_duration(s.p99),
+                format_duration(s.max),
+                format_duration(s.total),
+            )
+        )
+    return lines
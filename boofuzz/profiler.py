@@ -0,0 +1,184 @@
+import collections
+import json
+import os
+import sys
+import threading
+import time
+
+#: Output formats: ``collapsed`` writes one ``frame;frame;... count`` line per distinct stack, as read by
+#: flamegraph.pl, inferno and speedscope; ``speedscope`` writes the speedscope JSON file format.
+PROFILE_FORMATS = ("collapsed", "speedscope")
+
+_EXTENSIONS = {"collapsed": ".profile.txt", "speedscope": ".speedscope.json"}
+
+#: Default number of seconds between samples.
+DEFAULT_INTERVAL = 0.005
+
+
+def profile_filename(db_filename, profile_format):
+    """File a profile in `profile_format` of the run logging to `db_filename` is written to, next to the database.
+
+    Args:
+        db_filename (str): Results database of the run.
+        profile_format (str): One of PROFILE_FORMATS.
+
+    Returns:
+        str: Profile filename.
+    """
+    return os.path.splitext(db_filename)[0] + _EXTENSIONS[profile_format]
+
+
+def existing_profiles(db_filename):
+    """Return the profiles written for the run logging to `db_filename`.
+
+    Args:
+        db_filename (str): Results database of the run.
+
+    Returns:
+        dict: Profile filename by format, in the order of PROFILE_FORMATS.
+    """
+    filenames = ((f, profile_filename(db_filename, f)) for f in PROFILE_FORMATS)
+    return collections.OrderedDict((f, filename) for f, filename in filenames if os.path.exists(filename))
+
+
+def frame_name(code):
+    """Name of a stack frame in a profile, e.g. ``String.mutations (string.py:212)``.
+
+    Args:
+        code (types.CodeType): Code object of the frame.
+
+    Returns:
+        str: Qualified function name (Python 3.11+, the plain function name before), file name and first line.
+    """
+    return "{0} ({1}:{2})".format(
+        getattr(code, "co_qualname", code.co_name), os.path.basename(code.co_filename), code.co_firstlineno
+    )
+
+
+class SamplingProfiler:
+    """Statistical profiler sampling the stack of one thread from a background thread.
+
+    Every `interval` seconds the profiler thread looks up the current frame of the profiled thread with
+    ``sys._current_frames()`` and counts its stack. The profiled thread itself does no work, so the overhead is the
+    time the profiler thread holds the GIL to walk the stack, a few microseconds per sample. Stacks are counted by
+    code objects and only named when written.
+
+    Args:
+        thread_id (int): Identifier of the thread to profile (threading.get_ident()). Default None, the thread calling
+            start().
+        interval (float): Seconds between samples. Default DEFAULT_INTERVAL.
+    """
+
+    def __init__(self, thread_id=None, interval=DEFAULT_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = {}  # tuple of code objects, outermost first -> number of samples
+        self.num_samples = 0
+        self.duration = 0.0
+        self._thread = None
+        self._stop = threading.Event()
+        self._start_time = None
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def start(self):
+        """Start sampling."""
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+        self._stop.clear()
+        self._start_time = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="boofuzz-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling and wait for the profiler thread."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.duration += time.perf_counter() - self._start_time
+
+    def _run(self):
+        samples = self.samples
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            stack.reverse()
+            stack = tuple(stack)
+            samples[stack] = samples.get(stack, 0) + 1
+            self.num_samples += 1
+
+    def collapsed(self):
+        """Return the profile in the collapsed stack format.
+
+        Returns:
+            list of str: One ``frame;frame;... count`` line per distinct stack, most frequent first.
+        """
+        lines = []
+        for stack, count in sorted(self.samples.items(), key=lambda item: -item[1]):
+            lines.append("{0} {1}".format(";".join(frame_name(code).replace(";", ",") for code in stack), count))
+        return lines
+
+    def speedscope(self, name):
+        """Return the profile in the speedscope file format.
+
+        Args:
+            name (str): Profile name shown by speedscope.
+
+        Returns:
+            dict: JSON document.
+        """
+        frame_indices = {}
+        frames = []
+        samples = []
+        weights = []
+        seconds_per_sample = self.duration / self.num_samples if self.num_samples else self.interval
+        for stack, count in self.samples.items():
+            sample = []
+            for code in stack:
+                if code not in frame_indices:
+                    frame_indices[code] = len(frames)
+                    frames.append({"name": frame_name(code), "file": code.co_filename, "line": code.co_firstlineno})
+                sample.append(frame_indices[code])
+            samples.append(sample)
+            weights.append(count * seconds_per_sample)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "exporter": "boofuzz",
+            "name": name,
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": name,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": sum(weights),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+        }
+
+    def write(self, filename, profile_format="collapsed", name="boofuzz"):
+        """Write the profile.
+
+        Args:
+            filename (str): Output file.
+            profile_format (str): One of PROFILE_FORMATS. Default "collapsed".
+            name (str): Profile name, used by the speedscope format. Default "boofuzz".
+        """
+        if profile_format == "speedscope":
+            with open(filename, "w", encoding="utf-8") as f:
+                json.dump(self.speedscope(name), f)
+        else:
+            with open(filename, "w", encoding="utf-8") as f:
+                f.writelines(line + "\n" for line in self.collapsed())
@@ -0,0 +1,172 @@
+import collections
+import hashlib
+import re
+import zlib
+
+_TOKEN_REGEX = re.compile(rb"[A-Za-z0-9_]+|[^A-Za-z0-9_\s]")
+
+
+def length_class(data):
+    """Logarithmic length class of a response: 0 for empty, then 1, 2-3, 4-7, ...
+
+    Args:
+        data (bytes): Response.
+
+    Returns:
+        int: Length class.
+    """
+    return len(data).bit_length()
+
+
+def prefix_hash(data, prefix_len=8):
+    """CRC32 of the first bytes of a response, which usually contain status codes and message types.
+
+    Args:
+        data (bytes): Response.
+        prefix_len (int): Number of bytes to hash. Default 8.
+
+    Returns:
+        int: Hash of the prefix.
+    """
+    return zlib.crc32(data[:prefix_len])
+
+
+def simhash(data, bits=8):
+    """Locality sensitive hash of the response tokens.
+
+    Computes a 64-bit simhash over alphanumeric words and single punctuation characters and keeps only its top
+    `bits` bits, so that responses differing in a few tokens (timestamps, echoed values) usually share a bucket.
+
+    Args:
+        data (bytes): Response.
+        bits (int): Number of hash bits to keep. Default 8.
+
+    Returns:
+        int: Truncated simhash.
+    """
+    weights = [0] * 64
+    for token, count in collections.Counter(_TOKEN_REGEX.findall(data)).items():
+        token_hash = int.from_bytes(hashlib.blake2b(token, digest_size=8).digest(), "little")
+        for bit in range(64):
+            if token_hash >> bit & 1:
+                weights[bit] += count
+            else:
+                weights[bit] -= count
+    value = 0
+    for bit in range(64 - bits, 64):
+        if weights[bit] > 0:
+            value |= 1 << bit
+    return value >> (64 - bits)
+
+
+def dns_rcode(data, tcp=False):
+    """Protocol hook returning the RCODE of a DNS response, or None if the response is too short.
+
+    Args:
+        data (bytes): Response.
+        tcp (bool): Response carries the two byte DNS over TCP length prefix. Default False.
+
+    Returns:
+        int: RCODE (0 NOERROR, 1 FORMERR, 2 SERVFAIL, 3 NXDOMAIN, ...).
+    """
+    offset = 2 if tcp else 0
+    if len(data) < offset + 4:
+        return None
+    return data[offset + 3] & 0x0F
+
+
+class ResponseFingerprinter:
+    """Maps target responses to coarse response classes.
+
+    The fingerprint is a tuple of the enabled signals; two responses land in the same bucket if all signals agree.
+
+    Args:
+        use_length_class (bool): Include the logarithmic length class. Default True.
+        prefix_len (int): Number of leading bytes to hash. Set to 0 to disable. Default 8.
+        simhash_bits (int): Number of simhash bits to keep. Set to 0 to disable. Default 0.
+        hooks (list of callable): Protocol-specific functions taking the response bytes and returning a hashable
+            value, e.g. :func:`dns_rcode`. Default None.
+    """
+
+    def __init__(self, use_length_class=True, prefix_len=8, simhash_bits=0, hooks=None):
+        self.use_length_class = use_length_class
+        self.prefix_len = prefix_len
+        self.simhash_bits = simhash_bits
+        self.hooks = hooks if hooks is not None else []
+
+    def fingerprint(self, data):
+        """Compute the response class of `data`.
+
+        Args:
+            data (bytes): Response. None is treated as an empty response.
+
+        Returns:
+            tuple: Hashable fingerprint.
+        """
+        if data is None:
+            data = b""
+        fingerprint = []
+        if self.use_length_class:
+            fingerprint.append(length_class(data))
+        if self.prefix_len > 0:
+            fingerprint.append(prefix_hash(data, self.prefix_len))
+        if self.simhash_bits > 0:
+            fingerprint.append(simhash(data, self.simhash_bits))
+        for hook in self.hooks:
+            fingerprint.append(hook(data))
+        return tuple(fingerprint)
+
+
+class ResponseNoveltyTracker:
+    """Counts, per fuzzed element, how many previously unseen response classes its mutations produced.
+
+    Elements with many new response classes make the target take different code paths and are good candidates for
+    deeper, combinatorial fuzzing.
+
+    Args:
+        fingerprinter (ResponseFingerprinter): Used to bucket responses. Default creates one with length class and
+            prefix hash signals.
+    """
+
+    def __init__(self, fingerprinter=None):
+        self.fingerprinter = fingerprinter if fingerprinter is not None else ResponseFingerprinter()
+        self.buckets = {}  # fingerprint -> name of the first test case that produced it
+        self.new_bucket_counts = collections.Counter()  # element qualified name -> number of new buckets found
+        self.case_counts = collections.Counter()  # element qualified name -> number of responses observed
+
+    def observe(self, data, element_names, test_case_name=None):
+        """Record the response to a test case.
+
+        Args:
+            data (bytes): Response received after the fuzzed message.
+            element_names (iterable of str): Qualified names of the elements mutated in this test case.
+            test_case_name (str): Name of the test case, remembered as the first example of a new bucket.
+
+        Returns:
+            bool: True if the response fell into a bucket not seen before.
+        """
+        fingerprint = self.fingerprinter.fingerprint(data)
+        is_new = fingerprint not in self.buckets
+        if is_new:
+            self.buckets[fingerprint] = test_case_name
+        for name in element_names:
+            self.case_counts[name] += 1
+            if is_new:
+                self.new_bucket_counts[name] += 1
+        return is_new
+
+    @property
+    def num_buckets(self):
+        """Number of distinct response classes seen so far."""
+        return len(self.buckets)
+
+    def ranked_elements(self, n=None):
+        """Elements ordered by the number of new response classes they produced.
+
+        Args:
+            n (int): Maximum number of elements to return. Default None (all).
+
+        Returns:
+            list of (str, int, int): Qualified name, new bucket count and number of observed responses.
+        """
+        return [(name, count, self.case_counts[name]) for name, count in self.new_bucket_counts.most_common(n)]
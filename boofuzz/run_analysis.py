@@ -0,0 +1,358 @@
+import collections
+import csv
+import datetime
+import warnings
+
+from . import exception, fuzz_logger_db, helpers
+
+EXPORT_FORMATS = ("csv", "parquet", "arrow-ipc")
+
+#: File extension of each export format.
+EXPORT_EXTENSIONS = {"csv": ".csv", "parquet": ".parquet", "arrow-ipc": ".arrow"}
+
+#: Columns produced by iter_case_chunks, in order.
+COLUMNS = (
+    "index",
+    "name",
+    "timestamp",
+    "request",
+    "qualified_name",
+    "mutation_index",
+    "num_mutations",
+    "payload_length",
+    "recv_length",
+    "latency",
+    "failed",
+    "errored",
+)
+
+
+def _pyarrow():
+    try:
+        import pyarrow  # pytype: disable=import-error
+    except ImportError:
+        warnings.warn("Importing pyarrow package failed. Please install it using pip.", UserWarning)
+        raise
+    return pyarrow
+
+
+def timestamp_seconds(timestamp):
+    """Convert a run database timestamp like "[2021-05-04 13:37:00,123]" to seconds.
+
+    The result is only meaningful relative to other timestamps of the same run.
+
+    Args:
+        timestamp (str): Timestamp as written by FuzzLoggerDb.
+
+    Returns:
+        float: Seconds, or None if the timestamp cannot be parsed.
+    """
+    try:
+        day = datetime.date(int(timestamp[1:5]), int(timestamp[6:8]), int(timestamp[9:11])).toordinal()
+        return (
+            day * 86400
+            + int(timestamp[12:14]) * 3600
+            + int(timestamp[15:17]) * 60
+            + int(timestamp[18:20])
+            + int(timestamp[21:24]) / 1000
+        )
+    except (TypeError, ValueError):
+        return None
+
+
+def iter_case_chunks(db_filename, chunk_size=10000):
+    """Stream the test cases of a run database as column chunks.
+
+    Test cases and their steps are read `chunk_size` test cases at a time, so memory use does not grow with the size of
+    the run. Each test case becomes one row with these derived columns:
+
+    - ``request``: Name of the fuzzed message, i.e. the last node of the message path.
+    - ``qualified_name``, ``mutation_index``: Element and mutation index of the first mutation in the test case name.
+    - ``num_mutations``: Number of mutated elements.
+    - ``payload_length``: Length of the last sent message, usually the fuzzed one.
+    - ``recv_length``: Total number of bytes received.
+    - ``latency``: Seconds from the last send to the next receive, or None. Timestamps have millisecond resolution.
+    - ``failed``, ``errored``: Whether a failure or error was logged.
+
+    Only test cases kept in the database are included; see `fuzz_db_keep_only_n_pass_cases`.
+    The database is opened read-only and never migrated, so it may belong to a run still in progress.
+
+    Args:
+        db_filename (str): Run database written by FuzzLoggerDb.
+        chunk_size (int): Number of test cases per chunk. Default 10000.
+
+    Yields:
+        dict: Column name (see COLUMNS) -> list of values.
+    """
+    reader = fuzz_logger_db.FuzzLoggerDbReader(db_filename, read_only=True)
+    if reader.schema_version >= 4:
+        length = "COALESCE(data_length, length(data))"
+    else:
+        length = "length(data)"
+    steps_query = """SELECT test_case_index, type, timestamp, {0} FROM steps
+                     WHERE test_case_index BETWEEN ? AND ? ORDER BY test_case_index, rowid""".format(length)
+    last_index = None
+    while True:
+        if last_index is None:
+            cases = reader.query("""SELECT number, name, timestamp FROM cases ORDER BY number LIMIT ?""", [chunk_size])
+        else:
+            cases = reader.query(
+                """SELECT number, name, timestamp FROM cases WHERE number > ? ORDER BY number LIMIT ?""",
+                [last_index, chunk_size],
+            )
+        cases = cases.fetchall()
+        if not cases:
+            return
+        last_index = cases[-1][0]
+
+        steps = collections.defaultdict(list)
+        for test_case_index, step_type, timestamp, data_length in reader.query(steps_query, [cases[0][0], last_index]):
+            steps[test_case_index].append((step_type, timestamp, data_length))
+
+        chunk = {column: [] for column in COLUMNS}
+        for index, name, timestamp in cases:
+            _add_case(chunk, index, name, timestamp, steps.pop(index, []))
+        yield chunk
+
+
+def _add_case(chunk, index, name, timestamp, steps):
+    try:
+        path, mutation_names = helpers.parse_test_case_name(name)
+    except exception.BoofuzzError:
+        path, mutation_names = [name], []
+    if mutation_names:
+        qualified_name, mutation_index = helpers.split_mutation_name(mutation_names[0])
+    else:
+        qualified_name, mutation_index = None, None
+
+    payload_length = None
+    recv_length = 0
+    latency = None
+    last_send = None
+    failed = False
+    errored = False
+    for step_type, step_timestamp, data_length in steps:
+        if step_type == "send":
+            payload_length = data_length or 0
+            last_send = step_timestamp
+            latency = None
+        elif step_type == "receive":
+            recv_length += data_length or 0
+            if last_send is not None and latency is None:
+                sent, received = timestamp_seconds(last_send), timestamp_seconds(step_timestamp)
+                if sent is not None and received is not None:
+                    latency = received - sent
+        elif step_type == "fail":
+            failed = True
+        elif step_type == "error":
+            errored = True
+
+    chunk["index"].append(index)
+    chunk["name"].append(name)
+    chunk["timestamp"].append(timestamp)
+    chunk["request"].append(path[-1])
+    chunk["qualified_name"].append(qualified_name)
+    chunk["mutation_index"].append(mutation_index)
+    chunk["num_mutations"].append(len(mutation_names))
+    chunk["payload_length"].append(payload_length)
+    chunk["recv_length"].append(recv_length)
+    chunk["latency"].append(latency)
+    chunk["failed"].append(failed)
+    chunk["errored"].append(errored)
+
+
+def _arrow_schema(pyarrow):
+    return pyarrow.schema(
+        [
+            ("index", pyarrow.int64()),
+            ("name", pyarrow.string()),
+            ("timestamp", pyarrow.string()),
+            ("request", pyarrow.string()),
+            ("qualified_name", pyarrow.string()),
+            ("mutation_index", pyarrow.int64()),
+            ("num_mutations", pyarrow.int32()),
+            ("payload_length", pyarrow.int64()),
+            ("recv_length", pyarrow.int64()),
+            ("latency", pyarrow.float64()),
+            ("failed", pyarrow.bool_()),
+            ("errored", pyarrow.bool_()),
+        ]
+    )
+
+
+def export(db_filename, output_filename, export_format="csv", chunk_size=10000):
+    """Export the test cases of a run database in a columnar format, one row per test case.
+
+    The database is streamed in chunks (see iter_case_chunks). Parquet and Arrow IPC output need the pyarrow package;
+    each chunk becomes a row group or record batch.
+
+    Args:
+        db_filename (str): Run database written by FuzzLoggerDb.
+        output_filename (str): File to write.
+        export_format (str): "csv", "parquet" or "arrow-ipc". Default "csv".
+        chunk_size (int): Number of test cases per chunk. Default 10000.
+
+    Returns:
+        int: Number of exported test cases.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError("export_format must be one of {0}, got {1!r}".format(", ".join(EXPORT_FORMATS), export_format))
+    chunks = iter_case_chunks(db_filename, chunk_size=chunk_size)
+    count = 0
+    if export_format == "csv":
+        with open(output_filename, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(COLUMNS)
+            for chunk in chunks:
+                writer.writerows(zip(*(chunk[column] for column in COLUMNS)))
+                count += len(chunk["index"])
+        return count
+
+    pyarrow = _pyarrow()
+    schema = _arrow_schema(pyarrow)
+    if export_format == "parquet":
+        import pyarrow.parquet  # pytype: disable=import-error
+
+        writer = pyarrow.parquet.ParquetWriter(output_filename, schema)
+    else:
+        writer = pyarrow.ipc.new_file(output_filename, schema)
+    try:
+        for chunk in chunks:
+            batch = pyarrow.RecordBatch.from_pydict(chunk, schema=schema)
+            if export_format == "parquet":
+                writer.write_table(pyarrow.Table.from_batches([batch]))
+            else:
+                writer.write_batch(batch)
+            count += batch.num_rows
+    finally:
+        writer.close()
+    return count
+
+
+class _FailureCounter:
+    def __init__(self):
+        self.cases = 0
+        self.failed = 0
+        self.errored = 0
+
+    @property
+    def failure_rate(self):
+        return self.failed / self.cases if self.cases else 0.0
+
+
+class RunStats:
+    """Aggregates failure rates per request and element and throughput over time from column chunks.
+
+    Args:
+        interval (float): Width of the throughput buckets in seconds. Default 60.
+    """
+
+    def __init__(self, interval=60.0):
+        self.interval = interval
+        self.total = _FailureCounter()
+        self.by_request = collections.defaultdict(_FailureCounter)
+        self.by_element = collections.defaultdict(_FailureCounter)
+        self.buckets = collections.OrderedDict()  # bucket number -> [first timestamp, cases, failed]
+        self.latencies = 0
+        self.latency_sum = 0.0
+        self.first_seconds = None
+        self.last_seconds = None
+
+    def add_chunk(self, chunk):
+        """Add one chunk from iter_case_chunks."""
+        columns = ("request", "qualified_name", "timestamp", "failed", "errored", "latency")
+        for request, qualified_name, timestamp, failed, errored, latency in zip(*(chunk[c] for c in columns)):
+            counters = [self.total, self.by_request[request]]
+            if qualified_name is not None:
+                counters.append(self.by_element[qualified_name])
+            for counter in counters:
+                counter.cases += 1
+                counter.failed += failed
+                counter.errored += errored
+            if latency is not None:
+                self.latencies += 1
+                self.latency_sum += latency
+
+            seconds = timestamp_seconds(timestamp)
+            if seconds is None:
+                continue
+            if self.first_seconds is None or seconds < self.first_seconds:
+                self.first_seconds = seconds
+            if self.last_seconds is None or seconds > self.last_seconds:
+                self.last_seconds = seconds
+            bucket = self.buckets.get(int(seconds // self.interval))
+            if bucket is None:
+                bucket = self.buckets[int(seconds // self.interval)] = [timestamp, 0, 0]
+            bucket[1] += 1
+            bucket[2] += failed
+
+    @property
+    def duration(self):
+        """Seconds between the first and last test case."""
+        if self.first_seconds is None:
+            return 0.0
+        return self.last_seconds - self.first_seconds
+
+    def report(self, top=20):
+        """Format the statistics as text.
+
+        Args:
+            top (int): Maximum number of elements listed. Default 20.
+
+        Returns:
+            str: Report.
+        """
+        lines = []
+        total = self.total
+        rate = total.cases / self.duration if self.duration > 0 else 0.0
+        lines.append(
+            "{0} test cases, {1} failed ({2:.2%}), {3} with errors, {4:.0f} s, {5:.1f} cases/s".format(
+                total.cases, total.failed, total.failure_rate, total.errored, self.duration, rate
+            )
+        )
+        if self.latencies:
+            lines.append("Mean latency send to receive: {0:.1f} ms".format(self.latency_sum / self.latencies * 1000))
+
+        lines.append("")
+        lines.append("Failure rate by request:")
+        lines += self._table(sorted(self.by_request.items(), key=lambda item: -item[1].failed))
+        lines.append("")
+        lines.append("Failure rate by element (top {0}):".format(top))
+        lines += self._table(sorted(self.by_element.items(), key=lambda item: (-item[1].failed, item[0]))[:top])
+        lines.append("")
+        lines.append("Throughput per {0:g} s:".format(self.interval))
+        for timestamp, cases, failed in self.buckets.values():
+            lines.append(
+                "  {0}  {1:>8} cases  {2:>8.1f} cases/s  {3:>6} failed".format(
+                    timestamp, cases, cases / self.interval, failed
+                )
+            )
+        return "\n".join(lines)
+
+    @staticmethod
+    def _table(items):
+        lines = ["  {0:<50} {1:>8} {2:>8} {3:>8} {4:>8}".format("name", "cases", "failed", "rate", "errors")]
+        for name, counter in items:
+            lines.append(
+                "  {0:<50} {1:>8} {2:>8} {3:>8.2%} {4:>8}".format(
+                    name, counter.cases, counter.failed, counter.failure_rate, counter.errored
+                )
+            )
+        return lines
+
+
+def run_stats(db_filename, interval=60.0, chunk_size=10000):
+    """Compute RunStats for a run database.
+
+    Args:
+        db_filename (str): Run database written by FuzzLoggerDb.
+        interval (float): Width of the throughput buckets in seconds. Default 60.
+        chunk_size (int): Number of test cases per chunk. Default 10000.
+
+    Returns:
+        RunStats: Statistics.
+    """
+    stats = RunStats(interval=interval)
+    for chunk in iter_case_chunks(db_filename, chunk_size=chunk_size):
+        stats.add_chunk(chunk)
+    return stats
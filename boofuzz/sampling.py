@@ -0,0 +1,153 @@
+import hashlib
+import heapq
+
+MIN_FETCH_BATCH = 8
+MAX_FETCH_BATCH = 256
+
+
+def derive_key(seed, name):
+    """Derive a permutation key for one stratum from a run-wide seed.
+
+    Args:
+        seed (int): Run-wide seed.
+        name (str): Stratum name.
+
+    Returns:
+        int: 64-bit key.
+    """
+    digest = hashlib.blake2b("{0}:{1}".format(seed, name).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class FeistelPermutation:
+    """Keyed pseudo-random permutation of ``range(size)`` that needs no storage.
+
+    A balanced Feistel network permutes the smallest even-bit power of two covering `size`; indices that land outside
+    the range are encrypted again ("cycle walking") until they fall inside. This allows sampling without replacement
+    from very large index spaces without keeping a set of visited indices.
+
+    Args:
+        size (int): Number of indices to permute.
+        key (int): Permutation key. The same key always yields the same permutation.
+        rounds (int): Number of Feistel rounds. Default 4.
+    """
+
+    def __init__(self, size, key, rounds=4):
+        self.size = size
+        self.rounds = rounds
+        self._key = (key & ((1 << 64) - 1)).to_bytes(8, "little")
+        self._half_bits = max(1, ((max(size, 2) - 1).bit_length() + 1) // 2)
+        self._half_mask = (1 << self._half_bits) - 1
+
+    def _round_function(self, value, round_index):
+        digest = hashlib.blake2b(
+            value.to_bytes(8, "little") + bytes([round_index]), digest_size=8, key=self._key
+        ).digest()
+        return int.from_bytes(digest, "little") & self._half_mask
+
+    def _encrypt(self, value):
+        left, right = value >> self._half_bits, value & self._half_mask
+        for round_index in range(self.rounds):
+            left, right = right, left ^ self._round_function(right, round_index)
+        return (left << self._half_bits) | right
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.size:
+            raise IndexError("permutation index out of range")
+        value = self._encrypt(index)
+        while value >= self.size:
+            value = self._encrypt(value)
+        return value
+
+    def __iter__(self):
+        for index in range(self.size):
+            yield self[index]
+
+
+class Stratum:
+    """One part of the test case space that is sampled on its own, e.g. all mutations of one element.
+
+    Items are drawn in the order of a :class:`FeistelPermutation`. To avoid regenerating the stratum for every draw,
+    indices are fetched in sorted batches that grow with the number of draws.
+
+    Args:
+        name (str): Name used in coverage reports.
+        size (int): Number of items in the stratum.
+        fetch (callable): Takes a sorted list of indices and returns a dict mapping each index to its item.
+        key (int): Permutation key.
+    """
+
+    def __init__(self, name, size, fetch, key):
+        self.name = name
+        self.size = size
+        self.covered = 0
+        self.exhausted = size == 0
+        self._fetch = fetch
+        self._permutation = FeistelPermutation(size, key)
+        self._position = 0
+        self._pending = []
+
+    @property
+    def fraction_covered(self):
+        """Fraction of the stratum drawn so far."""
+        return self.covered / self.size if self.size else 1.0
+
+    def draw(self):
+        """Draw the next item.
+
+        Returns:
+            (int, object): Index within the stratum and the item, or None if the stratum is exhausted.
+        """
+        if not self._pending and not self.exhausted:
+            batch_size = min(MAX_FETCH_BATCH, max(MIN_FETCH_BATCH, self.covered), self.size - self._position)
+            indices = [self._permutation[p] for p in range(self._position, self._position + batch_size)]
+            self._position += batch_size
+            items = self._fetch(sorted(indices))
+            self._pending = [(index, items[index]) for index in reversed(indices) if index in items]
+        if not self._pending:
+            self.exhausted = True
+            return None
+        self.covered += 1
+        if self.covered >= self.size:
+            self.exhausted = True
+        return self._pending.pop()
+
+
+class StratifiedSampler:
+    """Interleaves draws from several strata so that all of them are covered proportionally to their size.
+
+    Each draw comes from the stratum with the lowest fraction covered so far, so after any number of draws every
+    stratum has been sampled to about the same fraction.
+
+    Args:
+        strata (list of Stratum): Strata to sample from.
+    """
+
+    def __init__(self, strata):
+        self.strata = list(strata)
+        self._heap = [(0.0, order, stratum) for order, stratum in enumerate(self.strata) if not stratum.exhausted]
+        heapq.heapify(self._heap)
+
+    def __iter__(self):
+        """Yield (stratum, index, item) until all strata are exhausted."""
+        while self._heap:
+            _, order, stratum = heapq.heappop(self._heap)
+            if stratum.exhausted:
+                continue
+            drawn = stratum.draw()
+            if drawn is None:
+                continue
+            if not stratum.exhausted:
+                heapq.heappush(self._heap, (stratum.fraction_covered, order, stratum))
+            yield stratum, drawn[0], drawn[1]
+
+    def coverage(self):
+        """Coverage per stratum.
+
+        Returns:
+            list of (str, int, int): Stratum name, number of items drawn and stratum size.
+        """
+        return [(stratum.name, stratum.covered, stratum.size) for stratum in self.strata]
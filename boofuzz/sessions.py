@@ -1,10 +1,15 @@
+import collections
+import copy
 import datetime
 import errno
+import functools
 import itertools
 import logging
 import os
 import pickle
+import random
 import socket
+import statistics
 import threading
 import time
 import traceback
@@ -15,24 +20,35 @@ from io import open
 
 from tornado.httpserver import HTTPServer
 from tornado.ioloop import IOLoop
-from tornado.wsgi import WSGIContainer
 
 from boofuzz import (
     blocks,
     constants,
     event_hook,
     exception,
+    forecast,
     fuzz_logger,
+    fuzz_logger_async,
     fuzz_logger_curses,
     fuzz_logger_db,
     fuzz_logger_text,
     helpers,
+    memory_tracking,
+    metrics,
+    minimizer,
     pgraph,
+    phase_timing,
     primitives,
+    profiler,
+    sampling,
+    spill_dict,
 )
+from boofuzz.fuzzable_block import FuzzableBlock
 from boofuzz.monitors import CallbackMonitor
 from boofuzz.mutation_context import MutationContext
 from boofuzz.protocol_session import ProtocolSession
+from boofuzz.response_novelty import ResponseFingerprinter, ResponseNoveltyTracker
+from boofuzz.web import live, process, status
 from boofuzz.web.app import app
 from .exception import BoofuzzFailure
 
@@ -181,7 +197,7 @@ class Target:
             max_bytes = self.max_recv_bytes
 
         if self._fuzz_data_logger is not None:
-            self._fuzz_data_logger.log_info("Receiving...")
+            self._fuzz_data_logger.log_debug("Receiving...")
 
         data = self._target_connection.recv(max_bytes=max_bytes)
 
@@ -202,11 +218,11 @@ class Target:
         """
         num_sent = 0
         if self._fuzz_data_logger is not None:
-            repeat = ""
-            if self.repeater is not None:
-                repeat = ", " + self.repeater.log_message()
-
-            self._fuzz_data_logger.log_info("Sending {0} bytes{1}...".format(len(data), repeat))
+            self._fuzz_data_logger.log_debug(
+                lambda: "Sending {0} bytes{1}...".format(
+                    len(data), "" if self.repeater is None else ", " + self.repeater.log_message()
+                )
+            )
 
         if self.repeater is not None:
             self.repeater.start()
@@ -258,6 +274,7 @@ class Connection(pgraph.Edge):
 
 class SessionInfo:
     def __init__(self, db_filename):
+        self._db_filename = db_filename
         self._db_reader = fuzz_logger_db.FuzzLoggerDbReader(db_filename=db_filename)
 
     @property
@@ -313,6 +330,18 @@ class SessionInfo:
         """
         return self._db_reader.get_test_case_data(index=index)
 
+    def failure_page(self, after=0, limit=100, filters=None):
+        """Return one page of failing test cases (for use by web server), see FuzzLoggerDbReader.failure_page."""
+        return self._db_reader.failure_page(after=after, limit=limit, filters=filters)
+
+    def profiles(self):
+        """Profiles written next to the database (for use by web server), see Session.profiles."""
+        return profiler.existing_profiles(self._db_filename)
+
+    def failure_counts(self, key, limit=100):
+        """Count failing test cases per request, element, monitor or bucket, see FuzzLoggerDbReader.failure_counts."""
+        return self._db_reader.failure_counts(key, limit=limit)
+
     @property
     def is_paused(self):
         return False
@@ -353,7 +382,7 @@ class WebApp:
 
     def _build_webapp_thread(self, port, address):
         app.session = self._session_info
-        http_server = HTTPServer(WSGIContainer(app))
+        http_server = HTTPServer(live.make_application(app))
         http_server.listen(port, address=address)
         flask_thread = threading.Thread(target=IOLoop.instance().start)
         flask_thread.daemon = True
@@ -401,10 +430,25 @@ class Session(pgraph.Graph):
         web_port (int or None): Port for monitoring fuzzing campaign via a web browser. Set to None to disable the web
                                 app. Default 26000.
         keep_web_open (bool):     Keep the webinterface open after session completion. Default True.
-        fuzz_loggers (list of ifuzz_logger.IFuzzLogger): For saving test data and results.. Default Log to STDOUT.
+        fuzz_loggers (list of ifuzz_logger.IFuzzLogger): For saving test data and results.. Default Log to STDOUT,
+                                                         showing up to 1024 bytes of each send and receive.
+        async_fuzz_loggers (bool): Deliver log events to fuzz_loggers on background threads, see
+                                   :class:`FuzzLoggerAsync <boofuzz.FuzzLoggerAsync>`. Failure bookkeeping and the
+                                   results database are not affected. Default False.
+        log_level (int): Minimum level of messages passed to fuzz_loggers and the results database, see LOG_LEVEL_*
+                         in :mod:`boofuzz.constants`. LOG_LEVEL_INFO skips details like the current value of the
+                         fuzzed element. Failures are always recorded. Default LOG_LEVEL_DEBUG.
+        max_failures_in_memory (int): Number of test cases kept in memory in the failure bookkeeping
+                                      (monitor_results, monitor_data and the fuzz logger's failed and error test
+                                      cases). Older entries are moved to the results database. Default 1000.
         fuzz_db_keep_only_n_pass_cases (int): Minimize disk usage by only saving passing test cases
                                               if they are in the n test cases preceding a failure or error.
                                               Set to 0 to save after every test case (high disk I/O!). Default 0.
+        fuzz_db_compression (str): Compress sent and received data in the results database with "zlib" or "zstd"
+                                   (requires the zstandard package). Default None.
+        fuzz_db_compact (bool): Store only the length, hash and a short prefix of sent and received data of test cases
+                                without failures. Sent data is regenerated from the protocol definition when viewing
+                                a test case. Default False.
         receive_data_after_each_request (bool): If True, Session will attempt to receive a reply after transmitting
                                                 each non-fuzzed node. Default True.
         check_data_received_each_request (bool): If True, Session will verify that some data has
@@ -427,6 +471,38 @@ class Session(pgraph.Graph):
         db_filename (str):      Filename to store sqlite db for test results and case information.
                                 Defaults to ./boofuzz-results/{uniq_timestamp}.db
         web_address:            Address where's Boofuzz logger exposed. Default 'localhost'
+        response_novelty (ResponseNoveltyTracker or bool): Buckets the responses to fuzzed messages and counts new
+                                response classes per element, see :meth:`novel_elements`. Default True, which uses
+                                a tracker with length class and prefix hash signals. Set to False to disable.
+                                Only used with receive_data_after_fuzz.
+        calibration_samples (int): Run a calibration phase before fuzzing that sends this many unmutated messages and
+                                this many mutations of each element, and prunes elements whose mutations change
+                                neither the response class, the timing nor the target's health. Requires
+                                receive_data_after_fuzz, as the responses are compared. Default 0 (disabled).
+        pruned_element_budget (int): Number of mutations still run for each pruned element. Minimum 1. Default 5.
+        web_process (bool): Serve the web UI from a separate process, so browsing it does not slow down fuzzing.
+                                The process reads progress from a shared status block and test cases from the results
+                                database, and polls instead of receiving live updates. Requests are served by
+                                several threads with tornado 6.3 or newer, by one thread before. Default False.
+        measure_phases (bool): Measure the time spent in each phase of a test case (connecting, rendering, sending,
+                                receiving, failure checks, logging, ...), see :meth:`phase_timings`. Default True.
+        metrics_file (str): Write the campaign metrics in the Prometheus text format (see :meth:`metrics_text`) to
+                                this file about once a second, e.g. for the node exporter textfile collector or
+                                ``boo serve-metrics``. Default None.
+        profile (bool or tuple): Sample the stack of the fuzzing thread with a
+                                :class:`SamplingProfiler <boofuzz.profiler.SamplingProfiler>` and write the profile
+                                next to the results database, see :meth:`profile_filename`. True profiles the whole
+                                run, a (first, last) tuple the test cases with these indices; last may be None.
+                                Default None.
+        profile_format (str):   Format of the profile, "collapsed" (collapsed stacks for flame graph tools) or
+                                "speedscope". Default "collapsed".
+        memory_report_interval (float): Take a memory report every this many seconds: resident set size, live
+                                mutation contexts, mutations and test steps, and the sizes of the session's growing
+                                containers, see :meth:`memory_reports`. A last report is taken at the end of the run.
+                                Default None (disabled).
+        memory_trace_allocations (bool): Trace allocations with tracemalloc and add the source lines whose live
+                                allocations grew most since the previous report to each memory report. Slows down
+                                fuzzing noticeably. Default False.
     """
 
     def __init__(
@@ -449,7 +525,12 @@ class Session(pgraph.Graph):
         post_test_case_callbacks=None,
         post_start_target_callbacks=None,
         fuzz_loggers=None,
+        async_fuzz_loggers=False,
+        log_level=constants.LOG_LEVEL_DEBUG,
+        max_failures_in_memory=1000,
         fuzz_db_keep_only_n_pass_cases=0,
+        fuzz_db_compression=None,
+        fuzz_db_compact=False,
         receive_data_after_each_request=True,
         check_data_received_each_request=False,
         receive_data_after_fuzz=False,
@@ -462,6 +543,16 @@ class Session(pgraph.Graph):
         web_address=constants.DEFAULT_WEB_UI_ADDRESS,
         db_filename=None,
         log_fuzz_testcase=False,
+        response_novelty=True,
+        calibration_samples=0,
+        pruned_element_budget=5,
+        web_process=False,
+        measure_phases=True,
+        metrics_file=None,
+        profile=None,
+        profile_format="collapsed",
+        memory_report_interval=None,
+        memory_trace_allocations=False,
     ):
         self._ignore_connection_reset = ignore_connection_reset
         self._ignore_connection_aborted = ignore_connection_aborted
@@ -493,7 +584,9 @@ class Session(pgraph.Graph):
                 )
                 self._keep_web_open = False
             else:
-                fuzz_loggers = [fuzz_logger_text.FuzzLoggerText()]
+                fuzz_loggers = [fuzz_logger_text.FuzzLoggerText(max_data_length=1024, flush_interval=0.5)]
+        if async_fuzz_loggers:
+            fuzz_loggers = [fuzz_logger_async.FuzzLoggerAsync(fuzz_logger=f) for f in fuzz_loggers]
 
         # self._run_id = datetime.datetime.utcnow().replace(microsecond=0).isoformat().replace(":", "-")
         self._run_id = time.strftime("%Y-%m-%dT%H-%M-%S")
@@ -505,7 +598,10 @@ class Session(pgraph.Graph):
             self._db_filename = os.path.join(constants.RESULTS_DIR, "run-{0}.db".format(self._run_id))
 
         self._db_logger = fuzz_logger_db.FuzzLoggerDb(
-            db_filename=self._db_filename, num_log_cases=fuzz_db_keep_only_n_pass_cases
+            db_filename=self._db_filename,
+            num_log_cases=fuzz_db_keep_only_n_pass_cases,
+            compression=fuzz_db_compression,
+            compact=fuzz_db_compact,
         )
 
         self.log_fuzz_testcase = log_fuzz_testcase
@@ -514,7 +610,18 @@ class Session(pgraph.Graph):
         
         self._crash_filename = "boofuzz-crash-bin-{0}".format(self._run_id)
 
-        self._fuzz_data_logger = fuzz_logger.FuzzLogger(fuzz_loggers=[self._db_logger] + fuzz_loggers)
+        # Pushes progress and test case steps to web UI clients; idle while none is connected.
+        if self.web_port is not None and not web_process:
+            self._live_updates = live.LiveUpdates(session=self)
+        else:
+            self._live_updates = None
+
+        self._fuzz_data_logger = fuzz_logger.FuzzLogger(
+            fuzz_loggers=[self._db_logger] + fuzz_loggers + ([self._live_updates] if self._live_updates else []),
+            log_level=log_level,
+            spill_db_filename=self._db_filename,
+            max_failures_in_memory=max_failures_in_memory,
+        )
         self._check_data_received_each_request = check_data_received_each_request
         self._receive_data_after_each_request = receive_data_after_each_request
         self._receive_data_after_fuzz = receive_data_after_fuzz
@@ -523,9 +630,15 @@ class Session(pgraph.Graph):
         self.start_time = time.time()
         self.end_time = None
         self.cumulative_pause_time = 0
+        self._phase_timer = phase_timing.PhaseTimer(enabled=measure_phases)
+        self.metrics = metrics.CampaignMetrics()
+        self._init_forecast()
+        self._metrics_files = [metrics_file] if metrics_file is not None else []
+        self._metrics_files_due = 0  # see metrics.METRICS_FILE_INTERVAL
+        self._init_profiler(profile, profile_format)
+        self._init_memory_tracker(memory_report_interval, memory_trace_allocations)
 
-        if self.web_port is not None:
-            self.web_interface_thread = self.build_webapp_thread(port=self.web_port, address=self.web_address)
+        self._init_web_interface(web_process)
 
         if pre_send_callbacks is None:
             pre_send_methods = []
@@ -561,12 +674,24 @@ class Session(pgraph.Graph):
         self.fuzz_node = None  # Request object currently being fuzzed
         self.current_test_case_name = ""
         self.targets = []
-        self.monitor_results = {}  # map of test case indices to list of crash synopsis strings (failed cases only)
+        # map of test case indices to list of crash synopsis strings (failed cases only)
+        self.monitor_results = spill_dict.SpillDict(self._db_filename, "monitor_results", max_failures_in_memory)
         # map of test case indices to list of supplement captured data (all cases where data was captured)
-        self.monitor_data = {}
+        self.monitor_data = spill_dict.SpillDict(self._db_filename, "monitor_data", max_failures_in_memory)
+        self._failures_reader = None  # read-only connections for the web server, see failure_page
+        # held while rendering the requests, which walks and may cache state in the element tree; shared by the fuzz
+        # thread, minimizer threads and the web server
+        self._render_lock = threading.Lock()
         self.is_paused = False
-        self.crashing_primitives = {}
+        self.crashing_primitives = {}  # crash counts per element and message; bounded by the protocol definition
         self.on_failure = event_hook.EventHook()
+        self.seeds = []  # names of test cases that reached new coverage, in the order they were found
+        self._seed_names = set()
+        self._seed_queue = collections.deque()  # (message path, mutations) of seeds not yet expanded
+        self._current_mutation_context = None
+        self._init_response_novelty(response_novelty)
+        self._init_calibration(calibration_samples, pruned_element_budget)
+        self.sampling_coverage = []  # (stratum, cases run, stratum size) of the last fuzz(budget=...) run
 
         # import settings if they exist.
         self.import_file()
@@ -596,6 +721,56 @@ class Session(pgraph.Graph):
                 self._fuzz_data_logger.log_error(str(e))
                 raise
 
+    def _init_web_interface(self, web_process):
+        self._web_process = None
+        self._web_pause_toggles = 0  # pause toggles requested through the web UI process and applied so far
+        self._web_num_mutations_element = None
+        self._web_phase_timings_due = 0  # see status.PHASE_TIMINGS_INTERVAL
+        if self.web_port is not None:
+            if web_process:
+                self._web_process = process.WebProcess(
+                    db_filename=self._db_filename, port=self.web_port, address=self.web_address
+                )
+                self._metrics_files.append(self._web_process.metrics_filename)
+            else:
+                self.web_interface_thread = self.build_webapp_thread(port=self.web_port, address=self.web_address)
+
+    def _init_response_novelty(self, response_novelty):
+        if response_novelty is True:
+            response_novelty = ResponseNoveltyTracker()
+        self.response_novelty = response_novelty or None
+
+    def _init_calibration(self, calibration_samples, pruned_element_budget):
+        self._calibration_samples = calibration_samples
+        self._pruned_element_budget = max(1, pruned_element_budget)
+        # qualified names of elements found insensitive -> number of depth-1 test cases saved
+        self.pruned_elements = {}
+        self._calibrating = False  # while yielding calibration cases, which the forecast does not count as planned
+
+    def _init_forecast(self):
+        self._forecaster = forecast.ThroughputForecaster()
+        self._forecast_path = None  # message path the forecast was planned for, None for all
+
+    def _init_profiler(self, profile, profile_format):
+        if profile_format not in profiler.PROFILE_FORMATS:
+            raise ValueError(
+                "profile_format must be one of {0}, got {1!r}".format(profiler.PROFILE_FORMATS, profile_format)
+            )
+        if profile is True:
+            profile = (1, None)
+        self._profile_window = tuple(profile) if profile else None
+        self._profile_format = profile_format
+        self._profiler = None
+        self._profile_first_index = None
+
+    def _init_memory_tracker(self, memory_report_interval, memory_trace_allocations):
+        if memory_report_interval is not None or memory_trace_allocations:
+            self._memory_tracker = memory_tracking.MemoryTracker(trace_allocations=memory_trace_allocations)
+        else:
+            self._memory_tracker = None
+        self._memory_report_interval = memory_report_interval
+        self._memory_report_due = 0
+
     @property
     def netmon_results(self):
         raise NotImplementedError(
@@ -824,15 +999,56 @@ class Session(pgraph.Graph):
         """
         If that pause flag is raised, enter an endless loop until it is lowered.
         """
+        self._publish_web_status()
         if self.is_paused:
             pause_start = time.time()
             while 1:
+                self._publish_web_status()
                 if self.is_paused:
                     time.sleep(1)
                 else:
                     break
             self.cumulative_pause_time += time.time() - pause_start
 
+    def _publish_web_status(self, num_mutations_element=None, final=False):
+        """Apply pause toggles requested through the web UI process and publish the session status to it.
+
+        Args:
+            num_mutations_element (int): Number of mutations of the fuzzed node, if it changed. Default None.
+            final (bool): Publish the phase timings even if they were published less than
+                status.PHASE_TIMINGS_INTERVAL seconds ago. Default False.
+        """
+        if self._web_process is None:
+            return
+        status_block = self._web_process.status
+        pause_toggles = status_block.pause_toggles
+        if (pause_toggles - self._web_pause_toggles) % 2:
+            self.is_paused = not self.is_paused
+        self._web_pause_toggles = pause_toggles
+        if num_mutations_element is not None:
+            self._web_num_mutations_element = num_mutations_element
+        status_block.write(
+            status.Status(
+                total_mutant_index=self.total_mutant_index,
+                total_num_mutations=self.total_num_mutations,
+                mutant_index=self.mutant_index,
+                num_mutations_element=self._web_num_mutations_element,
+                num_cases_actually_fuzzed=self.num_cases_actually_fuzzed,
+                start_time=self.start_time,
+                cumulative_pause_time=self.cumulative_pause_time,
+                end_time=self.end_time,
+                pause_toggles_seen=pause_toggles,
+                is_paused=self.is_paused,
+                current_element=self.fuzz_node.name if self.fuzz_node is not None else "",
+                current_test_case_name=self.current_test_case_name,
+            )
+        )
+        if self._phase_timer.enabled:
+            now = time.monotonic()
+            if final or now >= self._web_phase_timings_due:
+                status_block.write_phase_timings(self._phase_timer.stats())
+                self._web_phase_timings_due = now + status.PHASE_TIMINGS_INTERVAL
+
     def _check_for_passively_detected_failures(self, target, failure_already_detected=False):
         """Check for and log passively detected failures. Return True if any found.
 
@@ -928,6 +1144,9 @@ class Session(pgraph.Graph):
             else:
                 synopsis = "\n".join(crash_synopses)
             self.monitor_results[self.total_mutant_index] = crash_synopses
+            self.metrics.count_failures(
+                [fuzz_logger_db.classify_failure(self.current_test_case_name, s)[2] for s in crash_synopses]
+            )
             self._fuzz_data_logger.log_info(synopsis)
 
             if (
@@ -979,6 +1198,231 @@ class Session(pgraph.Graph):
         """
         self._callback_monitor.on_post_send.append(method)
 
+    def add_seed(self, mutation_context=None):
+        """Keep a test case as a seed for further mutation.
+
+        Used by feedback monitors (e.g. :class:`CoverageMonitor <boofuzz.monitors.CoverageMonitor>`) to mark test
+        cases that reached new behaviour in the target. After the current test case, every seed is combined with each
+        single mutation of the other elements of its message before regular fuzzing continues.
+
+        Args:
+            mutation_context (MutationContext): Test case to keep. Default None, meaning the test case currently
+                being fuzzed.
+
+        Returns:
+            bool: True if the test case was added, False if it was already a seed.
+        """
+        if mutation_context is None:
+            mutation_context = self._current_mutation_context
+        if mutation_context is None or not mutation_context.mutations:
+            return False
+
+        name = self._test_case_name(mutation_context)
+        if name in self._seed_names:
+            return False
+        self._seed_names.add(name)
+        self.seeds.append(name)
+        self._seed_queue.append((list(mutation_context.message_path), dict(mutation_context.mutations)))
+        return True
+
+    def novel_elements(self, n=None):
+        """Elements whose mutations produced the most previously unseen response classes.
+
+        Requires receive_data_after_fuzz, as the responses to fuzzed messages are what gets bucketed.
+
+        Args:
+            n (int): Maximum number of elements to return. Default None (all).
+
+        Returns:
+            list of (str, int, int): Qualified element name, number of new response classes and number of responses
+            observed for the element, most novel first. Empty if response novelty tracking is disabled.
+        """
+        if self.response_novelty is None:
+            return []
+        return self.response_novelty.ranked_elements(n)
+
+    def phase_timings(self):
+        """Time spent in each phase of the test cases run so far, see :data:`boofuzz.phase_timing.PHASES`.
+
+        Returns:
+            list of phase_timing.PhaseStats: Phase name, number of test cases in which it occurred, total, median,
+            99th percentile and maximum time per test case in seconds. Empty if measure_phases is disabled.
+        """
+        return self._phase_timer.stats()
+
+    def metrics_text(self):
+        """Campaign metrics in the Prometheus text exposition format, as served at ``/metrics`` by the web UI.
+
+        Includes test cases run (in total and per request), progress, execution speed, failures by monitor, target
+        restarts, connection errors by class, empty receives (socket connections return no data when the receive
+        timeout expires) and phase duration histograms. See :mod:`boofuzz.metrics`.
+
+        Returns:
+            str: Metrics.
+        """
+        return metrics.format_metrics(self, self.metrics, self._phase_timer.histograms, self.forecast())
+
+    def forecast(self):
+        """Forecast of the remaining time of the run, overall, per request and per element.
+
+        The time per test case is measured for each element, element type and request, and multiplied with the
+        remaining mutations of each element, see :class:`ThroughputForecaster <boofuzz.forecast.ThroughputForecaster>`.
+        The forecast covers the test cases mutating a single element, which :meth:`fuzz` runs first; test cases
+        combining mutations (max_depth greater than 1) are not forecast.
+
+        Returns:
+            forecast.Forecast: Test cases, remaining test cases, estimated remaining seconds and ETA. None unless
+            fuzzing the whole protocol or one message by name.
+        """
+        if not self._forecaster.planned:
+            return None
+        limit = None
+        if self._index_end is not None:
+            limit = max(self._index_end - self.total_mutant_index, 0)
+        return self._forecaster.forecast(limit=limit)
+
+    def _plan_forecast(self, path=None):
+        """Plan the forecast for the elements of the messages to fuzz, see :meth:`forecast`.
+
+        Args:
+            path (list of Connection): Plan only the message at the end of this path. Default None (all messages).
+        """
+        self._forecast_path = path
+        planned = []
+        fuzz_node = self.fuzz_node  # iterating message paths moves it
+        for message_path in self._iterate_protocol_message_paths(path=path):
+            request = self.nodes[message_path[-1].dst]
+            path_name = self._message_path_to_str(message_path)
+            for element in self._iterate_sampling_elements(request):
+                cases = element.get_num_mutations()
+                if element.qualified_name in self.pruned_elements:
+                    cases = min(cases, self._pruned_element_budget)
+                planned.append(
+                    forecast.PlannedElement(
+                        path=path_name,
+                        request=request.name,
+                        element=element.qualified_name,
+                        element_type=type(element).__name__,
+                        cases=cases,
+                    )
+                )
+        self.fuzz_node = fuzz_node
+        self._forecaster.plan(planned)
+
+    def _record_forecast(self, mutation_context, seconds):
+        mutant = self.fuzz_node.mutant
+        if mutant is None:
+            return  # unmutated calibration case
+        self._forecaster.record(
+            path=self._message_path_to_str(mutation_context.message_path),
+            request=self.fuzz_node.name,
+            element=mutant.qualified_name,
+            element_type=type(mutant).__name__,
+            seconds=seconds,
+            planned=not self._calibrating and len(mutation_context.mutations) == 1,
+        )
+
+    def _publish_metrics(self, final=False):
+        """Write the metrics files if metrics.METRICS_FILE_INTERVAL has passed since the last write, or if `final`."""
+        if not self._metrics_files:
+            return
+        now = time.monotonic()
+        if not final and now < self._metrics_files_due:
+            return
+        text = self.metrics_text()
+        for filename in self._metrics_files:
+            metrics.write_metrics_file(filename, text)
+        self._metrics_files_due = now + metrics.METRICS_FILE_INTERVAL
+
+    def profile_filename(self):
+        """File the profile of this run is written to (see Session arg `profile`), next to the results database."""
+        return profiler.profile_filename(self._db_filename, self._profile_format)
+
+    def profiles(self):
+        """Profile filenames by format of the profiles written for this run so far (for use by web server)."""
+        return profiler.existing_profiles(self._db_filename)
+
+    def _update_profiler(self, case_finished=False, end_of_run=False):
+        """Start the profiler when the current test case enters the profiled window, and stop it after the last one.
+
+        Args:
+            case_finished (bool): Called after the current test case instead of before it. Default False.
+            end_of_run (bool): Stop the profiler regardless of the window. Default False.
+        """
+        first, last = self._profile_window
+        index = self.total_mutant_index
+        if self._profiler is None:
+            if not (case_finished or end_of_run) and index >= first and (last is None or index <= last):
+                self._profiler = profiler.SamplingProfiler()
+                self._profiler.start()
+                self._profile_first_index = index
+        elif self._profiler.running and (end_of_run or (case_finished and last is not None and index >= last)):
+            self._profiler.stop()
+            filename = self.profile_filename()
+            self._profiler.write(
+                filename,
+                profile_format=self._profile_format,
+                name="boofuzz test cases {0}-{1}".format(self._profile_first_index, index),
+            )
+            self._fuzz_data_logger.log_info(
+                "Profile of test cases {0}-{1} ({2} samples) written to {3}".format(
+                    self._profile_first_index, index, self._profiler.num_samples, filename
+                )
+            )
+
+    def _log_phase_timings(self):
+        stats = self.phase_timings()
+        if not stats:
+            return
+        self._fuzz_data_logger.open_test_step("Phase timings")
+        for line in phase_timing.format_stats(stats):
+            self._fuzz_data_logger.log_info(line)
+
+    def memory_reports(self):
+        """Memory reports taken so far in this run, oldest first, see Session arg `memory_report_interval`.
+
+        See :func:`memory_tracking.format_report <boofuzz.memory_tracking.format_report>` to show them as text.
+
+        Returns:
+            list of memory_tracking.MemoryReport: Resident set size, live objects by type, container sizes and, if
+            allocations are traced, the top allocation sites of each report. Empty if memory reports are disabled.
+        """
+        if self._memory_tracker is None:
+            return []
+        return self._memory_tracker.reports
+
+    def _memory_containers(self):
+        """Number of entries of the session's containers that grow during a run, by name."""
+        containers = collections.OrderedDict()
+        for name, spilling in (
+            ("monitor_results", self.monitor_results),
+            ("monitor_data", self.monitor_data),
+            ("failed_test_cases", self._fuzz_data_logger.failed_test_cases),
+            ("error_test_cases", self._fuzz_data_logger.error_test_cases),
+        ):
+            containers[name] = len(spilling)
+            if isinstance(spilling, spill_dict.SpillDict):  # session files of older versions restore plain dicts
+                containers[name + " (in memory)"] = spilling.num_in_memory
+        containers["crashing_primitives"] = len(self.crashing_primitives)
+        containers["seeds"] = len(self.seeds)
+        containers["seed_queue"] = len(self._seed_queue)
+        containers["pruned_elements"] = len(self.pruned_elements)
+        if self.response_novelty is not None:
+            containers["response_buckets"] = len(self.response_novelty.buckets)
+        return containers
+
+    def _take_memory_report(self, final=False):
+        """Take a memory report if memory_report_interval has passed since the last one, or if `final`.
+
+        Reports are not logged: the fuzz loggers would store them as steps of the last test case.
+        """
+        now = time.monotonic()
+        if not final and (self._memory_report_interval is None or now < self._memory_report_due):
+            return
+        self._memory_tracker.report(self._memory_containers())
+        if self._memory_report_interval is not None:
+            self._memory_report_due = now + self._memory_report_interval
+
     # noinspection PyUnusedLocal
     def example_test_case_callback(self, target, fuzz_data_logger, session, test_case_context, *args, **kwargs):
         """
@@ -1016,7 +1460,7 @@ class Session(pgraph.Graph):
 
         for monitor in target.monitors:
             try:
-                self._fuzz_data_logger.open_test_step("Monitor {}.pre_send()".format(str(monitor)))
+                self._fuzz_data_logger.open_test_step(lambda: "Monitor {}.pre_send()".format(str(monitor)))
                 monitor.pre_send(target=target, fuzz_data_logger=self._fuzz_data_logger, session=self)
             except Exception:
                 self._fuzz_data_logger.log_error(
@@ -1024,13 +1468,14 @@ class Session(pgraph.Graph):
                     + traceback.format_exc()
                 )
 
-    def _restart_target(self, target):
+    def _restart_target(self, target, fuzz_data_logger=None):
         """
         Restart the fuzz target. If a VMControl is available revert the snapshot, if a process monitor is available
         restart the target process. If custom restart methods are registered, execute them. Otherwise, do nothing.
 
         Args:
             target (session.target): Target we are restarting
+            fuzz_data_logger (ifuzz_logger.IFuzzLogger): Logger to use instead of the session's. Default None.
 
         Raises:
              exception.BoofuzzRestartFailedError: if restart fails.
@@ -1039,34 +1484,38 @@ class Session(pgraph.Graph):
         # TODO: reuse_target_connection seems to be only handled when using
         #       a custom callback. wtf?
 
-        self._fuzz_data_logger.open_test_step("Restarting target")
+        if fuzz_data_logger is None:
+            fuzz_data_logger = self._fuzz_data_logger
+
+        self.metrics.count_restart()
+        fuzz_data_logger.open_test_step("Restarting target")
         restarted = False
         if len(self.on_failure) > 0:
             for f in self.on_failure:
-                self._fuzz_data_logger.open_test_step("Calling registered on_failure method")
-                f(logger=self._fuzz_data_logger)
+                fuzz_data_logger.open_test_step("Calling registered on_failure method")
+                f(logger=fuzz_data_logger)
             restarted = True
         # vm restarting is the preferred method so try that before monitors.
         elif target.vmcontrol:
-            self._fuzz_data_logger.log_info("Restarting target virtual machine")
+            fuzz_data_logger.log_info("Restarting target virtual machine")
             target.vmcontrol.restart_target()
             restarted = True
         # we always have at least one monitor; a Callback Monitor that handles all callbacks.
         else:
             for monitor in target.monitors:
-                self._fuzz_data_logger.log_info("Restarting target process using {}".format(monitor.__class__.__name__))
-                if monitor.restart_target(target=target, fuzz_data_logger=self._fuzz_data_logger, session=self):
+                fuzz_data_logger.log_info("Restarting target process using {}".format(monitor.__class__.__name__))
+                if monitor.restart_target(target=target, fuzz_data_logger=fuzz_data_logger, session=self):
                     # TODO: doesn't this belong in the process monitor?
-                    self._fuzz_data_logger.log_info("Giving the process 3 seconds to settle in")
+                    fuzz_data_logger.log_info("Giving the process 3 seconds to settle in")
                     time.sleep(3)
                     restarted = True
                     break
 
         if restarted:
             for monitor in target.monitors:
-                monitor.post_start_target(target=self.targets[0], fuzz_data_logger=self._fuzz_data_logger, session=self)
+                monitor.post_start_target(target=target, fuzz_data_logger=fuzz_data_logger, session=self)
         else:
-            self._fuzz_data_logger.log_info(
+            fuzz_data_logger.log_info(
                 "No reset handler available... sleeping for {} seconds".format(self.restart_sleep_time)
             )
             time.sleep(self.restart_sleep_time)
@@ -1076,7 +1525,11 @@ class Session(pgraph.Graph):
 
     def server_init(self):
         """Called by fuzz() to initialize variables, web interface, etc."""
-        if self.web_port is not None:
+        if self._web_process is not None:
+            if not self._web_process.is_alive():
+                port = self._web_process.start()
+                self._fuzz_data_logger.log_info("Web interface can be found at http://%s:%d" % (self.web_address, port))
+        elif self.web_port is not None:
             if not self.web_interface_thread.is_alive():
                 # spawn the web interface.
                 self.web_interface_thread.start()
@@ -1097,7 +1550,7 @@ class Session(pgraph.Graph):
 
         # if the edge has a callback, process it. the callback has the option to render the node, modify it and return.
         if edge.callback:
-            self._fuzz_data_logger.open_test_step("Callback function '{0}'".format(edge.callback.__name__))
+            self._fuzz_data_logger.open_test_step(lambda: "Callback function '{0}'".format(edge.callback.__name__))
             data = edge.callback(
                 self.targets[0],
                 self._fuzz_data_logger,
@@ -1123,18 +1576,22 @@ class Session(pgraph.Graph):
         if callback_data:
             data = callback_data
         else:
-            data = node.render(mutation_context=mutation_context)
+            with self._phase_timer.measure("prep_render"), self._render_lock:
+                data = node.render(mutation_context=mutation_context)
 
         try:  # send
-            self.targets[0].send(data)
+            with self._phase_timer.measure("prep_send"):
+                self.targets[0].send(data)
             self.last_send = data
         except exception.BoofuzzTargetConnectionReset:
+            self.metrics.count_connection_error("reset")
             # TODO: Switch _ignore_connection_reset for _ignore_transmission_error, or provide retry mechanism
             if self._ignore_connection_reset:
                 self._fuzz_data_logger.log_info(constants.ERR_CONN_RESET)
             else:
                 raise BoofuzzFailure(message=constants.ERR_CONN_RESET)
         except exception.BoofuzzTargetConnectionAborted as e:
+            self.metrics.count_connection_error("aborted")
             # TODO: Switch _ignore_connection_aborted for _ignore_transmission_error, or provide retry mechanism
             msg = constants.ERR_CONN_ABORTED.format(socket_errno=e.socket_errno, socket_errmsg=e.socket_errmsg)
             if self._ignore_connection_aborted:
@@ -1142,6 +1599,7 @@ class Session(pgraph.Graph):
             else:
                 raise BoofuzzFailure(msg)
         except exception.BoofuzzSSLError as e:
+            self.metrics.count_connection_error("ssl")
             if self._ignore_connection_ssl_errors:
                 self._fuzz_data_logger.log_info(str(e))
             else:
@@ -1149,7 +1607,9 @@ class Session(pgraph.Graph):
 
         try:  # recv
             if self._receive_data_after_each_request:
-                self.last_recv = self.targets[0].recv()
+                with self._phase_timer.measure("prep_recv"):
+                    self.last_recv = self.targets[0].recv()
+                self.metrics.count_receive(self.last_recv)
 
                 if self._check_data_received_each_request:
                     self._fuzz_data_logger.log_check("Verify some data was received from the target.")
@@ -1159,17 +1619,20 @@ class Session(pgraph.Graph):
                     else:
                         self._fuzz_data_logger.log_pass("Some data received from target.")
         except exception.BoofuzzTargetConnectionReset:
+            self.metrics.count_connection_error("reset")
             if self._check_data_received_each_request:
                 raise BoofuzzFailure(message=constants.ERR_CONN_RESET)
             else:
                 self._fuzz_data_logger.log_info(constants.ERR_CONN_RESET)
         except exception.BoofuzzTargetConnectionAborted as e:
+            self.metrics.count_connection_error("aborted")
             msg = constants.ERR_CONN_ABORTED.format(socket_errno=e.socket_errno, socket_errmsg=e.socket_errmsg)
             if self._check_data_received_each_request:
                 raise BoofuzzFailure(msg)
             else:
                 self._fuzz_data_logger.log_info(msg)
         except exception.BoofuzzSSLError as e:
+            self.metrics.count_connection_error("ssl")
             if self._ignore_connection_ssl_errors:
                 self._fuzz_data_logger.log_info(str(e))
             else:
@@ -1188,10 +1651,12 @@ class Session(pgraph.Graph):
         if callback_data:
             data = callback_data
         else:
-            data = self.fuzz_node.render(mutation_context)
+            with self._phase_timer.measure("fuzz_render"), self._render_lock:
+                data = self.fuzz_node.render(mutation_context)
 
         try:  # send
-            self.targets[0].send(data)
+            with self._phase_timer.measure("fuzz_send"):
+                self.targets[0].send(data)
             if self.log_fuzz_testcase:
                 if not os.path.exists('./testcases/' + self.fuzz_node.qualified_name):
                     os.mkdir('./testcases/' + self.fuzz_node.qualified_name)
@@ -1201,17 +1666,20 @@ class Session(pgraph.Graph):
                 f.close()
             self.last_send = data
         except exception.BoofuzzTargetConnectionReset:
+            self.metrics.count_connection_error("reset")
             if self._ignore_connection_issues_when_sending_fuzz_data:
                 self._fuzz_data_logger.log_info(constants.ERR_CONN_RESET)
             else:
                 raise BoofuzzFailure(message=constants.ERR_CONN_RESET)
         except exception.BoofuzzTargetConnectionAborted as e:
+            self.metrics.count_connection_error("aborted")
             msg = constants.ERR_CONN_ABORTED.format(socket_errno=e.socket_errno, socket_errmsg=e.socket_errmsg)
             if self._ignore_connection_issues_when_sending_fuzz_data:
                 self._fuzz_data_logger.log_info(msg)
             else:
                 raise BoofuzzFailure(msg)
         except exception.BoofuzzSSLError as e:
+            self.metrics.count_connection_error("ssl")
             if self._ignore_connection_ssl_errors:
                 self._fuzz_data_logger.log_info(str(e))
             else:
@@ -1220,13 +1688,17 @@ class Session(pgraph.Graph):
         received = b""
         try:  # recv
             if self._receive_data_after_fuzz:
-                received = self.targets[0].recv()
+                with self._phase_timer.measure("fuzz_recv"):
+                    received = self.targets[0].recv()
+                self.metrics.count_receive(received)
         except exception.BoofuzzTargetConnectionReset:
+            self.metrics.count_connection_error("reset")
             if self._check_data_received_each_request:
                 raise BoofuzzFailure(message=constants.ERR_CONN_RESET)
             else:
                 self._fuzz_data_logger.log_info(constants.ERR_CONN_RESET)
         except exception.BoofuzzTargetConnectionAborted as e:
+            self.metrics.count_connection_error("aborted")
             msg = constants.ERR_CONN_ABORTED.format(socket_errno=e.socket_errno, socket_errmsg=e.socket_errmsg)
             if self._check_data_received_each_request:
                 raise BoofuzzFailure(msg)
@@ -1234,6 +1706,7 @@ class Session(pgraph.Graph):
                 self._fuzz_data_logger.log_info(msg)
             pass
         except exception.BoofuzzSSLError as e:
+            self.metrics.count_connection_error("ssl")
             if self._ignore_connection_ssl_errors:
                 self._fuzz_data_logger.log_info(str(e))
             else:
@@ -1243,7 +1716,7 @@ class Session(pgraph.Graph):
 
     def build_webapp_thread(self, port=constants.DEFAULT_WEB_UI_PORT, address=constants.DEFAULT_WEB_UI_ADDRESS):
         app.session = self
-        http_server = HTTPServer(WSGIContainer(app))
+        http_server = HTTPServer(live.make_application(app, live_updates=self._live_updates))
         while True:
             try:
                 http_server.listen(port, address=address)
@@ -1271,7 +1744,7 @@ class Session(pgraph.Graph):
         for path in self._iterate_protocol_message_paths():
             self._message_check(path)
 
-    def fuzz(self, name=None, max_depth=None):
+    def fuzz(self, name=None, max_depth=None, budget=None, seed=None):
         """Fuzz the entire protocol tree.
 
         Iterates through and fuzzes all fuzz cases, skipping according to
@@ -1281,19 +1754,46 @@ class Session(pgraph.Graph):
         after calling this method. helpers.pause_for_signal() is
         available to this end.
 
+        With a `budget`, single mutations are instead sampled without replacement from the whole protocol, stratified
+        by message and element so that every element is covered proportionally from the start. Fuzzing stops once the
+        budget is used up, and the coverage reached per element is logged and kept in :attr:`sampling_coverage`.
+
         Args:
             name (str): Pass in a Request name to fuzz only a single request message. Pass in a test case name to fuzz
                         only a single test case.
             max_depth (int): Maximum combinatorial depth; set to 1 for "simple" fuzzing.
+            budget (float): Time budget in seconds for sampled fuzzing. Cannot be combined with name or max_depth.
+                            Default None (fuzz exhaustively).
+            seed (int): Key for the sampling order. Pass the seed logged by an earlier run to repeat it. Default None
+                        (random).
 
         Returns:
             None
         """
+        if budget is not None:
+            if name or max_depth is not None:
+                raise ValueError("budget can not be combined with name or max_depth")
+            if seed is None:
+                seed = random.getrandbits(32)
+            self.total_mutant_index = 0
+            self.total_num_mutations = self.num_mutations(max_depth=1)
+            self._forecaster.plan([])
+            self._main_fuzz_loop(self._interleave_seed_mutations(self._generate_sampled_mutations(budget, seed)))
+            return
+
         self.total_mutant_index = 0
         self.total_num_mutations = self.num_mutations(max_depth=max_depth)
 
         if name is None or name == "":
-            self._main_fuzz_loop(self._generate_mutations_indefinitely(max_depth=max_depth))
+            self._plan_forecast()
+            self._main_fuzz_loop(
+                self._interleave_seed_mutations(
+                    itertools.chain(
+                        self._generate_calibration_cases(),
+                        self._generate_mutations_indefinitely(max_depth=max_depth),
+                    )
+                )
+            )
         else:
             self.fuzz_by_name(name=name)
 
@@ -1310,6 +1810,7 @@ class Session(pgraph.Graph):
         else:
             self.total_mutant_index = 0
             self.total_num_mutations = 1
+            self._forecaster.plan([])
 
             node_edges = self._path_names_to_edges(node_names=path)
             self._main_fuzz_loop(self._generate_test_case_from_named_mutations(node_edges, mutations))
@@ -1324,8 +1825,16 @@ class Session(pgraph.Graph):
 
         self.total_mutant_index = 0
         self.total_num_mutations = self.nodes[node_edges[-1].dst].get_num_mutations()
+        self._plan_forecast(path=node_edges)
 
-        self._main_fuzz_loop(self._generate_mutations_indefinitely(path=node_edges))
+        self._main_fuzz_loop(
+            self._interleave_seed_mutations(
+                itertools.chain(
+                    self._generate_calibration_cases(path=node_edges),
+                    self._generate_mutations_indefinitely(path=node_edges),
+                )
+            )
+        )
 
     def fuzz_single_case(self, mutant_index):
         """Deprecated: Fuzz a test case by mutant_index.
@@ -1347,6 +1856,7 @@ class Session(pgraph.Graph):
         )
         self.total_mutant_index = 0
         self.total_num_mutations = 1
+        self._forecaster.plan([])
 
         self._main_fuzz_loop(self._generate_single_case_by_index(mutant_index))
 
@@ -1403,6 +1913,8 @@ class Session(pgraph.Graph):
                 self.targets[0].open()
             self.num_cases_actually_fuzzed = 0
             self.start_time = time.time()
+            if self._memory_tracker is not None:
+                self._memory_tracker.start()
             for mutation_context in fuzz_case_iterator:
                 if self.total_mutant_index < self._index_start:
                     continue
@@ -1428,6 +1940,8 @@ class Session(pgraph.Graph):
 
             if self._keep_web_open and self.web_port is not None:
                 self.end_time = time.time()
+                self._publish_web_status(final=True)
+                self._publish_metrics(final=True)
                 print(
                     "\nFuzzing session completed. Keeping webinterface up on {}:{}".format(
                         self.web_address, self.web_port
@@ -1452,6 +1966,14 @@ class Session(pgraph.Graph):
             self.export_file()
             raise
         finally:
+            if self._profile_window is not None:
+                self._update_profiler(end_of_run=True)
+            self._publish_web_status(final=True)
+            self._publish_metrics(final=True)
+            self._log_phase_timings()
+            if self._memory_tracker is not None:
+                self._take_memory_report(final=True)
+                self._memory_tracker.stop()
             self._fuzz_data_logger.close_test()
 
     def _generate_single_case_by_index(self, test_case_index):
@@ -1475,6 +1997,325 @@ class Session(pgraph.Graph):
                 break
             depth += 1
 
+    def _interleave_seed_mutations(self, fuzz_case_iterator):
+        """Yield from fuzz_case_iterator, expanding any seeds registered via add_seed() after each test case."""
+        for mutation_context in fuzz_case_iterator:
+            yield mutation_context
+            while self._seed_queue:
+                path, mutations = self._seed_queue.popleft()
+                for m in self._generate_mutations_from_seed(path, mutations):
+                    yield m
+
+    def _generate_mutations_from_seed(self, path, mutations):
+        """Yield MutationContext combining a seed's mutations with each mutation of the message's other elements.
+
+        The state of the interrupted regular iteration (current node, mutant and skip flags) is restored afterwards.
+
+        Args:
+            path (list of Connection): Message path of the seed.
+            mutations (dict): Seed mutations, keyed by qualified name.
+
+        Yields:
+            MutationContext: Seed mutations plus one additional mutation.
+        """
+        saved_node, saved_mutant_index = self.fuzz_node, self.mutant_index
+        saved_mutant = saved_node.mutant if saved_node is not None else None
+        saved_skip_node = self._skip_current_node_after_current_test_case
+        saved_skip_element = self._skip_current_element_after_current_test_case
+        try:
+            self.fuzz_node = self.nodes[path[-1].dst]
+            self.mutant_index = 0
+            for extra in self.fuzz_node.get_mutations(skip_elements=set(mutations)):
+                combined = list(mutations.values()) + extra
+                if self._mutations_contain_duplicate(combined):
+                    continue
+                self.mutant_index += 1
+                self.total_mutant_index += 1
+                yield MutationContext(message_path=path, mutations={n.qualified_name: n for n in combined})
+        finally:
+            self.fuzz_node, self.mutant_index = saved_node, saved_mutant_index
+            if saved_node is not None:
+                saved_node.mutant = saved_mutant
+            self._skip_current_node_after_current_test_case = saved_skip_node
+            self._skip_current_element_after_current_test_case = saved_skip_element
+
+    def _generate_calibration_cases(self, path=None):
+        """Yield the test cases of the calibration phase and prune insensitive elements once they have run.
+
+        For each message, `calibration_samples` unmutated test cases establish a baseline of response classes and
+        timing. Then up to `calibration_samples` mutations of each element are sent. An element whose samples caused no
+        failures, only produced baseline response classes and did not shift the timing beyond the baseline's noise is
+        added to :attr:`pruned_elements`, and the main fuzz loop runs only `pruned_element_budget` of its mutations.
+
+        Without responses, timing alone would decide, so nothing is calibrated without receive_data_after_fuzz and no
+        element of a message the target did not respond to is pruned.
+
+        Args:
+            path (list of Connection): Calibrate only the message at the end of this path. Default None (all messages).
+
+        Yields:
+            MutationContext: Calibration test cases.
+        """
+        if self._calibration_samples < 1:
+            return
+        if not self._receive_data_after_fuzz:
+            self._fuzz_data_logger.log_info(
+                "Calibration skipped: it compares responses to fuzzed messages, which requires receive_data_after_fuzz."
+            )
+            return
+        self._calibrating = True
+        if self.response_novelty is not None:
+            fingerprinter = self.response_novelty.fingerprinter
+        else:
+            fingerprinter = ResponseFingerprinter()
+        no_response = fingerprinter.fingerprint(None)
+
+        for path in self._iterate_protocol_message_paths(path=path):
+            node = self.nodes[path[-1].dst]
+            baseline = []
+            observations = collections.defaultdict(list)  # element qualified name -> calibration results
+
+            # a given path is yielded without moving fuzz_node, and the baseline cases must log against this node
+            self.fuzz_node = node
+            self.mutant_index = 0
+            node.mutant = None
+            for _ in range(self._calibration_samples):
+                for m in self._run_calibration_case(path, [], fingerprinter, baseline):
+                    yield m
+
+            for mutations in node.get_mutations():
+                samples = observations[node.mutant.qualified_name]
+                if len(samples) >= self._calibration_samples:
+                    node.mutant.stop_mutations()
+                    continue
+                self.mutant_index += 1
+                for m in self._run_calibration_case(path, mutations, fingerprinter, samples):
+                    yield m
+
+                if self._skip_current_node_after_current_test_case:
+                    self._skip_current_node_after_current_test_case = False
+                    break
+                elif self._skip_current_element_after_current_test_case:
+                    self._skip_current_element_after_current_test_case = False
+                    node.mutant.stop_mutations()
+
+            if all(fingerprint == no_response for fingerprint, _, _ in baseline):
+                self._fuzz_data_logger.log_info(
+                    "Calibration pruned no elements of {0}: the target did not respond to it.".format(node.name)
+                )
+            else:
+                self._prune_insensitive_elements(node, baseline, observations)
+
+        self._calibrating = False
+        if self._forecaster.planned:
+            self._plan_forecast(path=self._forecast_path)
+        self._fuzz_data_logger.log_info(self.pruning_report())
+
+    def _prune_insensitive_elements(self, node, baseline, observations):
+        """Add the elements of `node` whose calibration results match the baseline to :attr:`pruned_elements`.
+
+        The test cases saved are counted at depth 1, i.e. the element's mutations beyond the budget. Combinations with
+        a pruned element are cut short as well, but those savings are not counted; total_num_mutations is only known
+        at depth 1 anyway (see :meth:`num_mutations`), so the depth-1 count is exactly what it is corrected by.
+        """
+        for name, samples in observations.items():
+            if self._is_element_insensitive(baseline, samples):
+                saved = max(0, node.names[name].get_num_mutations() - self._pruned_element_budget)
+                self.pruned_elements[name] = saved
+                if self.total_num_mutations is not None:  # None when fuzzing combinations
+                    self.total_num_mutations -= saved
+
+    def _run_calibration_case(self, path, mutations, fingerprinter, results):
+        """Yield one calibration test case and append (response class, duration, failed) to `results` once it ran."""
+        self.total_mutant_index += 1
+        if self.total_num_mutations is not None:
+            self.total_num_mutations += 1
+        cases_fuzzed = self.num_cases_actually_fuzzed
+        self.last_recv = None
+        start_time = time.time()
+
+        yield MutationContext(message_path=list(path), mutations={m.qualified_name: m for m in mutations})
+
+        if self.num_cases_actually_fuzzed == cases_fuzzed:
+            return  # skipped, e.g. by index_start
+        test_case_id = self._fuzz_data_logger.most_recent_test_id
+        failed = (
+            test_case_id in self._fuzz_data_logger.failed_test_cases
+            or test_case_id in self._fuzz_data_logger.error_test_cases
+        )
+        results.append((fingerprinter.fingerprint(self.last_recv), time.time() - start_time, failed))
+
+    @staticmethod
+    def _is_element_insensitive(baseline, samples):
+        """Decide from calibration results whether mutating an element has no observable effect.
+
+        Args:
+            baseline (list of tuple): (response class, duration, failed) of the unmutated test cases.
+            samples (list of tuple): (response class, duration, failed) of the element's mutations.
+
+        Returns:
+            bool: True if the element can be pruned.
+        """
+        if not baseline or not samples or any(failed for _, _, failed in baseline + samples):
+            return False
+        baseline_classes = set(fingerprint for fingerprint, _, _ in baseline)
+        if any(fingerprint not in baseline_classes for fingerprint, _, _ in samples):
+            return False
+        baseline_durations = [duration for _, duration, _ in baseline]
+        baseline_mean = statistics.mean(baseline_durations)
+        tolerance = max(3 * statistics.pstdev(baseline_durations), 0.1 * baseline_mean)
+        return abs(statistics.mean(duration for _, duration, _ in samples) - baseline_mean) <= tolerance
+
+    def pruning_report(self):
+        """Describe which elements the calibration phase pruned.
+
+        Test cases saved are counted at depth 1, i.e. without combinations of several mutations.
+
+        Returns:
+            str: Human readable report listing each pruned element and the number of test cases saved.
+        """
+        lines = [
+            "Calibration pruned {0} element(s), saving {1} test cases.".format(
+                len(self.pruned_elements), sum(self.pruned_elements.values())
+            )
+        ]
+        for name, saved in sorted(self.pruned_elements.items(), key=lambda item: item[1], reverse=True):
+            lines.append("    {0}: {1} test cases saved".format(name, saved))
+        return "\n".join(lines)
+
+    def minimize(self, test_cases=None, targets=None, max_replays=1000):
+        """Minimize failing test cases from this session's run database.
+
+        Each failing test case is replayed and shrunk with structure-aware delta debugging (see
+        :class:`CaseMinimizer <boofuzz.minimizer.CaseMinimizer>`) until the smallest variant that still fails in the
+        same way is found. Results are stored in the ``minimized_cases`` table of the run database.
+
+        Test cases are distributed over the given targets, one thread per target, so pass several independent target
+        instances (each with its own monitors) to minimize in parallel. Do not call this while fuzzing the same
+        targets.
+
+        Args:
+            test_cases (list of int): Indices of the test cases to minimize. Default None (all failing test cases).
+            targets (list of Target): Targets to replay against. Default None (the session's targets).
+            max_replays (int): Maximum number of replays per test case. Default 1000.
+
+        Returns:
+            list of MinimizedCase: One result per test case, ordered by index.
+        """
+        if targets is None:
+            targets = self.targets
+        for target in targets:
+            if self._callback_monitor not in target.monitors:
+                target.monitors.append(self._callback_monitor)
+
+        self._db_logger.flush()
+        reader = fuzz_logger_db.FuzzLoggerDbReader(db_filename=self._db_filename)
+        failure_map = reader.failure_map
+        if test_cases is None:
+            test_cases = sorted(failure_map)
+        failing_cases = []
+        for index in test_cases:
+            for (name,) in reader.query("SELECT name FROM cases WHERE number=?", [index]):
+                failing_cases.append((index, name, failure_map.get(index, [])))
+                break
+
+        results = minimizer.minimize_in_parallel(self, targets, failing_cases, max_replays=max_replays)
+        minimizer.save_minimized_cases(self._db_filename, results)
+        return results
+
+    def _generate_sampled_mutations(self, budget, seed):
+        """Yield single mutations sampled across all messages and elements until the time budget is used up.
+
+        Each fuzzable element of each message is one stratum, drawn in the order of a keyed Feistel permutation.
+
+        Args:
+            budget (float): Time budget in seconds, measured like :attr:`runtime`.
+            seed (int): Key from which the per-stratum permutation keys are derived.
+
+        Yields:
+            MutationContext: Sampled test cases.
+        """
+        strata = []
+        stratum_targets = {}
+        for path in self._iterate_protocol_message_paths():
+            path = list(path)
+            for element in self._iterate_sampling_elements(self.nodes[path[-1].dst]):
+                name = "{0}:{1}".format(self._message_path_to_str(path), element.qualified_name)
+                stratum = sampling.Stratum(
+                    name=name,
+                    size=element.get_num_mutations(),
+                    fetch=functools.partial(self._fetch_mutations, element),
+                    key=sampling.derive_key(seed, name),
+                )
+                strata.append(stratum)
+                stratum_targets[stratum] = (path, element)
+        sampler = sampling.StratifiedSampler(strata)
+        self._fuzz_data_logger.log_info(
+            "Sampling {0} strata for {1} seconds (seed {2})".format(len(strata), budget, seed)
+        )
+
+        for stratum, _, mutations in sampler:
+            path, element = stratum_targets[stratum]
+            self.fuzz_node = self.nodes[path[-1].dst]
+            self.fuzz_node.mutant = element
+            self.mutant_index = stratum.covered
+            self.total_mutant_index += 1
+            yield MutationContext(message_path=path, mutations={m.qualified_name: m for m in mutations})
+
+            if self._skip_current_node_after_current_test_case:
+                self._skip_current_node_after_current_test_case = False
+                for other, (other_path, _) in stratum_targets.items():
+                    if other_path[-1].dst == path[-1].dst:
+                        other.exhausted = True
+            elif self._skip_current_element_after_current_test_case:
+                self._skip_current_element_after_current_test_case = False
+                stratum.exhausted = True
+
+            if self.runtime >= budget:
+                self._fuzz_data_logger.log_info("Time budget of {0} seconds used up.".format(budget))
+                break
+
+        self.sampling_coverage = sampler.coverage()
+        self._fuzz_data_logger.log_info(self._sampling_coverage_report())
+
+    def _iterate_sampling_elements(self, block):
+        """Yield the fuzzable elements of a block the way FuzzableBlock.mutations visits them.
+
+        Blocks with a group are yielded as a whole, since their mutations combine group values with their children.
+        """
+        for item in block.stack:
+            if not item.fuzzable:
+                continue
+            if isinstance(item, FuzzableBlock) and getattr(item, "group", None) is None:
+                for element in self._iterate_sampling_elements(item):
+                    yield element
+            else:
+                yield item
+
+    @staticmethod
+    def _fetch_mutations(element, indices):
+        """Collect the mutations of element at the given sorted indices in a single pass."""
+        wanted = set(indices)
+        found = {}
+        for index, mutations in enumerate(element.get_mutations()):
+            if index in wanted:
+                found[index] = mutations
+            if index >= indices[-1]:
+                break
+        return found
+
+    def _sampling_coverage_report(self):
+        covered = sum(c for _, c, _ in self.sampling_coverage)
+        size = sum(n for _, _, n in self.sampling_coverage)
+        lines = ["Sampled {0} of {1} test cases:".format(covered, size)]
+        for name, stratum_covered, stratum_size in self.sampling_coverage:
+            lines.append(
+                "    {0}: {1} of {2} ({3:.1%})".format(
+                    name, stratum_covered, stratum_size, stratum_covered / stratum_size if stratum_size else 1.0
+                )
+            )
+        return "\n".join(lines)
+
     def _generate_n_mutations(self, depth, path):
         """Yield MutationContext with n mutations per message over all messages."""
         for path in self._iterate_protocol_message_paths(path=path):
@@ -1586,6 +2427,7 @@ class Session(pgraph.Graph):
             skip_elements = []
         self.fuzz_node = self.nodes[path[-1].dst]
         self.mutant_index = 0
+        pruned_element, pruned_element_count = None, 0
 
         for mutations in self.fuzz_node.get_mutations(skip_elements=skip_elements):
             self.mutant_index += 1
@@ -1599,19 +2441,41 @@ class Session(pgraph.Graph):
                 self._skip_current_element_after_current_test_case = False
                 continue
 
+            mutant = self.fuzz_node.mutant
+            if mutant is not None and mutant.qualified_name in self.pruned_elements:
+                if mutant is not pruned_element:
+                    pruned_element, pruned_element_count = mutant, 0
+                pruned_element_count += 1
+                if pruned_element_count >= self._pruned_element_budget:
+                    mutant.stop_mutations()
+
     def _generate_test_case_from_named_mutations(self, path, mutation_names):
-        # need a way to get the mutation value based on the mutation index
         self.fuzz_node = self.nodes[path[-1].dst]
         self.mutant_index = 0
 
+        mutations = self._mutations_from_names(self.fuzz_node, mutation_names)
+        self.total_mutant_index += 1
+        yield MutationContext(message_path=path, mutations=mutations)
+
+    @staticmethod
+    def _mutations_from_names(request, mutation_names):
+        """Regenerate mutations from their names as used in test case names.
+
+        Args:
+            request (Request): Message the mutations belong to.
+            mutation_names (list of str): Names like "message.element:index".
+
+        Returns:
+            dict: Mutations keyed by qualified name.
+        """
+        # need a way to get the mutation value based on the mutation index
         mutations = []
         for mutation_name in mutation_names:
             qualified_name, index = mutation_name.rsplit(":")
             index = int(index)
-            fuzzable = self.fuzz_node.names[qualified_name]
+            fuzzable = request.names[qualified_name]
             mutations += next(itertools.islice(fuzzable.get_mutations(), index, index + 1))
-        self.total_mutant_index += 1
-        yield MutationContext(message_path=path, mutations={n.qualified_name: n for n in mutations})
+        return {n.qualified_name: n for n in mutations}
 
     def _path_names_to_edges(self, node_names):
         """Take a list of node names and return a list of edges describing that path.
@@ -1649,6 +2513,7 @@ class Session(pgraph.Graph):
         self.total_mutant_index += 1
 
         self._pause_if_pause_flag_is_set()
+        case_start = time.perf_counter()
 
         test_case_name = self._test_case_name_feature_check(mutation_context)
 
@@ -1715,6 +2580,7 @@ class Session(pgraph.Graph):
             self._get_monitor_data(target)
             self._fuzz_data_logger.close_test_case()
             self.export_file()
+            self._phase_timer.finish_case(time.perf_counter() - case_start)
 
     def _fuzz_current_case(self, mutation_context):
         """
@@ -1729,41 +2595,52 @@ class Session(pgraph.Graph):
 
         self._pause_if_pause_flag_is_set()
 
+        if self._profile_window is not None:
+            self._update_profiler()
+        phase_timer = self._phase_timer
+        case_start = time.perf_counter()
         test_case_name = self._test_case_name(mutation_context)
         self.current_test_case_name = test_case_name
-
-        self._fuzz_data_logger.open_test_case(
-            "{0}: {1}".format(self.total_mutant_index, test_case_name),
-            name=test_case_name,
-            index=self.total_mutant_index,
-            num_mutations=self.total_num_mutations,
-            current_index=self.mutant_index,
-            current_num_mutations=self.fuzz_node.get_num_mutations(),
-        )
-
-        if self.total_num_mutations is not None:
-            self._fuzz_data_logger.log_info(
-                "Type: {0}. Case {1} of {2} overall.".format(
-                    type(self.fuzz_node.mutant).__name__,
-                    self.total_mutant_index,
-                    self.total_num_mutations,
-                )
+        self._current_mutation_context = mutation_context
+
+        num_mutations_element = self.fuzz_node.get_num_mutations()
+        self.metrics.count_case(self.fuzz_node.name, num_mutations_element)
+        with phase_timer.measure("logging"):
+            self._fuzz_data_logger.open_test_case(
+                "{0}: {1}".format(self.total_mutant_index, test_case_name),
+                name=test_case_name,
+                index=self.total_mutant_index,
+                num_mutations=self.total_num_mutations,
+                current_index=self.mutant_index,
+                current_num_mutations=num_mutations_element,
             )
-        else:
-            self._fuzz_data_logger.log_info(
-                "Type: {0}".format(
-                    type(self.fuzz_node.mutant).__name__,
+
+            mutant = self.fuzz_node.mutant
+            if mutant is None:
+                self._fuzz_data_logger.log_info("Unmutated message (calibration baseline).")
+            elif self.total_num_mutations is not None:
+                self._fuzz_data_logger.log_info(
+                    lambda: "Type: {0}. Case {1} of {2} overall.".format(
+                        type(mutant).__name__,
+                        self.total_mutant_index,
+                        self.total_num_mutations,
+                    )
                 )
-            )
-        
-        # log the default value and current value of the fuzz node
-        self._fuzz_data_logger.log_info("Default value: {0}".format(self.fuzz_node.mutant._default_value))
-        self._fuzz_data_logger.log_info("Current value: {0}".format(self.fuzz_node.mutant.render(mutation_context)))
+            else:
+                self._fuzz_data_logger.log_info(lambda: "Type: {0}".format(type(mutant).__name__))
+
+            # log the default value and current value of the fuzz node; rendering the mutant is skipped unless needed
+            if mutant is not None:
+                self._fuzz_data_logger.log_debug(lambda: "Default value: {0}".format(mutant._default_value))
+                self._fuzz_data_logger.log_debug(lambda: "Current value: {0}".format(mutant.render(mutation_context)))
+        self._publish_web_status(num_mutations_element=num_mutations_element)
 
         try:
-            self._open_connection_keep_trying(target)
+            with phase_timer.measure("connect"):
+                self._open_connection_keep_trying(target)
 
-            self._pre_send(target)
+            with phase_timer.measure("pre_send"):
+                self._pre_send(target)
 
             for e in mutation_context.message_path[:-1]:
                 prev_node = self.nodes[e.src]
@@ -1774,8 +2651,9 @@ class Session(pgraph.Graph):
                 )
                 mutation_context.protocol_session = protocol_session
                 # Spwpun: added mutation_context to the _callback_current_node, so that the callback can use it
-                callback_data = self._callback_current_node(node=node, edge=e, test_case_context=protocol_session, mutation_context=mutation_context)
-                self._fuzz_data_logger.open_test_step("Transmit Prep Node '{0}'".format(node.name))
+                with phase_timer.measure("callbacks"):
+                    callback_data = self._callback_current_node(node=node, edge=e, test_case_context=protocol_session, mutation_context=mutation_context)
+                self._fuzz_data_logger.open_test_step(lambda: "Transmit Prep Node '{0}'".format(node.name))
                 self.transmit_normal(target, node, e, callback_data=callback_data, mutation_context=mutation_context)
 
             prev_node = self.nodes[mutation_context.message_path[-1].src]
@@ -1785,11 +2663,12 @@ class Session(pgraph.Graph):
                 current_message=node,
             )
             mutation_context.protocol_session = protocol_session
-            callback_data = self._callback_current_node(
-                node=self.fuzz_node, edge=mutation_context.message_path[-1], test_case_context=protocol_session,
-                mutation_context=mutation_context
-            )
-            self._fuzz_data_logger.open_test_step("Fuzzing Node '{0}'".format(self.fuzz_node.name))
+            with phase_timer.measure("callbacks"):
+                callback_data = self._callback_current_node(
+                    node=self.fuzz_node, edge=mutation_context.message_path[-1], test_case_context=protocol_session,
+                    mutation_context=mutation_context
+                )
+            self._fuzz_data_logger.open_test_step(lambda: "Fuzzing Node '{0}'".format(self.fuzz_node.name))
             self.transmit_fuzz(
                 target,
                 self.fuzz_node,
@@ -1797,21 +2676,41 @@ class Session(pgraph.Graph):
                 callback_data=callback_data,
                 mutation_context=mutation_context,
             )
+            if self.response_novelty is not None and self._receive_data_after_fuzz:
+                if self.response_novelty.observe(self.last_recv, mutation_context.mutations, test_case_name):
+                    self._fuzz_data_logger.log_info(
+                        "New response class ({0} seen)".format(self.response_novelty.num_buckets)
+                    )
 
-            self._check_for_passively_detected_failures(target=target)
+            with phase_timer.measure("check_failures"):
+                self._check_for_passively_detected_failures(target=target)
             if not self._reuse_target_connection:
-                target.close()
+                with phase_timer.measure("disconnect"):
+                    target.close()
 
             if self.sleep_time > 0:
                 self._fuzz_data_logger.open_test_step("Sleep between tests.")
                 self._sleep(self.sleep_time)
         except BoofuzzFailure as e:
-            self._fuzz_data_logger.log_fail(e.message)
-            self._check_for_passively_detected_failures(target=target, failure_already_detected=True)
+            with phase_timer.measure("logging"):
+                self._fuzz_data_logger.log_fail(e.message)
+            with phase_timer.measure("check_failures"):
+                self._check_for_passively_detected_failures(target=target, failure_already_detected=True)
         finally:
-            self._process_failures(target=target)
-            self._fuzz_data_logger.close_test_case()
-            self.export_file()
+            with phase_timer.measure("process_failures"):
+                self._process_failures(target=target)
+            with phase_timer.measure("logging"):
+                self._fuzz_data_logger.close_test_case()
+            with phase_timer.measure("export"):
+                self.export_file()
+            case_duration = time.perf_counter() - case_start
+            phase_timer.finish_case(case_duration)
+            self._record_forecast(mutation_context, case_duration)
+            self._publish_metrics()
+            if self._memory_tracker is not None:
+                self._take_memory_report()
+            if self._profile_window is not None:
+                self._update_profiler(case_finished=True)
 
     def _open_connection_keep_trying(self, target):
         """Open connection and if it fails, keep retrying.
@@ -1829,6 +2728,7 @@ class Session(pgraph.Graph):
                     target.open()
                     break  # break if no exception
                 except exception.BoofuzzTargetConnectionFailedError:
+                    self.metrics.count_connection_error("connect_failed")
                     if self.restart_threshold and unable_to_connect_count >= self.restart_threshold:
                         self._fuzz_data_logger.log_info(
                             "Unable to reconnect to target: Reached threshold of {0} retries. Ending fuzzing.".format(
@@ -1848,6 +2748,7 @@ class Session(pgraph.Graph):
                         self._restart_target(target)
                         unable_to_connect_count += 1
                 except exception.BoofuzzOutOfAvailableSockets:
+                    self.metrics.count_connection_error("no_sockets")
                     out_of_available_sockets_count += 1
                     if out_of_available_sockets_count == 50:
                         raise exception.BoofuzzError("There are no available sockets. Ending fuzzing.")
@@ -1884,10 +2785,61 @@ class Session(pgraph.Graph):
     def test_case_data(self, index):
         """Return test case data object (for use by web server)
 
+        Sent data that was logged in compact form is regenerated by rendering the test case again.
+
         Args:
             index (int): Test case index
 
         Returns:
             DataTestCase: Test case data object
         """
-        return self._db_logger.get_test_case_data(index=index)
+        test_case = self._db_logger.get_test_case_data(index=index)
+        if test_case is not None:
+            self._regenerate_sent_data(test_case)
+        return test_case
+
+    def failure_page(self, after=0, limit=100, filters=None):
+        """Return one page of failing test cases (for use by web server), see FuzzLoggerDbReader.failure_page.
+
+        Failures are read through a separate read-only connection, so the web server does not wait for the logger.
+        """
+        return self._web_db_reader().failure_page(after=after, limit=limit, filters=filters)
+
+    def failure_counts(self, key, limit=100):
+        """Count failing test cases per request, element, monitor or bucket, see FuzzLoggerDbReader.failure_counts."""
+        return self._web_db_reader().failure_counts(key, limit=limit)
+
+    def _web_db_reader(self):
+        if self._failures_reader is None:
+            self._failures_reader = fuzz_logger_db.FuzzLoggerDbReader(db_filename=self._db_filename, read_only=True)
+        return self._failures_reader
+
+    def _regenerate_sent_data(self, test_case):
+        """Replace truncated send steps with the rendered messages of the test case whose hash matches.
+
+        Runs on the web server thread, so it renders copies of the requests rather than the ones being fuzzed.
+        """
+        steps = [step for step in test_case.steps if step.type == "send" and step.truncated and step.data_hash]
+        if not steps:
+            return
+        try:
+            path_names, mutation_names = helpers.parse_test_case_name(test_case.name)
+            path = self._path_names_to_edges(node_names=path_names)
+            with self._render_lock:
+                nodes = copy.deepcopy({i: self.nodes[i] for edge in path for i in (edge.src, edge.dst)})
+            mutations = self._mutations_from_names(nodes[path[-1].dst], [n for n in mutation_names if n])
+        except Exception:
+            # Test case from a different protocol definition; keep the prefixes.
+            return
+
+        rendered = {}
+        mutation_context = MutationContext(message_path=path, mutations=mutations)
+        for edge in path:
+            node = nodes[edge.dst]
+            mutation_context.protocol_session = ProtocolSession(previous_message=nodes[edge.src], current_message=node)
+            data = node.render(mutation_context)
+            rendered[fuzz_logger_db.payload_hash(data)] = data
+        for step in steps:
+            if step.data_hash in rendered:
+                step.data = rendered[step.data_hash]
+                step.truncated = False
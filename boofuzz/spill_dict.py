@@ -0,0 +1,169 @@
+import collections
+import collections.abc
+import pickle
+import sqlite3
+import threading
+
+from . import fuzz_logger_db
+
+
+class SpillDict(collections.abc.MutableMapping):
+    """Dictionary keeping the most recently used entries in memory and spilling the rest to the run database.
+
+    Used for bookkeeping that grows with the length of a campaign, like failures per test case. Entries evicted from
+    the in-memory LRU are pickled into the ``spilled`` table of the run database and loaded back into memory when
+    accessed, so values fetched with ``d[key]`` can still be modified in place.
+
+    Pickling a SpillDict stores only the in-memory entries and a reference to the database, so session files stay
+    small; the spilled entries are found again as long as the database exists.
+
+    Keys must be picklable and compare equal exactly when their pickles are equal, e.g. ints and strings. Iteration
+    yields spilled keys first, then the in-memory ones from least to most recently used.
+
+    Args:
+        db_filename (str): Run database to spill to. If None, nothing is spilled and the dictionary is unbounded.
+        namespace (str): Name separating this dictionary from others spilling to the same database.
+        max_items (int): Maximum number of entries kept in memory. Default 1000.
+    """
+
+    def __init__(self, db_filename=None, namespace="default", max_items=1000):
+        self.db_filename = db_filename
+        self.namespace = namespace
+        self.max_items = max_items
+        self._memory = collections.OrderedDict()
+        self._num_spilled = 0
+        self._lock = threading.RLock()
+        self._connection = None
+        self._connect()
+
+    def _connect(self):
+        if self.db_filename is None:
+            return
+        self._connection = sqlite3.connect(self.db_filename, check_same_thread=False)
+        fuzz_logger_db.upgrade_schema(self._connection)
+        self._num_spilled = next(
+            self._connection.execute("""SELECT COUNT(*) FROM spilled WHERE namespace=?""", [self.namespace])
+        )[0]
+
+    def __getstate__(self):
+        with self._lock:
+            return {
+                "db_filename": self.db_filename,
+                "namespace": self.namespace,
+                "max_items": self.max_items,
+                "memory": list(self._memory.items()),
+            }
+
+    def __setstate__(self, state):
+        self.__init__(db_filename=state["db_filename"], namespace=state["namespace"], max_items=state["max_items"])
+        for key, value in state["memory"]:
+            self[key] = value
+
+    @property
+    def num_spilled(self):
+        """Number of entries currently stored in the database."""
+        return self._num_spilled
+
+    @property
+    def num_in_memory(self):
+        """Number of entries currently kept in memory."""
+        return len(self._memory)
+
+    def __getitem__(self, key):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+            value = self._unspill(key)
+            self._memory[key] = value
+            self._evict()
+            return value
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            if key not in self._memory:
+                self._delete_spilled(key)
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            self._evict()
+
+    def __delitem__(self, key):
+        with self._lock:
+            if key in self._memory:
+                del self._memory[key]
+            elif not self._delete_spilled(key):
+                raise KeyError(key)
+
+    def __contains__(self, key):
+        with self._lock:
+            if key in self._memory:
+                return True
+            if self._num_spilled == 0:
+                return False
+            return (
+                next(
+                    self._connection.execute(
+                        """SELECT COUNT(*) FROM spilled WHERE namespace=? AND key=?""",
+                        [self.namespace, pickle.dumps(key, protocol=2)],
+                    )
+                )[0]
+                > 0
+            )
+
+    def __iter__(self):
+        with self._lock:
+            keys = []
+            if self._num_spilled > 0:
+                keys = [
+                    pickle.loads(row[0])
+                    for row in self._connection.execute(
+                        """SELECT key FROM spilled WHERE namespace=? ORDER BY rowid""", [self.namespace]
+                    )
+                ]
+            keys += list(self._memory)
+        return iter(keys)
+
+    def __len__(self):
+        return len(self._memory) + self._num_spilled
+
+    def __repr__(self):
+        return "{0}(db_filename={1!r}, namespace={2!r}, {3} in memory, {4} spilled)".format(
+            type(self).__name__, self.db_filename, self.namespace, len(self._memory), self._num_spilled
+        )
+
+    def _evict(self):
+        if self._connection is None or len(self._memory) <= self.max_items:
+            return
+        rows = []
+        while len(self._memory) > self.max_items:
+            key, value = self._memory.popitem(last=False)
+            rows.append([self.namespace, pickle.dumps(key, protocol=2), pickle.dumps(value, protocol=2)])
+        self._connection.executemany("""INSERT OR REPLACE INTO spilled VALUES (?, ?, ?)""", rows)
+        self._connection.commit()
+        self._num_spilled += len(rows)
+
+    def _unspill(self, key):
+        if self._num_spilled == 0:
+            raise KeyError(key)
+        pickled_key = pickle.dumps(key, protocol=2)
+        rows = list(
+            self._connection.execute(
+                """SELECT value FROM spilled WHERE namespace=? AND key=?""", [self.namespace, pickled_key]
+            )
+        )
+        if not rows:
+            raise KeyError(key)
+        self._connection.execute("""DELETE FROM spilled WHERE namespace=? AND key=?""", [self.namespace, pickled_key])
+        self._connection.commit()
+        self._num_spilled -= 1
+        return pickle.loads(rows[0][0])
+
+    def _delete_spilled(self, key):
+        if self._num_spilled == 0:
+            return False
+        cursor = self._connection.execute(
+            """DELETE FROM spilled WHERE namespace=? AND key=?""", [self.namespace, pickle.dumps(key, protocol=2)]
+        )
+        self._connection.commit()  # also ends the transaction if nothing was deleted
+        self._num_spilled -= cursor.rowcount
+        return cursor.rowcount > 0
@@ -66,6 +66,7 @@ class DebuggerThreadSimple(threading.Thread):
         coredump_dir=None,
         log_level=1,
         capture_output=False,
+        env=None,
         **kwargs
     ):
         threading.Thread.__init__(self)
@@ -76,6 +77,7 @@ class DebuggerThreadSimple(threading.Thread):
         self.process_monitor = process_monitor
         self.coredump_dir = coredump_dir
         self.capture_output = capture_output
+        self.env = env
         self.finished_starting = threading.Event()
         # if isinstance(start_commands, basestring):
         #     self.tokens = start_commands.split(' ')
@@ -101,13 +103,18 @@ class DebuggerThreadSimple(threading.Thread):
     def spawn_target(self):
         self.log("starting target process")
 
+        env = None
+        if self.env:
+            env = dict(os.environ)
+            env.update(self.env)
+
         for command in self.start_commands:
             self.log("exec start command: {0}".format(command))
             try:
                 if self.capture_output:
-                    self._process = subprocess.Popen(command, stderr=subprocess.PIPE, stdout=subprocess.PIPE)
+                    self._process = subprocess.Popen(command, stderr=subprocess.PIPE, stdout=subprocess.PIPE, env=env)
                 else:
-                    self._process = subprocess.Popen(command)
+                    self._process = subprocess.Popen(command, env=env)
             except WindowsError as e:
                 print(
                     'WindowsError {errno}: "{strerror} while starting "{cmd}"'.format(
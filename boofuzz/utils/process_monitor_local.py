@@ -30,7 +30,9 @@ def _split_command_if_str(command):
 
 
 class ProcessMonitorLocal(BaseMonitor):
-    def __init__(self, crash_filename, debugger_class, proc_name=None, pid_to_ignore=None, level=1, coredump_dir=None):
+    def __init__(
+        self, crash_filename, debugger_class, proc_name=None, pid_to_ignore=None, level=1, coredump_dir=None, env=None
+    ):
         """
         @type  crash_filename: str
         @param crash_filename: Name of file to (un)serialize crash bin to/from
@@ -40,6 +42,10 @@ class ProcessMonitorLocal(BaseMonitor):
         @param pid_to_ignore:  (Optional, def=None) Ignore this PID when searching for the target process
         @type  level:          int
         @param level:          (Optional, def=1) Log output level, increase for more verbosity
+        @type  coredump_dir:   str
+        @param coredump_dir:   (Optional, def=None) Directory to move core dumps to
+        @type  env:            dict
+        @param env:            (Optional, def=None) Extra environment variables for the target process
         """
 
         self.crash_filename = os.path.abspath(crash_filename)
@@ -58,6 +64,7 @@ class ProcessMonitorLocal(BaseMonitor):
         self.last_synopsis = ""
 
         self.coredump_dir = coredump_dir
+        self.env = env
 
         if not os.access(os.path.dirname(self.crash_filename), os.X_OK):
             self.log("invalid path specified for crash bin: %s" % self.crash_filename)
@@ -159,6 +166,7 @@ class ProcessMonitorLocal(BaseMonitor):
             log_level=self.log_level,
             coredump_dir=self.coredump_dir,
             capture_output=self.capture_output,
+            env=self.env,
         )
         self.debugger_thread.daemon = True
         self.debugger_thread.start()
@@ -237,6 +245,10 @@ class ProcessMonitorLocal(BaseMonitor):
         self.stop_commands = new_stop_commands
         self.stop_commands = list(map(_split_command_if_str, new_stop_commands))
 
+    def set_env(self, new_env):
+        self.log("updating target environment to: {0}".format(new_env))
+        self.env = new_env
+
     def set_crash_filename(self, new_crash_filename):
         self.log("updating crash bin filename to '%s'" % new_crash_filename)
         self.crash_filename = new_crash_filename
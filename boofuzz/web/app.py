@@ -1,14 +1,25 @@
+import collections
+import os
 import re
+import threading
 
 import flask
 from flask import Flask, redirect, render_template
 
-from .. import exception
+from .. import exception, forecast, fuzz_logger_db, metrics, phase_timing
 
 MAX_LOG_LINE_LEN = 1500
+MAX_NOVEL_ELEMENTS = 10
+FAILURE_PAGE_SIZE = 100
+MAX_FAILURE_PAGE_SIZE = 1000
+TEST_CASE_VIEW_CACHE_SIZE = 256
 
 app = Flask(__name__)
 app.session = None
+# (key, fuzz node, number of mutations) of the last count, replaced as a whole so request threads can share it
+app.num_mutations_cache = None
+app.add_template_filter(phase_timing.format_duration, "duration")
+app.add_template_filter(forecast.format_remaining, "remaining")
 
 
 def commify(number):
@@ -27,12 +38,53 @@ def pause():
     return redirect("/")
 
 
+@app.route("/metrics")
+def metrics_endpoint():
+    # offline sessions (SessionInfo) have no campaign metrics
+    metrics_text = getattr(app.session, "metrics_text", None)
+    text = metrics_text() if metrics_text is not None else None
+    if text is None:
+        flask.abort(404)
+    return flask.Response(text, content_type=metrics.CONTENT_TYPE)
+
+
+@app.route("/profile/<profile_format>")
+def profile(profile_format):
+    filename = app.session.profiles().get(profile_format)
+    if filename is None:
+        flask.abort(404)
+    return flask.send_file(os.path.abspath(filename), as_attachment=True)
+
+
+@app.route("/api/memory")
+def memory_reports():
+    """Memory reports of the run, oldest first; empty unless the session takes them."""
+    # offline sessions (SessionInfo) have no memory reports
+    reports = getattr(app.session, "memory_reports", None)
+    if reports is None:
+        flask.abort(404)
+    return flask.jsonify({"reports": [_memory_report_info(report) for report in reports()]})
+
+
+def _memory_report_info(report):
+    allocations = report.allocations
+    if allocations is not None:
+        allocations = [site._asdict() for site in allocations]
+    return dict(report._asdict(), allocations=allocations)
+
+
+@app.route("/api/forecast")
+def forecast_endpoint():
+    """Forecast of the remaining time of the run per request and element; null unless the session plans one."""
+    return flask.jsonify({"forecast": _forecast_info(elements=True)})
+
+
 @app.route("/test-case/<int:crash_id>")
 def test_case(crash_id):
     return render_template(
         "test-case.html",
-        crashinfo=app.session.procmon_results.get(crash_id, None),
-        test_case=app.session.test_case_data(crash_id),
+        crashinfo=_failure_reasons(crash_id),
+        log_data=_get_log_data(crash_id),
     )
 
 
@@ -48,10 +100,49 @@ def api_test_case(test_case_index):
     return flask.jsonify(data)
 
 
+class _TestCaseViewCache:
+    """LRU cache of rendered test case logs, keyed by test case index.
+
+    Only test cases before the current one are cached, as the current one may still get steps. The cache is cleared
+    when the web app is pointed at another session.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._views = collections.OrderedDict()
+        self._session = None
+        self._lock = threading.Lock()
+
+    def get(self, session, index):
+        with self._lock:
+            if session is not self._session:
+                self._views.clear()
+                self._session = session
+            view = self._views.get(index)
+            if view is not None:
+                self._views.move_to_end(index)
+            return view
+
+    def put(self, session, index, view):
+        with self._lock:
+            if session is not self._session:
+                return
+            self._views[index] = view
+            if len(self._views) > self.max_size:
+                self._views.popitem(last=False)
+
+
+_test_case_views = _TestCaseViewCache(TEST_CASE_VIEW_CACHE_SIZE)
+
+
 def _get_log_data(test_case_id):
+    session = app.session
+    results = _test_case_views.get(session, test_case_id)
+    if results is not None:
+        return results
     results = []
     try:
-        case = app.session.test_case_data(test_case_id)
+        case = session.test_case_data(test_case_id)
     except exception.BoofuzzNoSuchTestCase:
         return None
     if case is not None:
@@ -59,34 +150,89 @@ def _get_log_data(test_case_id):
         for step in case.steps:
             line = step.html_log_line
             results.append({"css_class": step.css_class, "log_line": line})
-    return results
+        if test_case_id < session.total_mutant_index:
+            _test_case_views.put(session, test_case_id, results)
+        return results
+    return None
+
+
+def _failure_reasons(test_case_index):
+    failures, _ = app.session.failure_page(after=test_case_index - 1, limit=1)
+    if failures and failures[0][0] == test_case_index:
+        return failures[0][1]
+    return None
+
+
+@app.route("/api/failures")
+def api_failures():
+    """Page through failing test cases. Query parameters: after (cursor), limit, request, element, monitor, bucket."""
+    crashes, next_cursor = _crash_summary_info(
+        after=flask.request.args.get("after", 0, type=int),
+        limit=flask.request.args.get("limit", None, type=int),
+        filters=_failure_filters(),
+    )
+    return flask.jsonify({"failures": crashes, "next": next_cursor})
+
+
+@app.route("/api/failure-counts/<key>")
+def api_failure_counts(key):
+    if key not in fuzz_logger_db.FAILURE_FILTERS:
+        flask.abort(404)
+    counts = app.session.failure_counts(key)
+    return flask.jsonify({"key": key, "counts": [{"value": value, "count": count} for value, count in counts]})
+
+
+def _failure_filters():
+    return {key: flask.request.args.get(key) for key in fuzz_logger_db.FAILURE_FILTERS if flask.request.args.get(key)}
 
 
 @app.route("/api/current-run")
 def index_update():
-    data = {
-        "session_info": {
-            "is_paused": app.session.is_paused,
-            "current_index": app.session.total_mutant_index,
-            "num_mutations": app.session.total_num_mutations,
-            "current_index_element": app.session.mutant_index if app.session is not None else None,
-            "num_mutations_element": app.session.fuzz_node.get_num_mutations()
-            if app.session.fuzz_node is not None
-            else None,
-            "current_element": app.session.fuzz_node.name if app.session.fuzz_node is not None else None,
-            "current_test_case_name": app.session.current_test_case_name,
-            "crashes": _crash_summary_info(),
-            "runtime": app.session.runtime,
-            "exec_speed": app.session.exec_speed,
-        }
+    """Progress and failing test cases after the ``failures_after`` cursor (at most ``failures_limit`` of them)."""
+    session_info = progress_info()
+    session_info["crashes"], session_info["crashes_next"] = _crash_summary_info(
+        after=flask.request.args.get("failures_after", 0, type=int),
+        limit=flask.request.args.get("failures_limit", None, type=int),
+    )
+    return flask.jsonify({"session_info": session_info})
+
+
+def progress_info():
+    """Progress counters of the current session, as shown on the index page."""
+    return {
+        "is_paused": app.session.is_paused,
+        "current_index": app.session.total_mutant_index,
+        "num_mutations": app.session.total_num_mutations,
+        "current_index_element": app.session.mutant_index if app.session is not None else None,
+        "num_mutations_element": _num_mutations_element(),
+        "current_element": app.session.fuzz_node.name if app.session.fuzz_node is not None else None,
+        "current_test_case_name": app.session.current_test_case_name,
+        "runtime": app.session.runtime,
+        "exec_speed": app.session.exec_speed,
+        "novel_elements": _novel_elements_info(),
+        "phase_timings": _phase_timings_info(),
+        "profiles": list(app.session.profiles()),
+        "forecast": _forecast_info(),
     }
 
-    return flask.jsonify(data)
+
+def _num_mutations_element():
+    # Counting mutations walks the whole request; it only changes with the fuzzed node or the total (e.g. pruning).
+    fuzz_node = app.session.fuzz_node
+    if fuzz_node is None:
+        return None
+    # The cached node is kept alive so its id cannot be reused by another node.
+    key = (id(fuzz_node), app.session.total_num_mutations)
+    cached = app.num_mutations_cache
+    if cached is None or cached[0] != key:
+        cached = (key, fuzz_node, fuzz_node.get_num_mutations())
+        app.num_mutations_cache = cached
+    return cached[2]
 
 
 @app.route("/")
 def index():
-    crashes = _crash_summary_info()
+    crashes, crashes_next = _crash_summary_info()
 
     # which node (request) are we currently fuzzing.
     if app.session.fuzz_node is not None and app.session.fuzz_node.name:
@@ -139,20 +285,64 @@ def index():
         "total_num_mutations": commify(int(total_num_mutations)) if total_num_mutations is not None else None,
     }
 
-    return render_template("index.html", state=state, crashes=crashes)
+    return render_template(
+        "index.html",
+        state=state,
+        crashes=crashes,
+        crashes_next=crashes_next,
+        failure_filters=fuzz_logger_db.FAILURE_FILTERS,
+        novel_elements=_novel_elements_info(),
+        phase_timings=_phase_timings_info(),
+        profiles=list(app.session.profiles()),
+        forecast=_forecast_info(),
+    )
+
+
+def _novel_elements_info():
+    # offline sessions (SessionInfo) have no response novelty data
+    novel_elements = getattr(app.session, "novel_elements", None)
+    if novel_elements is None:
+        return []
+    return [
+        {"element": name, "new_buckets": new_buckets, "responses": responses}
+        for name, new_buckets, responses in novel_elements(MAX_NOVEL_ELEMENTS)
+    ]
+
+
+def _phase_timings_info():
+    # offline sessions (SessionInfo) have no phase timings
+    phase_timings = getattr(app.session, "phase_timings", None)
+    if phase_timings is None:
+        return []
+    return [stats._asdict() for stats in phase_timings()]
+
+
+def _forecast_info(elements=False):
+    # offline sessions (SessionInfo) and web UI processes (StatusSessionInfo) have no forecast
+    session_forecast = getattr(app.session, "forecast", None)
+    result = session_forecast() if session_forecast is not None else None
+    if result is None:
+        return None
+    info = dict(result._asdict(), requests=[r._asdict() for r in result.requests])
+    if elements:
+        info["elements"] = [e._asdict() for e in result.elements]
+    else:
+        # progress updates are pushed to web UI clients when they change, which the ETA does all the time
+        del info["elements"], info["eta"]
+    return info
 
 
-def _crash_summary_info():
+def _crash_summary_info(after=0, limit=None, filters=None):
+    """Return one page of failing test cases and the cursor of the next page (None on the last page)."""
+    limit = max(0, min(FAILURE_PAGE_SIZE if limit is None else limit, MAX_FAILURE_PAGE_SIZE))
+    failures, next_cursor = app.session.failure_page(after=after, limit=limit, filters=filters)
     crashes = []
-    procmon_result_keys = list(app.session.monitor_results)
-    procmon_result_keys.sort()
-    for key in procmon_result_keys:
-        val = app.session.monitor_results[key]
+    for key, reasons in failures:
         status_bytes = "&nbsp;"
 
         if key in app.session.monitor_data:
             status_bytes = commify(app.session.netmon_results[key])
 
-        crash = {"key": key, "reasons": val, "status_bytes": status_bytes}
+        crash = {"key": key, "reasons": reasons, "status_bytes": status_bytes}
         crashes.append(crash)
-    return crashes
+    return crashes, next_cursor
@@ -0,0 +1,236 @@
+import collections
+import json
+
+import tornado.web
+from tornado.concurrent import Future
+from tornado.ioloop import PeriodicCallback
+from tornado.iostream import StreamClosedError
+from tornado.wsgi import WSGIContainer
+
+from .. import constants, helpers, ifuzz_logger_backend
+from . import app as web_app
+
+MAX_DATA_LENGTH = 512
+
+
+class LiveUpdates(ifuzz_logger_backend.IFuzzLoggerBackend):
+    """
+    Pushes progress, new failures and the steps of the current test case to web UI clients as server-sent events.
+
+    LiveUpdates is a fuzz logger backend of the session. While no client is connected, its methods return right away.
+    While clients are connected, the fuzzing thread only records the current test case and new failures; every
+    `interval` seconds the web server thread turns what changed into events and writes them to all clients:
+
+    - ``progress``: Counters as returned by ``/api/current-run``, without the crash list. Sent when they change,
+      which includes the run time.
+    - ``failures``: List of ``{"key": test case index, "reasons": [...]}`` for failures since the last event.
+    - ``case``: ``{"index": ..., "log_data": [...]}`` with all steps of a new current test case.
+    - ``steps``: ``{"index": ..., "log_data": [...]}`` with steps added to the current test case.
+
+    Only the latest test case is sent, so the event rate does not depend on the fuzzing speed. Sent and received data
+    is shortened to MAX_DATA_LENGTH bytes.
+
+    Args:
+        session (Session): Session to report on.
+        interval (float): Seconds between event batches. Default 0.25.
+    """
+
+    log_level = constants.LOG_LEVEL_INFO
+
+    def __init__(self, session, interval=0.25):
+        self._session = session
+        self.interval = interval
+        self.active = False  # read by the fuzzing thread; True while clients are connected
+        self._clients = set()  # EventStreamHandler objects, only touched by the web server thread
+        self._periodic_callback = None
+
+        self._case = None  # (index, name, timestamp, steps); replaced, never modified, except appending steps
+        self._failures = collections.deque()  # (test case index, description)
+
+        self._sent_case = None
+        self._sent_steps = 0
+        self._sent_progress = None
+
+    @property
+    def num_clients(self):
+        """Number of connected clients."""
+        return len(self._clients)
+
+    def open_test_case(self, test_case_id, name, index, *args, **kwargs):
+        if self.active:
+            self._case = (index, name, helpers.get_time_stamp(), [])
+
+    def open_test_step(self, description):
+        self._step("step", description)
+
+    def log_check(self, description):
+        self._step("check", description)
+
+    def log_error(self, description):
+        self._step("error", description)
+        if self.active and self._case is not None:
+            self._failures.append((self._case[0], description))
+
+    def log_recv(self, data):
+        self._step("receive", None, data)
+
+    def log_send(self, data):
+        self._step("send", None, data)
+
+    def log_info(self, description):
+        self._step("info", description)
+
+    def log_fail(self, description=""):
+        self._step("fail", description)
+        if self.active and self._case is not None:
+            self._failures.append((self._case[0], description))
+
+    def log_pass(self, description=""):
+        self._step("pass", description)
+
+    def close_test_case(self):
+        pass
+
+    def close_test(self):
+        pass
+
+    def _step(self, step_type, description, data=None):
+        case = self._case
+        if self.active and case is not None:
+            case[3].append((step_type, description, data, helpers.get_time_stamp()))
+
+    def subscribe(self, client):
+        """Add a client. Called on the web server thread."""
+        self._clients.add(client)
+        # Send everything again so the new client starts with a complete view.
+        self._sent_progress = None
+        self._sent_case = None
+        if self._periodic_callback is None:
+            self._periodic_callback = PeriodicCallback(self.publish, self.interval * 1000)
+            self._periodic_callback.start()
+        self.active = True
+
+    def unsubscribe(self, client):
+        """Remove a client. Called on the web server thread."""
+        self._clients.discard(client)
+        if not self._clients:
+            self.active = False
+            self._case = None
+            self._failures.clear()
+            if self._periodic_callback is not None:
+                self._periodic_callback.stop()
+                self._periodic_callback = None
+
+    def publish(self):
+        """Write events for everything that changed since the last call to all clients."""
+        message = "".join(format_event(event, data) for event, data in self._collect_events())
+        if not message:
+            return
+        for client in list(self._clients):
+            client.send(message)
+
+    def _collect_events(self):
+        progress = web_app.progress_info()
+        if progress != self._sent_progress:
+            self._sent_progress = progress
+            yield "progress", progress
+
+        failures = collections.OrderedDict()
+        while self._failures:
+            index, description = self._failures.popleft()
+            failures.setdefault(index, []).append(description)
+        if failures:
+            yield "failures", [{"key": index, "reasons": reasons} for index, reasons in failures.items()]
+
+        case = self._case
+        if case is None:
+            return
+        index, name, timestamp, steps = case
+        num_steps = len(steps)
+        if case is not self._sent_case:
+            description = "{0}: {1}".format(index, name)
+            test_case_line = {
+                "css_class": helpers.test_step_info["test_case"]["css_class"],
+                "log_line": helpers.format_log_msg(
+                    msg_type="test_case", description=description, timestamp=timestamp, format_type="html"
+                ),
+            }
+            yield "case", {"index": index, "log_data": [test_case_line] + _log_lines(steps[:num_steps])}
+        elif num_steps > self._sent_steps:
+            yield "steps", {"index": index, "log_data": _log_lines(steps[self._sent_steps : num_steps])}
+        self._sent_case = case
+        self._sent_steps = num_steps
+
+
+def _log_lines(steps):
+    lines = []
+    for step_type, description, data, timestamp in steps:
+        if data is not None:
+            description = helpers.abbreviate_bytes(data, max_length=MAX_DATA_LENGTH) if data else None
+        lines.append(
+            {
+                "css_class": helpers.test_step_info[step_type]["css_class"],
+                "log_line": helpers.format_log_msg(
+                    msg_type=step_type, description=description, data=data, timestamp=timestamp, format_type="html"
+                ),
+            }
+        )
+    return lines
+
+
+def format_event(event, data):
+    """Format a server-sent event with a JSON payload."""
+    return "event: {0}\ndata: {1}\n\n".format(event, json.dumps(data, separators=(",", ":")))
+
+
+class EventStreamHandler(tornado.web.RequestHandler):
+    """Serves the ``/api/events`` server-sent event stream of a LiveUpdates object."""
+
+    def initialize(self, live_updates):
+        self._live_updates = live_updates
+        self._closed = Future()
+
+    async def get(self):
+        self.set_header("Content-Type", "text/event-stream")
+        self.set_header("Cache-Control", "no-cache")
+        self.write("retry: 1000\n\n")
+        self.send(None)
+        self._live_updates.subscribe(self)
+        await self._closed
+
+    def send(self, message):
+        if message is not None:
+            self.write(message)
+        self.flush().add_done_callback(self._flushed)
+
+    def _flushed(self, future):
+        if isinstance(future.exception(), StreamClosedError):
+            self.on_connection_close()
+
+    def on_connection_close(self):
+        self._live_updates.unsubscribe(self)
+        if not self._closed.done():
+            self._closed.set_result(None)
+
+
+def make_application(flask_app, live_updates=None, executor=None):
+    """Build the tornado application serving the Flask web UI and, if given, the live update event stream.
+
+    Args:
+        flask_app (flask.Flask): Web UI.
+        live_updates (LiveUpdates): Source of ``/api/events``. Default None (clients fall back to polling).
+        executor (concurrent.futures.Executor): Runs Flask requests. Ignored before tornado 6.3, which can only run
+            them on the IOLoop thread. Default None (on the IOLoop thread).
+
+    Returns:
+        tornado.web.Application: Application for an HTTPServer.
+    """
+    handlers = []
+    if live_updates is not None:
+        handlers.append((r"/api/events", EventStreamHandler, {"live_updates": live_updates}))
+    if executor is not None and tornado.version_info >= (6, 3):
+        wsgi_container = WSGIContainer(flask_app, executor=executor)
+    else:
+        wsgi_container = WSGIContainer(flask_app)
+    handlers.append((r".*", tornado.web.FallbackHandler, {"fallback": wsgi_container}))
+    return tornado.web.Application(handlers)
@@ -0,0 +1,315 @@
+import argparse
+import atexit
+import concurrent.futures
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from tornado.httpserver import HTTPServer
+from tornado.ioloop import IOLoop
+from tornado.netutil import bind_sockets
+
+from .. import exception, fuzz_logger_db, metrics, profiler
+from . import live, status
+from .app import app
+
+
+class _NodeStatus:
+    """Stands in for the fuzzed Request in the web UI process."""
+
+    def __init__(self, name, num_mutations):
+        self.name = name
+        self._num_mutations = num_mutations
+
+    def get_num_mutations(self):
+        return self._num_mutations
+
+
+class StatusSessionInfo:
+    """Session information for the web UI process.
+
+    Progress is read from the StatusBlock published by the fuzzing process, test cases and failures from a read-only
+    connection pool on the run database. Only committed test cases are visible, and sent data stored in compact form
+    is shown as stored.
+
+    Args:
+        status_block (StatusBlock): Status of the fuzzing process.
+        db_filename (str): Run database.
+        metrics_filename (str): Metrics file written by the fuzzing process. Default None (no ``/metrics``).
+    """
+
+    def __init__(self, status_block, db_filename, metrics_filename=None):
+        self._status_block = status_block
+        self._db_reader = fuzz_logger_db.FuzzLoggerDbReader(db_filename=db_filename, read_only=True)
+        self._node = None
+        self._metrics_filename = metrics_filename
+        self._db_filename = db_filename
+
+    @property
+    def is_paused(self):
+        current = self._status_block.read()
+        # Toggles not yet applied by the fuzzing process are shown right away.
+        return current.is_paused != bool((self._status_block.pause_toggles - current.pause_toggles_seen) % 2)
+
+    @is_paused.setter
+    def is_paused(self, value):
+        if value != self.is_paused:
+            self._status_block.request_pause_toggle()
+
+    @property
+    def monitor_results(self):
+        return self._db_reader.failure_map
+
+    @property
+    def monitor_data(self):
+        return {}
+
+    @property
+    def procmon_results(self):
+        return self.monitor_results
+
+    @property
+    def netmon_results(self):
+        return self.monitor_data
+
+    @property
+    def fuzz_node(self):
+        current = self._status_block.read()
+        if not current.current_element:
+            return None
+        node = self._node
+        if node is None or (node.name, node.get_num_mutations()) != (
+            current.current_element,
+            current.num_mutations_element,
+        ):
+            node = self._node = _NodeStatus(current.current_element, current.num_mutations_element)
+        return node
+
+    @property
+    def total_num_mutations(self):
+        return self._status_block.read().total_num_mutations
+
+    @property
+    def total_mutant_index(self):
+        return self._status_block.read().total_mutant_index
+
+    @property
+    def mutant_index(self):
+        return self._status_block.read().mutant_index
+
+    @property
+    def current_test_case_name(self):
+        return self._status_block.read().current_test_case_name
+
+    @property
+    def runtime(self):
+        return self._runtime(self._status_block.read())
+
+    @property
+    def exec_speed(self):
+        current = self._status_block.read()
+        runtime = self._runtime(current)
+        return current.num_cases_actually_fuzzed / runtime if runtime > 0 else 0
+
+    @staticmethod
+    def _runtime(current):
+        if not current.start_time:
+            return 0
+        end_time = current.end_time if current.end_time is not None else time.time()
+        return end_time - current.start_time - current.cumulative_pause_time
+
+    def phase_timings(self):
+        """Phase timings as last published by the fuzzing process, see Session.phase_timings."""
+        return self._status_block.read_phase_timings()
+
+    def metrics_text(self):
+        """Campaign metrics as last written by the fuzzing process, see Session.metrics_text. None without a file."""
+        if self._metrics_filename is None:
+            return None
+        return metrics.read_metrics_file(self._metrics_filename)
+
+    def profiles(self):
+        """Profiles written by the fuzzing process so far, see Session.profiles."""
+        return profiler.existing_profiles(self._db_filename)
+
+    def test_case_data(self, index):
+        """Return test case data object (for use by web server)
+
+        Args:
+            index (int): Test case index
+
+        Returns:
+            Test case data object
+        """
+        return self._db_reader.get_test_case_data(index=index)
+
+    def failure_page(self, after=0, limit=100, filters=None):
+        """Return one page of failing test cases (for use by web server), see FuzzLoggerDbReader.failure_page."""
+        return self._db_reader.failure_page(after=after, limit=limit, filters=filters)
+
+    def failure_counts(self, key, limit=100):
+        """Count failing test cases per request, element, monitor or bucket, see FuzzLoggerDbReader.failure_counts."""
+        return self._db_reader.failure_counts(key, limit=limit)
+
+
+class WebProcess:
+    """Serve the web UI of a running session from a separate process.
+
+    The web UI then neither competes with the fuzzing thread for the GIL nor shares its database connection. The
+    session publishes its progress to a StatusBlock (see Session.fuzz), and the web UI process reads test cases
+    through its own read-only connections (see StatusSessionInfo). Pausing from the web UI is passed back through the
+    status block. The web UI polls; live updates (see LiveUpdates) need the in-process server.
+
+    The process exits when this object is stopped or the fuzzing process exits.
+
+    Args:
+        db_filename (str): Run database of the session.
+        port (int): Port to serve on. If it is in use, the next free port is taken.
+        address (str): Address to serve on.
+        threads (int): Number of threads serving requests; one before tornado 6.3. Default 4.
+    """
+
+    def __init__(self, db_filename, port, address, threads=4):
+        self._db_filename = db_filename
+        self._requested_port = port
+        self.address = address
+        self._threads = threads
+        handle, status_filename = tempfile.mkstemp(prefix="boofuzz-status-")
+        os.close(handle)
+        self.status = status.StatusBlock(status_filename, create=True)
+        self.metrics_filename = status_filename + ".prom"
+        self.port = None
+        self._process = None
+        self._closed = False
+        atexit.register(self.stop)
+
+    def start(self):
+        """Start the web UI process and wait until it serves requests.
+
+        Returns:
+            int: Port the web UI is served on.
+        """
+        package_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [package_root, env.get("PYTHONPATH")]))
+        self._process = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "boofuzz.web",
+                self.status.filename,
+                self._db_filename,
+                "--port",
+                str(self._requested_port),
+                "--address",
+                self.address,
+                "--threads",
+                str(self._threads),
+                "--metrics-file",
+                self.metrics_filename,
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            env=env,
+        )
+        line = self._process.stdout.readline()
+        self._process.stdout.close()
+        if not line:
+            raise exception.BoofuzzError(
+                "Web UI process exited with code {0} before serving".format(self._process.wait())
+            )
+        self.port = int(line)
+        return self.port
+
+    def is_alive(self):
+        """Whether the web UI process is running."""
+        return self._process is not None and self._process.poll() is None
+
+    def stop(self):
+        """Stop the web UI process and remove the status block and metrics file."""
+        if self._process is not None:
+            self._process.stdin.close()
+            try:
+                self._process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+                self._process.wait()
+            self._process = None
+        if not self._closed:
+            self._closed = True
+            self.status.close(remove=True)
+            try:
+                os.remove(self.metrics_filename)
+            except OSError:
+                pass
+
+
+def serve(status_filename, db_filename, port, address, threads=4, metrics_filename=None):
+    """Serve the web UI for the session publishing to `status_filename`. Runs in the web UI process.
+
+    Writes the port served on as one line to stdout once requests are accepted, and returns when stdin is closed.
+
+    Args:
+        status_filename (str): File backing the StatusBlock of the session.
+        db_filename (str): Run database of the session.
+        port (int): Port to serve on; if in use, the next free port is taken. 0 picks any free port.
+        address (str): Address to serve on.
+        threads (int): Number of threads serving requests; one before tornado 6.3. Default 4.
+        metrics_filename (str): Metrics file written by the session, served at ``/metrics``. Default None.
+    """
+    status_block = status.StatusBlock(status_filename)
+    app.session = StatusSessionInfo(
+        status_block=status_block, db_filename=db_filename, metrics_filename=metrics_filename
+    )
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=threads)
+    http_server = HTTPServer(live.make_application(app, executor=executor))
+    while True:
+        try:
+            sockets = bind_sockets(port, address=address)
+        except OSError:
+            if port == 0:
+                raise
+            port += 1
+        else:
+            break
+    http_server.add_sockets(sockets)
+
+    io_loop = IOLoop.current()
+
+    def wait_for_parent():
+        sys.stdin.buffer.read()
+        io_loop.add_callback(io_loop.stop)
+
+    threading.Thread(target=wait_for_parent, daemon=True).start()
+    sys.stdout.write("{0}\n".format(sockets[0].getsockname()[1]))
+    sys.stdout.flush()
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())  # nobody reads stdout from here on
+
+    try:
+        io_loop.start()
+    finally:
+        http_server.stop()
+        executor.shutdown(wait=False)
+        status_block.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m boofuzz.web", description="Serve the web UI of a running session")
+    parser.add_argument("status_filename")
+    parser.add_argument("db_filename")
+    parser.add_argument("--port", type=int, required=True)
+    parser.add_argument("--address", default="localhost")
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--metrics-file")
+    args = parser.parse_args(argv)
+    serve(
+        args.status_filename,
+        args.db_filename,
+        args.port,
+        args.address,
+        threads=args.threads,
+        metrics_filename=args.metrics_file,
+    )
@@ -3,6 +3,10 @@ let failure_map = {};
 let test_case_log_snap = true;
 let test_case_log_index = 0;
 let last_test_case_log_response = "";
+let event_source = null;
+let failure_next = null; // cursor of the next page of failures, null once all are shown
+let failure_last_key = 0;
+let failure_filters = {};
 
 const StringUtilities = {
     repeat: function (str, times) {
@@ -11,6 +15,12 @@ const StringUtilities = {
 };
 
 function update_current_run_info(response) {
+    update_progress(response.session_info);
+    add_live_failures(response.session_info.crashes);
+}
+
+function update_progress(session_info) {
+    let response = {session_info: session_info};
     document.getElementById('current_index').textContent = response.session_info.current_index.toLocaleString();
     document.getElementById('num_mutations').textContent = (response.session_info.num_mutations || "many").toLocaleString();
     document.getElementById('current_index_element').textContent = response.session_info.current_index_element.toLocaleString();
@@ -45,14 +55,21 @@ function update_current_run_info(response) {
 
     }
 
-    if (response.session_info.crashes.length > 0) {
+    update_novel_elements(response.session_info.novel_elements);
+    update_phase_timings(response.session_info.phase_timings);
+    update_profiles(response.session_info.profiles);
+    update_forecast(response.session_info.forecast);
+}
+
+function add_failures(crashes) {
+    if (crashes.length > 0) {
         let failures_table = document.getElementById('crash-summary-table');
 
-        for (let i = 0; i < response.session_info.crashes.length; i++) {
-            let key = response.session_info.crashes[i].key;
+        for (let i = 0; i < crashes.length; i++) {
+            let key = crashes[i].key;
             if (!(key in failure_map))
             {
-                let reasons = response.session_info.crashes[i].reasons;
+                let reasons = crashes[i].reasons;
                 failure_map[key] = reasons;
                 let new_row = failures_table.insertRow(failures_table.rows.length);
 
@@ -72,8 +89,182 @@ function update_current_run_info(response) {
                     reasons_cell.appendChild(reason_item);
                 })
             }
+            failure_last_key = Math.max(failure_last_key, key);
+        }
+    }
+}
+
+// New failures are only appended once all earlier ones are shown and no filter is set.
+function showing_latest_failures() {
+    return failure_next === null && Object.keys(failure_filters).length === 0;
+}
+
+function add_live_failures(crashes) {
+    if (showing_latest_failures()) {
+        add_failures(crashes);
+    }
+}
+
+function set_failure_next(next) {
+    failure_next = next;
+    document.getElementById('failures-more').hidden = (next === null);
+}
+
+function failure_filter_query() {
+    return Object.keys(failure_filters).map(function (key) {
+        return `&${key}=${encodeURIComponent(failure_filters[key])}`;
+    }).join('');
+}
+
+function load_more_failures() {
+    if (failure_next === null) {
+        return;
+    }
+    fetch(new Request(`/api/failures?after=${failure_next}${failure_filter_query()}`), {method: 'GET'})
+        .then(function(response) { return response.json() })
+        .then(function(response) {
+            add_failures(response.failures);
+            set_failure_next(response.next);
+        })
+        .catch(function() {});
+}
+
+function failure_filter_change_handler(event) {
+    let key = event.target.dataset.key;
+    if (event.target.value) {
+        failure_filters[key] = event.target.value;
+    }
+    else {
+        delete failure_filters[key];
+    }
+    let failures_table = document.getElementById('crash-summary-table');
+    while (failures_table.rows.length > 1) {
+        failures_table.deleteRow(1);
+    }
+    failure_map = {};
+    failure_last_key = 0;
+    set_failure_next(0);
+    load_more_failures();
+}
+
+function load_failure_counts(event) {
+    let select = event.target;
+    fetch(new Request(`/api/failure-counts/${select.dataset.key}`), {method: 'GET'})
+        .then(function(response) { return response.json() })
+        .then(function(response) {
+            let selected = select.value;
+            while (select.options.length > 1) {
+                select.remove(1);
+            }
+            response.counts.forEach(function (count) {
+                let option = document.createElement('option');
+                option.value = count.value;
+                option.textContent = `${count.value} (${count.count.toLocaleString()})`;
+                select.appendChild(option);
+            });
+            select.value = selected;
+        })
+        .catch(function() {});
+}
+
+function update_novel_elements(novel_elements) {
+    let novel_elements_table = document.getElementById('novel-elements-table');
+    while (novel_elements_table.rows.length > 1) {
+        novel_elements_table.deleteRow(1);
+    }
+    novel_elements.forEach(function (element) {
+        let new_row = novel_elements_table.insertRow(novel_elements_table.rows.length);
+        let name_cell = new_row.insertCell(0);
+        name_cell.className = 'fixed';
+        name_cell.textContent = element.element;
+        new_row.insertCell(1).textContent = element.new_buckets.toLocaleString();
+        new_row.insertCell(2).textContent = element.responses.toLocaleString();
+    });
+}
+
+function format_duration(seconds) {
+    // same format as boofuzz.phase_timing.format_duration
+    if (seconds >= 1) {
+        return seconds.toFixed(2) + " s";
+    }
+    if (seconds >= 1e-3) {
+        return (seconds * 1e3).toFixed(1) + " ms";
+    }
+    return (seconds * 1e6).toFixed(0) + " us";
+}
+
+function update_phase_timings(phase_timings) {
+    let phase_timings_table = document.getElementById('phase-timings-table');
+    while (phase_timings_table.rows.length > 1) {
+        phase_timings_table.deleteRow(1);
+    }
+    phase_timings.forEach(function (timing) {
+        let new_row = phase_timings_table.insertRow(phase_timings_table.rows.length);
+        let name_cell = new_row.insertCell(0);
+        name_cell.className = 'fixed';
+        name_cell.textContent = timing.phase;
+        new_row.insertCell(1).textContent = timing.count.toLocaleString();
+        new_row.insertCell(2).textContent = format_duration(timing.p50);
+        new_row.insertCell(3).textContent = format_duration(timing.p99);
+        new_row.insertCell(4).textContent = format_duration(timing.max);
+        new_row.insertCell(5).textContent = format_duration(timing.total);
+    });
+}
+
+function update_profiles(profiles) {
+    let profiles_div = document.getElementById('profiles');
+    profiles_div.textContent = profiles.length > 0 ? 'Profile: ' : '';
+    profiles.forEach(function (profile_format) {
+        let link = document.createElement('a');
+        link.href = '/profile/' + profile_format;
+        link.textContent = profile_format;
+        profiles_div.appendChild(link);
+        profiles_div.appendChild(document.createTextNode(' '));
+    });
+}
+
+function format_remaining(seconds) {
+    // same format as boofuzz.forecast.format_remaining
+    if (seconds == null) {
+        return "";
+    }
+    seconds = Math.round(seconds);
+    let units = [["d", 86400], ["h", 3600], ["min", 60], ["s", 1]];
+    let parts = [];
+    for (let i = 0; i < units.length; i++) {
+        let unit = units[i][0], size = units[i][1];
+        if (seconds >= size || (unit === "s" && parts.length === 0)) {
+            parts.push(Math.floor(seconds / size) + " " + unit);
+            seconds %= size;
+        }
+        else if (parts.length > 0) {
+            break;
         }
     }
+    return parts.slice(0, 2).join(" ");
+}
+
+function update_forecast(forecast) {
+    let remaining_time = "";
+    if (forecast != null && forecast.remaining_seconds != null) {
+        let eta = new Date(Date.now() + forecast.remaining_seconds * 1000);
+        remaining_time = format_remaining(forecast.remaining_seconds) + " (ETA " + eta.toLocaleString() + ")";
+    }
+    document.getElementById('remaining_time').textContent = remaining_time;
+
+    let forecast_table = document.getElementById('forecast-table');
+    while (forecast_table.rows.length > 1) {
+        forecast_table.deleteRow(1);
+    }
+    (forecast != null ? forecast.requests : []).forEach(function (request) {
+        let new_row = forecast_table.insertRow(forecast_table.rows.length);
+        let name_cell = new_row.insertCell(0);
+        name_cell.className = 'fixed';
+        name_cell.textContent = request.path;
+        new_row.insertCell(1).textContent = request.done.toLocaleString() + " of " + request.cases.toLocaleString();
+        new_row.insertCell(2).textContent = request.remaining_cases.toLocaleString();
+        new_row.insertCell(3).textContent = format_remaining(request.remaining_seconds);
+    });
 }
 
 function response_changed(old_response, new_response) {
@@ -87,7 +278,10 @@ function update_current_test_case_log(response) {
         return
     }
     last_test_case_log_response = response;
+    render_test_case_log(response);
+}
 
+function render_test_case_log(response) {
     logUpdateIndex(response.index);
 
     // Create log table entries
@@ -102,16 +296,7 @@ function update_current_test_case_log(response) {
         new_entries.appendChild(new_tr);
     }
     else{
-        response.log_data.forEach(function(log_entry) {
-            let new_span = document.createElement('span');
-            new_span.setAttribute('class', log_entry.css_class);
-            new_span.textContent = log_entry.log_line;
-            let new_td = document.createElement('td');
-            let new_tr = document.createElement('tr');
-            new_td.appendChild(new_span);
-            new_tr.appendChild(new_td);
-            new_entries.appendChild(new_tr);
-        });
+        append_log_rows(new_entries, response.log_data);
     }
 
     // Insert log table entries
@@ -122,6 +307,59 @@ function update_current_test_case_log(response) {
     test_cases_table.appendChild(new_entries);
 }
 
+function append_log_rows(parent, log_data) {
+    log_data.forEach(function(log_entry) {
+        let new_span = document.createElement('span');
+        new_span.setAttribute('class', log_entry.css_class);
+        new_span.textContent = log_entry.log_line;
+        let new_td = document.createElement('td');
+        let new_tr = document.createElement('tr');
+        new_td.appendChild(new_span);
+        new_tr.appendChild(new_td);
+        parent.appendChild(new_tr);
+    });
+}
+
+function append_test_case_log(response) {
+    let test_cases_table = document.getElementById('test-steps-table');
+    if (response.index !== test_case_log_index || test_cases_table.firstChild === null) {
+        return;
+    }
+    append_log_rows(test_cases_table.firstChild, response.log_data);
+}
+
+function fetch_test_case_log(url) {
+    fetch(new Request(url), {method: 'GET'})
+        .then(function(response) { return response.json() })
+        .then(render_test_case_log)
+        .catch(function() {});
+}
+
+// Receive progress, failures and the current test case from the server as they happen. Falls back to polling if
+// the server does not offer an event stream, e.g. when viewing a finished run with `boo open`.
+function start_event_stream() {
+    event_source = new EventSource('/api/events');
+    event_source.addEventListener('progress', function(event) { update_progress(JSON.parse(event.data)) });
+    event_source.addEventListener('failures', function(event) { add_live_failures(JSON.parse(event.data)) });
+    event_source.addEventListener('case', function(event) {
+        if (test_case_log_snap) {
+            render_test_case_log(JSON.parse(event.data));
+        }
+    });
+    event_source.addEventListener('steps', function(event) {
+        if (test_case_log_snap) {
+            append_test_case_log(JSON.parse(event.data));
+        }
+    });
+    event_source.onerror = function() {
+        if (event_source.readyState === EventSource.CLOSED) {
+            event_source = null;
+            continually_update_current_run_info();
+            continually_update_current_test_case_log();
+        }
+    };
+}
+
 function continually_update_current_run_info()
 {
     function update_repeat(response)
@@ -133,7 +371,9 @@ function continually_update_current_run_info()
     {
         setTimeout(continually_update_current_run_info, 100);
     }
-    fetch(new Request('/api/current-run'), {method: 'GET'})
+    let failures_limit = showing_latest_failures() ? 100 : 0;
+    fetch(new Request(`/api/current-run?failures_after=${failure_last_key}&failures_limit=${failures_limit}`),
+          {method: 'GET'})
         .then(function(response) { return response.json() })
         .then(update_repeat)
         .catch(_repeat_only);
@@ -183,8 +423,13 @@ function progress_percentage(fraction){
 
 function start_live_update() {
     initialize_state();
-    continually_update_current_run_info();
-    continually_update_current_test_case_log();
+    if (window.EventSource) {
+        start_event_stream();
+    }
+    else {
+        continually_update_current_run_info();
+        continually_update_current_test_case_log();
+    }
 }
 
 function read_failure_map_from_dom() {
@@ -193,7 +438,9 @@ function read_failure_map_from_dom() {
     failure_rows.forEach(function (row) {
         let key = row.cells[0].textContent.trim();
         failure_map[key] = row.cells[1].textContent.trim();
+        failure_last_key = Math.max(failure_last_key, Number(key));
     });
+    failure_next = failures_table.dataset.next === '' ? null : Number(failures_table.dataset.next);
 }
 
 function set_failure_link_event_handlers() {
@@ -213,6 +460,9 @@ function logSnapChangeHandler(event){
     test_case_log_snap = event.target.checked;
     if (test_case_log_snap) {
         document.getElementById('test-case-log-index-input').value = '';
+        if (event_source !== null) {
+            fetch_test_case_log('/api/current-test-case');
+        }
     }
 }
 
@@ -228,6 +478,9 @@ function logNavGoTo(num){
     logUpdateSnap(false);
     if (num > 0) {
         updateIndexToFetch(num);
+        if (event_source !== null) {
+            fetch_test_case_log(`/api/test-case/${num}`);
+        }
     }
 }
 
@@ -260,6 +513,11 @@ function initPage(){
     document.getElementById('test-case-log-left').addEventListener('click', function(){logNavMove(-1)}, false);
     document.getElementById('test-case-log-right').addEventListener('click', function(){logNavMove(1)} , false);
     set_failure_link_event_handlers();
+    document.getElementById('failures-more').addEventListener('click', load_more_failures, false);
+    Array.from(document.getElementsByClassName('failure-filter')).forEach(function (select) {
+        select.addEventListener('focus', load_failure_counts, false);
+        select.addEventListener('change', failure_filter_change_handler, false);
+    });
     start_live_update();
 }
 
@@ -0,0 +1,174 @@
+import collections
+import mmap
+import os
+import struct
+
+from .. import phase_timing
+
+#: Maximum number of UTF-8 bytes kept of the current element and test case names.
+MAX_ELEMENT_NAME_LENGTH = 128
+MAX_TEST_CASE_NAME_LENGTH = 512
+#: Minimum number of seconds between updates of the phase timings by the fuzzing process.
+PHASE_TIMINGS_INTERVAL = 1.0
+
+_SEQUENCE = struct.Struct("<Q")
+# Fields of Status in order; None is stored as -1 (integers) or 0.0 (end_time).
+_FIELDS = struct.Struct("<qqqqqdddI?{0}s{1}s".format(MAX_ELEMENT_NAME_LENGTH, MAX_TEST_CASE_NAME_LENGTH))
+_PAUSE_TOGGLES = struct.Struct("<I")
+# count, total, p50, p99 and max of each phase in phase_timing.PHASES
+_PHASE_TIMINGS = struct.Struct("<" + "Qdddd" * len(phase_timing.PHASES))
+
+_FIELDS_OFFSET = _SEQUENCE.size
+_PAUSE_TOGGLES_OFFSET = _FIELDS_OFFSET + _FIELDS.size + (-_FIELDS.size % 8)
+_PHASE_TIMINGS_SEQUENCE_OFFSET = _PAUSE_TOGGLES_OFFSET + 8
+_PHASE_TIMINGS_OFFSET = _PHASE_TIMINGS_SEQUENCE_OFFSET + _SEQUENCE.size
+SIZE = _PHASE_TIMINGS_OFFSET + _PHASE_TIMINGS.size
+
+Status = collections.namedtuple(
+    "Status",
+    [
+        "total_mutant_index",
+        "total_num_mutations",
+        "mutant_index",
+        "num_mutations_element",
+        "num_cases_actually_fuzzed",
+        "start_time",
+        "cumulative_pause_time",
+        "end_time",
+        "pause_toggles_seen",
+        "is_paused",
+        "current_element",
+        "current_test_case_name",
+    ],
+)
+
+
+class StatusBlock:
+    """Fixed-size session status shared between the fuzzing process and the web UI process through a mapped file.
+
+    The fuzzing process is the only writer of the status fields. Writes are guarded by a sequence lock: the sequence
+    number is odd while a write is in progress, and readers retry until they copied the fields between two reads of
+    the same even number. Neither side ever waits for the other, so a busy web UI cannot slow down fuzzing.
+
+    The phase timings of the session (see Session.phase_timings) are kept in a second block with its own sequence
+    lock, as they are only updated every PHASE_TIMINGS_INTERVAL seconds.
+
+    The web UI process only writes a separate counter of pause toggle requests, see request_pause_toggle().
+
+    Args:
+        filename (str): File backing the block.
+        create (bool): Create (or truncate) the file and initialize an empty status. Default False, which opens a
+            block created by another process.
+    """
+
+    def __init__(self, filename, create=False):
+        self.filename = filename
+        mode = "w+b" if create else "r+b"
+        with open(filename, mode) as f:
+            if create:
+                f.write(b"\0" * SIZE)
+                f.flush()
+            self._mmap = mmap.mmap(f.fileno(), SIZE)
+        if create:
+            self.write(Status(0, None, 0, None, 0, 0.0, 0.0, None, 0, False, "", ""))
+
+    def write(self, status):
+        """Publish a new status. Only called by the fuzzing process.
+
+        Args:
+            status (Status): New status. Names longer than the block allows are truncated.
+        """
+        sequence = _SEQUENCE.unpack_from(self._mmap, 0)[0]
+        _SEQUENCE.pack_into(self._mmap, 0, sequence + 1)
+        _FIELDS.pack_into(
+            self._mmap,
+            _FIELDS_OFFSET,
+            status.total_mutant_index,
+            -1 if status.total_num_mutations is None else status.total_num_mutations,
+            status.mutant_index,
+            -1 if status.num_mutations_element is None else status.num_mutations_element,
+            status.num_cases_actually_fuzzed,
+            status.start_time,
+            status.cumulative_pause_time,
+            0.0 if status.end_time is None else status.end_time,
+            status.pause_toggles_seen,
+            status.is_paused,
+            status.current_element.encode("utf-8")[:MAX_ELEMENT_NAME_LENGTH],
+            status.current_test_case_name.encode("utf-8")[:MAX_TEST_CASE_NAME_LENGTH],
+        )
+        _SEQUENCE.pack_into(self._mmap, 0, sequence + 2)
+
+    def read(self):
+        """Return a consistent copy of the current status.
+
+        Returns:
+            Status: Current status.
+        """
+        fields = list(self._read_consistent(0, _FIELDS, _FIELDS_OFFSET))
+        fields[1] = None if fields[1] < 0 else fields[1]
+        fields[3] = None if fields[3] < 0 else fields[3]
+        fields[7] = fields[7] or None
+        fields[10] = fields[10].rstrip(b"\0").decode("utf-8", errors="ignore")
+        fields[11] = fields[11].rstrip(b"\0").decode("utf-8", errors="ignore")
+        return Status(*fields)
+
+    def write_phase_timings(self, stats):
+        """Publish the phase timings of the session. Only called by the fuzzing process.
+
+        Args:
+            stats (list of phase_timing.PhaseStats): Statistics of the measured phases.
+        """
+        by_phase = {s.phase: s for s in stats}
+        values = []
+        for phase in phase_timing.PHASES:
+            s = by_phase.get(phase)
+            values.extend((0, 0.0, 0.0, 0.0, 0.0) if s is None else (s.count, s.total, s.p50, s.p99, s.max))
+        sequence = _SEQUENCE.unpack_from(self._mmap, _PHASE_TIMINGS_SEQUENCE_OFFSET)[0]
+        _SEQUENCE.pack_into(self._mmap, _PHASE_TIMINGS_SEQUENCE_OFFSET, sequence + 1)
+        _PHASE_TIMINGS.pack_into(self._mmap, _PHASE_TIMINGS_OFFSET, *values)
+        _SEQUENCE.pack_into(self._mmap, _PHASE_TIMINGS_SEQUENCE_OFFSET, sequence + 2)
+
+    def read_phase_timings(self):
+        """Return a consistent copy of the published phase timings.
+
+        Returns:
+            list of phase_timing.PhaseStats: Statistics of the measured phases, in the order of phase_timing.PHASES.
+        """
+        values = self._read_consistent(_PHASE_TIMINGS_SEQUENCE_OFFSET, _PHASE_TIMINGS, _PHASE_TIMINGS_OFFSET)
+        stats = []
+        for i, phase in enumerate(phase_timing.PHASES):
+            count, total, p50, p99, maximum = values[i * 5 : i * 5 + 5]
+            if count:
+                stats.append(phase_timing.PhaseStats(phase, count, total, p50, p99, maximum))
+        return stats
+
+    def _read_consistent(self, sequence_offset, fields_struct, fields_offset):
+        while True:
+            sequence = _SEQUENCE.unpack_from(self._mmap, sequence_offset)[0]
+            if sequence % 2:
+                continue
+            fields = fields_struct.unpack_from(self._mmap, fields_offset)
+            if _SEQUENCE.unpack_from(self._mmap, sequence_offset)[0] == sequence:
+                return fields
+
+    @property
+    def pause_toggles(self):
+        """Number of pause toggles requested by the web UI so far."""
+        return _PAUSE_TOGGLES.unpack_from(self._mmap, _PAUSE_TOGGLES_OFFSET)[0]
+
+    def request_pause_toggle(self):
+        """Ask the fuzzing process to pause or resume. Only called by the web UI process."""
+        _PAUSE_TOGGLES.pack_into(self._mmap, _PAUSE_TOGGLES_OFFSET, (self.pause_toggles + 1) & 0xFFFFFFFF)
+
+    def close(self, remove=False):
+        """Unmap the block.
+
+        Args:
+            remove (bool): Also delete the backing file. Default False.
+        """
+        self._mmap.close()
+        if remove:
+            try:
+                os.remove(self.filename)
+            except OSError:
+                pass
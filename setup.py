@@ -46,6 +46,8 @@ extra_requirements = {
         "wheel",
     ],
     "docs": ["sphinx", "sphinx_rtd_theme", "pygments>=2.4.0"],
+    "zstd": ["zstandard"],
+    "arrow": ["pyarrow"],
 }
 extra_requirements["dev"] += extra_requirements["docs"]
 
@@ -59,7 +61,10 @@ setup(
     maintainer_email="joshua.t.pereyda@gmail.com",
     url="https://github.com/jtpereyda/boofuzz",
     packages=find_packages(exclude=["docs", "examples", "request_definitions", "unit_tests", "utils"]),
-    package_data={"boofuzz.web": ["static/*", "static/*/*", "templates/*", "templates/*/*"]},
+    package_data={
+        "boofuzz.bench": ["*.pem"],
+        "boofuzz.web": ["static/*", "static/*/*", "templates/*", "templates/*/*"],
+    },
     install_requires=[
         "attrs",
         "click",
@@ -7,3 +7,20 @@ def context():
         pass
 
     return Context()
+
+
+@pytest.fixture
+def stand_in_server():
+    """Start stand-in targets by kind, see boofuzz.bench.make_server. They are stopped after the test."""
+    from boofuzz.bench import make_server
+
+    servers = []
+
+    def start(kind, **options):
+        server = make_server(kind, **options)
+        servers.append(server)
+        return server.start()
+
+    yield start
+    for server in servers:
+        server.stop()
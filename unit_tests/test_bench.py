@@ -0,0 +1,99 @@
+import socket
+
+import pytest
+
+from boofuzz import bench
+
+
+@pytest.mark.parametrize("kind", ["tcp_echo", "tcp_response", "udp", "ssl_echo", "crash", "slow_accept"])
+def test_stand_in_server_answers(stand_in_server, kind):
+    """
+    Given: A stand-in server of each kind.
+    When: Sending a message through the target connection made for it.
+    Then: The server answers.
+    """
+    server = stand_in_server(kind)
+    connection = server.connection()
+    connection.open()
+    try:
+        connection.send(b"hello")
+        response = connection.recv(100)
+    finally:
+        connection.close()
+
+    assert response == (b"OK\r\n" if kind == "tcp_response" else b"hello")
+    assert server.connections == 1
+
+
+def test_crashing_server_restart(stand_in_server):
+    """
+    Given: A crashing stand-in server.
+    When: Sending its crash pattern, then restarting it.
+    Then: It closes the connection and refuses new ones until restarted on the same port.
+    """
+    server = stand_in_server("crash", pattern=b"BOOM")
+    port = server.port
+    with socket.create_connection((server.host, port)) as sock:
+        sock.sendall(b"xBOOMx")
+        assert sock.recv(100) == b""
+    assert not server.is_alive(timeout=1)
+    with pytest.raises(ConnectionRefusedError):
+        socket.create_connection((server.host, port), timeout=1).close()
+
+    server.restart()
+
+    assert server.is_alive()
+    assert server.port == port
+    with socket.create_connection((server.host, port)) as sock:
+        sock.sendall(b"hello")
+        assert sock.recv(100) == b"hello"
+
+
+def test_server_process_crash(stand_in_server):
+    """
+    Given: A crashing stand-in server in a separate process.
+    When: Sending its crash pattern.
+    Then: The process exits, and restart() starts a new one on the same port.
+    """
+    server = stand_in_server("crash", separate_process=True, pattern="BOOM")
+    port = server.port
+    with socket.create_connection((server.host, port)) as sock:
+        sock.sendall(b"hello")
+        assert sock.recv(100) == b"hello"
+        sock.sendall(b"BOOM")
+        assert sock.recv(100) == b""
+    assert not server.is_alive(timeout=5)
+
+    server.restart()
+
+    assert server.is_alive()
+    assert server.port == port
+
+
+def test_run_scenario():
+    """
+    Given: The TCP echo scenario.
+    When: Running 50 test cases.
+    Then: Throughput, memory and phase timings of the 50 test cases are reported.
+    """
+    result = bench.run_scenario("tcp_echo", cases=50)
+
+    assert result.cases == 50
+    assert result.cases_per_second > 0
+    assert result.failures == 0
+    assert result.peak_rss > 0
+    assert {"connect", "fuzz_send", "fuzz_recv", "test_case"} <= {stats.phase for stats in result.phases}
+    assert "tcp_echo" in bench.format_result(result)
+
+
+def test_run_crash_scenario():
+    """
+    Given: The crash scenario, whose server crashes on format string mutations of the path.
+    When: Running the first 120 test cases.
+    Then: Each crash is a failure followed by a restart, and the path is skipped after 3 failures.
+    """
+    result = bench.run_scenario("crash", cases=120)
+
+    assert result.failures == 3
+    assert result.restarts == 3
+    assert result.cases < 120
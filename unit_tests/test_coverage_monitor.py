@@ -0,0 +1,163 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import mock
+
+from boofuzz import Request, Session, String
+from boofuzz.monitors import CoverageMap, CoverageMonitor, SharedMemoryBitmap
+from boofuzz.mutation_context import MutationContext
+
+MAP_SIZE = 64
+
+
+def _trace(**hits):
+    """Build a trace bitmap from {"e<index>": hit count} pairs."""
+    trace = bytearray(MAP_SIZE)
+    for edge, count in hits.items():
+        trace[int(edge[1:])] = count
+    return bytes(trace)
+
+
+class TestCoverageMap(unittest.TestCase):
+    def test_first_trace_is_new(self):
+        """
+        Given: An empty CoverageMap.
+        When: Updating with a trace that hits two edges.
+        Then: Two new edges are reported and counted.
+        """
+        coverage = CoverageMap(map_size=MAP_SIZE)
+
+        self.assertEqual((2, 0), coverage.update(_trace(e1=1, e7=1)))
+        self.assertEqual(2, coverage.edges_covered)
+
+    def test_repeated_trace_is_not_new(self):
+        """
+        Given: A CoverageMap that has seen a trace.
+        When: Updating with the same trace, and with a hit count in the same bucket.
+        Then: No new coverage is reported.
+        """
+        coverage = CoverageMap(map_size=MAP_SIZE)
+        coverage.update(_trace(e1=1, e7=5))
+
+        self.assertEqual((0, 0), coverage.update(_trace(e1=1, e7=5)))
+        self.assertEqual((0, 0), coverage.update(_trace(e1=1, e7=6)))
+        self.assertEqual((0, 0), coverage.update(_trace()))
+
+    def test_new_hit_count_bucket(self):
+        """
+        Given: A CoverageMap that has seen an edge once.
+        When: Updating with a trace hitting the same edge 40 times.
+        Then: One new hit count bucket and no new edges are reported.
+        """
+        coverage = CoverageMap(map_size=MAP_SIZE)
+        coverage.update(_trace(e3=1))
+
+        self.assertEqual((0, 1), coverage.update(_trace(e3=40)))
+        self.assertEqual(1, coverage.edges_covered)
+
+    def test_new_edge_and_bucket(self):
+        """
+        Given: A CoverageMap that has seen one edge.
+        When: Updating with a trace hitting that edge in a new bucket plus a new edge.
+        Then: Both are reported separately.
+        """
+        coverage = CoverageMap(map_size=MAP_SIZE)
+        coverage.update(_trace(e3=1))
+
+        self.assertEqual((1, 1), coverage.update(_trace(e3=200, e4=1)))
+        self.assertEqual(2, coverage.edges_covered)
+
+
+@unittest.skipIf(sys.platform == "win32", "SysV shared memory is not available on Windows")
+class TestCoverageMonitor(unittest.TestCase):
+    def setUp(self):
+        self.bitmap = SharedMemoryBitmap(map_size=MAP_SIZE)
+        self.monitor = CoverageMonitor(bitmap=self.bitmap)
+        self.session = mock.MagicMock()
+        self.logger = mock.MagicMock()
+
+    def tearDown(self):
+        self.bitmap.close()
+
+    def test_environment(self):
+        """
+        Given: A CoverageMonitor.
+        Then: Its environment carries the shared memory id under the AFL variable name.
+        """
+        self.assertEqual({"__AFL_SHM_ID": str(self.bitmap.shm_id)}, self.monitor.environment)
+
+    def test_new_coverage_adds_seed(self):
+        """
+        Given: A CoverageMonitor.
+        When: The target writes new edges to the bitmap between pre_send and post_send.
+        Then: post_send reports no failure, logs the new coverage and adds a seed to the session.
+        """
+        self.monitor.pre_send(session=self.session)
+        self.bitmap.write(_trace(e2=1, e9=3))
+
+        self.assertTrue(self.monitor.post_send(fuzz_data_logger=self.logger, session=self.session))
+        self.session.add_seed.assert_called_once_with()
+        self.logger.log_info.assert_called_once()
+        self.assertEqual(2, self.monitor.edges_covered)
+
+    def test_known_coverage_adds_no_seed(self):
+        """
+        Given: A CoverageMonitor that has seen a trace.
+        When: pre_send clears the bitmap and the target writes the same trace again.
+        Then: No seed is added.
+        """
+        self.bitmap.write(_trace(e2=1))
+        self.monitor.post_send(fuzz_data_logger=self.logger, session=self.session)
+        self.session.reset_mock()
+
+        self.monitor.pre_send(session=self.session)
+        self.assertEqual(bytes(MAP_SIZE), self.bitmap.read())
+        self.bitmap.write(_trace(e2=1))
+
+        self.assertTrue(self.monitor.post_send(fuzz_data_logger=self.logger, session=self.session))
+        self.session.add_seed.assert_not_called()
+
+
+class TestSessionSeeds(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.session = Session(web_port=None, fuzz_loggers=[], db_filename=os.path.join(self.tmp_dir.name, "seeds.db"))
+        self.request = Request(
+            "seed-msg",
+            children=[
+                String(name="first", default_value="a", max_len=2),
+                String(name="second", default_value="b", max_len=2),
+            ],
+        )
+        self.session.connect(self.request)
+
+    def tearDown(self):
+        self.session._db_logger._database_connection.close()
+        self.tmp_dir.cleanup()
+
+    def test_seed_expands_with_other_elements(self):
+        """
+        Given: A Session with one message of two elements.
+        When: A test case mutating the first element is added as a seed and the seeds are expanded.
+        Then: Every yielded case keeps the seed mutation and adds one mutation of the second element.
+        """
+        path = self.session.edges_from(self.session.root.id)
+        seed_mutation = next(self.request.names["seed-msg.first"].get_mutations())
+        seed = MutationContext(message_path=path, mutations=seed_mutation)
+
+        self.assertTrue(self.session.add_seed(seed))
+        self.assertFalse(self.session.add_seed(seed))
+
+        cases = list(self.session._interleave_seed_mutations(iter([seed])))
+
+        self.assertEqual(1 + self.request.names["seed-msg.second"].get_num_mutations(), len(cases))
+        for case in cases[1:]:
+            self.assertEqual(["seed-msg.first", "seed-msg.second"], sorted(case.mutations))
+            self.assertEqual(seed_mutation[0], case.mutations["seed-msg.first"])
+        self.assertEqual(["seed-msg:[seed-msg.first:0]"], self.session.seeds)
+
+
+if __name__ == "__main__":
+    unittest.main()
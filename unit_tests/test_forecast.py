@@ -0,0 +1,163 @@
+import os
+import tempfile
+import unittest
+
+from boofuzz import Byte, Group, Request, Session, String, Target
+from boofuzz.connections import ITargetConnection
+from boofuzz.forecast import format_remaining, PlannedElement, ThroughputForecaster
+from boofuzz.web.app import app
+
+
+class NullConnection(ITargetConnection):
+    """Fake target accepting all data and never answering."""
+
+    def close(self):
+        pass
+
+    def open(self):
+        pass
+
+    def recv(self, max_bytes):
+        return b""
+
+    def send(self, data):
+        return len(data)
+
+    @property
+    def info(self):
+        return "null connection"
+
+
+def record(forecaster, path, element, element_type, seconds, n):
+    for _ in range(n):
+        forecaster.record(path, path, element, element_type, seconds)
+
+
+class TestThroughputForecaster(unittest.TestCase):
+    def setUp(self):
+        self.forecaster = ThroughputForecaster(min_samples=10)
+        self.forecaster.plan(
+            [
+                PlannedElement(path="a", request="a", element="a.big", element_type="String", cases=20),
+                PlannedElement(path="a", request="a", element="a.small", element_type="Byte", cases=10),
+                PlannedElement(path="b", request="b", element="b.small", element_type="Byte", cases=10),
+            ]
+        )
+
+    def test_no_measurements(self):
+        """
+        Given: A forecaster with a plan of 40 test cases.
+        When: Forecasting before any test case ran.
+        Then: All test cases are remaining, with no time estimate.
+        """
+        forecast = self.forecaster.forecast(now=0)
+
+        self.assertEqual((40, 0, 40), (forecast.cases, forecast.done, forecast.remaining_cases))
+        self.assertIsNone(forecast.remaining_seconds)
+        self.assertIsNone(forecast.eta)
+
+    def test_estimates_by_element_type_and_request(self):
+        """
+        Given: A forecaster with a plan of a slow string element and two byte elements.
+        When: 10 string test cases took 1 s each, then 10 byte test cases of the same request 10 ms each.
+        Then: Remaining string test cases were skipped,
+         and: The byte element of the other request is estimated by the byte test cases, not the string ones.
+        """
+        record(self.forecaster, "a", "a.big", "String", 1.0, 10)
+
+        forecast = self.forecaster.forecast(now=0)
+        self.assertAlmostEqual(10 * 1.0 + 20 * 1.0, forecast.remaining_seconds)
+
+        record(self.forecaster, "a", "a.small", "Byte", 0.01, 10)
+
+        forecast = self.forecaster.forecast(now=100)
+        self.assertEqual([0, 0, 10], [e.remaining_cases for e in forecast.elements])
+        self.assertAlmostEqual(0.1, forecast.remaining_seconds)
+        self.assertAlmostEqual(100.1, forecast.eta)
+        self.assertEqual([("a", 30, 20, 0), ("b", 10, 0, 10)], [r[:4] for r in forecast.requests])
+
+    def test_limit_and_nested_elements(self):
+        """
+        Given: A forecaster with a plan of 40 test cases.
+        When: Recording a test case of a child of a planned element, and forecasting with a limit of 25 test cases.
+        Then: The test case counts towards the planned element,
+         and: Only 25 test cases are remaining, from the first planned elements.
+        """
+        self.forecaster.record("a", "a", "a.big.child", "Static", 0.5)
+
+        forecast = self.forecaster.forecast(limit=25)
+
+        self.assertEqual(1, forecast.elements[0].done)
+        self.assertEqual([19, 6, 0], [e.remaining_cases for e in forecast.elements])
+        self.assertAlmostEqual(25 * 0.5, forecast.remaining_seconds)
+
+    def test_format_remaining(self):
+        """
+        Given: Remaining times from seconds to days.
+        When: Formatting them.
+        Then: The two most significant units are shown.
+        """
+        self.assertEqual(
+            ["0 s", "45 s", "2 min 5 s", "3 h 12 min", "1 h", "2 d 5 h", ""],
+            [
+                format_remaining(s)
+                for s in (0.2, 45, 125, 3 * 3600 + 12 * 60 + 7, 3600 + 30, 2 * 86400 + 5 * 3600, None)
+            ],
+        )
+
+
+class TestSessionForecast(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_session_forecast(self):
+        """
+        Given: A session with two requests.
+        When: Fuzzing them without combining mutations.
+        Then: The forecast plans each element with its mutations and none are remaining at the end,
+         and: The web UI serves the forecast per request and element.
+        """
+        session = Session(
+            target=Target(connection=NullConnection()),
+            web_port=None,
+            fuzz_loggers=[],
+            db_filename=os.path.join(self.tmp_dir.name, "run.db"),
+        )
+        first = Request("first", children=[Byte(name="byte"), String(name="string", default_value="x")])
+        second = Request("second", children=[Group(name="verb", default_value="GET", values=["PUT", "POST"])])
+        session.connect(first)
+        session.connect(first, second)
+        self.assertIsNone(session.forecast())
+
+        session.fuzz(max_depth=1)
+
+        forecast = session.forecast()
+        self.assertEqual(session.num_cases_actually_fuzzed, forecast.cases)
+        self.assertEqual(forecast.cases, forecast.done)
+        self.assertEqual(0, forecast.remaining_cases)
+        self.assertEqual(0, forecast.remaining_seconds)
+        self.assertEqual(
+            [
+                ("first", "first.byte", "Byte"),
+                ("first", "first.string", "String"),
+                ("first->second", "second.verb", "Group"),
+            ],
+            [(e.path, e.element, e.element_type) for e in forecast.elements],
+        )
+        self.assertEqual(
+            [first.names["first.byte"].get_num_mutations(), 2], [forecast.elements[0].cases, forecast.elements[2].cases]
+        )
+
+        app.session = session
+        document = app.test_client().get("/api/forecast").get_json()["forecast"]
+        self.assertEqual(["first", "first->second"], [r["path"] for r in document["requests"]])
+        self.assertEqual(3, len(document["elements"]))
+        self.assertNotIn("eta", app.test_client().get("/api/current-run").get_json()["session_info"]["forecast"])
+        self.assertEqual(200, app.test_client().get("/").status_code)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,7 +4,7 @@ import unittest
 # noinspection PyPackageRequirements
 import mock
 
-from boofuzz import fuzz_logger, ifuzz_logger_backend
+from boofuzz import constants, fuzz_logger, ifuzz_logger_backend
 
 
 class TestFuzzLogger(unittest.TestCase):
@@ -253,5 +253,68 @@ class TestFuzzLogger(unittest.TestCase):
         self.assertEqual(4, self.logger.test_case_count)
 
 
+class TestFuzzLoggerLevels(unittest.TestCase):
+    def setUp(self):
+        self.debug_logger = mock.MagicMock(spec=ifuzz_logger_backend.IFuzzLoggerBackend)
+        self.debug_logger.log_level = constants.LOG_LEVEL_DEBUG
+        self.info_logger = mock.MagicMock(spec=ifuzz_logger_backend.IFuzzLoggerBackend)
+        self.info_logger.log_level = constants.LOG_LEVEL_INFO
+
+    def test_debug_only_reaches_debug_loggers(self):
+        """
+        Given: A FuzzLogger with a debug level and an info level backend.
+        When: Calling log_debug() and log_info().
+        Then: The debug message is passed as log_info only to the debug level backend; the info message to both.
+        """
+        logger = fuzz_logger.FuzzLogger(fuzz_loggers=[self.debug_logger, self.info_logger])
+
+        logger.log_debug("details")
+        logger.log_info("info")
+
+        self.assertEqual(
+            [mock.call.log_info(description="details"), mock.call.log_info(description="info")],
+            self.debug_logger.mock_calls,
+        )
+        self.assertEqual([mock.call.log_info(description="info")], self.info_logger.mock_calls)
+        self.assertTrue(logger.is_enabled(constants.LOG_LEVEL_DEBUG))
+
+    def test_callable_description_is_lazy(self):
+        """
+        Given: A FuzzLogger with log level LOG_LEVEL_INFO.
+        When: Logging callable descriptions with log_debug() and log_info().
+        Then: The debug callable is never called, the info callable is called once and its result logged.
+        """
+        logger = fuzz_logger.FuzzLogger(fuzz_loggers=[self.debug_logger], log_level=constants.LOG_LEVEL_INFO)
+        debug_description = mock.Mock(return_value="expensive")
+        info_description = mock.Mock(return_value="cheap")
+
+        logger.log_debug(debug_description)
+        logger.open_test_step(info_description)
+
+        debug_description.assert_not_called()
+        info_description.assert_called_once_with()
+        self.assertEqual([mock.call.open_test_step(description="cheap")], self.debug_logger.mock_calls)
+        self.assertFalse(logger.is_enabled(constants.LOG_LEVEL_DEBUG))
+
+    def test_failures_recorded_at_fail_level(self):
+        """
+        Given: A FuzzLogger with log level LOG_LEVEL_FAIL.
+        When: Logging a step, send, and a failure.
+        Then: Only the failure reaches the backend, and failed_test_cases is updated.
+        """
+        logger = fuzz_logger.FuzzLogger(fuzz_loggers=[self.debug_logger], log_level=constants.LOG_LEVEL_FAIL)
+
+        logger.open_test_case(test_case_id="a", name="a", index=1)
+        logger.open_test_step("step")
+        logger.log_send(b"data")
+        logger.log_fail("crash")
+
+        self.assertEqual(
+            [mock.call.open_test_case(test_case_id="a", name="a", index=1), mock.call.log_fail(description="crash")],
+            self.debug_logger.mock_calls,
+        )
+        self.assertEqual({"a": ["crash"]}, logger.failed_test_cases)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,135 @@
+import threading
+import unittest
+
+import mock
+
+from boofuzz import FuzzLogger, FuzzLoggerAsync, ifuzz_logger_backend
+
+
+class BlockingBackend(ifuzz_logger_backend.IFuzzLoggerBackend):
+    """Backend recording events, stalling in log_info until released."""
+
+    def __init__(self):
+        self.events = []
+        self.release = threading.Event()
+
+    def open_test_case(self, test_case_id, name, index, *args, **kwargs):
+        self.events.append(("open_test_case", index))
+
+    def open_test_step(self, description):
+        self.events.append(("open_test_step", description))
+
+    def log_check(self, description):
+        self.events.append(("log_check", description))
+
+    def log_error(self, description):
+        self.events.append(("log_error", description))
+
+    def log_recv(self, data):
+        self.events.append(("log_recv", data))
+
+    def log_send(self, data):
+        self.events.append(("log_send", data))
+
+    def log_info(self, description):
+        self.release.wait()
+        self.events.append(("log_info", description))
+
+    def log_fail(self, description=""):
+        self.events.append(("log_fail", description))
+
+    def log_pass(self, description=""):
+        self.events.append(("log_pass", description))
+
+    def close_test_case(self):
+        self.events.append(("close_test_case",))
+
+    def close_test(self):
+        self.events.append(("close_test",))
+
+
+class TestFuzzLoggerAsync(unittest.TestCase):
+    def test_events_delivered_in_order(self):
+        """
+        Given: A FuzzLoggerAsync wrapping a mock backend.
+        When: Logging a test case and calling close_test.
+        Then: The backend receives all calls in order, with the same arguments.
+        """
+        backend = mock.MagicMock(spec=ifuzz_logger_backend.IFuzzLoggerBackend)
+        logger = FuzzLoggerAsync(fuzz_logger=backend)
+
+        logger.open_test_case("id", name="name", index=1)
+        logger.log_send(b"data")
+        logger.log_fail("crash")
+        logger.close_test_case()
+        logger.close_test()
+
+        self.assertEqual(
+            [
+                mock.call.open_test_case(test_case_id="id", name="name", index=1),
+                mock.call.log_send(data=b"data"),
+                mock.call.log_fail(description="crash"),
+                mock.call.close_test_case(),
+                mock.call.close_test(),
+            ],
+            backend.mock_calls,
+        )
+        self.assertEqual(0, logger.lag)
+
+    def test_drop_policy_keeps_failures(self):
+        """
+        Given: A FuzzLoggerAsync with the drop policy and a maximum lag of 2, whose backend is stalled.
+        When: Logging more infos than fit the queue, then a failure.
+        Then: Surplus infos are dropped, the failure is delivered, and FuzzLogger's failure bookkeeping is immediate.
+        """
+        backend = BlockingBackend()
+        async_logger = FuzzLoggerAsync(fuzz_logger=backend, max_lag=2, overflow="drop")
+        logger = FuzzLogger(fuzz_loggers=[async_logger])
+
+        logger.open_test_case("id", name="name", index=1)
+        for i in range(10):
+            logger.log_info(str(i))
+        self.assertGreater(async_logger.dropped_events, 0)
+        backend.release.set()
+        logger.log_fail("crash")
+        self.assertEqual({"id": ["crash"]}, logger.failed_test_cases)
+        logger.close_test()
+
+        self.assertEqual(10 - async_logger.dropped_events, sum(1 for e in backend.events if e[0] == "log_info"))
+        self.assertEqual([("log_fail", "crash"), ("close_test",)], backend.events[-2:])
+
+    def test_block_policy_delivers_everything(self):
+        """
+        Given: A FuzzLoggerAsync with the block policy and a maximum lag of 2.
+        When: Logging many events.
+        Then: None are dropped.
+        """
+        backend = BlockingBackend()
+        backend.release.set()
+        logger = FuzzLoggerAsync(fuzz_logger=backend, max_lag=2)
+
+        for i in range(100):
+            logger.log_info(str(i))
+        logger.close_test()
+
+        self.assertEqual(0, logger.dropped_events)
+        self.assertEqual([("log_info", str(i)) for i in range(100)], backend.events[:-1])
+
+    def test_backend_error_is_raised(self):
+        """
+        Given: A FuzzLoggerAsync whose backend raises.
+        When: Logging an event and flushing.
+        Then: The exception is raised in the logging thread.
+        """
+        backend = mock.MagicMock(spec=ifuzz_logger_backend.IFuzzLoggerBackend)
+        backend.log_info.side_effect = IOError("disk full")
+        logger = FuzzLoggerAsync(fuzz_logger=backend)
+
+        logger.log_info("x")
+        with self.assertRaises(IOError):
+            logger.flush()
+        logger.close_test()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -589,6 +589,21 @@ class TestFuzzLoggerCsv(unittest.TestCase):
             ),
         )
 
+    def test_log_recv_max_data_length(self):
+        """
+        Given: FuzzLoggerCsv with max_data_length set.
+        When: Calling log_recv with data longer than max_data_length.
+        Then: The row holds the full length, but both renderings only show the head and tail of the data.
+        """
+        self.logger = fuzz_logger_csv.FuzzLoggerCsv(file_handle=self.virtual_file, max_data_length=4, tail_length=1)
+
+        self.logger.log_recv(b"abc" + b"x" * 100 + b"z")
+
+        row = self.virtual_file.getvalue()
+        self.assertRegex(row, LOGGER_PREAMBLE + re.escape('recv,104,"61 62 63 [... 100 bytes omitted, 104 bytes total'))
+        self.assertRegex(row, re.escape(""" ...] 7a","b'abc' [... 100 bytes omitted""") + r".* \.\.\.\] b'z'")
+        self.assertNotIn("xx", row)
+
 
 if __name__ == "__main__":
     unittest.main()
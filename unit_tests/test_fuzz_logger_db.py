@@ -0,0 +1,373 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from boofuzz import Request, Session, Static, String, Target
+from boofuzz.connections import ITargetConnection
+from boofuzz.fuzz_logger_db import (
+    SCHEMA_VERSION,
+    FuzzLoggerDb,
+    FuzzLoggerDbReader,
+    classify_failure,
+    get_schema_version,
+)
+
+
+class TestFuzzLoggerDb(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_filename = os.path.join(self.tmp_dir.name, "run.db")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _log_cases(self, logger, indices, fail_index=None):
+        for index in indices:
+            logger.open_test_case("case {0}".format(index), name="case {0}".format(index), index=index)
+            logger.open_test_step("Fuzzing")
+            logger.log_send(b"data")
+            if index == fail_index:
+                logger.log_fail("crash")
+            logger.close_test_case()
+
+    def test_all_cases_written_by_close_test(self):
+        """
+        Given: A FuzzLoggerDb logging all test cases with a long commit interval.
+        When: Logging many test cases and calling close_test.
+        Then: All cases and steps are committed and visible to a separate reader, and the writer thread is stopped.
+        """
+        logger = FuzzLoggerDb(db_filename=self.db_filename, commit_interval=60, commit_count=10**6)
+        self._log_cases(logger, range(1, 201))
+
+        logger.close_test()
+
+        reader = FuzzLoggerDbReader(db_filename=self.db_filename)
+        self.assertEqual([(200,)], list(reader.query("SELECT COUNT(*) FROM cases")))
+        self.assertEqual([(400,)], list(reader.query("SELECT COUNT(*) FROM steps")))
+        self.assertEqual(b"data", reader.get_test_case_data(200).steps[1].data)
+        self.assertIsNone(logger._writer_thread)
+
+    def test_failure_is_flushed(self):
+        """
+        Given: A FuzzLoggerDb keeping the last 2 test cases before a failure.
+        When: A failure is logged in test case 5.
+        Then: The first case, cases 4 and 5 are committed before close_test, and the reader sees the failure.
+        """
+        logger = FuzzLoggerDb(db_filename=self.db_filename, num_log_cases=2, commit_interval=60)
+        self._log_cases(logger, range(1, 6), fail_index=5)
+
+        reader = FuzzLoggerDbReader(db_filename=self.db_filename)
+        self.assertEqual([1, 4, 5], [row[0] for row in reader.query("SELECT number FROM cases ORDER BY number")])
+        self.assertEqual({5: ["crash"]}, dict(reader.failure_map))
+        logger.close_test()
+
+    def test_get_test_case_data_sees_pending_rows(self):
+        """
+        Given: A FuzzLoggerDb with a long commit interval.
+        When: Reading a test case through the logger right after logging it.
+        Then: The test case is returned.
+        """
+        logger = FuzzLoggerDb(db_filename=self.db_filename, commit_interval=60, commit_count=10**6)
+        self._log_cases(logger, [1, 2])
+
+        self.assertEqual("case 2", logger.get_test_case_data(2).name)
+        logger.close_test()
+
+    def test_failed_batch_is_rolled_back(self):
+        """
+        Given: A FuzzLoggerDb with a long commit interval.
+        When: Writing the steps of test case 1 fails after its case row was inserted, then test case 2 is logged.
+        Then: The error is raised on the logging thread,
+         and: Only test case 2 is committed, without the case row of test case 1.
+        """
+        logger = FuzzLoggerDb(db_filename=self.db_filename, commit_interval=60, commit_count=10**6)
+        with mock.patch.object(logger, "_prepare_steps", side_effect=sqlite3.OperationalError("disk I/O error")):
+            self._log_cases(logger, [1])
+            with self.assertRaises(sqlite3.OperationalError):
+                logger.flush()
+
+        self._log_cases(logger, [2])
+        logger.close_test()
+
+        reader = FuzzLoggerDbReader(db_filename=self.db_filename)
+        self.assertEqual([(2,)], list(reader.query("SELECT number FROM cases")))
+        self.assertEqual([(2,)], list(reader.query("SELECT DISTINCT test_case_index FROM steps")))
+
+    def test_writer_error_left_to_logging_thread(self):
+        """
+        Given: A FuzzLoggerDb whose writer thread failed to write test case 2.
+        When: Reading test cases from another thread, e.g. the web server.
+        Then: The committed test cases are returned and the missing one is None, without raising the writer error,
+         and: The writer error is raised on the logging thread afterwards.
+        """
+        logger = FuzzLoggerDb(db_filename=self.db_filename, commit_interval=60, commit_count=10**6)
+        self._log_cases(logger, [1], fail_index=1)
+        with mock.patch.object(logger, "_prepare_steps", side_effect=sqlite3.OperationalError("disk I/O error")):
+            self._log_cases(logger, [2])
+            results = []
+            thread = threading.Thread(target=lambda: results.extend(logger.get_test_case_data(i) for i in (1, 2)))
+            thread.start()
+            thread.join()
+
+        self.assertEqual("case 1", results[0].name)
+        self.assertIsNone(results[1])
+        with self.assertRaises(sqlite3.OperationalError):
+            logger.close_test()
+
+    def test_identical_payloads_stored_once(self):
+        """
+        Given: A FuzzLoggerDb with zlib compressed blobs.
+        When: Logging many test cases sending the same payload and receiving distinct ones.
+        Then: The sent payload is stored in one blob, and all payloads read back unchanged.
+        """
+        logger = FuzzLoggerDb(db_filename=self.db_filename, compression="zlib")
+        sent = b"GET / HTTP/1.1\r\n" * 20
+        for index in range(1, 51):
+            logger.open_test_case("case", name="case", index=index)
+            logger.log_send(sent)
+            logger.log_recv("reply {0}".format(index).encode())
+            logger.close_test_case()
+        logger.close_test()
+
+        reader = FuzzLoggerDbReader(db_filename=self.db_filename)
+        self.assertEqual([(51,)], list(reader.query("SELECT COUNT(*) FROM blobs")))
+        self.assertEqual([("zlib", 1)], list(reader.query("SELECT encoding, COUNT(*) FROM blobs WHERE encoding != ''")))
+        steps = reader.get_test_case_data(42).steps
+        self.assertEqual(sent, steps[0].data)
+        self.assertEqual(b"reply 42", steps[1].data)
+
+    def test_compact_keeps_failures_in_full(self):
+        """
+        Given: A FuzzLoggerDb in compact mode with a prefix length of 2.
+        When: Logging three test cases, the last one failing.
+        Then: Passing cases keep a 2 byte prefix with the full length, the failing case keeps the full payload.
+        """
+        logger = FuzzLoggerDb(db_filename=self.db_filename, compact=True, compact_prefix_length=2)
+        self._log_cases(logger, [1, 2, 3], fail_index=3)
+        logger.close_test()
+
+        reader = FuzzLoggerDbReader(db_filename=self.db_filename)
+        passing = reader.get_test_case_data(2).steps[1]
+        failing = reader.get_test_case_data(3).steps[1]
+        self.assertEqual((b"da", True, 4), (passing.data, passing.truncated, passing.data_length))
+        self.assertEqual((b"data", False, 4), (failing.data, bool(failing.truncated), failing.data_length))
+
+    def test_unknown_compression(self):
+        """
+        Given: An unsupported compression name.
+        When: Creating a FuzzLoggerDb.
+        Then: ValueError is raised.
+        """
+        with self.assertRaises(ValueError):
+            FuzzLoggerDb(db_filename=self.db_filename, compression="lzma")
+
+
+class EchoConnection(ITargetConnection):
+    """Fake target echoing the last message sent."""
+
+    def __init__(self):
+        self.last_sent = b""
+
+    def close(self):
+        pass
+
+    def open(self):
+        pass
+
+    def recv(self, max_bytes):
+        return self.last_sent
+
+    def send(self, data):
+        self.last_sent = data
+        return len(data)
+
+    @property
+    def info(self):
+        return "echo connection"
+
+
+class TestCompactLogging(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_filename = os.path.join(self.tmp_dir.name, "compact.db")
+        self.session = Session(
+            target=Target(connection=EchoConnection()),
+            web_port=None,
+            fuzz_loggers=[],
+            db_filename=self.db_filename,
+            receive_data_after_fuzz=True,
+            fuzz_db_compact=True,
+        )
+        self.request = Request(
+            "msg", children=[Static(name="verb", default_value="ECHO "), String(name="text", default_value="hi")]
+        )
+        self.session.connect(self.request)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_sent_data_regenerated(self):
+        """
+        Given: A session logging in compact mode.
+        When: Fuzzing and reading back a test case with a long payload.
+        Then: The database keeps only a prefix, and Session.test_case_data regenerates the full sent data, while
+              the received data stays truncated,
+         and: The data is regenerated from copies of the requests, not the ones the fuzz thread renders.
+        """
+        self.session.fuzz(max_depth=1)
+        reader = FuzzLoggerDbReader(db_filename=self.db_filename)
+        index, length = next(
+            reader.query("SELECT test_case_index, data_length FROM steps WHERE type='send' AND data_length > 100")
+        )
+
+        stored = reader.get_test_case_data(index)
+        with mock.patch.object(String, "get_mutations", autospec=True, side_effect=String.get_mutations) as spy:
+            test_case = self.session.test_case_data(index)
+        self.assertNotIn(self.request.names["msg.text"], [c.args[0] for c in spy.call_args_list])
+        self.assertEqual(1, spy.call_count)
+
+        stored_send = next(step for step in stored.steps if step.type == "send")
+        self.assertTrue(stored_send.truncated)
+        self.assertEqual(32, len(stored_send.data))
+        send = next(step for step in test_case.steps if step.type == "send")
+        receive = next(step for step in test_case.steps if step.type == "receive")
+        self.assertFalse(send.truncated)
+        self.assertEqual(length, len(send.data))
+        self.assertEqual(stored_send.data, send.data[:32])
+        self.assertTrue(receive.truncated)
+
+
+class TestFuzzLoggerDbSchema(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_filename = os.path.join(self.tmp_dir.name, "old.db")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _create_unversioned_db(self):
+        connection = sqlite3.connect(self.db_filename)
+        connection.execute("CREATE TABLE cases (name text, number integer, timestamp TEXT)")
+        connection.execute(
+            "CREATE TABLE steps (test_case_index integer, type text, description text, data blob, "
+            "timestamp TEXT, is_truncated BOOLEAN)"
+        )
+        connection.execute("INSERT INTO cases VALUES ('case 1', 1, '')")
+        connection.execute("INSERT INTO steps VALUES (1, 'fail', 'crash one', x'', '', 0)")
+        connection.execute("INSERT INTO steps VALUES (1, 'info', 'not a failure', x'', '', 0)")
+        connection.commit()
+        connection.close()
+
+    def test_unversioned_db_is_migrated(self):
+        """
+        Given: A run database written before the schema was versioned.
+        When: Opening it with FuzzLoggerDbReader.
+        Then: It is migrated to the current version, existing failures are in the failures table, and test case
+              lookups use indexes.
+        """
+        self._create_unversioned_db()
+
+        reader = FuzzLoggerDbReader(db_filename=self.db_filename)
+
+        self.assertEqual(SCHEMA_VERSION, get_schema_version(reader._database_connection))
+        self.assertEqual({1: ["crash one"]}, dict(reader.failure_map))
+        for query in ["SELECT * FROM steps WHERE test_case_index=1", "SELECT * FROM cases WHERE number=1"]:
+            plan = " ".join(str(row) for row in reader.query("EXPLAIN QUERY PLAN " + query))
+            self.assertIn("USING INDEX", plan)
+
+    def test_failures_maintained_on_insert(self):
+        """
+        Given: A migrated run database.
+        When: Logging another failure with FuzzLoggerDb.
+        Then: The failures table contains old and new failures.
+        """
+        self._create_unversioned_db()
+        logger = FuzzLoggerDb(db_filename=self.db_filename)
+        logger.open_test_case("case 2", name="case 2", index=2)
+        logger.log_fail("crash two")
+        logger.close_test_case()
+        logger.close_test()
+
+        reader = FuzzLoggerDbReader(db_filename=self.db_filename)
+
+        self.assertEqual({1: ["crash one"], 2: ["crash two"]}, dict(reader.failure_map))
+
+
+class TestFailurePaging(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_filename = os.path.join(self.tmp_dir.name, "run.db")
+        logger = FuzzLoggerDb(db_filename=self.db_filename)
+        for index in range(1, 11):
+            element = "req.a" if index % 2 else "req.b"
+            logger.open_test_case("id", name="req:[{0}:{1}]".format(element, index), index=index)
+            if index % 3 == 0:
+                logger.log_fail(
+                    "ProcessMonitor#{0}[localhost:26002] detected crash on test case #{1}: "
+                    "Segfault at 0x{1:08x}".format(1000 + index, index)
+                )
+                logger.log_fail("Target connection reset.")
+            logger.close_test_case()
+        logger.close_test()
+        self.reader = FuzzLoggerDbReader(db_filename=self.db_filename)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_classify_failure(self):
+        """
+        Given: A test case name and a failure reported by a monitor.
+        When: Calling classify_failure.
+        Then: Request, element, monitor without object id and the synopsis with numbers masked are returned.
+        """
+        self.assertEqual(
+            ("req", "req.a", "ProcessMonitor[localhost:26002]", "Segfault at #, pid #"),
+            classify_failure(
+                "hello->req:[req.a:5, req.b:1]",
+                "ProcessMonitor#1234[localhost:26002] detected crash on test case #7: Segfault at 0x1f, pid 42\nmore",
+            ),
+        )
+        self.assertEqual(
+            ("req", None, None, "Target connection reset."), classify_failure("req", "Target connection reset.")
+        )
+
+    def test_pages(self):
+        """
+        Given: A run database with failures in test cases 3, 6 and 9.
+        When: Reading pages of two test cases.
+        Then: The first page ends with a cursor to the second one, which is the last.
+        """
+        page, cursor = self.reader.failure_page(limit=2)
+
+        self.assertEqual([3, 6], [index for index, _ in page])
+        self.assertEqual(2, len(page[0][1]))
+        self.assertEqual(6, cursor)
+        self.assertEqual(([9], None), ([index for index, _ in self.reader.failure_page(after=cursor)[0]], None))
+
+    def test_filters_use_indexes(self):
+        """
+        Given: A run database with failures in test cases 3, 6 and 9.
+        When: Filtering by element and monitor and counting failures per element.
+        Then: Only matching test cases are returned, using the filter's index.
+        """
+        self.assertEqual([3, 9], [index for index, _ in self.reader.failure_page(filters={"element": "req.a"})[0]])
+        page, _ = self.reader.failure_page(filters={"monitor": "ProcessMonitor[localhost:26002]", "element": "req.b"})
+        self.assertEqual([6], [index for index, _ in page])
+        self.assertEqual([("req.a", 2), ("req.b", 1)], self.reader.failure_counts("element"))
+        plan = " ".join(
+            str(row)
+            for row in self.reader.query(
+                "EXPLAIN QUERY PLAN SELECT DISTINCT test_case_index FROM failures WHERE test_case_index > 0 "
+                "AND bucket = 'x' ORDER BY test_case_index"
+            )
+        )
+        self.assertIn("failures_bucket", plan)
+        with self.assertRaises(ValueError):
+            self.reader.failure_page(filters={"description": "x"})
+
+
+if __name__ == "__main__":
+    unittest.main()
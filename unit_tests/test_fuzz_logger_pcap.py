@@ -0,0 +1,122 @@
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+
+from boofuzz import FuzzLoggerPcap
+
+
+def read_packets(filename):
+    """Parse a pcapng file written by FuzzLoggerPcap into a list of (packet, comments) tuples."""
+    with open(filename, "rb") as f:
+        data = f.read()
+    packets = []
+    offset = 0
+    while offset < len(data):
+        block_type, length = struct.unpack_from("<II", data, offset)
+        assert struct.unpack_from("<I", data, offset + length - 4)[0] == length
+        if block_type == 6:
+            captured_length = struct.unpack_from("<I", data, offset + 20)[0]
+            packet = data[offset + 28 : offset + 28 + captured_length]
+            comments = []
+            option_offset = offset + 28 + captured_length + (-captured_length % 4)
+            while option_offset < offset + length - 4:
+                code, option_length = struct.unpack_from("<HH", data, option_offset)
+                if code == 0:
+                    break
+                if code == 1:
+                    comments.append(data[option_offset + 4 : option_offset + 4 + option_length].decode())
+                option_offset += 4 + option_length + (-option_length % 4)
+            packets.append((packet, comments))
+        offset += length
+    return packets
+
+
+def tcp_fields(packet):
+    """Return source port, destination port, seq, ack, flags and payload of an IPv4/TCP packet."""
+    source_port, destination_port, seq, ack, _, flags = struct.unpack_from(">HHIIBB", packet, 20)
+    return source_port, destination_port, seq, ack, flags, packet[40:]
+
+
+class TestFuzzLoggerPcap(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, "boofuzz.pcapng")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_tcp_flow(self):
+        """
+        Given: A FuzzLoggerPcap in TCP mode.
+        When: Logging one test case with a send, a receive and a failure.
+        Then: The file holds a handshake, both data segments with consistent sequence numbers and a teardown.
+         and: The first packet is commented with the test case index and name, the last data packet with the failure.
+        """
+        logger = FuzzLoggerPcap(filename=self.filename, target_port=80)
+        logger.open_test_case("id", name="req:elem:1", index=7)
+        logger.log_send(b"GET / HTTP/1.0\r\n\r\n")
+        logger.log_recv(b"HTTP/1.0 200 OK\r\n")
+        logger.log_fail("crashed")
+        logger.close_test_case()
+        logger.close_test()
+
+        packets = read_packets(self.filename)
+        self.assertEqual(8, len(packets))
+        fields = [tcp_fields(packet) for packet, _ in packets]
+        self.assertEqual([0x02, 0x12, 0x10, 0x18, 0x18, 0x11, 0x11, 0x10], [f[4] for f in fields])
+        self.assertEqual((1031, 80), fields[0][:2])
+        self.assertEqual((80, 1031), fields[4][:2])
+        self.assertEqual(b"GET / HTTP/1.0\r\n\r\n", fields[3][5])
+        self.assertEqual(b"HTTP/1.0 200 OK\r\n", fields[4][5])
+        self.assertEqual((1, 1), fields[3][2:4])
+        self.assertEqual((1, 1 + 18), fields[4][2:4])
+        self.assertEqual((1 + 18, 1 + 17), fields[5][2:4])
+        self.assertEqual(["Test case #7: req:elem:1"], packets[0][1])
+        self.assertEqual(["Fail: crashed"], packets[4][1])
+
+    def test_udp_flows_per_test_case(self):
+        """
+        Given: A FuzzLoggerPcap in UDP mode.
+        When: Logging two test cases.
+        Then: Each test case is a separate flow with its own source port, without extra packets.
+        """
+        logger = FuzzLoggerPcap(filename=self.filename, protocol="udp", target_port=53)
+        for index in (1, 2):
+            logger.open_test_case("id", name="dns:{0}".format(index), index=index)
+            logger.log_send(b"query")
+            logger.log_recv(b"answer")
+            logger.close_test_case()
+        logger.close_test()
+
+        packets = read_packets(self.filename)
+        self.assertEqual(4, len(packets))
+        ports = [struct.unpack_from(">HH", packet, 20) for packet, _ in packets]
+        self.assertEqual([(1025, 53), (53, 1025), (1026, 53), (53, 1026)], ports)
+        self.assertEqual(b"answer", packets[1][0][28:])
+        self.assertEqual(["Test case #2: dns:2"], packets[2][1])
+
+    def test_rotation(self):
+        """
+        Given: A FuzzLoggerPcap with a small max_file_size.
+        When: Logging several test cases.
+        Then: New files are started at test case boundaries, and each file holds complete flows.
+        """
+        logger = FuzzLoggerPcap(filename=self.filename, max_file_size=200)
+        for index in range(1, 4):
+            logger.open_test_case("id", name="case", index=index)
+            logger.log_send(b"A" * 100)
+            logger.close_test_case()
+        logger.close_test()
+
+        names = ["boofuzz.pcapng", "boofuzz-0001.pcapng", "boofuzz-0002.pcapng"]
+        self.assertEqual([os.path.join(self.directory, name) for name in names], logger.filenames)
+        for filename in logger.filenames:
+            packets = read_packets(filename)
+            self.assertEqual(7, len(packets))
+            self.assertEqual(0x02, tcp_fields(packets[0][0])[4])
+
+
+if __name__ == "__main__":
+    unittest.main()
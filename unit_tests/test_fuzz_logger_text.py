@@ -113,6 +113,26 @@ class TestFuzzLoggerTextFreeFunctions(unittest.TestCase):
                 "{:02x} {}".format(c, expected_results[c]), boofuzz.helpers.hex_to_hexstr(bytes(chr(c), "latin-1"))
             )
 
+    def test_abbreviate_bytes(self):
+        """
+        Given: Data longer than max_length.
+        When: Calling abbreviate_bytes with a tail_length.
+        Then: Only the head and tail are rendered, with the number of omitted bytes, total length and digest.
+         and: Data up to max_length is rendered in full.
+        """
+        data = bytes(range(100))
+
+        abbreviated = boofuzz.helpers.abbreviate_bytes(
+            data, max_length=10, tail_length=4, bytes_to_str=boofuzz.helpers.hex_str
+        )
+
+        self.assertRegex(
+            abbreviated,
+            r"^00 01 02 03 04 05 \[\.\.\. 90 bytes omitted, 100 bytes total, blake2b [0-9a-f]{16} \.\.\.\] "
+            r"60 61 62 63$",
+        )
+        self.assertEqual(boofuzz.helpers.hex_to_hexstr(data), boofuzz.helpers.abbreviate_bytes(data, max_length=100))
+
 
 class TestFuzzLoggerText(unittest.TestCase):
     def setUp(self):
@@ -486,6 +506,42 @@ class TestFuzzLoggerText(unittest.TestCase):
         self.assertTrue(self.some_test_case_id in self.virtual_file.readline())
         self.assertTrue(hex_to_str(self.some_recv_data) in self.virtual_file.readline())
 
+    def test_log_send_max_data_length(self):
+        """
+        Given: FuzzLoggerText with max_data_length set.
+        When: Calling log_send with data longer than max_data_length.
+        Then: The full length is printed, but only the head and tail of the data.
+        """
+        self.logger = fuzz_logger_text.FuzzLoggerText(file_handle=self.virtual_file, max_data_length=8, tail_length=2)
+
+        self.logger.log_send(b"A" * 6 + b"B" * 1000 + b"CC")
+
+        output = self.virtual_file.getvalue()
+        self.assertIn("Transmitted 1008 bytes", output)
+        self.assertIn("b'AAAAAA' [... 1000 bytes omitted, 1008 bytes total", output)
+        self.assertNotIn("BBB", output)
+
+    def test_flush_interval(self):
+        """
+        Given: FuzzLoggerText with a long flush_interval.
+        When: Logging steps, then a failure, then closing the test case.
+        Then: Nothing is written until the failure, which writes all buffered lines.
+         and: Lines logged after that are written when the test case is closed.
+        """
+        self.logger = fuzz_logger_text.FuzzLoggerText(file_handle=self.virtual_file, flush_interval=3600)
+
+        self.logger.open_test_case(self.some_test_case_id, self.some_test_case_name, self.some_test_case_index)
+        self.logger.log_send(self.some_send_data)
+        self.assertEqual("", self.virtual_file.getvalue())
+
+        self.logger.log_fail(self.some_log_fail_msg)
+        self.assertEqual(3, len(self.virtual_file.getvalue().splitlines()))
+
+        self.logger.log_info(self.some_log_info_msg)
+        self.assertEqual(3, len(self.virtual_file.getvalue().splitlines()))
+        self.logger.close_test_case()
+        self.assertIn(self.some_log_info_msg, self.virtual_file.getvalue().splitlines()[3])
+
 
 if __name__ == "__main__":
     unittest.main()
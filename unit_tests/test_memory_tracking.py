@@ -0,0 +1,125 @@
+import os
+import tempfile
+import tracemalloc
+import unittest
+from unittest import mock
+
+from boofuzz import Group, IFuzzLogger, Request, Session, Target
+from boofuzz.connections import ITargetConnection
+from boofuzz.memory_tracking import format_report, MemoryTracker
+from boofuzz.mutation_context import MutationContext
+from boofuzz.web.app import app
+
+
+class NullConnection(ITargetConnection):
+    """Fake target accepting all data and never answering."""
+
+    def close(self):
+        pass
+
+    def open(self):
+        pass
+
+    def recv(self, max_bytes):
+        return b""
+
+    def send(self, data):
+        return len(data)
+
+    @property
+    def info(self):
+        return "null connection"
+
+
+def allocate():
+    return [bytearray(1000) for _ in range(1000)]
+
+
+class TestMemoryTracker(unittest.TestCase):
+    def test_live_objects(self):
+        """
+        Given: A memory tracker.
+        When: Taking a report while 100 mutation contexts are alive, and another after they are released.
+        Then: The first report counts 100 more mutation contexts than the second,
+         and: The second report is formatted with the change since the first.
+        """
+        tracker = MemoryTracker()
+        contexts = [MutationContext() for _ in range(100)]
+        first = tracker.report({"contexts": len(contexts)})
+        del contexts
+        second = tracker.report({"contexts": 0})
+
+        self.assertEqual(100, first.objects["MutationContext"] - second.objects["MutationContext"])
+        self.assertEqual([first, second], list(tracker.reports))
+        self.assertIsNone(second.allocations)
+        lines = format_report(second, first)
+        self.assertIn("Live MutationContext objects: {0} (-100)".format(second.objects["MutationContext"]), lines)
+        self.assertIn("contexts entries: 0 (-100)", lines)
+
+    @unittest.skipIf(tracemalloc.is_tracing(), "tracemalloc is already tracing")
+    def test_trace_allocations(self):
+        """
+        Given: A memory tracker tracing allocations.
+        When: Taking a report after allocating about 1 MB in allocate().
+        Then: The top allocation site is in allocate(), grown by at least 1 MB,
+         and: Tracing stops when the tracker is stopped.
+        """
+        tracker = MemoryTracker(trace_allocations=True, top=3)
+        tracker.start()
+        try:
+            data = allocate()
+            report = tracker.report()
+        finally:
+            tracker.stop()
+
+        self.assertFalse(tracemalloc.is_tracing())
+        self.assertLessEqual(len(report.allocations), 3)
+        top = report.allocations[0]
+        self.assertIn("test_memory_tracking.py:", top.site)
+        self.assertGreaterEqual(top.size_diff, 1000 * len(data))
+        self.assertGreaterEqual(report.traced_peak, report.traced)
+        self.assertIn(top.site, format_report(report)[-len(report.allocations)])
+
+
+class TestSessionMemoryReports(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_memory_reports(self):
+        """
+        Given: A session taking a memory report every test case.
+        When: Fuzzing the 2 test cases of a request.
+        Then: A report is taken per test case and one at the end of the run, with the sizes of the session's containers,
+         and: The reports are not logged as test steps,
+         and: The web UI serves them.
+        """
+        logger = mock.MagicMock(spec=IFuzzLogger)
+        session = Session(
+            target=Target(connection=NullConnection()),
+            web_port=None,
+            fuzz_loggers=[logger],
+            db_filename=os.path.join(self.tmp_dir.name, "run.db"),
+            memory_report_interval=0,
+        )
+        session.connect(Request("cmd", children=[Group(name="verb", default_value="GET", values=["PUT", "POST"])]))
+
+        session.fuzz()
+
+        reports = session.memory_reports()
+        self.assertEqual(3, len(reports))
+        self.assertEqual(0, reports[-1].containers["monitor_results"])
+        self.assertIn("failed_test_cases (in memory)", reports[-1].containers)
+        self.assertIn("DataTestStep", reports[-1].objects)
+        steps = [c[2]["description"] for c in logger.method_calls if c[0] == "open_test_step"]
+        self.assertNotIn("Memory report", steps)
+
+        app.session = session
+        document = app.test_client().get("/api/memory").get_json()
+        self.assertEqual([r.rss for r in reports], [r["rss"] for r in document["reports"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import os
+import tempfile
+import unittest
+import urllib.error
+import urllib.request
+
+from boofuzz import exception, Group, Request, Session, Target
+from boofuzz.connections import ITargetConnection
+from boofuzz.metrics import CONTENT_TYPE, MetricsExporter, read_metrics_file
+from boofuzz.web.app import app
+
+
+class ResettingConnection(ITargetConnection):
+    """Fake target resetting the connection on PUT commands and never answering."""
+
+    def close(self):
+        pass
+
+    def open(self):
+        pass
+
+    def recv(self, max_bytes):
+        return b""
+
+    def send(self, data):
+        if data.startswith(b"PUT"):
+            raise exception.BoofuzzTargetConnectionReset()
+        return len(data)
+
+    @property
+    def info(self):
+        return "resetting connection"
+
+
+def parse_samples(text):
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+def fail_on_post(target, fuzz_data_logger, session, *args, **kwargs):
+    if session.last_send.startswith(b"POST"):
+        fuzz_data_logger.log_fail("POST accepted")
+
+
+class TestSessionMetrics(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.metrics_filename = os.path.join(self.tmp_dir.name, "boofuzz.prom")
+        self.session = Session(
+            target=Target(connection=ResettingConnection()),
+            web_port=None,
+            fuzz_loggers=[],
+            db_filename=os.path.join(self.tmp_dir.name, "run.db"),
+            receive_data_after_fuzz=True,
+            restart_interval=2,
+            restart_sleep_time=0,
+            post_test_case_callbacks=[fail_on_post],
+            metrics_file=self.metrics_filename,
+        )
+        self.session.connect(
+            Request("cmd", children=[Group(name="verb", default_value="GET", values=["PUT", "POST", "HEAD"])])
+        )
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_campaign_metrics(self):
+        """
+        Given: A session fuzzing a target that resets the connection on PUT, never answers and fails on POST.
+        When: Fuzzing all test cases, restarting the target every 2 test cases.
+        Then: Test cases, failures, restarts, connection errors and empty receives are counted,
+         and: The metrics file holds the final metrics including phase duration histograms.
+        """
+        self.session.fuzz()
+
+        samples = parse_samples(self.session.metrics_text())
+        self.assertEqual(3, samples["boofuzz_test_cases_total"])
+        self.assertEqual(3, samples['boofuzz_request_test_cases_total{request="cmd"}'])
+        self.assertEqual(3, samples['boofuzz_request_mutations{request="cmd"}'])
+        self.assertEqual(1, samples["boofuzz_failed_test_cases_total"])
+        self.assertEqual(1, samples['boofuzz_failures_total{monitor="session"}'])
+        self.assertEqual(2, samples["boofuzz_restarts_total"])  # restart interval and POST failure
+        self.assertEqual(1, samples['boofuzz_connection_errors_total{class="reset"}'])
+        self.assertEqual(0, samples['boofuzz_connection_errors_total{class="ssl"}'])
+        self.assertEqual(3, samples["boofuzz_receives_total"])
+        self.assertEqual(3, samples["boofuzz_empty_receives_total"])
+        self.assertEqual(3, samples['boofuzz_phase_duration_seconds_count{phase="test_case"}'])
+        self.assertEqual(3, samples['boofuzz_phase_duration_seconds_bucket{phase="test_case",le="+Inf"}'])
+        file_samples = parse_samples(read_metrics_file(self.metrics_filename))
+        self.assertEqual(3, file_samples["boofuzz_test_cases_total"])
+        self.assertEqual(1, file_samples["boofuzz_failed_test_cases_total"])
+
+    def test_metrics_endpoint(self):
+        """
+        Given: The web UI of a session.
+        When: Requesting /metrics.
+        Then: The metrics are served in the Prometheus text format.
+        """
+        app.session = self.session
+        response = app.test_client().get("/metrics")
+
+        self.assertEqual(CONTENT_TYPE, response.headers["Content-Type"])
+        self.assertIn("boofuzz_test_cases_total 0", response.data.decode())
+
+    def test_exporter(self):
+        """
+        Given: A standalone MetricsExporter serving a metrics file.
+        When: Scraping /metrics and another path.
+        Then: The file is served, and other paths are not found.
+        """
+        with open(self.metrics_filename, "w") as f:
+            f.write("boofuzz_test_cases_total 7\n")
+        exporter = MetricsExporter(lambda: read_metrics_file(self.metrics_filename), port=0, address="127.0.0.1")
+        exporter.start()
+        try:
+            url = "http://127.0.0.1:{0}".format(exporter.port)
+            with urllib.request.urlopen(url + "/metrics", timeout=10) as response:
+                self.assertEqual("boofuzz_test_cases_total 7\n", response.read().decode())
+            with self.assertRaises(urllib.error.HTTPError):
+                urllib.request.urlopen(url + "/", timeout=10)
+        finally:
+            exporter.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+
+from boofuzz import microbench
+from boofuzz.microbench import BenchmarkResult
+
+
+def result(name, seconds):
+    return BenchmarkResult(name=name, rounds=1, loops=1, min=seconds, median=seconds, stdev=0.0)
+
+
+class TestMicrobench(unittest.TestCase):
+    def test_benchmarks_run(self):
+        """
+        Given: The benchmarks of primitives, blocks, rendering, name resolution and mutation contexts.
+        When: Running each for one short round.
+        Then: Each benchmark reports a positive time per call.
+        """
+        names = microbench.benchmark_names()
+        for prefix in ("string.", "bytes.", "bit_field.", "random_data.", "group.", "request.render."):
+            self.assertTrue(any(name.startswith(prefix) for name in names), prefix)
+
+        results = microbench.run(rounds=1, min_time=0)
+
+        self.assertEqual(names, [r.name for r in results])
+        for r in results:
+            self.assertGreater(r.min, 0, r.name)
+
+    def test_filter(self):
+        """
+        Given: A glob pattern.
+        When: Listing benchmarks.
+        Then: Only matching benchmarks are listed.
+        """
+        self.assertEqual(["group.mutations", "group.num_mutations"], microbench.benchmark_names("group.*"))
+
+    def test_compare_with_saved_baseline(self):
+        """
+        Given: A baseline saved to a file.
+        When: Comparing results with one benchmark 50% slower, one faster and one without baseline.
+        Then: Only the slower benchmark is reported as a regression, and the new one is skipped.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = os.path.join(tmp_dir, "baseline.json")
+            microbench.save_results(filename, [result("a", 1e-6), result("b", 2e-6)])
+            baseline = microbench.load_results(filename)
+
+        comparisons = microbench.compare([result("a", 1.5e-6), result("b", 1e-6), result("c", 1e-6)], baseline)
+
+        self.assertEqual(["a", "b"], [c.name for c in comparisons])
+        self.assertAlmostEqual(0.5, comparisons[0].change)
+        self.assertEqual([True, False], [c.regressed for c in comparisons])
+        self.assertIn("REGRESSION", microbench.format_comparison(comparisons[0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
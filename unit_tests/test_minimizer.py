@@ -0,0 +1,195 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from boofuzz import exception, Request, Session, Static, String, Target
+from boofuzz.connections import ITargetConnection
+from boofuzz.fuzz_logger_db import FuzzLoggerDbReader
+from boofuzz.minimizer import crash_bucket
+from boofuzz.monitors import BaseMonitor
+
+CRASH_LENGTH = 40
+
+
+class RecordingConnection(ITargetConnection):
+    """Fake target connection remembering the last message sent."""
+
+    def __init__(self):
+        self.last_sent = b""
+
+    def close(self):
+        pass
+
+    def open(self):
+        pass
+
+    def recv(self, max_bytes):
+        return b""
+
+    def send(self, data):
+        self.last_sent = data
+        return len(data)
+
+    @property
+    def info(self):
+        return "recording connection"
+
+
+class ResettingConnection(RecordingConnection):
+    """Fake target connection reset by messages longer than CRASH_LENGTH bytes, counting opens of an open connection."""
+
+    def __init__(self):
+        super(ResettingConnection, self).__init__()
+        self.is_open = False
+        self.leaked = 0
+
+    def close(self):
+        self.is_open = False
+
+    def open(self):
+        self.leaked += self.is_open
+        self.is_open = True
+
+    def send(self, data):
+        if len(data) > CRASH_LENGTH:
+            raise exception.BoofuzzTargetConnectionReset()
+        return super(ResettingConnection, self).send(data)
+
+
+class RestartingMonitor(BaseMonitor):
+    """Restarts the target without touching its connection, like a process monitor."""
+
+    def alive(self):
+        return True
+
+    def restart_target(self, target=None, fuzz_data_logger=None, session=None):
+        return True
+
+
+class LengthCrashMonitor(BaseMonitor):
+    """Reports a crash whenever the last message was longer than CRASH_LENGTH bytes."""
+
+    def __init__(self, connection):
+        super(LengthCrashMonitor, self).__init__()
+        self.connection = connection
+
+    def alive(self):
+        return True
+
+    def post_send(self, target=None, fuzz_data_logger=None, session=None):
+        return len(self.connection.last_sent) <= CRASH_LENGTH
+
+    def get_crash_synopsis(self):
+        return "buffer overflow at 0x{0:x}".format(id(self.connection.last_sent))
+
+
+class TestCrashBucket(unittest.TestCase):
+    def test_volatile_parts_are_masked(self):
+        """
+        Given: Failure descriptions of two test cases differing in test case number and address.
+        When: Computing their crash buckets.
+        Then: The buckets are equal, and supplementary monitor reports are ignored.
+        """
+        first = crash_bucket(["Mon detected crash on test case #12: segfault at 0x7f00aa"])
+        second = crash_bucket(
+            [
+                "Mon detected crash on test case #345: segfault at 0x7f11bb",
+                "Other monitor provided additional information for test case #345",
+            ]
+        )
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, crash_bucket(["Mon detected crash on test case #12: hang"]))
+        self.assertEqual(frozenset(), crash_bucket([]))
+
+
+class TestSessionMinimize(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_filename = os.path.join(self.tmp_dir.name, "minimize.db")
+        self.connection = RecordingConnection()
+        target = Target(connection=self.connection, monitors=[LengthCrashMonitor(self.connection)])
+        self.session = Session(
+            target=target,
+            web_port=None,
+            fuzz_loggers=[],
+            db_filename=self.db_filename,
+            restart_sleep_time=0,
+            crash_threshold_element=1,
+        )
+        self.session.connect(
+            Request(
+                "cmd", children=[Static(name="verb", default_value="SET "), String(name="value", default_value="x")]
+            )
+        )
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_crash_is_shrunk_to_threshold(self):
+        """
+        Given: A target that crashes on messages longer than CRASH_LENGTH bytes, fuzzed until the first crash.
+        When: Minimizing the crashing test case.
+        Then: The minimized message is exactly one byte over the limit, and the result is stored in the database.
+        """
+        self.session.fuzz(max_depth=1)
+        failing = min(FuzzLoggerDbReader(self.db_filename).failure_map)
+
+        results = self.session.minimize(test_cases=[failing])
+
+        self.assertEqual(1, len(results))
+        result = results[0]
+        self.assertTrue(result.reproducible)
+        self.assertEqual(failing, result.test_case_index)
+        self.assertEqual(CRASH_LENGTH + 1, result.minimized_length)
+        self.assertGreater(result.original_length, result.minimized_length)
+        self.assertTrue(result.data.startswith(b"SET "))
+
+        connection = sqlite3.connect(self.db_filename)
+        try:
+            rows = connection.execute("SELECT test_case_index, data FROM minimized_cases").fetchall()
+        finally:
+            connection.close()
+        self.assertEqual([(failing, result.data)], rows)
+
+    def test_failing_replays_close_connection(self):
+        """
+        Given: A target resetting the connection on messages longer than CRASH_LENGTH bytes, with a monitor restarting
+               it without closing the connection, fuzzed until the first failure.
+        When: Minimizing the failing test case.
+        Then: The failure is shrunk to one byte over the limit,
+         and: Every connection opened by a replay is closed before the next one, including those of failing replays.
+        """
+        connection = ResettingConnection()
+        session = Session(
+            target=Target(connection=connection, monitors=[RestartingMonitor()]),
+            web_port=None,
+            fuzz_loggers=[],
+            db_filename=self.db_filename,
+            restart_sleep_time=0,
+            crash_threshold_element=1,
+            ignore_connection_issues_when_sending_fuzz_data=False,
+        )
+        session.connect(
+            Request(
+                "cmd", children=[Static(name="verb", default_value="SET "), String(name="value", default_value="x")]
+            )
+        )
+        with mock.patch("time.sleep"):  # after restarting the target
+            session.fuzz(max_depth=1)
+            failing = min(FuzzLoggerDbReader(self.db_filename).failure_map)
+            connection.close()  # left open by the failing test case of the run
+            connection.leaked = 0
+
+            results = session.minimize(test_cases=[failing])
+
+        self.assertTrue(results[0].reproducible)
+        self.assertEqual(CRASH_LENGTH + 1, results[0].minimized_length)
+        self.assertEqual(0, connection.leaked)
+        self.assertFalse(connection.is_open)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+import io
+import os
+import tempfile
+import time
+import unittest
+
+from boofuzz import FuzzLoggerText, Group, Request, Session, Target
+from boofuzz.connections import ITargetConnection
+from boofuzz.phase_timing import BUCKET_BOUNDS, format_stats, Histogram, PhaseTimer
+
+
+class SlowConnection(ITargetConnection):
+    """Fake target taking `recv_time` seconds to answer."""
+
+    def __init__(self, recv_time):
+        self.recv_time = recv_time
+
+    def close(self):
+        pass
+
+    def open(self):
+        pass
+
+    def recv(self, max_bytes):
+        time.sleep(self.recv_time)
+        return b"OK"
+
+    def send(self, data):
+        return len(data)
+
+    @property
+    def info(self):
+        return "slow connection"
+
+
+class TestHistogram(unittest.TestCase):
+    def test_percentiles(self):
+        """
+        Given: A histogram of 98 durations of 1 ms, one of 40 ms and one of 50 ms.
+        When: Estimating percentiles.
+        Then: p50 falls into the bucket of 1 ms, p99 between 40 and 50 ms, and the maximum is exact.
+        """
+        histogram = Histogram()
+        for _ in range(98):
+            histogram.add(0.001)
+        histogram.add(0.05)
+        histogram.add(0.04)
+
+        self.assertEqual(100, histogram.count)
+        self.assertAlmostEqual(0.188, histogram.total)
+        self.assertTrue(0.001 <= histogram.percentile(0.5) < 0.001 * 1.19)
+        self.assertTrue(0.04 <= histogram.percentile(0.99) <= 0.05)
+        self.assertEqual(0.05, histogram.percentile(1.0))
+        self.assertEqual(0.05, histogram.max)
+
+    def test_overflow_and_empty(self):
+        """
+        Given: An empty histogram and one with a duration beyond the last bucket.
+        When: Estimating percentiles.
+        Then: The empty histogram reports 0 and the overflow is reported as the maximum.
+        """
+        self.assertEqual(0.0, Histogram().percentile(0.5))
+        histogram = Histogram()
+        histogram.add(BUCKET_BOUNDS[-1] * 2)
+        self.assertEqual(BUCKET_BOUNDS[-1] * 2, histogram.percentile(0.99))
+
+
+class TestPhaseTimer(unittest.TestCase):
+    def test_phases_summed_per_test_case(self):
+        """
+        Given: A PhaseTimer.
+        When: Measuring a phase twice in one test case and not at all in a second one.
+        Then: The phase is counted once with the summed time, and every test case is counted.
+        """
+        timer = PhaseTimer()
+        with timer.measure("prep_send"):
+            time.sleep(0.002)
+        with timer.measure("prep_send"):
+            time.sleep(0.002)
+        timer.finish_case(0.01)
+        timer.finish_case(0.02)
+
+        stats = {s.phase: s for s in timer.stats()}
+        self.assertEqual(["prep_send", "test_case"], list(stats))
+        self.assertEqual(1, stats["prep_send"].count)
+        self.assertGreaterEqual(stats["prep_send"].total, 0.004)
+        self.assertEqual(2, stats["test_case"].count)
+        self.assertEqual(0.02, stats["test_case"].max)
+        self.assertEqual(3, len(format_stats(timer.stats())))
+
+    def test_disabled(self):
+        """
+        Given: A disabled PhaseTimer.
+        When: Measuring a phase and finishing the test case.
+        Then: Nothing is counted.
+        """
+        timer = PhaseTimer(enabled=False)
+        with timer.measure("connect"):
+            pass
+        timer.finish_case(0.01)
+
+        self.assertEqual([], timer.stats())
+
+
+class TestSessionPhaseTimings(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_session_phase_timings(self):
+        """
+        Given: A session fuzzing a target that takes 5 ms to answer fuzzed messages.
+        When: Fuzzing all test cases.
+        Then: Every test case is timed, the receive phase accounts for the answer time,
+         and: The text log ends with a phase timing summary.
+        """
+        output = io.StringIO()
+        request = Request("req", children=[Group(name="cmd", default_value="GET", values=["PUT", "POST"])])
+        session = Session(
+            target=Target(connection=SlowConnection(recv_time=0.005)),
+            web_port=None,
+            fuzz_loggers=[FuzzLoggerText(file_handle=output)],
+            db_filename=os.path.join(self.tmp_dir.name, "run.db"),
+            receive_data_after_fuzz=True,
+        )
+        session.connect(request)
+
+        session.fuzz()
+
+        stats = {s.phase: s for s in session.phase_timings()}
+        self.assertEqual(session.num_cases_actually_fuzzed, stats["test_case"].count)
+        for phase in ("connect", "pre_send", "fuzz_render", "fuzz_send", "fuzz_recv", "logging", "export"):
+            self.assertEqual(stats["test_case"].count, stats[phase].count, phase)
+        self.assertGreaterEqual(stats["fuzz_recv"].p50, 0.005)
+        self.assertGreaterEqual(stats["test_case"].total, stats["fuzz_recv"].total)
+        self.assertIn("Phase timings", output.getvalue())
+        self.assertIn("fuzz_recv", output.getvalue().split("Phase timings")[-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
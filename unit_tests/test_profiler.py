@@ -0,0 +1,145 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from boofuzz import Group, Request, Session, Target
+from boofuzz.connections import ITargetConnection
+from boofuzz.profiler import existing_profiles, profile_filename, SamplingProfiler
+from boofuzz.web.app import app
+
+
+class SleepingConnection(ITargetConnection):
+    """Fake target taking 5 ms to accept data."""
+
+    def close(self):
+        pass
+
+    def open(self):
+        pass
+
+    def recv(self, max_bytes):
+        return b""
+
+    def send(self, data):
+        time.sleep(0.005)
+        return len(data)
+
+    @property
+    def info(self):
+        return "sleeping connection"
+
+
+def busy_function(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+class TestSamplingProfiler(unittest.TestCase):
+    def setUp(self):
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=busy_function, args=(self.stop,))
+        self.thread.start()
+        self.profiler = SamplingProfiler(thread_id=self.thread.ident, interval=0.001)
+        self.profiler.start()
+        time.sleep(0.2)
+        self.profiler.stop()
+        self.stop.set()
+        self.thread.join()
+
+    def test_collapsed(self):
+        """
+        Given: A profiler sampling a thread that is busy in busy_function for 200 ms.
+        When: Formatting the collapsed stacks.
+        Then: The stacks end in busy_function, and the counts add up to the number of samples.
+        """
+        lines = self.profiler.collapsed()
+
+        self.assertFalse(self.profiler.running)
+        self.assertGreater(self.profiler.num_samples, 10)
+        self.assertEqual(self.profiler.num_samples, sum(int(line.rsplit(" ", 1)[1]) for line in lines))
+        self.assertIn("busy_function (test_profiler.py:", lines[0].rsplit(";", 1)[-1])
+
+    def test_speedscope(self):
+        """
+        Given: A profiler sampling a thread that is busy in busy_function for 200 ms.
+        When: Writing the speedscope format.
+        Then: The file holds one sampled profile with a weight per stack, referencing busy_function.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = os.path.join(tmp_dir, "run.speedscope.json")
+            self.profiler.write(filename, profile_format="speedscope", name="test")
+            with open(filename) as f:
+                document = json.load(f)
+
+        profile = document["profiles"][0]
+        self.assertEqual("sampled", profile["type"])
+        self.assertEqual(len(profile["samples"]), len(profile["weights"]))
+        self.assertAlmostEqual(self.profiler.duration, profile["endValue"])
+        self.assertIn("busy_function", [frame["name"].split(" ")[0] for frame in document["shared"]["frames"]])
+
+
+class TestSessionProfile(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_filename = os.path.join(self.tmp_dir.name, "run.db")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_profile_window(self):
+        """
+        Given: A session profiling test cases 2 to 3 of a target that takes 5 ms to accept data.
+        When: Fuzzing all 4 test cases.
+        Then: The profiler runs during test cases 2 and 3 only,
+         and: A collapsed profile is written next to the results database,
+         and: The web UI lists it and serves it for download.
+        """
+        session = Session(
+            target=Target(connection=SleepingConnection()),
+            web_port=None,
+            fuzz_loggers=[],
+            db_filename=self.db_filename,
+            profile=(2, 3),
+        )
+        session.connect(
+            Request("cmd", children=[Group(name="verb", default_value="GET", values=["PUT", "POST", "HEAD", "BREW"])])
+        )
+        profiled = []
+        session.register_post_test_case_callback(
+            lambda *args, **kwargs: profiled.append(session._profiler is not None and session._profiler.running)
+        )
+
+        session.fuzz()
+
+        self.assertEqual([False, True, True, False], profiled)
+
+        filename = profile_filename(self.db_filename, "collapsed")
+        self.assertEqual(os.path.join(self.tmp_dir.name, "run.profile.txt"), filename)
+        self.assertEqual({"collapsed": filename}, existing_profiles(self.db_filename))
+        with open(filename) as f:
+            self.assertIn("_fuzz_current_case", f.read())
+
+        app.session = session
+        client = app.test_client()
+        self.assertEqual(["collapsed"], client.get("/api/current-run").get_json()["session_info"]["profiles"])
+        response = client.get("/profile/collapsed")
+        self.assertEqual(200, response.status_code)
+        self.assertIn("attachment", response.headers["Content-Disposition"])
+        response.close()
+        self.assertEqual(404, client.get("/profile/speedscope").status_code)
+
+    def test_invalid_format(self):
+        """
+        Given: An unknown profile format.
+        When: Creating a session.
+        Then: ValueError is raised.
+        """
+        with self.assertRaises(ValueError):
+            Session(target=None, web_port=None, fuzz_loggers=[], db_filename=self.db_filename, profile_format="pstats")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+
+from boofuzz.response_novelty import (
+    dns_rcode,
+    length_class,
+    ResponseFingerprinter,
+    ResponseNoveltyTracker,
+    simhash,
+)
+
+
+class TestSignals(unittest.TestCase):
+    def test_length_class(self):
+        """
+        Given: Responses of various lengths.
+        When: Computing their length class.
+        Then: Lengths within the same power of two share a class.
+        """
+        self.assertEqual(0, length_class(b""))
+        self.assertEqual(1, length_class(b"a"))
+        self.assertEqual(length_class(b"a" * 5), length_class(b"a" * 7))
+        self.assertNotEqual(length_class(b"a" * 7), length_class(b"a" * 8))
+
+    def test_simhash_similar_responses(self):
+        """
+        Given: Two responses differing in one token out of many, and an unrelated response.
+        When: Computing a 4 bit simhash.
+        Then: The similar responses share a hash and the result fits in 4 bits.
+        """
+        base = b"HTTP/1.1 200 OK Server: test Content-Type: text/html Connection: close Cache-Control: no-cache "
+        self.assertEqual(simhash(base + b"Date: 1", bits=4), simhash(base + b"Date: 2", bits=4))
+        self.assertLess(simhash(b"something else entirely", bits=4), 16)
+
+    def test_dns_rcode(self):
+        """
+        Given: A DNS response header with RCODE 3 (NXDOMAIN), over UDP and over TCP.
+        When: Calling the dns_rcode hook.
+        Then: The RCODE is returned; truncated responses yield None.
+        """
+        header = b"\x12\x34\x81\x83\x00\x01\x00\x00\x00\x00\x00\x00"
+        self.assertEqual(3, dns_rcode(header))
+        self.assertEqual(3, dns_rcode(b"\x00\x0c" + header, tcp=True))
+        self.assertIsNone(dns_rcode(b"\x12\x34"))
+
+
+class TestResponseNoveltyTracker(unittest.TestCase):
+    def test_counts_new_buckets_per_element(self):
+        """
+        Given: A tracker using the default fingerprinter.
+        When: Observing responses to mutations of two elements, one of which provokes a different response.
+        Then: Only new response classes are counted, and the provoking element ranks first.
+        """
+        tracker = ResponseNoveltyTracker()
+
+        self.assertTrue(tracker.observe(b"200 OK", ["req.a"], "case 1"))
+        self.assertFalse(tracker.observe(b"200 OK", ["req.b"]))
+        self.assertFalse(tracker.observe(b"200 OK", ["req.a"]))
+        self.assertTrue(tracker.observe(b"500 Internal Server Error", ["req.b"]))
+        self.assertTrue(tracker.observe(None, ["req.b"]))
+
+        self.assertEqual(3, tracker.num_buckets)
+        self.assertEqual([("req.b", 2, 3), ("req.a", 1, 2)], tracker.ranked_elements())
+        self.assertEqual([("req.b", 2, 3)], tracker.ranked_elements(1))
+
+    def test_protocol_hook(self):
+        """
+        Given: A fingerprinter using only the DNS RCODE hook.
+        When: Observing DNS responses with different IDs but the same RCODE, then a different RCODE.
+        Then: Only the RCODE change is a new bucket.
+        """
+        tracker = ResponseNoveltyTracker(ResponseFingerprinter(use_length_class=False, prefix_len=0, hooks=[dns_rcode]))
+
+        self.assertTrue(tracker.observe(b"\x00\x01\x81\x80" + bytes(8), ["q.name"]))
+        self.assertFalse(tracker.observe(b"\x00\x02\x81\x80" + bytes(8), ["q.name"]))
+        self.assertTrue(tracker.observe(b"\x00\x03\x81\x82" + bytes(8), ["q.type"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import csv
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from boofuzz import fuzz_logger_db, run_analysis
+from boofuzz.fuzz_logger_db import FuzzLoggerDb
+
+
+class TestRunAnalysis(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_filename = os.path.join(self.tmp_dir.name, "run.db")
+        logger = FuzzLoggerDb(db_filename=self.db_filename)
+        for index in range(1, 8):
+            element = "req.a" if index <= 4 else "req.b"
+            name = "hello->req:[{0}:{1}]".format(element, index)
+            logger.open_test_case(name, name=name, index=index)
+            logger.log_send(b"hello")
+            logger.log_recv(b"ok")
+            logger.log_send(b"x" * index)
+            logger.log_recv(b"reply")
+            if index in (2, 6, 7):
+                logger.log_fail("crash")
+            if index == 3:
+                logger.log_error("connection refused")
+            logger.close_test_case()
+        logger.close_test()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_iter_case_chunks(self):
+        """
+        Given: A run database with 7 test cases.
+        When: Calling iter_case_chunks with chunk_size 3.
+        Then: Three chunks with 3, 3 and 1 rows are yielded.
+         and: The derived columns hold request, element, mutation index, lengths and failure flags.
+        """
+        chunks = list(run_analysis.iter_case_chunks(self.db_filename, chunk_size=3))
+
+        self.assertEqual([3, 3, 1], [len(chunk["index"]) for chunk in chunks])
+        rows = [row for chunk in chunks for row in zip(*(chunk[column] for column in run_analysis.COLUMNS))]
+        self.assertEqual(list(range(1, 8)), [row[0] for row in rows])
+        row = dict(zip(run_analysis.COLUMNS, rows[1]))
+        self.assertEqual(
+            {"request": "req", "qualified_name": "req.a", "mutation_index": 2, "num_mutations": 1},
+            {column: row[column] for column in ("request", "qualified_name", "mutation_index", "num_mutations")},
+        )
+        self.assertEqual(
+            (2, 7, True, False), (row["payload_length"], row["recv_length"], row["failed"], row["errored"])
+        )
+        self.assertGreaterEqual(row["latency"], 0)
+        self.assertTrue(rows[2][-1])
+        self.assertEqual("req.b", rows[6][4])
+
+    def test_export_csv(self):
+        """
+        Given: A run database with 7 test cases.
+        When: Exporting it as CSV.
+        Then: The file has a header row and one row per test case.
+        """
+        output = os.path.join(self.tmp_dir.name, "run.csv")
+
+        count = run_analysis.export(self.db_filename, output, export_format="csv", chunk_size=2)
+
+        self.assertEqual(7, count)
+        with open(output, newline="") as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(list(run_analysis.COLUMNS), rows[0])
+        self.assertEqual(8, len(rows))
+        self.assertEqual(["7", "req.b", "7", "True"], [rows[7][0], rows[7][4], rows[7][7], rows[7][10]])
+
+    def test_run_stats(self):
+        """
+        Given: A run database with 7 test cases, 3 of them failing.
+        When: Computing run_stats.
+        Then: Failure counts per request and element are aggregated, and the report lists them,
+         and: The database is opened read-only, without migrating it.
+        """
+        with mock.patch.object(fuzz_logger_db, "upgrade_schema") as upgrade_schema:
+            stats = run_analysis.run_stats(self.db_filename, chunk_size=2)
+
+        upgrade_schema.assert_not_called()
+
+        self.assertEqual((7, 3, 1), (stats.total.cases, stats.total.failed, stats.total.errored))
+        self.assertEqual(7, stats.by_request["req"].cases)
+        self.assertEqual((4, 1), (stats.by_element["req.a"].cases, stats.by_element["req.a"].failed))
+        self.assertEqual((3, 2), (stats.by_element["req.b"].cases, stats.by_element["req.b"].failed))
+        self.assertEqual(7, sum(bucket[1] for bucket in stats.buckets.values()))
+        report = stats.report()
+        self.assertIn("7 test cases, 3 failed (42.86%), 1 with errors", report)
+        self.assertIn("req.b", report)
+
+    def test_timestamp_seconds(self):
+        """
+        Given: Two run database timestamps across midnight.
+        When: Calling timestamp_seconds.
+        Then: The difference is the elapsed time, and invalid timestamps give None.
+        """
+        self.assertAlmostEqual(
+            1.5,
+            run_analysis.timestamp_seconds("[2021-01-02 00:00:01,000]")
+            - run_analysis.timestamp_seconds("[2021-01-01 23:59:59,500]"),
+        )
+        self.assertIsNone(run_analysis.timestamp_seconds("yesterday"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+import os
+import tempfile
+import unittest
+
+from boofuzz import Block, Group, Request, Session, Target
+from boofuzz.connections import ITargetConnection
+from boofuzz.sampling import FeistelPermutation, StratifiedSampler, Stratum
+
+
+class RecordingConnection(ITargetConnection):
+    def __init__(self):
+        self.sent = []
+
+    def close(self):
+        pass
+
+    def open(self):
+        pass
+
+    def recv(self, max_bytes):
+        return b""
+
+    def send(self, data):
+        self.sent.append(data)
+        return len(data)
+
+    @property
+    def info(self):
+        return "recording connection"
+
+
+def _list_stratum(name, items, key=0):
+    return Stratum(name=name, size=len(items), fetch=lambda indices: {i: items[i] for i in indices}, key=key)
+
+
+class TestFeistelPermutation(unittest.TestCase):
+    def test_is_permutation(self):
+        """
+        Given: Permutations of various sizes, including sizes that are not powers of two.
+        When: Iterating over them.
+        Then: Every index appears exactly once.
+        """
+        for size in (1, 2, 3, 10, 255, 256, 1000):
+            self.assertEqual(list(range(size)), sorted(FeistelPermutation(size, key=1234)))
+
+    def test_keyed(self):
+        """
+        Given: Two permutations with the same size.
+        When: Comparing their order for the same and for different keys.
+        Then: The order only depends on the key.
+        """
+        self.assertEqual(list(FeistelPermutation(100, key=1)), list(FeistelPermutation(100, key=1)))
+        self.assertNotEqual(list(FeistelPermutation(100, key=1)), list(FeistelPermutation(100, key=2)))
+        self.assertNotEqual(list(range(100)), list(FeistelPermutation(100, key=1)))
+
+    def test_index_out_of_range(self):
+        with self.assertRaises(IndexError):
+            FeistelPermutation(10, key=1)[10]
+
+
+class TestStratifiedSampler(unittest.TestCase):
+    def test_draws_everything_once(self):
+        """
+        Given: A stratum larger than the fetch batch size.
+        When: Drawing until exhausted.
+        Then: Every item is drawn exactly once.
+        """
+        items = ["item{0}".format(i) for i in range(600)]
+        drawn = [item for _, _, item in StratifiedSampler([_list_stratum("s", items)])]
+
+        self.assertEqual(sorted(items), sorted(drawn))
+
+    def test_proportional_coverage(self):
+        """
+        Given: A small and a large stratum.
+        When: Drawing a fifth of all items.
+        Then: Both strata are covered to about the same fraction.
+        """
+        small = _list_stratum("small", list(range(20)))
+        large = _list_stratum("large", list(range(180)))
+        sampler = StratifiedSampler([small, large])
+
+        for n, _ in enumerate(sampler, start=1):
+            if n == 40:
+                break
+
+        self.assertEqual([("small", 4, 20), ("large", 36, 180)], sampler.coverage())
+
+
+class TestSessionBudget(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.connection = RecordingConnection()
+        self.request = Request(
+            "msg",
+            children=[
+                Group(name="first", default_value="a", values=["b", "c", "d"]),
+                Block(name="block", children=[Group(name="second", default_value="1", values=["2", "3"])]),
+                Group(name="third", default_value="x", values=["y"]),
+            ],
+        )
+        self.session = Session(
+            target=Target(connection=self.connection),
+            web_port=None,
+            fuzz_loggers=[],
+            db_filename=os.path.join(self.tmp_dir.name, "budget.db"),
+        )
+        self.session.connect(self.request)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_large_budget_covers_all_mutations_once(self):
+        """
+        Given: A session with a single message of three elements, one nested in a block.
+        When: Fuzzing with a budget large enough for all mutations.
+        Then: Each single mutation is sent exactly once and the coverage report is complete.
+        """
+        self.session.fuzz(budget=60, seed=1)
+
+        self.assertEqual(
+            sorted([b"b1x", b"c1x", b"d1x", b"a2x", b"a3x", b"a1y"]),
+            sorted(self.connection.sent),
+        )
+        self.assertEqual(
+            [("msg:msg.first", 3, 3), ("msg:msg.block.second", 2, 2), ("msg:msg.third", 1, 1)],
+            self.session.sampling_coverage,
+        )
+        self.assertEqual(self.session.total_num_mutations, self.session.total_mutant_index)
+
+    def test_budget_stops_run(self):
+        """
+        Given: A session.
+        When: Fuzzing with a budget that is used up by the first test case.
+        Then: The run stops cleanly after one test case.
+        """
+        self.session.fuzz(budget=0, seed=1)
+
+        self.assertEqual(1, len(self.connection.sent))
+        self.assertEqual(1, sum(covered for _, covered, _ in self.session.sampling_coverage))
+
+    def test_seed_reproduces_order(self):
+        """
+        Given: Two runs with the same seed.
+        Then: The test cases are sent in the same order.
+        """
+        self.session.fuzz(budget=60, seed=7)
+        first_run = list(self.connection.sent)
+        self.connection.sent = []
+
+        self.session.fuzz(budget=60, seed=7)
+
+        self.assertEqual(first_run, self.connection.sent)
+
+    def test_budget_with_name(self):
+        with self.assertRaises(ValueError):
+            self.session.fuzz(name="msg", budget=10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+import os
+import tempfile
+import unittest
+
+from boofuzz import Group, Request, Session, Static, Target
+from boofuzz.connections import ITargetConnection
+
+
+class CommandConnection(ITargetConnection):
+    """Fake target answering b"OK" to GET commands and b"ERROR: bad command" to anything else."""
+
+    def __init__(self):
+        self.last_sent = b""
+        self.num_sent = 0
+
+    def close(self):
+        pass
+
+    def open(self):
+        pass
+
+    def recv(self, max_bytes):
+        if self.last_sent.startswith(b"GET "):
+            return b"OK"
+        return b"ERROR: bad command"
+
+    def send(self, data):
+        self.last_sent = data
+        self.num_sent += 1
+        return len(data)
+
+    @property
+    def info(self):
+        return "command connection"
+
+
+class TestSessionCalibration(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.connection = CommandConnection()
+        self.request = Request(
+            "cmd",
+            children=[
+                Group(name="command", default_value="GET", values=["PUT", "POST", "DELETE", "HEAD"]),
+                Static(name="space", default_value=" "),
+                Group(name="comment", default_value="x", values=["y" * n for n in range(1, 11)]),
+            ],
+        )
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _session(self, **kwargs):
+        kwargs.setdefault("receive_data_after_fuzz", True)
+        session = Session(
+            target=Target(connection=self.connection),
+            web_port=None,
+            fuzz_loggers=[],
+            db_filename=os.path.join(self.tmp_dir.name, "calibration.db"),
+            sleep_time=0.02,  # keeps timing noise well within the calibration tolerance
+            **kwargs
+        )
+        session.connect(self.request)
+        return session
+
+    def test_insensitive_element_is_pruned(self):
+        """
+        Given: A target whose response depends on the command element but ignores the comment element.
+        When: Fuzzing with a calibration phase.
+        Then: Only the comment element is pruned, the report names it, and the comment mutations beyond the
+              budget are not sent.
+        """
+        session = self._session(calibration_samples=3, pruned_element_budget=2)
+        num_command_mutations = self.request.names["cmd.command"].get_num_mutations()
+        num_comment_mutations = self.request.names["cmd.comment"].get_num_mutations()
+
+        session.fuzz(max_depth=1)
+
+        self.assertEqual({"cmd.comment": num_comment_mutations - 2}, session.pruned_elements)
+        self.assertIn("cmd.comment: {0} test cases saved".format(num_comment_mutations - 2), session.pruning_report())
+        calibration_cases = 3 + 3 + 3
+        self.assertEqual(calibration_cases + num_command_mutations + 2, self.connection.num_sent)
+        self.assertEqual(session.total_num_mutations, session.total_mutant_index)
+
+    def test_calibration_by_name(self):
+        """
+        Given: A target whose response depends on the command element but ignores the comment element.
+        When: Fuzzing the request by name with a calibration phase.
+        Then: The calibration runs against the named request and prunes the comment element.
+        """
+        session = self._session(calibration_samples=2, pruned_element_budget=2)
+        fuzzed_nodes = []
+        session.register_post_test_case_callback(lambda *args, **kwargs: fuzzed_nodes.append(session.fuzz_node))
+
+        session.fuzz(name="cmd")
+
+        self.assertEqual(["cmd.comment"], list(session.pruned_elements))
+        self.assertEqual([self.request] * 6, fuzzed_nodes[:6])  # baseline, command and comment calibration cases
+
+    def test_no_calibration_without_responses(self):
+        """
+        Given: A Session with a calibration phase that does not receive responses to fuzzed messages.
+        When: Fuzzing.
+        Then: The calibration phase is skipped, so nothing is pruned and only the mutations are sent.
+        """
+        session = self._session(calibration_samples=2, receive_data_after_fuzz=False)
+
+        session.fuzz(max_depth=1)
+
+        self.assertEqual({}, session.pruned_elements)
+        self.assertEqual(self.request.get_num_mutations(), self.connection.num_sent)
+
+    def test_no_pruning_without_responses(self):
+        """
+        Given: A Session with a calibration phase and a target that never responds.
+        When: Fuzzing.
+        Then: The calibration cases are sent, but nothing is pruned on timing alone.
+        """
+        self.connection.recv = lambda max_bytes: b""
+        session = self._session(calibration_samples=2)
+
+        session.fuzz(max_depth=1)
+
+        self.assertEqual({}, session.pruned_elements)
+        self.assertEqual(2 + 2 + 2 + self.request.get_num_mutations(), self.connection.num_sent)
+
+    def test_no_calibration_by_default(self):
+        """
+        Given: A Session without calibration_samples.
+        When: Fuzzing.
+        Then: Nothing is pruned and every mutation is sent.
+        """
+        session = self._session()
+
+        session.fuzz(max_depth=1)
+
+        self.assertEqual({}, session.pruned_elements)
+        self.assertEqual(self.request.get_num_mutations(), self.connection.num_sent)
+
+
+class TestIsElementInsensitive(unittest.TestCase):
+    def test_decision(self):
+        """
+        Given: Calibration results for a baseline and an element.
+        When: Deciding whether the element is insensitive.
+        Then: Failures, new response classes and shifted timing each keep the element.
+        """
+        baseline = [("ok", 0.010, False), ("ok", 0.011, False), ("ok", 0.012, False)]
+
+        self.assertTrue(Session._is_element_insensitive(baseline, [("ok", 0.011, False), ("ok", 0.012, False)]))
+        self.assertFalse(Session._is_element_insensitive(baseline, [("ok", 0.011, True)]))
+        self.assertFalse(Session._is_element_insensitive(baseline, [("error", 0.011, False)]))
+        self.assertFalse(Session._is_element_insensitive(baseline, [("ok", 0.5, False)]))
+        self.assertFalse(Session._is_element_insensitive(baseline, []))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+from boofuzz.spill_dict import SpillDict
+
+
+class TestSpillDict(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_filename = os.path.join(self.tmp_dir.name, "run.db")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_evicted_entries_are_spilled(self):
+        """
+        Given: A SpillDict keeping 2 entries in memory.
+        When: Adding 5 entries.
+        Then: 3 entries are spilled, and all entries are still found, counted and iterated.
+        """
+        d = SpillDict(self.db_filename, "failures", max_items=2)
+        for i in range(5):
+            d[i] = ["crash {0}".format(i)]
+
+        self.assertEqual(3, d.num_spilled)
+        self.assertEqual(5, len(d))
+        self.assertIn(0, d)
+        self.assertNotIn(5, d)
+        self.assertEqual([0, 1, 2, 3, 4], sorted(d))
+        self.assertEqual({i: ["crash {0}".format(i)] for i in range(5)}, dict(d.items()))
+
+    def test_spilled_value_modified_in_place(self):
+        """
+        Given: A SpillDict with a spilled entry.
+        When: Appending to the value fetched with d[key], then evicting it again.
+        Then: The modification is kept.
+        """
+        d = SpillDict(self.db_filename, "failures", max_items=1)
+        d["a"] = ["first"]
+        d["b"] = ["other"]
+
+        d["a"].append("second")
+        d["c"] = ["other"]
+        d["d"] = ["other"]
+
+        self.assertEqual(["first", "second"], d["a"])
+
+    def test_namespaces_are_separate(self):
+        """
+        Given: Two SpillDicts spilling to the same database with different namespaces.
+        When: Both spill an entry with the same key.
+        Then: Each sees only its own entry.
+        """
+        first = SpillDict(self.db_filename, "first", max_items=0)
+        second = SpillDict(self.db_filename, "second", max_items=0)
+        first[1] = "one"
+        second[1] = "uno"
+
+        self.assertEqual("one", first[1])
+        self.assertEqual("uno", second[1])
+
+    def test_pickle_keeps_reference(self):
+        """
+        Given: A SpillDict with spilled and in-memory entries.
+        When: Pickling and unpickling it.
+        Then: The copy finds all entries, and the pickle does not contain the spilled values.
+        """
+        d = SpillDict(self.db_filename, "failures", max_items=1)
+        d[1] = "x" * 1000
+        d[2] = "small"
+
+        data = pickle.dumps(d)
+        copy = pickle.loads(data)
+
+        self.assertLess(len(data), 1000)
+        self.assertEqual({1: "x" * 1000, 2: "small"}, dict(copy.items()))
+
+    def test_without_database(self):
+        """
+        Given: A SpillDict without database.
+        When: Adding more entries than max_items.
+        Then: All are kept in memory.
+        """
+        d = SpillDict(max_items=1)
+        d[1] = "a"
+        d[2] = "b"
+        del d[1]
+
+        self.assertEqual({2: "b"}, dict(d.items()))
+        self.assertEqual(0, d.num_spilled)
+
+
+if __name__ == "__main__":
+    unittest.main()
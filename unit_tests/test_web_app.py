@@ -0,0 +1,114 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from boofuzz.fuzz_logger_db import FuzzLoggerDb
+from boofuzz.sessions import SessionInfo
+from boofuzz.web import app as web_app
+from boofuzz.web.app import app
+
+
+class CountingSessionInfo(SessionInfo):
+    def __init__(self, db_filename):
+        super(CountingSessionInfo, self).__init__(db_filename=db_filename)
+        self.test_case_reads = 0
+
+    def test_case_data(self, index):
+        self.test_case_reads += 1
+        return super(CountingSessionInfo, self).test_case_data(index)
+
+
+class TestWebApp(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        db_filename = os.path.join(self.tmp_dir.name, "run.db")
+        logger = FuzzLoggerDb(db_filename=db_filename)
+        for index in range(1, 8):
+            element = "req.a" if index < 5 else "req.b"
+            logger.open_test_case("id", name="req:[{0}:{1}]".format(element, index), index=index)
+            logger.log_send(b"\x00" * 100)
+            logger.log_fail("crash {0}".format(index))
+            logger.close_test_case()
+        logger.close_test()
+        app.session = CountingSessionInfo(db_filename=db_filename)
+        self.client = app.test_client()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_failure_pages(self):
+        """
+        Given: A run with 7 failing test cases.
+        When: Requesting pages of 3 failures, and a page filtered by element.
+        Then: The pages follow each other by cursor until the last page, and the filter applies.
+        """
+        keys = []
+        after = 0
+        while after is not None:
+            response = json.loads(self.client.get("/api/failures?limit=3&after={0}".format(after)).data)
+            keys.append([crash["key"] for crash in response["failures"]])
+            after = response["next"]
+
+        self.assertEqual([[1, 2, 3], [4, 5, 6], [7]], keys)
+        response = json.loads(self.client.get("/api/failures?element=req.b").data)
+        self.assertEqual([5, 6, 7], [crash["key"] for crash in response["failures"]])
+        self.assertEqual(["crash 5"], response["failures"][0]["reasons"])
+        counts = json.loads(self.client.get("/api/failure-counts/element").data)["counts"]
+        self.assertEqual([{"value": "req.a", "count": 4}, {"value": "req.b", "count": 3}], counts)
+        self.assertEqual(404, self.client.get("/api/failure-counts/description").status_code)
+
+    def test_index_shows_first_page(self):
+        """
+        Given: A run with more failing test cases than fit on a page.
+        When: Requesting the index page and /api/current-run after a cursor.
+        Then: Only the first page is rendered with a cursor for the rest, and the API returns failures after the cursor.
+        """
+        page_size, web_app.FAILURE_PAGE_SIZE = web_app.FAILURE_PAGE_SIZE, 5
+        try:
+            page = self.client.get("/").data.decode()
+        finally:
+            web_app.FAILURE_PAGE_SIZE = page_size
+
+        self.assertIn('data-next="5"', page)
+        self.assertIn("crash 5", page)
+        self.assertNotIn("crash 6", page)
+        info = json.loads(self.client.get("/api/current-run?failures_after=5").data)["session_info"]
+        self.assertEqual([6, 7], [crash["key"] for crash in info["crashes"]])
+        self.assertIsNone(info["crashes_next"])
+
+    def test_test_case_views_cached(self):
+        """
+        Given: A finished run.
+        When: Viewing the same test case twice as a page and through the API.
+        Then: The test case is read and rendered once, and the page shows its failure.
+        """
+        first = self.client.get("/test-case/2").data.decode()
+        self.client.get("/api/test-case/2")
+        second = self.client.get("/test-case/2").data.decode()
+
+        self.assertEqual(first, second)
+        self.assertIn("crash 2", first)
+        self.assertEqual(1, app.session.test_case_reads)
+
+    def test_num_mutations_counted_once(self):
+        """
+        Given: A session fuzzing a node.
+        When: Reading the node's number of mutations twice, then again after the total changes.
+        Then: The mutations are counted once per fuzzed node and total, and the count is kept on the app.
+        """
+        fuzz_node = mock.Mock(**{"get_num_mutations.return_value": 42})
+        app.session = mock.Mock(fuzz_node=fuzz_node, total_num_mutations=100)
+
+        self.assertEqual(42, web_app._num_mutations_element())
+        self.assertEqual(42, web_app._num_mutations_element())
+        self.assertEqual(1, fuzz_node.get_num_mutations.call_count)
+        app.session.total_num_mutations = 90
+        self.assertEqual(42, web_app._num_mutations_element())
+        self.assertEqual(2, fuzz_node.get_num_mutations.call_count)
+        self.assertIs(fuzz_node, app.num_mutations_cache[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
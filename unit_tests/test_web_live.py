@@ -0,0 +1,148 @@
+import concurrent.futures
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import tornado
+from tornado.testing import AsyncHTTPTestCase
+
+from boofuzz import Request, Session, Static
+from boofuzz.web import live
+from boofuzz.web.app import app
+
+
+class FakeClient:
+    def __init__(self):
+        self.messages = []
+
+    def send(self, message):
+        self.messages.append(message)
+
+    def events(self):
+        events = []
+        for message in self.messages:
+            for block in message.strip().split("\n\n"):
+                event_line, data_line = block.split("\n")
+                events.append((event_line[len("event: ") :], json.loads(data_line[len("data: ") :])))
+        return events
+
+
+class TestLiveUpdates(AsyncHTTPTestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.session = Session(
+            fuzz_loggers=[], web_port=None, db_filename=os.path.join(self.tmp_dir.name, "run.db"), keep_web_open=False
+        )
+        self.session.connect(Request("req", children=[Static(name="static", default_value=b"A")]))
+        app.session = self.session
+        self.live_updates = live.LiveUpdates(session=self.session)
+        super(TestLiveUpdates, self).setUp()
+
+    def tearDown(self):
+        super(TestLiveUpdates, self).tearDown()
+        self.session._db_logger.close_test()
+        self.tmp_dir.cleanup()
+
+    def get_app(self):
+        return live.make_application(app, live_updates=self.live_updates)
+
+    def _log_case(self, index, fail=False):
+        self.live_updates.open_test_case("id", name="req:[req.static:{0}]".format(index), index=index)
+        self.live_updates.log_send(b"A" * 1000)
+        self.live_updates.log_recv(b"reply")
+        if fail:
+            self.live_updates.log_fail("crash")
+
+    def test_idle_without_clients(self):
+        """
+        Given: LiveUpdates without clients.
+        When: Logging a test case.
+        Then: Nothing is recorded.
+        """
+        self._log_case(1, fail=True)
+
+        self.assertFalse(self.live_updates.active)
+        self.assertIsNone(self.live_updates._case)
+        self.assertEqual(0, len(self.live_updates._failures))
+
+    def test_publish_incremental_events(self):
+        """
+        Given: LiveUpdates with one client.
+        When: Logging test cases and steps between calls to publish.
+        Then: The client first gets progress, then failures and the current case, then only new steps.
+         and: Long data is shortened.
+        """
+        client = FakeClient()
+        self.live_updates.subscribe(client)
+        self._log_case(1)
+        self._log_case(2, fail=True)
+
+        self.live_updates.publish()
+        events = client.events()
+        self.assertEqual(["progress", "failures", "case"], [event for event, _ in events])
+        self.assertEqual([{"key": 2, "reasons": ["crash"]}], events[1][1])
+        self.assertEqual(2, events[2][1]["index"])
+        self.assertEqual(4, len(events[2][1]["log_data"]))
+        self.assertIn("bytes omitted", events[2][1]["log_data"][1]["log_line"])
+
+        client.messages = []
+        self.live_updates.log_info("more")
+        self.live_updates.publish()
+        events = [(event, data) for event, data in client.events() if event != "progress"]
+        self.assertEqual(["steps"], [event for event, _ in events])
+        self.assertEqual(1, len(events[0][1]["log_data"]))
+
+        client.messages = []
+        self.live_updates.publish()
+        self.assertEqual([], [event for event, _ in client.events() if event != "progress"])
+
+        self.live_updates.unsubscribe(client)
+        self.assertFalse(self.live_updates.active)
+
+    def test_flask_routes_still_served(self):
+        """
+        Given: The tornado application with live updates.
+        When: Requesting /api/current-run.
+        Then: The Flask app answers it.
+        """
+        response = self.fetch("/api/current-run")
+
+        self.assertEqual(200, response.code)
+        self.assertIn("session_info", json.loads(response.body))
+
+    def test_event_stream(self):
+        """
+        Given: The tornado application with live updates.
+        When: Connecting to /api/events.
+        Then: The stream starts with a progress event and the handler is subscribed.
+        """
+        chunks = []
+
+        def on_chunk(chunk):
+            chunks.append(chunk)
+            if b"event: progress" in b"".join(chunks):
+                self.stop()
+
+        self.http_client.fetch(self.get_url("/api/events"), streaming_callback=on_chunk, raise_error=False)
+        self.wait(timeout=5)
+
+        self.assertEqual(1, self.live_updates.num_clients)
+        self.assertIn(b"event: progress\ndata: {", b"".join(chunks))
+
+
+class TestMakeApplication(unittest.TestCase):
+    def test_executor_needs_tornado_6_3(self):
+        """
+        Given: An executor for Flask requests.
+        When: Building the application with tornado 6.2 and 6.3.
+        Then: The executor is only passed to the WSGI container from tornado 6.3 on, which added the argument.
+        """
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(executor.shutdown)
+        for version_info, expected in (((6, 2, 0, 0), {}), ((6, 3, 0, 0), {"executor": executor})):
+            with mock.patch.object(tornado, "version_info", version_info):
+                with mock.patch.object(live, "WSGIContainer") as container:
+                    live.make_application(app, executor=executor)
+            container.assert_called_once_with(app, **expected)
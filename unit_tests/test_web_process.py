@@ -0,0 +1,201 @@
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+import urllib.request
+
+from boofuzz import phase_timing, Request, Session, Static
+from boofuzz.fuzz_logger_db import FuzzLoggerDb, FuzzLoggerDbReader
+from boofuzz.web import process, status
+from boofuzz.web.app import app
+
+
+def make_status(**kwargs):
+    fields = {
+        "total_mutant_index": 3,
+        "total_num_mutations": 10,
+        "mutant_index": 2,
+        "num_mutations_element": 5,
+        "num_cases_actually_fuzzed": 3,
+        "start_time": 1000.0,
+        "cumulative_pause_time": 0.0,
+        "end_time": 1002.0,
+        "pause_toggles_seen": 0,
+        "is_paused": False,
+        "current_element": "req",
+        "current_test_case_name": "req:[req.static:2]",
+    }
+    fields.update(kwargs)
+    return status.Status(**fields)
+
+
+class TestWebProcess(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_filename = os.path.join(self.tmp_dir.name, "run.db")
+        self.status_filename = os.path.join(self.tmp_dir.name, "status")
+        logger = FuzzLoggerDb(db_filename=self.db_filename)
+        for index in (1, 2):
+            logger.open_test_case("id", name="req:[req.static:{0}]".format(index), index=index)
+            logger.log_send(b"A")
+            if index == 2:
+                logger.log_fail("crash")
+            logger.close_test_case()
+        logger.close_test()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_status_block_round_trip(self):
+        """
+        Given: A StatusBlock created by the fuzzing process and opened a second time by the web UI process.
+        When: Writing a status with unknown totals and a name longer than the block allows.
+        Then: The reader gets the same status, with None kept and the name truncated.
+        """
+        writer = status.StatusBlock(self.status_filename, create=True)
+        reader = status.StatusBlock(self.status_filename)
+        long_name = "x" * (status.MAX_TEST_CASE_NAME_LENGTH + 10)
+
+        writer.write(make_status(total_num_mutations=None, end_time=None, current_test_case_name=long_name))
+
+        self.assertEqual(
+            make_status(
+                total_num_mutations=None, end_time=None, current_test_case_name="x" * status.MAX_TEST_CASE_NAME_LENGTH
+            ),
+            reader.read(),
+        )
+        reader.close()
+        writer.close(remove=True)
+        self.assertFalse(os.path.exists(self.status_filename))
+
+    def test_phase_timings_round_trip(self):
+        """
+        Given: A StatusBlock shared by the fuzzing process and the web UI process.
+        When: Publishing phase timings and requesting the progress from the web UI.
+        Then: The web UI shows the measured phases in order.
+        """
+        status_block = status.StatusBlock(self.status_filename, create=True)
+        stats = [
+            phase_timing.PhaseStats("fuzz_send", 3, 0.003, 0.001, 0.001, 0.001),
+            phase_timing.PhaseStats("connect", 3, 0.3, 0.1, 0.1, 0.1),
+        ]
+
+        status_block.write_phase_timings(stats)
+        app.session = process.StatusSessionInfo(status_block=status_block, db_filename=self.db_filename)
+        info = json.loads(app.test_client().get("/api/current-run").data)["session_info"]
+
+        self.assertEqual(["connect", "fuzz_send"], [timing["phase"] for timing in info["phase_timings"]])
+        self.assertEqual(stats[1]._asdict(), info["phase_timings"][0])
+        status_block.close(remove=True)
+
+    def test_read_only_reader(self):
+        """
+        Given: A run database.
+        When: Opening it with a read-only FuzzLoggerDbReader.
+        Then: Test cases can be read, and writes fail.
+        """
+        reader = FuzzLoggerDbReader(db_filename=self.db_filename, read_only=True)
+
+        self.assertEqual("req:[req.static:2]", reader.get_test_case_data(2).name)
+        self.assertEqual({2: ["crash"]}, dict(reader.failure_map))
+        with self.assertRaises(sqlite3.OperationalError):
+            reader.query("DELETE FROM cases")
+
+    def test_status_session_info(self):
+        """
+        Given: The web UI serving a StatusSessionInfo.
+        When: Requesting the progress and toggling pause.
+        Then: Progress comes from the status block and failures from the database.
+         and: The pause toggle is requested through the status block and shown right away.
+        """
+        status_block = status.StatusBlock(self.status_filename, create=True)
+        status_block.write(make_status())
+        app.session = process.StatusSessionInfo(status_block=status_block, db_filename=self.db_filename)
+        client = app.test_client()
+
+        info = json.loads(client.get("/api/current-run").data)["session_info"]
+        self.assertEqual(
+            (3, 10, 2, 5),
+            tuple(
+                info[k] for k in ("current_index", "num_mutations", "current_index_element", "num_mutations_element")
+            ),
+        )
+        self.assertEqual("req", info["current_element"])
+        self.assertAlmostEqual(2.0, info["runtime"])
+        self.assertAlmostEqual(1.5, info["exec_speed"])
+        self.assertEqual([2], [crash["key"] for crash in info["crashes"]])
+        self.assertEqual(200, client.get("/api/test-case/1").status_code)
+
+        client.get("/togglepause")
+        self.assertEqual(1, status_block.pause_toggles)
+        self.assertTrue(app.session.is_paused)
+        status_block.close(remove=True)
+
+    def test_metrics_from_file(self):
+        """
+        Given: The web UI process serving a StatusSessionInfo with and without a metrics file.
+        When: Requesting /metrics.
+        Then: The metrics file written by the session is served, and without one the endpoint is not found.
+        """
+        status_block = status.StatusBlock(self.status_filename, create=True)
+        metrics_filename = os.path.join(self.tmp_dir.name, "run.prom")
+        with open(metrics_filename, "w") as f:
+            f.write("boofuzz_test_cases_total 2\n")
+
+        app.session = process.StatusSessionInfo(
+            status_block=status_block, db_filename=self.db_filename, metrics_filename=metrics_filename
+        )
+        self.assertEqual(b"boofuzz_test_cases_total 2\n", app.test_client().get("/metrics").data)
+        app.session = process.StatusSessionInfo(status_block=status_block, db_filename=self.db_filename)
+        self.assertEqual(404, app.test_client().get("/metrics").status_code)
+        status_block.close(remove=True)
+
+    def test_session_applies_pause_toggle(self):
+        """
+        Given: A Session serving its web UI from a separate process.
+        When: The web UI process requests a pause toggle.
+        Then: The session pauses on its next status update and publishes it.
+        """
+        session = Session(
+            fuzz_loggers=[],
+            web_port=0,
+            web_process=True,
+            db_filename=os.path.join(self.tmp_dir.name, "session.db"),
+            keep_web_open=False,
+        )
+        session.connect(Request("req", children=[Static(name="static", default_value=b"A")]))
+        web_status = status.StatusBlock(session._web_process.status.filename)
+
+        web_status.request_pause_toggle()
+        session._publish_web_status()
+
+        self.assertTrue(session.is_paused)
+        self.assertEqual((True, 1), (web_status.read().is_paused, web_status.read().pause_toggles_seen))
+        web_status.close()
+        session._web_process.stop()
+        session._db_logger.close_test()
+
+    def test_serve_in_process(self):
+        """
+        Given: A WebProcess for a run database.
+        When: Starting it on any free port and requesting the progress.
+        Then: The separate process answers, and stopping it ends the process and removes the status block.
+        """
+        web_process = process.WebProcess(db_filename=self.db_filename, port=0, address="127.0.0.1")
+        web_process.status.write(make_status())
+
+        port = web_process.start()
+        try:
+            with urllib.request.urlopen("http://127.0.0.1:{0}/api/current-run".format(port), timeout=10) as response:
+                info = json.loads(response.read())["session_info"]
+        finally:
+            web_process.stop()
+
+        self.assertEqual("req:[req.static:2]", info["current_test_case_name"])
+        self.assertFalse(web_process.is_alive())
+        self.assertFalse(os.path.exists(web_process.status.filename))
+
+
+if __name__ == "__main__":
+    unittest.main()